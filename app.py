@@ -1,23 +1,107 @@
+import io
+import math
+import time
+from typing import Optional
+
 from dotenv import load_dotenv
-from flask import Flask, jsonify, make_response, Response, request
+from flask import Flask, g, jsonify, make_response, Response, request, stream_with_context
+from flask.json.provider import JSONProvider
+from flask.logging import default_handler
 # from flask_cors import CORS
 
-from meal_max.models import kitchen_model
-from meal_max.models.battle_model import BattleModel
-from meal_max.utils.sql_utils import check_database_connection, check_table_exists
+from meal_max.models import kitchen_model, odds
+from meal_max.models.arena_model import DEFAULT_ARENA_ID, get_arena_store
+from meal_max.models.battle_model import run_battles
+from meal_max.models.battle_writer import get_battle_writer
+from meal_max.models.tournament_model import TournamentModel
+from meal_max.utils.bulk_io import BULK_FORMATS, format_bulk, parse_bulk
+from meal_max.utils.logger import configure_logger
+from meal_max.utils import metrics, serialization
+from meal_max.utils.random_source import get_random_source
+from meal_max.utils.server_config import ServerConfig
+from meal_max.utils.sql_utils import check_database_connection, check_table_exists, get_pool_stats
 
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Battles queued for a write-behind flush are per process. With several workers they only
+# join the leaderboard ETag once flushed, so every worker hands out the same ETag.
+LEADERBOARD_ETAG_QUEUED = not ServerConfig.from_env().shares_workers
+
+
+class FastJSONProvider(JSONProvider):
+    """Serializes jsonify() responses with serialization.dumps (orjson when available).
+
+    Keys stay sorted, like Flask's default provider, so response bodies are unchanged
+    apart from non-ASCII text being sent as UTF-8 rather than escaped.
+    """
+
+    sort_keys = True
+    mimetype = "application/json"
+
+    def dumps(self, obj, **kwargs) -> str:
+        return serialization.dumps(obj, sort_keys=kwargs.get('sort_keys', self.sort_keys),
+                                   indent=bool(kwargs.get('indent'))).decode()
+
+    def loads(self, s, **kwargs):
+        return serialization.loads(s)
+
+    def response(self, *args, **kwargs) -> Response:
+        # Bytes straight from the backend, skipping the str round trip of the default provider.
+        body = serialization.dumps(self._prepare_response_obj(args, kwargs), sort_keys=self.sort_keys,
+                                   indent=self._app.debug)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
+# Route logs follow LOG_LEVEL / LOG_FORMAT like the rest of the package
+app.logger.removeHandler(default_handler)
+configure_logger(app.logger)
 # This bypasses standard security stuff we'll talk about later
 # If you get errors that use words like cross origin or flight,
 # uncomment this
 # CORS(app)
 
-# Initialize the BattleModel
-battle_model = BattleModel()
+# Combatants live in per-session arenas (see ARENA_STORE); the legacy routes use the default arena
+tournament_model = TournamentModel()
+
+if metrics.METRICS_ENABLED:
+    @app.before_request
+    def start_request_timer() -> None:
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def observe_request_latency(response: Response) -> Response:
+        start = g.pop('request_start', None)
+        if start is not None:
+            # The URL rule, not the path, so /api/get-meal-by-id/<int:meal_id> is one series
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            metrics.HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, route=route,
+                                                  method=request.method, status=response.status_code)
+        return response
+
+if serialization.COMPRESS_MIN_BYTES > 0:
+    @app.after_request
+    def compress_response(response: Response) -> Response:
+        """Gzips large JSON bodies (see COMPRESS_MIN_BYTES) for clients that accept gzip."""
+        if (response.mimetype != "application/json" or response.direct_passthrough or response.is_streamed
+                or response.status_code != 200 or 'Content-Encoding' in response.headers):
+            return response
+        response.vary.add('Accept-Encoding')
+        if 'gzip' not in request.accept_encodings:
+            return response
+        body = serialization.compress(response.get_data())
+        if body is None:
+            return response
+        response.set_data(body)
+        response.headers['Content-Encoding'] = 'gzip'
+        # The compressed bytes differ from the identity ones, so a strong validator must become weak.
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
 
 ####################################################
 #
@@ -58,6 +142,35 @@ def db_check() -> Response:
     except Exception as e:
         return make_response(jsonify({'error': str(e)}), 404)
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics_endpoint() -> Response:
+    """
+    Route to expose request, query, random source, battle and connection metrics.
+
+    Returns:
+        The metrics of this worker process in the Prometheus text format.
+    Raises:
+        404 error if metrics are disabled (METRICS_ENABLED=false).
+    """
+    if not metrics.METRICS_ENABLED:
+        return make_response(jsonify({'error': 'Metrics are disabled'}), 404)
+    return Response(metrics.render(), mimetype=None, content_type=metrics.CONTENT_TYPE)
+
+@app.route('/api/db-pool-stats', methods=['GET'])
+def db_pool_stats() -> Response:
+    """
+    Route to get the connection pool hit/miss/wait metrics.
+
+    Returns:
+        JSON response with the current pool counters.
+    """
+    try:
+        app.logger.info("Retrieving connection pool stats")
+        return make_response(jsonify({'status': 'success', 'pool': get_pool_stats()}), 200)
+    except Exception as e:
+        app.logger.error(f"Error retrieving pool stats: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
 
 ##########################################################
 #
@@ -115,6 +228,81 @@ def add_meal() -> Response:
         app.logger.error("Failed to add combatant: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
+def bulk_format_arg() -> str:
+    """
+    Picks the bulk format from the ?format= parameter, falling back to the Content-Type.
+
+    Raises:
+        ValueError: If the format is not one of BULK_FORMATS.
+    """
+    bulk_format = request.args.get('format')
+    if bulk_format is None:
+        bulk_format = 'csv' if 'csv' in (request.mimetype or '') else 'ndjson'
+    if bulk_format not in BULK_FORMATS:
+        raise ValueError(f"format must be one of {BULK_FORMATS}")
+    return bulk_format
+
+@app.route('/api/create-meals-bulk', methods=['POST'])
+def add_meals_bulk() -> Response:
+    """
+    Route to add many meals from an NDJSON or CSV request body.
+
+    The body is parsed and inserted as it streams in, one chunk per transaction, so imports
+    are not limited by request size. Invalid rows and duplicate names are skipped and reported.
+
+    Query Parameters:
+        - format (str, optional): 'ndjson' or 'csv'. Default is taken from the Content-Type
+          (text/csv for CSV, anything else for NDJSON).
+
+    Expected Input (one meal per line or CSV row):
+        - meal, cuisine, price, difficulty, and optionally battles, wins and deleted.
+
+    Returns:
+        JSON response with the inserted and failed counts and the per-row errors.
+    Raises:
+        400 error if the format is invalid.
+        500 error if there is an issue writing to the database.
+    """
+    try:
+        try:
+            bulk_format = bulk_format_arg()
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 400)
+        app.logger.info("Importing meals in bulk (%s)", bulk_format)
+
+        lines = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+        summary = kitchen_model.create_meals_bulk(parse_bulk(lines, bulk_format))
+
+        app.logger.info("Bulk import finished: %d inserted, %d failed", summary['inserted'], summary['failed'])
+        return make_response(jsonify({'status': 'success', **summary}), 201)
+    except Exception as e:
+        app.logger.error("Failed to import meals: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/export-meals', methods=['GET'])
+def export_meals() -> Response:
+    """
+    Route to stream every meal as NDJSON or CSV.
+
+    Query Parameters:
+        - format (str, optional): 'ndjson' or 'csv'. Default is 'ndjson'.
+        - include_deleted (bool, optional): Whether to include deleted meals. Default is false.
+
+    Returns:
+        A streamed NDJSON or CSV response with one meal per line.
+    Raises:
+        400 error if the format is invalid.
+    """
+    bulk_format = request.args.get('format', 'ndjson')
+    if bulk_format not in BULK_FORMATS:
+        return make_response(jsonify({'error': f"format must be one of {BULK_FORMATS}"}), 400)
+    include_deleted = request.args.get('include_deleted', 'false').lower() in ('1', 'true', 'yes')
+    app.logger.info("Exporting meals (%s)", bulk_format)
+
+    rows = kitchen_model.iter_meals(include_deleted=include_deleted)
+    mimetype = 'text/csv' if bulk_format == 'csv' else 'application/x-ndjson'
+    return Response(stream_with_context(format_bulk(rows, bulk_format)), mimetype=mimetype)
+
 @app.route('/api/clear-meals', methods=['DELETE'])
 def clear_catalog() -> Response:
     """
@@ -151,6 +339,21 @@ def delete_meal(meal_id: int) -> Response:
         app.logger.error(f"Error deleting meal: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
 
+@app.route('/api/meal-cache-stats', methods=['GET'])
+def meal_cache_stats() -> Response:
+    """
+    Route to get the hit-rate statistics of the meal cache.
+
+    Returns:
+        JSON response with the meal cache counters.
+    """
+    try:
+        app.logger.info("Retrieving meal cache stats")
+        return make_response(jsonify({'status': 'success', 'cache': kitchen_model.get_meal_cache_stats()}), 200)
+    except Exception as e:
+        app.logger.error(f"Error retrieving meal cache stats: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
 @app.route('/api/get-meal-by-id/<int:meal_id>', methods=['GET'])
 def get_meal_by_id(meal_id: int) -> Response:
     """
@@ -202,39 +405,174 @@ def get_meal_by_name(meal_name: str) -> Response:
 ############################################################
 
 
+@app.route('/api/arenas', methods=['POST'])
+def create_arena() -> Response:
+    """
+    Route to create a new arena with its own empty combatant list.
+
+    Returns:
+        JSON response with the new arena's ID.
+    Raises:
+        500 error if there is an issue creating the arena.
+    """
+    try:
+        arena_id = get_arena_store().create()
+        return make_response(jsonify({'status': 'success', 'arena_id': arena_id}), 201)
+    except Exception as e:
+        app.logger.error("Failed to create arena: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/arenas/<string:arena_id>', methods=['DELETE'])
+def delete_arena(arena_id: str) -> Response:
+    """
+    Route to delete an arena.
+
+    Path Parameter:
+        - arena_id (str): The ID of the arena to delete.
+
+    Returns:
+        JSON response indicating success of the operation.
+    Raises:
+        404 error if the arena does not exist.
+        500 error if there is an issue deleting the arena.
+    """
+    try:
+        if not get_arena_store().delete(arena_id):
+            return make_response(jsonify({'error': f"Arena {arena_id} not found"}), 404)
+        return make_response(jsonify({'status': 'success'}), 200)
+    except Exception as e:
+        app.logger.error("Failed to delete arena: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/arena-stats', methods=['GET'])
+def arena_stats() -> Response:
+    """
+    Route to get the arena count and store settings.
+
+    Returns:
+        JSON response with the arena store stats.
+    """
+    try:
+        return make_response(jsonify({'status': 'success', 'arenas': get_arena_store().stats()}), 200)
+    except Exception as e:
+        app.logger.error("Failed to get arena stats: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+def arena_session(arena_id: str):
+    """
+    Opens a session on an arena. The default arena is created on first use.
+
+    Raises:
+        ValueError: If any other arena does not exist.
+    """
+    return get_arena_store().session(arena_id, create=arena_id == DEFAULT_ARENA_ID)
+
+def arena_not_found(arena_id: str) -> Response:
+    return make_response(jsonify({'error': f"Arena {arena_id} not found"}), 404)
+
 @app.route('/api/battle', methods=['GET'])
-def battle() -> Response:
+@app.route('/api/arenas/<string:arena_id>/battle', methods=['GET'])
+def battle(arena_id: str = DEFAULT_ARENA_ID) -> Response:
     """
     Route to initiate a battle between the two currently prepared meals.
 
+    Path Parameter:
+        - arena_id (str, optional): The arena to battle in. Default is the shared default arena.
+
     Returns:
         JSON response indicating the result of the battle and the winner.
     Raises:
+        404 error if the arena does not exist.
         500 error if there is an issue during the battle.
     """
     try:
         app.logger.info('Two meals enter, one meal leaves!')
 
-        winner = battle_model.battle()
+        if not get_arena_store().exists(arena_id) and arena_id != DEFAULT_ARENA_ID:
+            return arena_not_found(arena_id)
+        with arena_session(arena_id) as battle_model:
+            winner = battle_model.battle()
 
         return make_response(jsonify({'status': 'success', 'winner': winner}), 200)
     except Exception as e:
         app.logger.error(f"Battle error: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
 
+def is_json_int(value) -> bool:
+    """Returns whether a parsed JSON value is an integer. JSON true / false parse to bool, a subclass of int."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+@app.route('/api/battles', methods=['POST'])
+def run_battle_batch() -> Response:
+    """
+    Route to run many independent battles at once and record every result.
+
+    The battles run on the async battle path, all waiting on randomness together, so a
+    batch takes about as long as its slowest battle rather than the sum of them. Each
+    battle is recorded on its own: if some fail, the others are still recorded, and the
+    response reports the outcome of every pairing.
+
+    Expected JSON Input:
+        - pairings (list[list[int]]): [combatant_1, combatant_2] meal ID pairs, at most
+          BATTLES_MAX_PAIRINGS of them.
+
+    Returns:
+        JSON response with one result per pairing, in order: {'winner': name} for a recorded
+        battle, or {'error': message} for one that failed and was not recorded. The status
+        is 'success' when every battle was recorded, 'partial' otherwise.
+    Raises:
+        400 error if input validation fails or a meal is deleted or not found; no battle is
+        played then.
+        500 error if there is an issue starting the battles.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        pairings = data.get('pairings')
+
+        if not isinstance(pairings, list) or not all(
+                isinstance(pair, list) and len(pair) == 2 and all(is_json_int(meal_id) for meal_id in pair)
+                for pair in pairings):
+            return make_response(jsonify({'error': 'pairings must be a list of [meal_id, meal_id] pairs'}), 400)
+
+        app.logger.info("Running %d battles", len(pairings))
+        try:
+            outcomes = run_battles(pairings)
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 400)
+
+        results = [{'error': str(outcome)} if isinstance(outcome, Exception) else {'winner': outcome}
+                   for outcome in outcomes]
+        failed = sum('error' in result for result in results)
+        if failed:
+            app.logger.error("%d of %d battles failed", failed, len(results))
+        return make_response(jsonify({'status': 'partial' if failed else 'success', 'results': results,
+                                      'recorded': len(results) - failed}), 200)
+    except Exception as e:
+        app.logger.error(f"Battles error: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
 @app.route('/api/clear-combatants', methods=['POST'])
-def clear_combatants() -> Response:
+@app.route('/api/arenas/<string:arena_id>/clear-combatants', methods=['POST'])
+def clear_combatants(arena_id: str = DEFAULT_ARENA_ID) -> Response:
     """
     Route to clear the list of combatants for the battle.
 
+    Path Parameter:
+        - arena_id (str, optional): The arena to clear. Default is the shared default arena.
+
     Returns:
         JSON response indicating success of the operation.
     Raises:
+        404 error if the arena does not exist.
         500 error if there is an issue clearing combatants.
     """
     try:
         app.logger.info('Clearing all combatants...')
-        battle_model.clear_combatants()
+        try:
+            with arena_session(arena_id) as battle_model:
+                battle_model.clear_combatants()
+        except ValueError:
+            return arena_not_found(arena_id)
         app.logger.info('Combatants cleared.')
         return make_response(jsonify({'status': 'success'}), 200)
     except Exception as e:
@@ -242,26 +580,111 @@ def clear_combatants() -> Response:
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/get-combatants', methods=['GET'])
-def get_combatants() -> Response:
+@app.route('/api/arenas/<string:arena_id>/combatants', methods=['GET'])
+def get_combatants(arena_id: str = DEFAULT_ARENA_ID) -> Response:
     """
     Route to get the list of combatants for the battle.
 
+    Path Parameter:
+        - arena_id (str, optional): The arena to read. Default is the shared default arena.
+
     Returns:
         JSON response with the list of combatants.
+    Raises:
+        404 error if the arena does not exist.
     """
     try:
         app.logger.info('Getting combatants...')
-        combatants = battle_model.get_combatants()
+        try:
+            with arena_session(arena_id) as battle_model:
+                combatants = list(battle_model.get_combatants())
+        except ValueError:
+            return arena_not_found(arena_id)
         return make_response(jsonify({'status': 'success', 'combatants': combatants}), 200)
     except Exception as e:
         app.logger.error("Failed to get combatants: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
+@app.route('/api/tournament', methods=['POST'])
+def run_tournament() -> Response:
+    """
+    Route to run a bulk tournament between many meals and record every result.
+
+    Expected JSON Input:
+        - format (str): 'round_robin', 'knockout' or 'swiss'. Default is 'round_robin'.
+        - meal_ids (list[int], optional): The participating meals. Default is every non-deleted meal.
+        - rounds (int, optional): The number of Swiss rounds.
+
+    Returns:
+        JSON response with the tournament standings.
+    Raises:
+        400 error if input validation fails, or the tournament would play more than
+        TOURNAMENT_MAX_BATTLES battles.
+        500 error if there is an issue running the tournament.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        tournament_format = data.get('format', 'round_robin')
+        meal_ids = data.get('meal_ids')
+        rounds = data.get('rounds')
+
+        if meal_ids is not None and (not isinstance(meal_ids, list) or
+                                     not all(is_json_int(meal_id) for meal_id in meal_ids)):
+            return make_response(jsonify({'error': 'meal_ids must be a list of integers'}), 400)
+        if rounds is not None and not is_json_int(rounds):
+            return make_response(jsonify({'error': 'rounds must be an integer'}), 400)
+
+        app.logger.info("Running %s tournament", tournament_format)
+        try:
+            result = tournament_model.run(meal_ids, tournament_format, rounds)
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 400)
+
+        return make_response(jsonify({'status': 'success', 'tournament': result}), 200)
+    except Exception as e:
+        app.logger.error(f"Tournament error: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/random-stats', methods=['GET'])
+def random_stats() -> Response:
+    """
+    Route to get the latency and refill metrics of the battle random source.
+
+    Returns:
+        JSON response with the random source counters.
+    """
+    try:
+        app.logger.info('Retrieving random source stats')
+        return make_response(jsonify({'status': 'success', 'random_source': get_random_source().stats()}), 200)
+    except Exception as e:
+        app.logger.error("Failed to get random source stats: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/battle-writer-stats', methods=['GET'])
+def battle_writer_stats() -> Response:
+    """
+    Route to get the queue and flush metrics of the write-behind battle writer.
+
+    Returns:
+        JSON response with the writer counters, or null when battles are committed as they are fought.
+    """
+    try:
+        writer = get_battle_writer()
+        return make_response(jsonify({'status': 'success',
+                                      'battle_writer': writer.stats() if writer is not None else None}), 200)
+    except Exception as e:
+        app.logger.error("Failed to get battle writer stats: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
 @app.route('/api/prep-combatant', methods=['POST'])
-def prep_combatant() -> Response:
+@app.route('/api/arenas/<string:arena_id>/prep-combatant', methods=['POST'])
+def prep_combatant(arena_id: str = DEFAULT_ARENA_ID) -> Response:
     """
     Route to prepare a prep a meal making it a combatant for a battle.
 
+    Path Parameter:
+        - arena_id (str, optional): The arena to prep in. Default is the shared default arena.
+
     Parameters:
         - meal (str): The name of the meal
 
@@ -278,10 +701,13 @@ def prep_combatant() -> Response:
         if not meal:
             return make_response(jsonify({'error': 'You must name a combatant'}), 400)
 
+        if not get_arena_store().exists(arena_id) and arena_id != DEFAULT_ARENA_ID:
+            return arena_not_found(arena_id)
         try:
             meal = kitchen_model.get_meal_by_name(meal)
-            battle_model.prep_combatant(meal)
-            combatants = battle_model.get_combatants()
+            with arena_session(arena_id) as battle_model:
+                battle_model.prep_combatant(meal)
+                combatants = list(battle_model.get_combatants())
         except Exception as e:
             app.logger.error("Failed to prepare combatant: %s", str(e))
             return make_response(jsonify({'error': str(e)}), 500)
@@ -299,31 +725,225 @@ def prep_combatant() -> Response:
 ############################################################
 
 
+def non_negative_int_arg(name: str, default: Optional[int] = None) -> Optional[int]:
+    """
+    Reads a non-negative integer query parameter.
+
+    Raises:
+        ValueError: If the parameter is present but not a non-negative integer.
+    """
+    value = request.args.get(name)
+    if value is None:
+        return default
+    if not value.isdigit():
+        raise ValueError(f"{name} must be a non-negative integer")
+    return int(value)
+
+def float_arg(name: str) -> Optional[float]:
+    """
+    Reads a finite floating-point query parameter.
+
+    Raises:
+        ValueError: If the parameter is present but not a finite number.
+    """
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        number = math.nan
+    if not math.isfinite(number):
+        raise ValueError(f"{name} must be a number")
+    return number
+
 @app.route('/api/leaderboard', methods=['GET'])
 def get_leaderboard() -> Response:
     """
-    Route to get the leaderboard of meals sorted by wins, battles, or win percentage.
+    Route to get the leaderboard of meals sorted by wins, win percentage, or Elo rating.
 
     Query Parameters:
-        - sort (str): The field to sort by ('wins', 'battles', or 'win_pct'). Default is 'wins'.
+        - sort (str): The field to sort by ('wins', 'win_pct' or 'rating'). Default is 'wins'.
+        - top (int, optional): Return only the first N meals, with no cursor.
+        - limit (int, optional): Page size. With limit (and no offset) the response is one
+          keyset page and includes next_cursor; without it, all meals are returned.
+        - cursor (str, optional): The next_cursor of the previous page.
+        - offset (int, optional): The number of leading meals to skip. Default is 0.
+        - cuisine, difficulty (str, optional): Only include meals with this cuisine / difficulty.
+        - min_price, max_price (float, optional): Only include meals within this price range.
+
+    The response carries an ETag that changes whenever the leaderboard does; a request with
+    a matching If-None-Match gets 304 Not Modified without querying the leaderboard. With a
+    single worker the ETag also changes when a battle is queued for a write-behind flush;
+    with several it is built from the database alone, so it is the same on every worker and
+    trails queued battles by at most BATTLE_FLUSH_INTERVAL_MS.
 
     Returns:
         JSON response with a sorted leaderboard of meals.
     Raises:
+        400 error if a parameter is invalid or top / cursor / offset are combined.
         500 error if there is an issue generating the leaderboard.
     """
     try:
         sort_by = request.args.get('sort', 'wins')  # Default sort by wins
-        app.logger.info("Generating leaderboard sorted by %s", sort_by)
+        cursor = request.args.get('cursor')
+        try:
+            top = non_negative_int_arg('top')
+            limit = non_negative_int_arg('limit')
+            offset = non_negative_int_arg('offset')
+            filters = {
+                'cuisine': request.args.get('cuisine'),
+                'difficulty': request.args.get('difficulty'),
+                'min_price': float_arg('min_price'),
+                'max_price': float_arg('max_price'),
+            }
+            if top is not None and (limit is not None or cursor is not None or offset is not None):
+                raise ValueError("top cannot be combined with limit, cursor or offset")
+            if cursor is not None and offset is not None:
+                raise ValueError("cursor cannot be combined with offset")
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 400)
+
+        etag = f"leaderboard-{kitchen_model.get_leaderboard_version()}"
+        writer = get_battle_writer()
+        if writer is not None and LEADERBOARD_ETAG_QUEUED:
+            etag += f"-{writer.accepted}"
+        if request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+        else:
+            app.logger.info("Generating leaderboard sorted by %s", sort_by)
+            try:
+                if top is not None:
+                    body = {'leaderboard': kitchen_model.get_leaderboard(sort_by, limit=top, **filters)}
+                elif offset is None and (limit is not None or cursor is not None):
+                    page_size = kitchen_model.LEADERBOARD_PAGE_SIZE if limit is None else limit
+                    body = kitchen_model.get_leaderboard_page(sort_by, limit=page_size, cursor=cursor, **filters)
+                else:
+                    body = {'leaderboard': kitchen_model.get_leaderboard(sort_by, limit=limit, offset=offset or 0,
+                                                                         **filters)}
+            except ValueError as e:
+                return make_response(jsonify({'error': str(e)}), 400)
+            response = make_response(jsonify({'status': 'success', **body}), 200)
+
+        response.set_etag(etag)
+        # Let caches store the leaderboard, but revalidate it on every request.
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    except Exception as e:
+        app.logger.error(f"Error generating leaderboard: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
 
-        leaderboard_data = kitchen_model.get_leaderboard(sort_by)
+@app.route('/api/meals-by-score', methods=['GET'])
+def get_meals_by_score() -> Response:
+    """
+    Route to rank every meal, battled or not, by its stored battle score.
+
+    Query Parameters:
+        - limit (int, optional): The number of meals to return. Default is LEADERBOARD_PAGE_SIZE.
+        - offset (int, optional): The number of leading meals to skip. Default is 0.
+        - cuisine, difficulty (str, optional): Only include meals with this cuisine / difficulty.
+        - min_score, max_score (float, optional): Only include meals within this score range.
 
-        return make_response(jsonify({'status': 'success', 'leaderboard': leaderboard_data}), 200)
+    The response carries an ETag that changes whenever meals are added or deleted.
+
+    Returns:
+        JSON response with the meals, strongest first.
+    Raises:
+        400 error if a parameter is invalid.
+        500 error if there is an issue retrieving the meals.
+    """
+    try:
+        try:
+            params = {
+                'limit': non_negative_int_arg('limit', kitchen_model.LEADERBOARD_PAGE_SIZE),
+                'offset': non_negative_int_arg('offset', 0),
+                'cuisine': request.args.get('cuisine'),
+                'difficulty': request.args.get('difficulty'),
+                'min_score': float_arg('min_score'),
+                'max_score': float_arg('max_score'),
+            }
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 400)
+
+        etag = f"meals-by-score-{kitchen_model.get_catalog_version()}"
+        if request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+        else:
+            app.logger.info("Retrieving meals by battle score")
+            try:
+                meals = kitchen_model.get_meals_by_score(**params)
+            except ValueError as e:
+                return make_response(jsonify({'error': str(e)}), 400)
+            response = make_response(jsonify({'status': 'success', 'meals': meals}), 200)
+
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
     except Exception as e:
-        app.logger.error(f"Error generating leaderboard: {e}")
+        app.logger.error(f"Error retrieving meals by score: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
 
 
+############################################################
+#
+# Odds
+#
+############################################################
+
+
+@app.route('/api/odds', methods=['GET'])
+def get_odds() -> Response:
+    """
+    Route to get exact win probabilities, computed from battle scores without battling.
+
+    Query Parameters:
+        - meal_id (int): The meal in the first combatant slot, or the meal to rate.
+        - opponent_id (int, optional): The meal in the second combatant slot. Without it,
+          the response rates meal_id against every other meal.
+        - limit (int, optional): Opponents listed per page. Default is ODDS_PAGE_SIZE.
+        - offset (int, optional): The number of opponents to skip. Default is 0.
+
+    The response carries an ETag that changes whenever meals are added or deleted.
+
+    Returns:
+        JSON response with both combatants' win probabilities, or the meal's odds in each
+        slot against the field and per opponent.
+    Raises:
+        400 error if a parameter is invalid or a meal is not found.
+        500 error if there is an issue computing the odds.
+    """
+    try:
+        try:
+            meal_id = non_negative_int_arg('meal_id')
+            opponent_id = non_negative_int_arg('opponent_id')
+            limit = non_negative_int_arg('limit', odds.ODDS_PAGE_SIZE)
+            offset = non_negative_int_arg('offset', 0)
+            if meal_id is None:
+                raise ValueError("meal_id is required")
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 400)
+
+        etag = f"odds-{kitchen_model.get_catalog_version()}"
+        if request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+        else:
+            app.logger.info("Computing odds for meal %d", meal_id)
+            try:
+                if opponent_id is not None:
+                    body = odds.get_pair_odds(meal_id, opponent_id)
+                else:
+                    body = odds.get_field_odds(meal_id, limit=limit, offset=offset)
+            except ValueError as e:
+                return make_response(jsonify({'error': str(e)}), 400)
+            response = make_response(jsonify({'status': 'success', **body}), 200)
+
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    except Exception as e:
+        app.logger.error(f"Error computing odds: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
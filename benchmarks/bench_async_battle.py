@@ -0,0 +1,97 @@
+"""Battles per second when every random number takes a network round trip.
+
+Runs the same battles with BattleModel.battle() on a thread pool and with
+BattleModel.battle_async() on one event loop, against a random source that sleeps for
+--latency seconds per draw (a stand-in for random.org). Threads cap the battles in flight
+at --threads; the event loop keeps all of them waiting on randomness at once.
+
+    python -m benchmarks.bench_async_battle --battles 500 --latency 0.1 --threads 8
+"""
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import time
+from typing import List
+
+from benchmarks.common import emit, silence_logs, seed_meals, temp_database
+from meal_max.models import kitchen_model
+from meal_max.models.battle_model import BattleModel
+from meal_max.utils.async_utils import shutdown_db_executor
+from meal_max.utils.random_source import LocalRandomSource
+
+
+class SlowRandomSource(LocalRandomSource):
+    """A local PRNG that takes latency seconds to answer, on both the sync and async paths."""
+
+    name = "slow"
+
+    def __init__(self, latency: float, seed: int = 7):
+        super().__init__(seed)
+        self.latency = latency
+
+    def get_randoms(self, count: int) -> List[float]:
+        time.sleep(self.latency)
+        return super().get_randoms(count)
+
+    async def get_randoms_async(self, count: int) -> List[float]:
+        await asyncio.sleep(self.latency)
+        return LocalRandomSource.get_randoms(self, count)
+
+
+def prepped_models(catalog: list, battles: int, source) -> List[BattleModel]:
+    models = []
+    for i in range(battles):
+        model = BattleModel(random_source=source)
+        model.prep_combatant(catalog[(2 * i) % len(catalog)])
+        model.prep_combatant(catalog[(2 * i + 1) % len(catalog)])
+        models.append(model)
+    return models
+
+
+def run_threaded(catalog: list, battles: int, latency: float, threads: int) -> dict:
+    models = prepped_models(catalog, battles, SlowRandomSource(latency))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(lambda model: model.battle(), models))
+    elapsed = time.perf_counter() - start
+    return {'threads': threads, 'battles_per_sec': round(battles / elapsed, 1), 'seconds': round(elapsed, 3)}
+
+
+def run_async(catalog: list, battles: int, latency: float) -> dict:
+    models = prepped_models(catalog, battles, SlowRandomSource(latency))
+
+    async def main():
+        await asyncio.gather(*(model.battle_async() for model in models))
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    elapsed = time.perf_counter() - start
+    return {'in_flight': battles, 'battles_per_sec': round(battles / elapsed, 1), 'seconds': round(elapsed, 3)}
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meals", type=int, default=1000)
+    parser.add_argument("--battles", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.1, help="Seconds per random draw.")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout.")
+    args = parser.parse_args(argv)
+    silence_logs()
+
+    with temp_database() as db_path:
+        seed_meals(db_path, args.meals, battles=False)
+        catalog = [kitchen_model.get_meal_by_id(meal_id) for meal_id in range(1, args.meals + 1)]
+        try:
+            results = {
+                'threaded': run_threaded(catalog, args.battles, args.latency, args.threads),
+                'async': run_async(catalog, args.battles, args.latency),
+            }
+        finally:
+            shutdown_db_executor()
+    emit("async_battle", results, args.output)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Battles log cost: logged tournament-size batches, and replaying the log to rebuild counters and ratings.
+
+Each size gets a freshly seeded catalog (whose seeded counters become the baseline) and
+a log of the given number of battles between random meals, written in batches of
+--batch through record_battle_results. 'rebuild' replays the log after every call
+corrupted one meal's counters, so each call writes one row; 'ratings.rebuild' replays
+every rating from the log.
+
+    python -m benchmarks.bench_battle_log --sizes 1000 100000 --events 1000000 --repeat 5
+"""
+import argparse
+import random
+from typing import Dict
+
+from benchmarks.common import emit, silence_logs, seed_meals, temp_database, time_calls
+from meal_max.models import battle_log, kitchen_model, ratings
+from meal_max.utils import sql_utils
+
+
+def run_size(rows: int, events: int, repeat: int, batch: int = 1000, seed: int = 7) -> Dict[str, dict]:
+    """Seeds rows meals, logs events battles between them and times the log scenarios.
+
+    Returns:
+        Dict[str, dict]: Timing summaries (see time_calls) keyed by scenario name.
+    """
+    rng = random.Random(seed)
+    results: Dict[str, dict] = {}
+    with temp_database() as db_path:
+        seed_meals(db_path, rows)
+        batches = iter(range(max(1, events // batch)))
+
+        def log_batch():
+            next(batches)
+            results_batch = []
+            for _ in range(batch):
+                winner, loser = rng.sample(range(1, rows + 1), 2)
+                results_batch.append((winner, loser))
+            kitchen_model.record_battle_results(results_batch)
+
+        results[f'record_battle_results.batch={batch}'] = time_calls(log_batch, max(1, events // batch))
+
+        def corrupt_and_rebuild():
+            with sql_utils.get_db_connection() as conn:
+                conn.execute("UPDATE meals SET wins = wins + 1 WHERE id = ?", (rng.randint(1, rows),))
+                conn.commit()
+            battle_log.rebuild_battle_stats()
+
+        results['audit'] = time_calls(battle_log.audit_battle_stats, repeat)
+        results['rebuild'] = time_calls(corrupt_and_rebuild, repeat)
+        results['ratings.rebuild'] = time_calls(ratings.rebuild_ratings, repeat)
+    return results
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--events", type=int, default=1000000, help="Battles in the log.")
+    parser.add_argument("--batch", type=int, default=1000, help="Battles per record_battle_results call.")
+    parser.add_argument("--repeat", type=int, default=5, help="Calls per replay scenario.")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout.")
+    args = parser.parse_args(argv)
+    silence_logs()
+
+    results = {f"rows={rows}": run_size(rows, args.events, args.repeat, args.batch) for rows in args.sizes}
+    emit("battle_log", results, args.output)
+    return results
+
+
+if __name__ == "__main__":
+    main()
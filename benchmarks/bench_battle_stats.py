@@ -0,0 +1,71 @@
+"""Battles per second with two update_meal_stats calls vs. one record_battle_result vs. write-behind batching.
+
+The write_behind scenario queues each battle for the battle writer; its final flush is timed
+separately, under its 'close' key.
+
+    python -m benchmarks.bench_battle_stats --meals 1000 --battles 2000
+"""
+import argparse
+import random
+from unittest.mock import patch
+
+from benchmarks.common import emit, silence_logs, seed_meals, temp_database, time_calls
+from meal_max.models import kitchen_model
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.battle_writer import BattleWriter, set_battle_writer
+from meal_max.utils.random_source import LocalRandomSource
+
+
+def legacy_record_battle_result(winner_id: int, loser_id: int, record=None) -> None:
+    """The pre-record_battle_result write path: two connections, four statements, two commits."""
+    kitchen_model.update_meal_stats(winner_id, 'win')
+    kitchen_model.update_meal_stats(loser_id, 'loss')
+
+
+def run_battles(meals: int, battles: int, legacy: bool = False, write_behind: bool = False) -> dict:
+    """Runs battles between random pairs of meals and returns the timing summary."""
+    rng = random.Random(7)
+    with temp_database() as db_path:
+        seed_meals(db_path, meals, battles=False)
+        catalog = [kitchen_model.get_meal_by_id(meal_id) for meal_id in range(1, meals + 1)]
+        model = BattleModel(random_source=LocalRandomSource(7))
+
+        def one_battle():
+            model.clear_combatants()
+            first, second = rng.sample(catalog, 2)
+            model.prep_combatant(first)
+            model.prep_combatant(second)
+            model.battle()
+
+        if legacy:
+            with patch('meal_max.models.battle_model.record_battle_result', legacy_record_battle_result):
+                return time_calls(one_battle, battles)
+        if write_behind:
+            set_battle_writer(BattleWriter())
+            try:
+                result = time_calls(one_battle, battles)
+            finally:
+                result['close'] = time_calls(lambda: set_battle_writer(None), 1)
+            return result
+        return time_calls(one_battle, battles)
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meals", type=int, default=1000)
+    parser.add_argument("--battles", type=int, default=2000)
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout.")
+    args = parser.parse_args(argv)
+    silence_logs()
+
+    results = {
+        'update_meal_stats_x2': run_battles(args.meals, args.battles, legacy=True),
+        'record_battle_result': run_battles(args.meals, args.battles),
+        'write_behind': run_battles(args.meals, args.battles, write_behind=True),
+    }
+    emit("battle_stats", results, args.output)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Memory per meal and load time of the in-memory catalog representations.
+
+Compares a list of Meal objects (get_active_meals), a list of row dicts (iter_meals) and
+the columnar MealCatalog (load_meal_catalog). Memory is what the loaded structure retains,
+measured with tracemalloc; peak also counts the rows fetched from SQLite while loading.
+
+    python -m benchmarks.bench_catalog --sizes 1000 100000 1000000 --repeat 3
+"""
+import argparse
+import gc
+import tracemalloc
+from typing import Any, Callable, Dict
+
+from benchmarks.common import emit, silence_logs, seed_meals, temp_database, time_calls
+from meal_max.models import kitchen_model
+from meal_max.models.meal_catalog import load_meal_catalog
+
+
+REPRESENTATIONS: Dict[str, Callable[[], Any]] = {
+    'meals': kitchen_model.get_active_meals,
+    'row_dicts': lambda: list(kitchen_model.iter_meals()),
+    'columnar': load_meal_catalog,
+}
+
+
+def measure_memory(load: Callable[[], Any], rows: int) -> dict:
+    """Loads once under tracemalloc and returns retained and peak bytes per meal."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        loaded = load()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del loaded
+    return {
+        'bytes_per_meal': round((retained - before) / rows, 1),
+        'peak_bytes_per_meal': round((peak - before) / rows, 1),
+    }
+
+
+def run_size(rows: int, repeat: int) -> Dict[str, dict]:
+    """Seeds a database with rows meals and measures each representation.
+
+    Returns:
+        Dict[str, dict]: Load timing (see time_calls) plus memory figures, keyed by representation.
+    """
+    results: Dict[str, dict] = {}
+    with temp_database() as db_path:
+        seed_meals(db_path, rows)
+        for name, load in REPRESENTATIONS.items():
+            results[name] = {**time_calls(load, repeat), **measure_memory(load, rows)}
+    return results
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=3, help="Timed loads per representation.")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout.")
+    args = parser.parse_args(argv)
+    silence_logs()
+
+    results = {f"rows={rows}": run_size(rows, args.repeat) for rows in args.sizes}
+    emit("catalog", results, args.output)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Per-call throughput of the kitchen_model functions and BattleModel.battle at several catalog sizes.
+
+Each size gets a freshly seeded database. Lookups are measured with the meal cache off
+(every call reads SQLite) and on (repeat lookups of a hot set); battles use a seeded local
+random source, so only scoring and the stats write are measured.
+
+    python -m benchmarks.bench_kitchen --sizes 1000 100000 1000000 --repeat 2000
+"""
+import argparse
+import random
+from typing import Callable, Dict
+
+from benchmarks.common import emit, silence_logs, seed_meals, temp_database, time_calls
+from meal_max.models import kitchen_model
+from meal_max.models.battle_model import BattleModel
+from meal_max.utils.random_source import LocalRandomSource
+
+
+# Returning every leaderboard row is only measured up to this many meals.
+FULL_LEADERBOARD_MAX_ROWS = 100000
+
+
+def run_size(rows: int, repeat: int, seed: int = 7) -> Dict[str, dict]:
+    """Seeds a database with rows meals and times every scenario against it.
+
+    Returns:
+        Dict[str, dict]: Timing summaries (see time_calls) keyed by scenario name.
+    """
+    rng = random.Random(seed)
+    results: Dict[str, dict] = {}
+
+    def measure(name: str, func: Callable[[], object], calls: int = repeat) -> None:
+        results[name] = time_calls(func, calls)
+
+    cache_enabled = kitchen_model.MEAL_CACHE_ENABLED
+    with temp_database() as db_path:
+        seed_meals(db_path, rows)
+        try:
+            kitchen_model.configure_meal_cache(enabled=False)
+            measure('get_meal_by_id.uncached', lambda: kitchen_model.get_meal_by_id(rng.randint(1, rows)))
+            measure('get_meal_by_name.uncached',
+                    lambda: kitchen_model.get_meal_by_name(f"Meal {rng.randrange(rows)}"))
+
+            kitchen_model.configure_meal_cache(enabled=True)
+            hot = [rng.randint(1, rows) for _ in range(min(rows, 256))]
+            for meal_id in hot:
+                kitchen_model.get_meal_by_id(meal_id)
+                kitchen_model.get_meal_by_name(f"Meal {meal_id - 1}")
+            measure('get_meal_by_id.cached', lambda: kitchen_model.get_meal_by_id(rng.choice(hot)))
+            measure('get_meal_by_name.cached', lambda: kitchen_model.get_meal_by_name(f"Meal {rng.choice(hot) - 1}"))
+
+            measure('get_leaderboard.wins.top10', lambda: kitchen_model.get_leaderboard("wins", limit=10))
+            measure('get_leaderboard.win_pct.top10', lambda: kitchen_model.get_leaderboard("win_pct", limit=10))
+            measure('get_leaderboard.wins.deep_page',
+                    lambda: kitchen_model.get_leaderboard("wins", limit=10, offset=rows // 2))
+            middle = kitchen_model.get_leaderboard("wins", limit=1, offset=rows // 2)[0]
+            cursor = kitchen_model.encode_leaderboard_cursor("wins", middle['wins'], middle['id'])
+            measure('get_leaderboard_page.wins.deep_page',
+                    lambda: kitchen_model.get_leaderboard_page("wins", limit=10, cursor=cursor))
+            measure('get_leaderboard_page.wins.thai_top10',
+                    lambda: kitchen_model.get_leaderboard_page("wins", limit=10, cuisine="Thai"))
+            measure('get_meals_by_score.top100', lambda: kitchen_model.get_meals_by_score(limit=100))
+            measure('get_meals_by_score.thai_top10', lambda: kitchen_model.get_meals_by_score(limit=10, cuisine="Thai"))
+            if rows <= FULL_LEADERBOARD_MAX_ROWS:
+                measure('get_leaderboard.wins.all', lambda: kitchen_model.get_leaderboard("wins"),
+                        calls=max(1, min(repeat, 1_000_000 // rows)))
+
+            measure('update_meal_stats',
+                    lambda: kitchen_model.update_meal_stats(rng.randint(1, rows), rng.choice(['win', 'loss'])))
+
+            catalog = [kitchen_model.get_meal_by_id(meal_id) for meal_id in rng.sample(range(1, rows + 1),
+                                                                                      min(rows, 1000))]
+            model = BattleModel(random_source=LocalRandomSource(seed))
+
+            def one_battle():
+                model.clear_combatants()
+                first, second = rng.sample(catalog, 2)
+                model.prep_combatant(first)
+                model.prep_combatant(second)
+                model.battle()
+
+            measure('battle', one_battle)
+
+            names = (f"Bench meal {i}" for i in range(repeat))
+            measure('create_meal',
+                    lambda: kitchen_model.create_meal(next(names), rng.choice(["Thai", "Greek"]), 9.99, "MED"))
+        finally:
+            kitchen_model.configure_meal_cache(enabled=cache_enabled)
+    return results
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=2000, help="Calls per scenario.")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout.")
+    args = parser.parse_args(argv)
+    silence_logs()
+
+    results = {f"rows={rows}": run_size(rows, args.repeat) for rows in args.sizes}
+    emit("kitchen", results, args.output)
+    return results
+
+
+if __name__ == "__main__":
+    main()
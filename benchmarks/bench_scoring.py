@@ -0,0 +1,90 @@
+"""Scalar BattleModel scoring vs. the NumPy batch path in battle_scoring.
+
+For each catalog size, times scoring every meal, deciding a batch of random pairings, and
+loading the catalog (Meal objects vs. score columns vs. the stored scores). Each scenario
+reports calls/sec, and the batch scenarios also report their speedup over the scalar ones. The odds scenarios time
+exact pair and whole-field odds from the cached scores, and the field odds after a cache drop.
+
+    python -m benchmarks.bench_scoring --sizes 1000 100000 --pairings 100000 --repeat 5
+"""
+import argparse
+import random
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from benchmarks.common import emit, silence_logs, seed_meals, temp_database, time_calls
+from meal_max.models import battle_scoring, kitchen_model, odds
+from meal_max.models.battle_model import BattleModel
+
+
+def scalar_play(model: BattleModel, by_id: Dict[int, kitchen_model.Meal], pairings: List[Tuple[int, int]],
+                randoms: List[float]) -> List[Tuple[int, int]]:
+    """Decides pairings one at a time, the way BattleModel.battle() does."""
+    results = []
+    for (first, second), random_number in zip(pairings, randoms):
+        delta = abs(model.get_battle_score(by_id[first]) - model.get_battle_score(by_id[second])) / 100
+        results.append((first, second) if delta > random_number else (second, first))
+    return results
+
+
+def run_size(rows: int, pairings: int, repeat: int, seed: int = 7) -> Dict[str, dict]:
+    """Seeds a database with rows meals and times the scalar and batch scoring paths.
+
+    Returns:
+        Dict[str, dict]: Timing summaries (see time_calls) keyed by scenario name.
+    """
+    rng = random.Random(seed)
+    results: Dict[str, dict] = {}
+    with temp_database() as db_path:
+        seed_meals(db_path, rows, battles=False)
+        meals = kitchen_model.get_active_meals()
+        by_id = {meal.id: meal for meal in meals}
+        columns = battle_scoring.columns_from_meals(meals)
+        model = BattleModel()
+        pairs = [tuple(rng.sample(range(1, rows + 1), 2)) for _ in range(pairings)]
+        randoms = [rng.random() for _ in range(pairings)]
+        # Batch callers hand over arrays; converting Python lists costs more than the scoring.
+        pair_array, random_array = np.array(pairs, dtype=np.int64), np.array(randoms)
+
+        results['score.scalar'] = time_calls(lambda: [model.get_battle_score(meal) for meal in meals], repeat)
+        results['score.batch'] = time_calls(lambda: battle_scoring.battle_scores(columns), repeat)
+        results['pairings.scalar'] = time_calls(lambda: scalar_play(model, by_id, pairs, randoms), repeat)
+        results['pairings.batch'] = time_calls(
+            lambda: battle_scoring.play_pairings(columns, pair_array, random_array), repeat)
+        results['load.meals'] = time_calls(kitchen_model.get_active_meals, repeat)
+        results['load.columns'] = time_calls(battle_scoring.load_score_columns, repeat)
+        results['load.stored_scores'] = time_calls(battle_scoring.load_battle_scores, repeat)
+
+        odds.get_battle_scores()
+        results['odds.pair'] = time_calls(lambda: odds.get_pair_odds(*rng.sample(range(1, rows + 1), 2)), repeat)
+        results['odds.field'] = time_calls(lambda: odds.get_field_odds(rng.randint(1, rows)), repeat)
+
+        def cold_field_odds():
+            odds.clear_score_cache()
+            odds.get_field_odds(rng.randint(1, rows))
+
+        results['odds.field.cold'] = time_calls(cold_field_odds, repeat)
+
+    for scenario in ('score', 'pairings'):
+        batch = results[f'{scenario}.batch']
+        batch['speedup'] = round(batch['ops_per_sec'] / results[f'{scenario}.scalar']['ops_per_sec'], 1)
+    return results
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--pairings", type=int, default=100000, help="Pairings decided per call.")
+    parser.add_argument("--repeat", type=int, default=5, help="Calls per scenario.")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout.")
+    args = parser.parse_args(argv)
+    silence_logs()
+
+    results = {f"rows={rows}": run_size(rows, args.pairings, args.repeat) for rows in args.sizes}
+    emit("scoring", results, args.output)
+    return results
+
+
+if __name__ == "__main__":
+    main()
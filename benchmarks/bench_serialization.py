@@ -0,0 +1,60 @@
+"""Leaderboard response time per JSON backend, with and without gzip.
+
+Requests go through the Flask test client, so the figures cover query, serialization and
+compression but not the network. 'encode' times serialization.dumps of the leaderboard
+rows alone; the Flask default encoder (stdlib json) is the 'stdlib' backend.
+
+    python -m benchmarks.bench_serialization --sizes 1000 100000 --repeat 20
+"""
+import argparse
+from typing import Dict
+
+from benchmarks.common import emit, silence_logs, seed_meals, temp_database, time_calls
+from meal_max.models import kitchen_model
+from meal_max.utils import serialization
+
+
+def run_size(rows: int, repeat: int) -> Dict[str, dict]:
+    """Seeds a database with rows meals and times leaderboard responses for every backend.
+
+    Returns:
+        Dict[str, dict]: Timing summaries (see time_calls) keyed by backend and scenario.
+    """
+    from app import app
+
+    client = app.test_client()
+    backends = ['stdlib'] + (['orjson'] if serialization.orjson is not None else [])
+    saved = serialization.get_backend()
+    results: Dict[str, dict] = {}
+    with temp_database() as db_path:
+        seed_meals(db_path, rows)
+        leaderboard = kitchen_model.get_leaderboard()
+        try:
+            for backend in backends:
+                serialization.set_backend(backend)
+                results[f'{backend}.encode'] = time_calls(lambda: serialization.dumps(leaderboard), repeat)
+                for scenario, url in (('all', '/api/leaderboard'), ('top100', '/api/leaderboard?top=100')):
+                    for encoding in ('identity', 'gzip'):
+                        summary = time_calls(lambda: client.get(url, headers={'Accept-Encoding': encoding}), repeat)
+                        summary['bytes'] = len(client.get(url, headers={'Accept-Encoding': encoding}).data)
+                        results[f'{backend}.{scenario}.{encoding}'] = summary
+        finally:
+            serialization.set_backend(saved)
+    return results
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--repeat", type=int, default=20, help="Requests per scenario.")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout.")
+    args = parser.parse_args(argv)
+    silence_logs()
+
+    results = {f"rows={rows}": run_size(rows, args.repeat) for rows in args.sizes}
+    emit("serialization", results, args.output)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Throughput of /api/leaderboard and /api/battle under gunicorn at different worker counts.
+
+Starts the app with gunicorn.conf.py against a seeded temporary database, once per worker
+count, and drives each route from concurrent keep-alive clients. Battles run in one arena
+per client (ARENA_STORE=sqlite, so any worker can serve any arena) with the local random
+source, so the numbers measure the service rather than random.org.
+
+    python -m benchmarks.bench_serving --workers 1 2 4 --threads 4 --clients 16 --requests 200
+"""
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import List
+
+import requests
+
+from benchmarks.common import emit, silence_logs, seed_meals, temp_database
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(db_path: str, workers: int, threads: int, port: int) -> subprocess.Popen:
+    """Launches gunicorn in production mode against db_path."""
+    env = dict(
+        os.environ,
+        SERVER_MODE="production",
+        SERVER_BIND=f"127.0.0.1:{port}",
+        WEB_CONCURRENCY=str(workers),
+        WEB_THREADS=str(threads),
+        DB_PATH=db_path,
+        DB_POOL_SIZE=str(max(threads, 5)),
+        ARENA_STORE="sqlite",
+        ARENA_DB_PATH=os.path.join(os.path.dirname(db_path), "arenas.sqlite"),
+        RANDOM_SOURCE="local",
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--access-logfile", os.devnull, "app:app"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_ready(process: subprocess.Popen, base_url: str, timeout: float = 30.0) -> None:
+    """Polls the health check until the server answers.
+
+    Raises:
+        RuntimeError: If the server exits or does not come up within timeout seconds.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {process.returncode}")
+        try:
+            if requests.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"Server at {base_url} did not start within {timeout}s")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def drive(clients: int, requests_per_client: int, setup, call, after=None) -> dict:
+    """Runs call(session, state) requests_per_client times from each of clients threads.
+
+    setup(session, index) builds each client's state; after(session, state), if given, runs
+    untimed after every call.
+
+    Returns:
+        dict: Aggregate requests/sec, p50/p99 latency in milliseconds and the error count.
+    """
+    samples: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    barrier = threading.Barrier(clients + 1)
+
+    def client(index: int) -> None:
+        session = requests.Session()
+        state = setup(session, index)
+        local: List[float] = []
+        failed = 0
+        barrier.wait()
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            ok = call(session, state)
+            local.append(time.perf_counter() - start)
+            failed += not ok
+            if after is not None:
+                after(session, state)
+        with lock:
+            samples.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    for thread in threads:
+        thread.join()
+
+    samples.sort()
+    # Throughput from timed calls only, so untimed after() work does not count against it.
+    busy = sum(samples) / clients
+    return {
+        'requests_per_sec': round(len(samples) / busy, 1) if busy else float('inf'),
+        'p50_ms': round(samples[len(samples) // 2] * 1e3, 2),
+        'p99_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e3, 2),
+        'errors': errors[0],
+    }
+
+
+def bench_leaderboard(base_url: str, clients: int, requests_per_client: int) -> dict:
+    def call(session, state):
+        return session.get(f"{base_url}/leaderboard", params={'limit': 10}).status_code == 200
+
+    return drive(clients, requests_per_client, lambda session, index: None, call)
+
+
+def bench_battle(base_url: str, meals: int, clients: int, requests_per_client: int) -> dict:
+    """Times GET /battle; refilling the client's arena to two combatants happens off the clock."""
+    def prep(session, state):
+        combatants = session.get(f"{state['url']}/combatants").json()['combatants']
+        names = {combatant['meal'] for combatant in combatants}
+        while len(names) < 2:
+            name = f"Meal {state['rng'].randrange(meals)}"
+            if name not in names:
+                session.post(f"{state['url']}/prep-combatant", json={'meal': name})
+                names.add(name)
+
+    def setup(session, index):
+        arena_id = session.post(f"{base_url}/arenas").json()['arena_id']
+        state = {'url': f"{base_url}/arenas/{arena_id}", 'rng': random.Random(index)}
+        prep(session, state)
+        return state
+
+    def call(session, state):
+        return session.get(f"{state['url']}/battle").status_code == 200
+
+    return drive(clients, requests_per_client, setup, call, after=prep)
+
+
+def run_worker_count(db_path: str, meals: int, workers: int, threads: int, clients: int,
+                     requests_per_client: int) -> dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}/api"
+    process = start_server(db_path, workers, threads, port)
+    try:
+        wait_ready(process, base_url)
+        return {
+            'workers': workers,
+            'threads': threads,
+            'leaderboard': bench_leaderboard(base_url, clients, requests_per_client),
+            'battle': bench_battle(base_url, meals, clients, requests_per_client),
+        }
+    finally:
+        stop_server(process)
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meals", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per client per route.")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout.")
+    args = parser.parse_args(argv)
+    silence_logs()
+
+    with temp_database() as db_path:
+        seed_meals(db_path, args.meals)
+        results = [run_worker_count(db_path, args.meals, workers, args.threads, args.clients, args.requests)
+                   for workers in args.workers]
+    emit("serving", results, args.output)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Simulated battles per second of BattleSimulator, serial and on a process pool.
+
+Each size gets a freshly seeded catalog, loaded once; every call then simulates --battles
+battles across the whole field. 'battles_per_sec' is the headline figure; 'ops_per_sec'
+counts whole runs, as in the other benchmarks.
+
+    python -m benchmarks.bench_simulation --sizes 1000 100000 --battles 10000000 --workers 1 4
+"""
+import argparse
+from typing import Dict, List
+
+from benchmarks.common import emit, silence_logs, seed_meals, temp_database, time_calls
+from meal_max.models.simulation import BattleSimulator
+
+
+def run_size(rows: int, battles: int, repeat: int, workers: List[int]) -> Dict[str, dict]:
+    """Seeds rows meals and times simulating battles between them per worker count.
+
+    Returns:
+        Dict[str, dict]: Timing summaries (see time_calls) keyed by scenario name.
+    """
+    results: Dict[str, dict] = {}
+    with temp_database() as db_path:
+        seed_meals(db_path, rows)
+        simulator = BattleSimulator()
+        for count in workers:
+            simulator.workers = count
+            summary = time_calls(lambda: simulator.run(battles, seed=count), repeat)
+            summary['battles_per_sec'] = round(summary['ops_per_sec'] * battles, 1)
+            results[f"run.workers={count}"] = summary
+    return results
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--battles", type=int, default=10000000, help="Battles per run.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario.")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout.")
+    args = parser.parse_args(argv)
+    silence_logs()
+
+    results = {f"rows={rows}": run_size(rows, args.battles, args.repeat, args.workers) for rows in args.sizes}
+    emit("simulation", results, args.output)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Read throughput of the meals database during a sustained battle-write storm.
+
+Runs the same mixed workload (writer threads calling update_meal_stats, reader threads
+calling get_leaderboard and get_meal_by_id) against the SQLite defaults (rollback
+journal, synchronous=FULL) and against the configured DatabaseConfig (WAL by default).
+
+    python -m benchmarks.bench_wal --meals 5000 --duration 5 --readers 4 --writers 2
+"""
+import argparse
+import random
+import sqlite3
+import threading
+import time
+
+from benchmarks.common import emit, silence_logs, seed_meals, temp_database
+from meal_max.models import kitchen_model
+from meal_max.utils import sql_utils
+from meal_max.utils.db_config import DatabaseConfig
+
+
+ROLLBACK_CONFIG = DatabaseConfig(journal_mode='DELETE', synchronous='FULL', busy_timeout_ms=5000,
+                                 cache_size=-2000, mmap_size=0, temp_store='DEFAULT')
+
+
+def run_storm(config: DatabaseConfig, meals: int, duration: float, readers: int, writers: int) -> dict:
+    """Runs the mixed workload for duration seconds and returns per-side throughput."""
+    counts = {'reads': 0, 'writes': 0, 'read_errors': 0, 'write_errors': 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def tally(key: str, n: int) -> None:
+        with lock:
+            counts[key] += n
+
+    def reader(seed: int) -> None:
+        rng = random.Random(seed)
+        done = errors = 0
+        while not stop.is_set():
+            try:
+                if done % 10 == 0:
+                    kitchen_model.get_leaderboard("wins")
+                else:
+                    kitchen_model.get_meal_by_id(rng.randint(1, meals))
+                done += 1
+            except sqlite3.OperationalError:
+                errors += 1
+        tally('reads', done)
+        tally('read_errors', errors)
+
+    def writer(seed: int) -> None:
+        rng = random.Random(seed)
+        done = errors = 0
+        while not stop.is_set():
+            try:
+                kitchen_model.update_meal_stats(rng.randint(1, meals), rng.choice(['win', 'loss']))
+                done += 1
+            except sqlite3.OperationalError:
+                errors += 1
+        tally('writes', done)
+        tally('write_errors', errors)
+
+    with temp_database(config) as db_path:
+        seed_meals(db_path, meals)
+        sql_utils.DB_POOL_SIZE = readers + writers
+        threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+        threads += [threading.Thread(target=writer, args=(1000 + i,)) for i in range(writers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+    return {
+        'journal_mode': config.journal_mode,
+        'synchronous': config.synchronous,
+        'reads_per_sec': round(counts['reads'] / elapsed, 1),
+        'writes_per_sec': round(counts['writes'] / elapsed, 1),
+        'read_errors': counts['read_errors'],
+        'write_errors': counts['write_errors'],
+    }
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meals", type=int, default=5000)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout.")
+    args = parser.parse_args(argv)
+    silence_logs()
+
+    saved_pool_size = sql_utils.DB_POOL_SIZE
+    try:
+        results = {
+            'rollback_journal': run_storm(ROLLBACK_CONFIG, args.meals, args.duration, args.readers, args.writers),
+            'configured': run_storm(DatabaseConfig.from_env(), args.meals, args.duration, args.readers, args.writers),
+        }
+    finally:
+        sql_utils.DB_POOL_SIZE = saved_pool_size
+    emit("wal", results, args.output)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+from contextlib import contextmanager
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Iterator, List, Optional
+
+from meal_max.models.kitchen_model import battle_score
+from meal_max.utils import migrations, sql_utils
+from meal_max.utils.db_config import DatabaseConfig
+
+
+CUISINES = ["Italian", "Japanese", "Mexican", "French", "Thai", "Indian", "Greek", "Korean"]
+DIFFICULTIES = ["LOW", "MED", "HIGH"]
+
+
+def silence_logs() -> None:
+    """Suppresses application logging, which otherwise dominates the measured time."""
+    logging.disable(logging.CRITICAL)
+
+
+@contextmanager
+def temp_database(config: Optional[DatabaseConfig] = None) -> Iterator[str]:
+    """Points sql_utils at a fresh temporary database for the duration of the block.
+
+    Args:
+        config (DatabaseConfig, optional): Connection settings to use. Defaults to DB_CONFIG.
+
+    Yields:
+        str: The path of the temporary database.
+    """
+    saved_path, saved_config = sql_utils.DB_PATH, sql_utils.DB_CONFIG
+    tmpdir = tempfile.mkdtemp(prefix="meal_max_bench_")
+    db_path = os.path.join(tmpdir, "bench.sqlite")
+    sql_utils.close_pool()
+    sql_utils.DB_PATH = db_path
+    if config is not None:
+        sql_utils.DB_CONFIG = config
+    try:
+        create_schema(db_path)
+        yield db_path
+    finally:
+        sql_utils.close_pool()
+        sql_utils.DB_PATH, sql_utils.DB_CONFIG = saved_path, saved_config
+        for name in os.listdir(tmpdir):
+            os.remove(os.path.join(tmpdir, name))
+        os.rmdir(tmpdir)
+
+
+def create_schema(db_path: str) -> None:
+    """Applies every schema migration to db_path."""
+    conn = sql_utils.connect(db_path)
+    try:
+        migrations.migrate(conn)
+    finally:
+        conn.close()
+
+
+def seed_meals(db_path: str, count: int, battles: bool = True, seed: int = 42) -> None:
+    """Inserts count synthetic meals in a single transaction.
+
+    Args:
+        db_path (str): The database to seed.
+        count (int): How many meals to insert.
+        battles (bool): Whether to give the meals random battle/win counters.
+        seed (int): Seed for the synthetic data.
+    """
+    rng = random.Random(seed)
+
+    def rows():
+        for i in range(count):
+            played = rng.randint(1, 50) if battles else 0
+            cuisine, price, difficulty = rng.choice(CUISINES), round(rng.uniform(1, 50), 2), rng.choice(DIFFICULTIES)
+            yield (f"Meal {i}", cuisine, price, difficulty, played, rng.randint(0, played),
+                   battle_score(price, cuisine, difficulty))
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executemany(
+            "INSERT INTO meals (meal, cuisine, price, difficulty, battles, wins, score) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows())
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def time_calls(func: Callable[[], Any], repeat: int) -> dict[str, float]:
+    """Calls func repeat times and summarizes the per-call latency.
+
+    Returns:
+        dict[str, float]: ops/sec plus mean, p50 and p99 latency in microseconds.
+    """
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    total = sum(samples)
+    return {
+        'ops_per_sec': round(repeat / total, 1) if total else float('inf'),
+        'mean_us': round(total / repeat * 1e6, 2),
+        'p50_us': round(samples[len(samples) // 2] * 1e6, 2),
+        'p99_us': round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6, 2),
+    }
+
+
+def emit(name: str, results: Any, output: Optional[str] = None) -> None:
+    """Writes benchmark results as JSON to output, or to stdout."""
+    payload = json.dumps({'benchmark': name, 'results': results}, indent=2)
+    if output:
+        with open(output, "w") as fh:
+            fh.write(payload + "\n")
+    else:
+        sys.stdout.write(payload + "\n")
@@ -0,0 +1,168 @@
+"""Runs the benchmark suite into one JSON file and compares result files across commits.
+
+    python -m benchmarks.suite run --output bench/HEAD.json
+    python -m benchmarks.suite run --quick --output bench/HEAD.json
+    python -m benchmarks.suite compare bench/main.json bench/HEAD.json --threshold 0.10
+
+`run` records the kitchen_model / BattleModel scenarios (bench_kitchen), the scalar vs.
+batch scoring scenarios (bench_scoring), the catalog load time and memory per meal
+(bench_catalog), the leaderboard response time per JSON backend (bench_serialization) and
+the battles log write and replay time (bench_battle_log) and the single-process simulation
+throughput (bench_simulation) at each catalog size and, unless --no-http, the gunicorn load scenario (bench_serving),
+flattened to one figure per scenario together with the commit and environment they ran on.
+`compare` prints the relative change of every shared scenario and exits with status 1 if
+any throughput dropped, or any memory figure grew, by more than the threshold.
+"""
+import argparse
+import datetime
+import json
+import platform
+import sqlite3
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks import (bench_battle_log, bench_catalog, bench_kitchen, bench_scoring, bench_serialization,
+                        bench_serving, bench_simulation)
+from benchmarks.common import emit, silence_logs, seed_meals, temp_database
+
+
+# Keys that hold the throughput figure in each benchmark's timing summaries
+THROUGHPUT_KEYS = ('ops_per_sec', 'requests_per_sec')
+# Keys of figures where lower is better
+MEMORY_KEYS = ('bytes_per_meal',)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=bench_serving.ROOT).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> Dict[str, str]:
+    return {
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+    }
+
+
+def run_suite(sizes: List[int], repeat: int, http: bool, workers: List[int], clients: int,
+              http_requests: int, pairings: int = 100000, scoring_repeat: int = 3,
+              events: int = 100000) -> Dict[str, dict]:
+    """Runs every scenario and returns timing summaries keyed by flat scenario name."""
+    results: Dict[str, dict] = {}
+    for rows in sizes:
+        for name, summary in bench_kitchen.run_size(rows, repeat).items():
+            results[f"kitchen.{name}.rows={rows}"] = summary
+        for name, summary in bench_scoring.run_size(rows, pairings, scoring_repeat).items():
+            results[f"scoring.{name}.rows={rows}"] = summary
+        for name, summary in bench_catalog.run_size(rows, scoring_repeat).items():
+            memory = {key: summary.pop(key) for key in ('bytes_per_meal', 'peak_bytes_per_meal')}
+            results[f"catalog.{name}.load.rows={rows}"] = summary
+            results[f"catalog.{name}.memory.rows={rows}"] = memory
+        for name, summary in bench_simulation.run_size(rows, 10 * pairings, scoring_repeat, [1]).items():
+            results[f"simulation.{name}.rows={rows}"] = summary
+        if rows <= bench_kitchen.FULL_LEADERBOARD_MAX_ROWS:
+            for name, summary in bench_serialization.run_size(rows, scoring_repeat).items():
+                results[f"serialization.{name}.rows={rows}"] = summary
+            for name, summary in bench_battle_log.run_size(rows, events, scoring_repeat).items():
+                results[f"battle_log.{name}.rows={rows}"] = summary
+
+    if http:
+        meals = min(sizes)
+        with temp_database() as db_path:
+            seed_meals(db_path, meals)
+            for count in workers:
+                run = bench_serving.run_worker_count(db_path, meals, count, 4, clients, http_requests)
+                for route in ('leaderboard', 'battle'):
+                    results[f"http.{route}.workers={count}"] = run[route]
+    return results
+
+
+def figure(summary: dict) -> Tuple[Optional[float], bool]:
+    """Returns a scenario's headline figure and whether higher is better."""
+    for key in THROUGHPUT_KEYS:
+        if key in summary:
+            return summary[key], True
+    for key in MEMORY_KEYS:
+        if key in summary:
+            return summary[key], False
+    return None, True
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[str]:
+    """Prints the per-scenario change and returns the scenarios that got worse beyond threshold."""
+    base_results = baseline['results']['scenarios']
+    head_results = current['results']['scenarios']
+    regressions = []
+    width = max((len(name) for name in head_results), default=0)
+    for name in sorted(set(base_results) & set(head_results)):
+        (before, higher_is_better), (after, _) = figure(base_results[name]), figure(head_results[name])
+        if not before or after is None:
+            continue
+        change = (after - before) / before
+        flag = ""
+        if (change < -threshold) if higher_is_better else (change > threshold):
+            regressions.append(name)
+            flag = "  REGRESSION"
+        sys.stdout.write(f"{name:<{width}}  {before:>12.1f} -> {after:>12.1f}  {change:+7.1%}{flag}\n")
+    for name in sorted(set(head_results) - set(base_results)):
+        sys.stdout.write(f"{name:<{width}}  (new)\n")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="Run the suite.")
+    run.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    run.add_argument("--repeat", type=int, default=2000, help="Calls per kitchen scenario.")
+    run.add_argument("--pairings", type=int, default=100000, help="Pairings per scoring scenario call.")
+    run.add_argument("--events", type=int, default=100000, help="Battles in each replayed battles log.")
+    run.add_argument("--no-http", dest="http", action="store_false", help="Skip the gunicorn load scenario.")
+    run.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    run.add_argument("--clients", type=int, default=16)
+    run.add_argument("--http-requests", type=int, default=200, help="Requests per client per route.")
+    run.add_argument("--quick", action="store_true", help="Small sizes and counts, for smoke runs.")
+    run.add_argument("--output", help="Write JSON results to this file instead of stdout.")
+
+    diff = subparsers.add_parser("compare", help="Compare two result files.")
+    diff.add_argument("baseline")
+    diff.add_argument("current")
+    diff.add_argument("--threshold", type=float, default=0.10, help="Allowed fractional throughput drop.")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        with open(args.current) as fh:
+            current = json.load(fh)
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            sys.stdout.write(f"{len(regressions)} scenario(s) regressed by more than {args.threshold:.0%}\n")
+            return 1
+        return 0
+
+    if args.quick:
+        args.sizes, args.repeat, args.workers, args.clients, args.http_requests = [1000], 200, [1], 4, 25
+        args.pairings, args.events = 10000, 10000
+    silence_logs()
+    results = {
+        'commit': git_commit(),
+        'started_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'environment': environment(),
+        'scenarios': run_suite(args.sizes, args.repeat, args.http, args.workers, args.clients,
+                               args.http_requests, args.pairings, events=args.events),
+    }
+    emit("suite", results, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
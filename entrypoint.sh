@@ -10,8 +10,14 @@ if [ "$CREATE_DB" = "true" ]; then
     echo "Creating the database..."
     /app/sql/create_db.sh
 else
-    echo "Skipping database creation."
+    echo "Skipping database creation, applying pending migrations..."
+    python -m meal_max.cli migrate
 fi
 
-# Start the Python application
-exec python app.py
+# Start the Python application: gunicorn workers in production, the Flask dev server otherwise
+if [ "$SERVER_MODE" = "production" ]; then
+    echo "Starting gunicorn (WEB_CONCURRENCY=${WEB_CONCURRENCY:-2}, WEB_THREADS=${WEB_THREADS:-4})..."
+    exec gunicorn -c gunicorn.conf.py app:app
+else
+    exec python app.py
+fi
@@ -0,0 +1,53 @@
+"""gunicorn settings for production serving, driven by the SERVER_* and WEB_* environment variables.
+
+    gunicorn -c gunicorn.conf.py app:app
+
+Send SIGHUP to the master for a graceful reload: new workers are started with the current
+code and configuration, and old workers finish their in-flight requests (up to
+WEB_GRACEFUL_TIMEOUT seconds) before exiting.
+
+With more than one worker, arenas default to the shared SQLite store (ARENA_STORE=sqlite),
+since a client's consecutive requests may reach different workers; ARENA_STORE=memory is
+refused.
+"""
+import os
+
+from dotenv import load_dotenv
+
+from meal_max.utils.server_config import ServerConfig
+
+
+load_dotenv()
+
+_config = ServerConfig.from_env()
+globals().update(_config.gunicorn_settings())
+
+# Workers inherit the environment, so every one of them opens the same arena store.
+os.environ.setdefault("ARENA_STORE", _config.default_arena_store())
+_config.check_arena_store(os.environ["ARENA_STORE"])
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    """Gives each worker its own warmed connection pool before it accepts requests."""
+    from meal_max.utils import sql_utils
+
+    _config.check_pool_size(sql_utils.DB_POOL_SIZE)
+    sql_utils.init_pool()
+
+
+def worker_exit(server, worker):
+    """Records the worker's queued battles, closes its pooled connections and stops its random prefetch thread."""
+    from meal_max.models.arena_model import set_arena_store
+    from meal_max.models.battle_writer import shutdown_battle_writer
+    from meal_max.utils import sql_utils
+    from meal_max.utils.async_utils import shutdown_db_executor
+    from meal_max.utils.random_source import set_random_source
+
+    set_arena_store(None)
+    set_random_source(None)
+    shutdown_battle_writer()
+    shutdown_db_executor()
+    sql_utils.close_pool()
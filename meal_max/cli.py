@@ -0,0 +1,112 @@
+"""Command-line entry points for Meal Max maintenance and batch jobs.
+
+    python -m meal_max.cli migrate
+    python -m meal_max.cli tournament --format knockout --meal-ids 1 2 3 4
+    python -m meal_max.cli import meals.csv
+    python -m meal_max.cli export --format ndjson > meals.ndjson
+"""
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+from meal_max.models.kitchen_model import create_meals_bulk, iter_meals
+from meal_max.models.tournament_model import TOURNAMENT_FORMATS, TournamentModel
+from meal_max.utils import migrations
+from meal_max.utils.bulk_io import BULK_FORMATS, format_bulk, parse_bulk
+from meal_max.utils.random_source import LocalRandomSource
+from meal_max.utils.sql_utils import DB_PATH, get_db_connection
+
+
+def run_migrate(args: argparse.Namespace) -> int:
+    """Applies pending schema migrations, optionally dropping everything first."""
+    with get_db_connection() as conn:
+        if args.reset:
+            migrations.reset_database(conn)
+        before = migrations.get_schema_version(conn)
+        after = migrations.migrate(conn, target=args.target)
+    print(f"{DB_PATH}: schema version {before} -> {after}")
+    return 0
+
+
+def run_tournament(args: argparse.Namespace) -> int:
+    """Runs a tournament and prints the result as JSON."""
+    random_source = LocalRandomSource(args.seed) if args.seed is not None else None
+    result = TournamentModel(random_source).run(
+        meal_ids=args.meal_ids,
+        tournament_format=args.format,
+        rounds=args.rounds,
+        record=not args.dry_run,
+    )
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+def run_import(args: argparse.Namespace) -> int:
+    """Imports meals from an NDJSON or CSV file (or stdin) and prints the summary as JSON."""
+    bulk_format = args.format or ('csv' if args.path.endswith('.csv') else 'ndjson')
+    if args.path == '-':
+        summary = create_meals_bulk(parse_bulk(sys.stdin, bulk_format), chunk_size=args.chunk_size)
+    else:
+        with open(args.path, encoding='utf-8', newline='') as f:
+            summary = create_meals_bulk(parse_bulk(f, bulk_format), chunk_size=args.chunk_size)
+    json.dump(summary, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 1 if summary['failed'] else 0
+
+
+def run_export(args: argparse.Namespace) -> int:
+    """Writes every meal to stdout as NDJSON or CSV."""
+    for chunk in format_bulk(iter_meals(include_deleted=args.include_deleted), args.format):
+        sys.stdout.write(chunk)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="meal_max", description="Meal Max batch jobs.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate = subparsers.add_parser("migrate", help="Apply pending schema migrations.")
+    migrate.add_argument("--target", type=int, help="Stop at this schema version.")
+    migrate.add_argument("--reset", action="store_true", help="Drop all tables before migrating.")
+    migrate.set_defaults(func=run_migrate)
+
+    tournament = subparsers.add_parser("tournament", help="Run a bulk battle tournament.")
+    tournament.add_argument("--format", choices=TOURNAMENT_FORMATS, default="round_robin")
+    tournament.add_argument("--meal-ids", type=int, nargs="+",
+                            help="Participating meal IDs (default: every non-deleted meal).")
+    tournament.add_argument("--rounds", type=int, help="Number of Swiss rounds.")
+    tournament.add_argument("--seed", type=int, help="Use a seeded local PRNG instead of the configured source.")
+    tournament.add_argument("--dry-run", action="store_true", help="Do not record the results.")
+    tournament.set_defaults(func=run_tournament)
+
+    bulk_import = subparsers.add_parser("import", help="Import meals from an NDJSON or CSV file.")
+    bulk_import.add_argument("path", help="The file to import, or - for stdin.")
+    bulk_import.add_argument("--format", choices=BULK_FORMATS,
+                             help="Input format (default: csv for *.csv files, otherwise ndjson).")
+    bulk_import.add_argument("--chunk-size", type=int, default=1000, help="Rows per transaction.")
+    bulk_import.set_defaults(func=run_import)
+
+    export = subparsers.add_parser("export", help="Write every meal to stdout.")
+    export.add_argument("--format", choices=BULK_FORMATS, default="ndjson")
+    export.add_argument("--include-deleted", action="store_true", help="Include deleted meals.")
+    export.set_defaults(func=run_export)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    load_dotenv()
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except ValueError as e:
+        sys.stderr.write(f"error: {e}\n")
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
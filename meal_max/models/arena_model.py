@@ -0,0 +1,430 @@
+from contextlib import contextmanager
+from dataclasses import asdict
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional
+
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import Meal
+from meal_max.utils.db_pool import ConnectionPool
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.random_source import RandomSource
+from meal_max.utils import sql_utils
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# The arena served by the legacy single-arena routes; created on first use and never expired.
+DEFAULT_ARENA_ID = "default"
+
+# Seconds an arena may sit unused before it is discarded (0 disables expiry)
+ARENA_IDLE_TIMEOUT = float(os.getenv("ARENA_IDLE_TIMEOUT", "1800"))
+
+# Seconds a SqliteArenaStore session may hold an arena before another session may take it
+# over, so a worker that dies mid-session does not lock its arena for good.
+ARENA_LOCK_TIMEOUT = float(os.getenv("ARENA_LOCK_TIMEOUT", "30"))
+
+
+class ArenaStore:
+    """Base class for stores of arenas, each holding its own two-slot combatant list.
+
+    Callers work on an arena through session(), which hands out a BattleModel loaded with
+    the arena's combatants and saves them back on exit. Sessions on the same arena are
+    serialized, so concurrent requests cannot clobber each other's combatants.
+
+    Attributes:
+        idle_timeout (float): Seconds an arena may sit unused before expire_idle() discards it.
+        random_source (RandomSource): The source given to each session's BattleModel, or None
+            for the process-wide source.
+    """
+
+    name = "base"
+
+    def __init__(self, idle_timeout: float = ARENA_IDLE_TIMEOUT, random_source: Optional[RandomSource] = None):
+        """
+        Raises:
+            ValueError: If idle_timeout is negative.
+        """
+        if idle_timeout < 0:
+            raise ValueError(f"Invalid idle timeout: {idle_timeout}. Must be non-negative.")
+        self.idle_timeout = idle_timeout
+        self.random_source = random_source
+
+    def create(self) -> str:
+        """Creates an empty arena.
+
+        Returns:
+            str: The new arena's ID.
+        """
+        raise NotImplementedError
+
+    def exists(self, arena_id: str) -> bool:
+        """Returns whether the arena exists."""
+        raise NotImplementedError
+
+    def delete(self, arena_id: str) -> bool:
+        """Deletes an arena.
+
+        Returns:
+            bool: True if the arena existed.
+        """
+        raise NotImplementedError
+
+    def session(self, arena_id: str, create: bool = False):
+        """Locks an arena and yields a BattleModel holding its combatants.
+
+        Changes to the model's combatants are saved when the block exits, including when it
+        raises, since BattleModel only changes its combatants once an operation has succeeded.
+
+        Args:
+            arena_id (str): The arena to open.
+            create (bool): Whether to create the arena if it does not exist. Defaults to False.
+
+        Raises:
+            ValueError: If the arena does not exist and create is False.
+        """
+        raise NotImplementedError
+
+    def expire_idle(self) -> int:
+        """Discards arenas unused for longer than idle_timeout.
+
+        Returns:
+            int: The number of arenas discarded.
+        """
+        raise NotImplementedError
+
+    def stats(self) -> dict[str, Any]:
+        """Returns the store's arena count and settings."""
+        return {'store': self.name, 'idle_timeout_seconds': self.idle_timeout}
+
+    def close(self) -> None:
+        """Releases any resources (connections) held by the store."""
+
+    def _new_model(self, combatants: List[Meal]) -> BattleModel:
+        model = BattleModel(self.random_source)
+        model.combatants = combatants
+        return model
+
+    @staticmethod
+    def _new_id() -> str:
+        return uuid.uuid4().hex
+
+
+class _MemoryArena:
+    __slots__ = ('combatants', 'lock', 'last_used')
+
+    def __init__(self):
+        self.combatants: List[Meal] = []
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+
+class MemoryArenaStore(ArenaStore):
+    """Keeps arenas in this process's memory, locked per arena.
+
+    Arenas are not shared between worker processes; use SqliteArenaStore for that.
+    """
+
+    name = "memory"
+
+    def __init__(self, idle_timeout: float = ARENA_IDLE_TIMEOUT, random_source: Optional[RandomSource] = None):
+        super().__init__(idle_timeout, random_source)
+        self._arenas: Dict[str, _MemoryArena] = {}
+        self._lock = threading.Lock()
+
+    def create(self) -> str:
+        self.expire_idle()
+        arena_id = self._new_id()
+        with self._lock:
+            self._arenas[arena_id] = _MemoryArena()
+        logger.info("Created arena %s", arena_id)
+        return arena_id
+
+    def exists(self, arena_id: str) -> bool:
+        with self._lock:
+            return arena_id in self._arenas
+
+    def delete(self, arena_id: str) -> bool:
+        with self._lock:
+            existed = self._arenas.pop(arena_id, None) is not None
+        if existed:
+            logger.info("Deleted arena %s", arena_id)
+        return existed
+
+    @contextmanager
+    def session(self, arena_id: str, create: bool = False) -> Iterator[BattleModel]:
+        with self._lock:
+            arena = self._arenas.get(arena_id)
+            if arena is None:
+                if not create:
+                    logger.info("Arena %s not found", arena_id)
+                    raise ValueError(f"Arena {arena_id} not found")
+                arena = self._arenas[arena_id] = _MemoryArena()
+                logger.info("Created arena %s", arena_id)
+
+        with arena.lock:
+            arena.last_used = time.monotonic()
+            try:
+                # The model works on the arena's own list, so its changes are saved in place.
+                yield self._new_model(arena.combatants)
+            finally:
+                arena.last_used = time.monotonic()
+
+    def expire_idle(self) -> int:
+        if not self.idle_timeout:
+            return 0
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            expired = [arena_id for arena_id, arena in self._arenas.items()
+                       if arena_id != DEFAULT_ARENA_ID and arena.last_used < cutoff and not arena.lock.locked()]
+            for arena_id in expired:
+                del self._arenas[arena_id]
+        if expired:
+            logger.info("Expired %d idle arena(s)", len(expired))
+        return len(expired)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {**super().stats(), 'arenas': len(self._arenas)}
+
+
+class SqliteArenaStore(ArenaStore):
+    """Keeps arenas in a SQLite database so every worker process serves the same arenas.
+
+    A session locks only its own arena, by writing a lease (lock_token, locked_until) into
+    the arena's row in a short transaction, and clears it when saving the combatants. No
+    transaction stays open while the session runs, so battles in different arenas (and on
+    different workers) run in parallel, and the random number fetch never holds a database
+    lock. A lease left behind by a dead worker lapses after lock_timeout seconds.
+
+    Attributes:
+        db_path (str): The arena database file.
+        lock_timeout (float): Seconds a session may hold its arena before others may take it over.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, db_path: str, idle_timeout: float = ARENA_IDLE_TIMEOUT,
+                 random_source: Optional[RandomSource] = None, pool_size: int = sql_utils.DB_POOL_SIZE,
+                 lock_timeout: float = ARENA_LOCK_TIMEOUT):
+        """Opens the arena database, creating its table if needed.
+
+        Raises:
+            ValueError: If db_path is the meals database, or lock_timeout is not positive.
+            sqlite3.Error: If the database cannot be opened.
+        """
+        super().__init__(idle_timeout, random_source)
+        if os.path.abspath(db_path) == os.path.abspath(sql_utils.DB_PATH):
+            raise ValueError("The arena store needs its own database file, not DB_PATH.")
+        if lock_timeout <= 0:
+            raise ValueError(f"Invalid lock timeout: {lock_timeout}. Must be positive.")
+        self.db_path = db_path
+        self.lock_timeout = lock_timeout
+        self._pool = ConnectionPool(db_path, max_size=pool_size, timeout=sql_utils.DB_POOL_TIMEOUT,
+                                    connect=sql_utils.DB_CONFIG.connect)
+        with self._pool.connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS arenas (
+                    id TEXT PRIMARY KEY,
+                    combatants TEXT NOT NULL DEFAULT '[]',
+                    last_used REAL NOT NULL
+                )
+            """)
+            # Arena files written before sessions took per-arena leases lack these columns.
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(arenas)")}
+            if 'lock_token' not in columns:
+                conn.execute("ALTER TABLE arenas ADD COLUMN lock_token TEXT")
+            if 'locked_until' not in columns:
+                conn.execute("ALTER TABLE arenas ADD COLUMN locked_until REAL NOT NULL DEFAULT 0")
+            conn.commit()
+
+    def create(self) -> str:
+        self.expire_idle()
+        arena_id = self._new_id()
+        try:
+            with self._pool.connection() as conn:
+                conn.execute("INSERT INTO arenas (id, last_used) VALUES (?, ?)", (arena_id, time.time()))
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error("Database error: %s", str(e))
+            raise e
+        logger.info("Created arena %s", arena_id)
+        return arena_id
+
+    def exists(self, arena_id: str) -> bool:
+        try:
+            with self._pool.connection() as conn:
+                return conn.execute("SELECT 1 FROM arenas WHERE id = ?", (arena_id,)).fetchone() is not None
+        except sqlite3.Error as e:
+            logger.error("Database error: %s", str(e))
+            raise e
+
+    def delete(self, arena_id: str) -> bool:
+        try:
+            with self._pool.connection() as conn:
+                existed = conn.execute("DELETE FROM arenas WHERE id = ?", (arena_id,)).rowcount > 0
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error("Database error: %s", str(e))
+            raise e
+        if existed:
+            logger.info("Deleted arena %s", arena_id)
+        return existed
+
+    @contextmanager
+    def session(self, arena_id: str, create: bool = False) -> Iterator[BattleModel]:
+        token = uuid.uuid4().hex
+        combatants = self._acquire(arena_id, token, create)
+        model = self._new_model([Meal(**combatant) for combatant in json.loads(combatants)])
+        try:
+            yield model
+        finally:
+            self._release(arena_id, token, model.combatants)
+
+    def _acquire(self, arena_id: str, token: str, create: bool) -> str:
+        """Takes the arena's lease, waiting while another session holds it.
+
+        Returns:
+            str: The arena's combatants, as JSON.
+
+        Raises:
+            ValueError: If the arena does not exist and create is False.
+            sqlite3.Error: If a database error occurs.
+        """
+        delay = 0.001
+        while True:
+            now = time.time()
+            try:
+                with self._pool.connection() as conn:
+                    row = conn.execute("""
+                        UPDATE arenas SET lock_token = ?, locked_until = ?, last_used = ?
+                        WHERE id = ? AND (lock_token IS NULL OR locked_until < ?)
+                        RETURNING combatants
+                    """, (token, now + self.lock_timeout, now, arena_id, now)).fetchone()
+                    if row is None and conn.execute("SELECT 1 FROM arenas WHERE id = ?", (arena_id,)).fetchone() is None:
+                        if not create:
+                            conn.rollback()
+                            logger.info("Arena %s not found", arena_id)
+                            raise ValueError(f"Arena {arena_id} not found")
+                        if conn.execute("INSERT OR IGNORE INTO arenas (id, last_used, lock_token, locked_until) "
+                                        "VALUES (?, ?, ?, ?)",
+                                        (arena_id, now, token, now + self.lock_timeout)).rowcount:
+                            logger.info("Created arena %s", arena_id)
+                            row = ("[]",)
+                    conn.commit()
+            except sqlite3.Error as e:
+                logger.error("Database error: %s", str(e))
+                raise e
+            if row is not None:
+                return row[0]
+            # Another session holds the arena; its lease ends when it saves or times out.
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)
+
+    def _release(self, arena_id: str, token: str, combatants: List[Meal]) -> None:
+        """Saves the combatants and clears the lease, unless the arena was deleted or taken over."""
+        try:
+            with self._pool.connection() as conn:
+                saved = conn.execute("""
+                    UPDATE arenas SET combatants = ?, last_used = ?, lock_token = NULL, locked_until = 0
+                    WHERE id = ? AND lock_token = ?
+                """, (json.dumps([asdict(meal) for meal in combatants]), time.time(), arena_id, token)).rowcount
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error("Database error: %s", str(e))
+            raise e
+        if not saved:
+            logger.warning("Arena %s was deleted or held past its lock timeout; its combatants were not saved",
+                           arena_id)
+
+    def expire_idle(self) -> int:
+        if not self.idle_timeout:
+            return 0
+        try:
+            with self._pool.connection() as conn:
+                now = time.time()
+                expired = conn.execute("DELETE FROM arenas WHERE last_used < ? AND id != ? AND locked_until < ?",
+                                       (now - self.idle_timeout, DEFAULT_ARENA_ID, now)).rowcount
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error("Database error: %s", str(e))
+            raise e
+        if expired:
+            logger.info("Expired %d idle arena(s)", expired)
+        return expired
+
+    def stats(self) -> dict[str, Any]:
+        with self._pool.connection() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM arenas").fetchone()[0]
+        return {**super().stats(), 'arenas': count, 'db_path': self.db_path,
+                'lock_timeout_seconds': self.lock_timeout}
+
+    def close(self) -> None:
+        self._pool.close()
+
+
+def create_arena_store() -> ArenaStore:
+    """Builds the arena store described by the ARENA_* environment variables.
+
+    ARENA_STORE selects 'memory' (default: per-process) or 'sqlite' (shared by every worker,
+    kept in ARENA_DB_PATH, default arenas.sqlite next to DB_PATH).
+
+    Returns:
+        ArenaStore: The configured store.
+
+    Raises:
+        ValueError: If ARENA_STORE names an unknown store.
+    """
+    kind = os.getenv("ARENA_STORE", "memory").lower()
+    if kind == "memory":
+        return MemoryArenaStore()
+    if kind == "sqlite":
+        default_path = os.path.join(os.path.dirname(sql_utils.DB_PATH), "arenas.sqlite")
+        return SqliteArenaStore(os.getenv("ARENA_DB_PATH", default_path))
+    raise ValueError(f"Invalid ARENA_STORE: {kind}. Expected 'memory' or 'sqlite'.")
+
+
+_store: Optional[ArenaStore] = None
+_store_pid: Optional[int] = None
+_store_lock = threading.Lock()
+
+
+def get_arena_store() -> ArenaStore:
+    """Returns the process-wide arena store, creating it on first use.
+
+    A forked child builds its own store, since pooled connections must not cross fork.
+
+    Returns:
+        ArenaStore: The shared store.
+    """
+    global _store, _store_pid
+    if _store is not None and _store_pid == os.getpid():
+        return _store
+    with _store_lock:
+        if _store is None or _store_pid != os.getpid():
+            _store = create_arena_store()
+            _store_pid = os.getpid()
+            logger.info("Using %s arena store", _store.name)
+        return _store
+
+
+def set_arena_store(store: Optional[ArenaStore]) -> None:
+    """Replaces the process-wide arena store, closing the previous one.
+
+    Args:
+        store (ArenaStore, optional): The new store, or None to rebuild from the environment.
+    """
+    global _store, _store_pid
+    with _store_lock:
+        previous = _store if _store_pid == os.getpid() else None
+        _store = store
+        _store_pid = os.getpid() if store is not None else None
+    if previous is not None and previous is not store:
+        previous.close()
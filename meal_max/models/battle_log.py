@@ -0,0 +1,123 @@
+import itertools
+import logging
+import sqlite3
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.metrics import timed_query
+from meal_max.utils.sql_utils import get_db_connection
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+def _int_rows(cursor: sqlite3.Cursor, width: int) -> np.ndarray:
+    """Streams an all-integer result set into an (N, width) int64 array."""
+    return np.fromiter(itertools.chain.from_iterable(cursor), dtype=np.int64).reshape(-1, width)
+
+
+def _replay(cursor: sqlite3.Cursor) -> Tuple[int, np.ndarray, np.ndarray, np.ndarray]:
+    """Recomputes every meal's counters from the baseline and the battles log.
+
+    The log is read once, as three integer columns with NULL as 0 (never a meal ID), and
+    tallied with np.bincount: each row is one battle for each combatant and one win for
+    the winner.
+
+    Returns:
+        Tuple[int, np.ndarray, np.ndarray, np.ndarray]: The number of log rows; the meals
+            table as (id, battles, wins) rows; and the replayed battles and wins, indexed
+            by meal ID.
+    """
+    log = _int_rows(cursor.execute(
+        "SELECT combatant_1, IFNULL(combatant_2, 0), IFNULL(winner_id, 0) FROM battles"), 3)
+    baseline = _int_rows(cursor.execute("SELECT meal_id, battles, wins FROM battle_stats_baseline"), 3)
+    meals = _int_rows(cursor.execute("SELECT id, IFNULL(battles, 0), IFNULL(wins, 0) FROM meals"), 3)
+
+    size = 1 + max(int(meals[:, 0].max(initial=0)), int(baseline[:, 0].max(initial=0)), int(log.max(initial=0)))
+    battles = np.bincount(log[:, :2].ravel(), minlength=size)
+    wins = np.bincount(log[:, 2], minlength=size)
+    battles[baseline[:, 0]] += baseline[:, 1]
+    wins[baseline[:, 0]] += baseline[:, 2]
+    return len(log), meals, battles, wins
+
+
+def _mismatches(meals: np.ndarray, battles: np.ndarray, wins: np.ndarray) -> np.ndarray:
+    """Returns the (id, battles, wins) rows of meals whose counters differ from the replay."""
+    ids = meals[:, 0]
+    return meals[(meals[:, 1] != battles[ids]) | (meals[:, 2] != wins[ids])]
+
+
+def _report(events: int, rows: np.ndarray, battles: np.ndarray, wins: np.ndarray) -> dict[str, Any]:
+    mismatches: List[Dict[str, int]] = [
+        {'id': meal_id, 'battles': meal_battles, 'wins': meal_wins,
+         'log_battles': int(battles[meal_id]), 'log_wins': int(wins[meal_id])}
+        for meal_id, meal_battles, meal_wins in rows.tolist()
+    ]
+    return {'events': events, 'mismatches': mismatches}
+
+
+@timed_query
+def audit_battle_stats() -> dict[str, Any]:
+    """Compares every meal's battles and wins with a replay of the battles log.
+
+    A meal's counters should equal its baseline (the counters it had when it entered the
+    log) plus one battle per log row it appears in and one win per row it won.
+
+    Returns:
+        dict[str, Any]: 'events', the number of log rows replayed, and 'mismatches', one
+            dict per disagreeing meal with its id, battles and wins and the log_battles and
+            log_wins the replay expects, ordered by ID.
+
+    Raises:
+        sqlite3.Error: If a database error occurs.
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # One read transaction, so the log and the counters are read at the same point
+            cursor.execute("BEGIN")
+            events, meals, battles, wins = _replay(cursor)
+            conn.rollback()
+    except sqlite3.Error as e:
+        logger.error("Database error while auditing battle stats: %s", str(e))
+        raise e
+
+    report = _report(events, _mismatches(meals, battles, wins), battles, wins)
+    logger.info("Audited %d battle log rows: %d meals disagree", events, len(report['mismatches']))
+    return report
+
+
+@timed_query
+def rebuild_battle_stats() -> dict[str, Any]:
+    """Resets every meal's battles and wins to a replay of the battles log.
+
+    The replay and the writes share one BEGIN IMMEDIATE transaction, so no battle can be
+    recorded in between. Only meals whose counters differ are written (the leaderboard
+    triggers follow them).
+
+    Returns:
+        dict[str, Any]: The audit report (see audit_battle_stats) of the meals corrected.
+
+    Raises:
+        sqlite3.Error: If a database error occurs; nothing is written (the pool rolls back).
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            events, meals, battles, wins = _replay(cursor)
+            rows = _mismatches(meals, battles, wins)
+            ids = rows[:, 0]
+            cursor.executemany("UPDATE meals SET battles = ?, wins = ? WHERE id = ?",
+                               zip(battles[ids].tolist(), wins[ids].tolist(), ids.tolist()))
+            conn.commit()
+    except sqlite3.Error as e:
+        logger.error("Database error while rebuilding battle stats: %s", str(e))
+        raise e
+
+    report = _report(events, rows, battles, wins)
+    logger.info("Replayed %d battle log rows: corrected %d meals", events, len(report['mismatches']))
+    return report
@@ -1,36 +1,113 @@
+import asyncio
 import logging
-from typing import List
+import os
+from typing import Iterable, List, Optional, Tuple, Union
 
-from meal_max.models.kitchen_model import Meal, update_meal_stats
-from meal_max.utils.logger import configure_logger
-from meal_max.utils.random_utils import get_random
+from meal_max.models.battle_writer import get_battle_writer
+from meal_max.models.kitchen_model import BattleRecord, Meal, battle_score, get_meal_by_id, record_battle_result
+from meal_max.utils.async_utils import run_db
+from meal_max.utils.logger import HOT_PATH, configure_logger
+from meal_max.utils.random_source import RandomSource, get_random_source
 
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
+# The most battles one run_battles() call (and one /api/battles request) may start.
+BATTLES_MAX_PAIRINGS = int(os.getenv("BATTLES_MAX_PAIRINGS", "500"))
+
+
 class BattleModel:
     """Represents the battle logic between meals for the Meal Max application.
 
     Attributes:
         combatants (List[Meal]): A list of meals prepared for battle.
+        random_source (RandomSource): The source of battle random numbers, or None to use
+            the process-wide source from get_random_source().
     """
 
-    def __init__(self):
-        """Initializes a new BattleModel instance with an empty list of combatants."""
+    def __init__(self, random_source: Optional[RandomSource] = None):
+        """Initializes a new BattleModel instance with an empty list of combatants.
+
+        Args:
+            random_source (RandomSource, optional): The source of battle random numbers.
+                Defaults to the process-wide source.
+        """
         self.combatants: List[Meal] = []
+        self.random_source = random_source
 
     def battle(self) -> str:
         """Conducts a battle between the two prepared combatants and determines a winner.
 
+        With BATTLE_WRITE_BEHIND on, the result is queued for the battle writer's next flush
+        (see battle_writer) instead of being committed before this returns.
+
         Returns:
             str: The name of the winning meal.
 
         Raises:
             ValueError: If there are fewer than two combatants.
         """
-        logger.info("Two meals enter, one meal leaves!")
+        combatant_1, combatant_2, score_1, score_2 = self._start_battle()
+
+        # Get random number from the configured source (random.org by default)
+        random_number = (self.random_source or get_random_source()).get_random()
+
+        winner, loser, record = self._decide(combatant_1, combatant_2, score_1, score_2, random_number)
+
+        # Update stats for both combatants and log the battle in one transaction, now or in
+        # the write-behind writer's next batch
+        writer = get_battle_writer()
+        if writer is None:
+            record_battle_result(winner.id, loser.id, record)
+        else:
+            writer.record(record)
+
+        # Remove the losing combatant from combatants
+        self.combatants.remove(loser)
+
+        return winner.meal
+
+    async def battle_async(self) -> str:
+        """Conducts a battle like battle(), without blocking the event loop.
+
+        The random number is awaited from the source's async path and the stats update runs
+        on the bounded database executor, so many battles (on separate models) can wait on
+        randomness at once. Like battle(), a single model runs one battle at a time.
+
+        Returns:
+            str: The name of the winning meal.
+
+        Raises:
+            ValueError: If there are fewer than two combatants.
+        """
+        combatant_1, combatant_2, score_1, score_2 = self._start_battle()
+
+        random_number = await (self.random_source or get_random_source()).get_random_async()
+
+        winner, loser, record = self._decide(combatant_1, combatant_2, score_1, score_2, random_number)
+
+        writer = get_battle_writer()
+        if writer is None:
+            await run_db(record_battle_result, winner.id, loser.id, record)
+        else:
+            await writer.record_async(record)
+
+        self.combatants.remove(loser)
+
+        return winner.meal
+
+    def _start_battle(self) -> Tuple[Meal, Meal, float, float]:
+        """Checks the combatants and computes their battle scores.
+
+        Returns:
+            Tuple[Meal, Meal, float, float]: Both combatants and their battle scores.
+
+        Raises:
+            ValueError: If there are fewer than two combatants.
+        """
+        logger.debug("Two meals enter, one meal leaves!", extra=HOT_PATH)
 
         if len(self.combatants) < 2:
             logger.error("Not enough combatants to start a battle.")
@@ -40,27 +117,33 @@ class BattleModel:
         combatant_2 = self.combatants[1]
 
         # Log the start of the battle
-        logger.info("Battle started between %s and %s", combatant_1.meal, combatant_2.meal)
+        logger.debug("Battle started between %s and %s", combatant_1.meal, combatant_2.meal, extra=HOT_PATH)
 
         # Get battle scores for both combatants
         score_1 = self.get_battle_score(combatant_1)
         score_2 = self.get_battle_score(combatant_2)
 
         # Log the scores for both combatants
-        logger.info("Score for %s: %.3f", combatant_1.meal, score_1)
-        logger.info("Score for %s: %.3f", combatant_2.meal, score_2)
+        logger.debug("Score for %s: %.3f", combatant_1.meal, score_1, extra=HOT_PATH)
+        logger.debug("Score for %s: %.3f", combatant_2.meal, score_2, extra=HOT_PATH)
+
+        return combatant_1, combatant_2, score_1, score_2
+
+    def _decide(self, combatant_1: Meal, combatant_2: Meal, score_1: float, score_2: float,
+                random_number: float) -> Tuple[Meal, Meal, BattleRecord]:
+        """Picks the winner: combatant 1 wins iff abs(score_1 - score_2) / 100 > random_number.
 
+        Returns:
+            Tuple[Meal, Meal, BattleRecord]: The winner, the loser and the battle's log record.
+        """
         # Compute the delta and normalize between 0 and 1
         delta = abs(score_1 - score_2) / 100
 
         # Log the delta and normalized delta
-        logger.info("Delta between scores: %.3f", delta)
-
-        # Get random number from random.org
-        random_number = get_random()
+        logger.debug("Delta between scores: %.3f", delta, extra=HOT_PATH)
 
         # Log the random number
-        logger.info("Random number from random.org: %.3f", random_number)
+        logger.debug("Random number: %.3f", random_number, extra=HOT_PATH)
 
         # Determine the winner based on the normalized delta
         if delta > random_number:
@@ -71,16 +154,9 @@ class BattleModel:
             loser = combatant_1
 
         # Log the winner
-        logger.info("The winner is: %s", winner.meal)
+        logger.info("The winner is: %s", winner.meal, extra=HOT_PATH)
 
-        # Update stats for both combatants
-        update_meal_stats(winner.id, 'win')
-        update_meal_stats(loser.id, 'loss')
-
-        # Remove the losing combatant from combatants
-        self.combatants.remove(loser)
-
-        return winner.meal
+        return winner, loser, BattleRecord(combatant_1.id, combatant_2.id, winner.id, score_1, score_2, random_number)
 
     def clear_combatants(self):
         """Clears the list of combatants."""
@@ -88,7 +164,7 @@ class BattleModel:
         self.combatants.clear()
 
     def get_battle_score(self, combatant: Meal) -> float:
-        """Calculates the battle score for a given combatant.
+        """Calculates the battle score for a given combatant with kitchen_model.battle_score.
 
         Args:
             combatant (Meal): The meal object representing the combatant.
@@ -96,17 +172,12 @@ class BattleModel:
         Returns:
             float: The calculated battle score for the combatant.
         """
-        difficulty_modifier = {"HIGH": 1, "MED": 2, "LOW": 3}
-
-        # Log the calculation process
-        logger.info("Calculating battle score for %s: price=%.3f, cuisine=%s, difficulty=%s",
-                    combatant.meal, combatant.price, combatant.cuisine, combatant.difficulty)
-
         # Calculate score
-        score = (combatant.price * len(combatant.cuisine)) - difficulty_modifier[combatant.difficulty]
+        score = battle_score(combatant.price, combatant.cuisine, combatant.difficulty)
 
-        # Log the calculated score
-        logger.info("Battle score for %s: %.3f", combatant.meal, score)
+        # One line per score: this runs for every combatant of every battle and tournament
+        logger.debug("Battle score for %s: %.3f (price=%.3f, cuisine=%s, difficulty=%s)", combatant.meal, score,
+                     combatant.price, combatant.cuisine, combatant.difficulty, extra=HOT_PATH)
 
         return score
 
@@ -116,7 +187,7 @@ class BattleModel:
         Returns:
             List[Meal]: The list of combatants.
         """
-        logger.info("Retrieving current list of combatants.")
+        logger.debug("Retrieving current list of combatants.")
         return self.combatants
 
     def prep_combatant(self, combatant_data: Meal):
@@ -133,9 +204,61 @@ class BattleModel:
             raise ValueError("Combatant list is full, cannot add more combatants.")
 
         # Log the addition of the combatant
-        logger.info("Adding combatant '%s' to combatants list", combatant_data.meal)
+        logger.info("Adding combatant '%s' to combatants list", combatant_data.meal, extra=HOT_PATH)
 
         self.combatants.append(combatant_data)
 
         # Log the current state of combatants
-        logger.info("Current combatants list: %s", [combatant.meal for combatant in self.combatants])
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Current combatants list: %s", [combatant.meal for combatant in self.combatants])
+
+
+def run_battles(pairings: Iterable[Tuple[int, int]],
+                random_source: Optional[RandomSource] = None) -> List[Union[str, Exception]]:
+    """Runs one battle per pairing, all of them in flight at once on a new event loop.
+
+    Each pairing gets its own BattleModel and is played with battle_async(), so the battles
+    wait on randomness together instead of one after another. Each result is recorded like
+    battle() records it, on its own: a battle that fails does not stop or undo the others.
+    The loop lives for this call only, which lets a synchronous caller (such as a WSGI
+    request thread) use the async path.
+
+    Args:
+        pairings (Iterable[Tuple[int, int]]): (combatant_1, combatant_2) meal IDs, the first
+            of each taking the deciding first slot.
+        random_source (RandomSource, optional): The source of battle random numbers.
+            Defaults to the process-wide source.
+
+    Returns:
+        List[Union[str, Exception]]: For each pairing, in order, the name of the winner, or
+            the exception that battle raised, in which case its result was not recorded.
+
+    Raises:
+        ValueError: If there are no pairings or more than BATTLES_MAX_PAIRINGS, or a meal
+            has been deleted or is not found. No battle is played in that case.
+    """
+    pairings = list(pairings)
+    if not pairings or len(pairings) > BATTLES_MAX_PAIRINGS:
+        raise ValueError(f"Invalid number of pairings: {len(pairings)}. Must be between 1 and {BATTLES_MAX_PAIRINGS}.")
+
+    models = []
+    for meal_id_1, meal_id_2 in pairings:
+        model = BattleModel(random_source)
+        model.prep_combatant(get_meal_by_id(meal_id_1))
+        model.prep_combatant(get_meal_by_id(meal_id_2))
+        models.append(model)
+    source = random_source or get_random_source()
+
+    async def play() -> List[Union[str, Exception]]:
+        try:
+            return list(await asyncio.gather(*(model.battle_async() for model in models), return_exceptions=True))
+        finally:
+            # The loop ends with this call; its HTTP session must not outlive it.
+            await source.release_loop()
+
+    logger.info("Running %d battles", len(models))
+    outcomes = asyncio.run(play())
+    for (meal_id_1, meal_id_2), outcome in zip(pairings, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error("Battle between meals %s and %s failed: %s", meal_id_1, meal_id_2, outcome)
+    return outcomes
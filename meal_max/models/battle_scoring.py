@@ -0,0 +1,226 @@
+import logging
+import sqlite3
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from meal_max.models.kitchen_model import DIFFICULTY_MODIFIERS, Meal, _select_active_rows
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.random_source import RANDOM_GRID_SIZE
+from meal_max.utils.sql_utils import get_db_connection
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+@dataclass(frozen=True)
+class ScoreColumns:
+    """The columns battle scoring needs, one array entry per meal, ordered by ID.
+
+    Scores computed from these arrays are bit-identical to kitchen_model.battle_score:
+    float64 arithmetic on the same operands in the same order as the scalar path.
+
+    Attributes:
+        ids (np.ndarray): Meal IDs (int64), ascending.
+        prices (np.ndarray): Meal prices (float64).
+        cuisine_lengths (np.ndarray): len(cuisine) of each meal (int64).
+        modifiers (np.ndarray): DIFFICULTY_MODIFIERS of each meal's difficulty (int64).
+    """
+    ids: np.ndarray
+    prices: np.ndarray
+    cuisine_lengths: np.ndarray
+    modifiers: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def positions(self, meal_ids: Sequence[int]) -> np.ndarray:
+        """Maps meal IDs to their positions in these columns.
+
+        Raises:
+            ValueError: If any ID is not in the columns.
+        """
+        wanted = np.asarray(meal_ids, dtype=np.int64)
+        found = np.searchsorted(self.ids, wanted)
+        present = found < len(self.ids)
+        present[present] = self.ids[found[present]] == wanted[present]
+        if not present.all():
+            raise ValueError(f"Meal with ID {int(wanted[~present][0])} is not in the scored columns")
+        return found
+
+
+def _columns(rows: Sequence[Tuple[int, float, int, str]]) -> ScoreColumns:
+    ids, prices, lengths, difficulties = zip(*rows) if rows else ((), (), (), ())
+    return ScoreColumns(
+        ids=np.array(ids, dtype=np.int64),
+        prices=np.array(prices, dtype=np.float64),
+        cuisine_lengths=np.array(lengths, dtype=np.int64),
+        modifiers=np.array([DIFFICULTY_MODIFIERS[difficulty] for difficulty in difficulties], dtype=np.int64),
+    )
+
+
+def columns_from_meals(meals: Sequence[Meal]) -> ScoreColumns:
+    """Builds score columns from Meal objects, sorted by ID.
+
+    Args:
+        meals (Sequence[Meal]): The meals to score. IDs must be unique.
+
+    Returns:
+        ScoreColumns: The meals' scoring columns.
+    """
+    ordered = sorted(meals, key=lambda meal: meal.id)
+    return _columns([(meal.id, meal.price, len(meal.cuisine), meal.difficulty) for meal in ordered])
+
+
+def load_score_columns(meal_ids: Optional[Iterable[int]] = None) -> ScoreColumns:
+    """Reads the scoring columns of non-deleted meals straight from SQLite, without building Meals.
+
+    Cuisine lengths come from SQLite's length(), which counts characters like len().
+
+    Args:
+        meal_ids (Iterable[int], optional): The IDs to load. Defaults to every non-deleted meal.
+
+    Returns:
+        ScoreColumns: The meals' scoring columns, ordered by ID.
+
+    Raises:
+        ValueError: If any of the requested meals has been deleted or is not found.
+        sqlite3.Error: If a database error occurs.
+    """
+    columns = "id, price, length(cuisine), difficulty"
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            if meal_ids is None:
+                cursor.execute(f"SELECT {columns} FROM meals WHERE deleted = FALSE ORDER BY id")
+                rows = cursor.fetchall()
+            else:
+                meal_ids = set(meal_ids)
+                rows = _select_active_rows(cursor, columns, meal_ids)
+                missing = meal_ids - {row[0] for row in rows}
+                if missing:
+                    meal_id = min(missing)
+                    logger.info("Meal with ID %s not found or deleted", meal_id)
+                    raise ValueError(f"Meal with ID {meal_id} not found or has been deleted")
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+    logger.debug("Loaded score columns for %d meals", len(rows))
+    return _columns(rows)
+
+
+def load_battle_scores() -> Tuple[np.ndarray, np.ndarray]:
+    """Reads the stored battle scores (meals.score) of non-deleted meals.
+
+    The stored scores were computed by kitchen_model.battle_score when each meal was
+    inserted, so they need no recomputation and equal battle_scores() of the same meals.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Meal IDs (int64, ascending) and their scores (float64).
+
+    Raises:
+        sqlite3.Error: If a database error occurs.
+    """
+    try:
+        with get_db_connection() as conn:
+            rows = conn.execute("SELECT id, score FROM meals WHERE deleted = FALSE ORDER BY id").fetchall()
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+    logger.debug("Loaded stored battle scores for %d meals", len(rows))
+    ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    scores = np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+    return ids, scores
+
+
+def battle_scores(columns: ScoreColumns) -> np.ndarray:
+    """Computes price * len(cuisine) - modifier for every meal.
+
+    Returns:
+        np.ndarray: float64 scores, aligned with columns.ids.
+    """
+    return columns.prices * columns.cuisine_lengths - columns.modifiers
+
+
+def battle_deltas(scores: np.ndarray, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Computes abs(score_1 - score_2) / 100 for each pairing.
+
+    Args:
+        scores (np.ndarray): Scores from battle_scores().
+        first (np.ndarray): Positions (into scores) of the first-slot combatants.
+        second (np.ndarray): Positions of the second-slot combatants.
+
+    Returns:
+        np.ndarray: The normalized deltas, one per pairing.
+    """
+    return np.abs(scores[first] - scores[second]) / 100
+
+
+def battle_outcomes(deltas: np.ndarray, randoms: Sequence[float]) -> np.ndarray:
+    """Decides each pairing with the BattleModel.battle() rule.
+
+    Returns:
+        np.ndarray: True where the first-slot combatant wins (delta > random).
+
+    Raises:
+        ValueError: If the number of random numbers does not match the number of deltas.
+    """
+    randoms = np.asarray(randoms, dtype=np.float64)
+    if randoms.shape != deltas.shape:
+        raise ValueError(f"Expected {len(deltas)} random numbers, got {len(randoms)}.")
+    return deltas > randoms
+
+
+def winning_draws(deltas: np.ndarray) -> np.ndarray:
+    """Counts the random numbers with which the first-slot combatant wins each pairing.
+
+    The random number is k / RANDOM_GRID_SIZE for a uniform k (see random_source), so the
+    first slot wins with the grid points below the delta, compared as battle_outcomes does,
+    and the second slot with the rest.
+
+    Returns:
+        np.ndarray: int64 counts between 0 (equal scores) and RANDOM_GRID_SIZE.
+    """
+    grid = np.arange(RANDOM_GRID_SIZE) / RANDOM_GRID_SIZE
+    return np.searchsorted(grid, deltas, side='left')
+
+
+def win_probabilities(deltas: np.ndarray) -> np.ndarray:
+    """Computes the exact chance that the first-slot combatant wins each pairing.
+
+    This is min(delta, 1) rounded up to the random number grid, and 0 only for equal scores.
+
+    Returns:
+        np.ndarray: float64 probabilities, one per delta.
+    """
+    return winning_draws(deltas) / RANDOM_GRID_SIZE
+
+
+def play_pairings(columns: ScoreColumns, pairings: Sequence[Tuple[int, int]],
+                  randoms: Sequence[float], scores: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Scores and decides a batch of (combatant_1, combatant_2) meal ID pairings.
+
+    Args:
+        columns (ScoreColumns): Columns covering every meal in the pairings.
+        pairings (Sequence[Tuple[int, int]]): Meal ID pairs; the first slot wins iff delta > random.
+        randoms (Sequence[float]): One random number per pairing.
+        scores (np.ndarray, optional): Precomputed battle_scores(columns).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Winner IDs and loser IDs, one per pairing.
+
+    Raises:
+        ValueError: If a meal is not in columns or the random numbers do not match the pairings.
+    """
+    pairs = np.asarray(pairings, dtype=np.int64).reshape(-1, 2)
+    first, second = columns.positions(pairs[:, 0]), columns.positions(pairs[:, 1])
+    if scores is None:
+        scores = battle_scores(columns)
+    first_wins = battle_outcomes(battle_deltas(scores, first, second), randoms)
+    winners = np.where(first_wins, pairs[:, 0], pairs[:, 1])
+    losers = np.where(first_wins, pairs[:, 1], pairs[:, 0])
+    return winners, losers
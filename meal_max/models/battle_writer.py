@@ -0,0 +1,396 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from meal_max.models.kitchen_model import (BattleRecord, get_active_meal_ids, record_battle_results,
+                                           set_pending_battles)
+from meal_max.utils.async_utils import run_db
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+T = TypeVar("T")
+
+
+# Batch battle results in memory instead of committing each one (see BattleWriter)
+BATTLE_WRITE_BEHIND = os.getenv("BATTLE_WRITE_BEHIND", "false").lower() == "true"
+# A batch is flushed once its oldest battle is this old, or once it holds this many battles
+BATTLE_FLUSH_INTERVAL_MS = float(os.getenv("BATTLE_FLUSH_INTERVAL_MS", "50"))
+BATTLE_FLUSH_MAX_BATTLES = int(os.getenv("BATTLE_FLUSH_MAX_BATTLES", "500"))
+# Whether a battle waits for the flush that commits it, rather than returning once queued
+BATTLE_WRITE_DURABLE = os.getenv("BATTLE_WRITE_DURABLE", "false").lower() == "true"
+
+
+class BattleWriter:
+    """Queues battle results in memory and records each batch in one transaction.
+
+    A background thread flushes the queue once its oldest battle is interval seconds old or
+    it holds max_battles battles. Flushes go through record_battle_results, so stats, Elo
+    ratings and the battles log end up as if each battle had been committed on its own, in
+    order, at the cost of one commit per batch. Meanwhile kitchen_model.get_leaderboard and
+    get_leaderboard_page merge the queued battles into their rows. Only this process's queue
+    is merged: other processes see a battle once it is flushed.
+
+    With durable=False, record() returns as soon as the battle is queued; a crash loses at
+    most the battles not yet flushed, and a batch that fails to commit is retried after
+    interval seconds. With durable=True, record() waits for the flush that commits its
+    battle and raises if that fails, like record_battle_result; concurrent battles still
+    share one commit. Either way, a battle whose meal is deleted before the flush is
+    dropped (record() raises ValueError for it when durable).
+
+    Attributes:
+        interval (float): Seconds a queued battle may wait for its flush.
+        max_battles (int): Queued battles that trigger a flush right away.
+        durable (bool): Whether record() waits until its battle is committed.
+    """
+
+    def __init__(self, interval: float = BATTLE_FLUSH_INTERVAL_MS / 1000,
+                 max_battles: int = BATTLE_FLUSH_MAX_BATTLES, durable: bool = BATTLE_WRITE_DURABLE):
+        """Initializes an empty queue. The flush thread is started on first use.
+
+        Raises:
+            ValueError: If interval or max_battles are out of range.
+        """
+        if interval <= 0:
+            raise ValueError(f"Invalid flush interval: {interval}. Must be positive.")
+        if max_battles < 1:
+            raise ValueError(f"Invalid max battles: {max_battles}. Must be at least 1.")
+
+        self.interval = interval
+        self.max_battles = max_battles
+        self.durable = durable
+
+        # (sequence number, record) in battle order; sequence numbers count accepted battles.
+        self._queue: List[Tuple[int, BattleRecord]] = []
+        self._oldest = 0.0
+        self._retry_at = 0.0
+        self._cond = threading.Condition(threading.Lock())
+        # Held for a whole flush, so only one batch is in flight at a time.
+        self._flush_lock = threading.Lock()
+        # Bumped when a batch leaves the queue and again once it is settled, so it is odd while
+        # a flush is in flight. Leaderboard reads use it to detect a flush that overlapped them.
+        self._flush_generation = 0
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._accepted = 0
+        # Every battle up to this sequence number is committed, dropped or failed.
+        self._settled = 0
+        self._errors: Dict[int, Exception] = {}
+
+        self._flushes = 0
+        self._flush_failures = 0
+        self._recorded = 0
+        self._dropped = 0
+        self._flush_latency_total = 0.0
+        self._flush_latency_max = 0.0
+
+    @property
+    def accepted(self) -> int:
+        """The number of battles queued so far, flushed or not."""
+        return self._accepted
+
+    def _ensure_thread(self) -> None:
+        """Starts the flush thread if it is not running. Caller holds the lock."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._flush_loop, name="battle-writer", daemon=True)
+            self._thread.start()
+
+    def _due_in(self) -> Optional[float]:
+        """Seconds until the queue is due for a flush, or None while it is empty. Caller holds the lock."""
+        if not self._queue:
+            return None
+        due_at = self._oldest + self.interval if len(self._queue) < self.max_battles else 0.0
+        return max(0.0, max(due_at, self._retry_at) - time.monotonic())
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed:
+                    due_in = self._due_in()
+                    if due_in == 0.0:
+                        break
+                    self._cond.wait(due_in)
+                if self._closed:
+                    # close() flushes whatever is left.
+                    return
+            self.flush()
+
+    def record(self, record: BattleRecord) -> None:
+        """Queues a battle for the next flush.
+
+        Waits while two full batches are already queued, so a slow database holds battles
+        back rather than letting the queue grow without bound.
+
+        Args:
+            record (BattleRecord): The battle, as BattleModel.battle() decided it.
+
+        Raises:
+            RuntimeError: If the writer is closed.
+            ValueError: If durable and a meal was deleted before the flush.
+            sqlite3.Error: If durable and the flush failed.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: len(self._queue) < 2 * self.max_battles or self._closed)
+            if self._closed:
+                raise RuntimeError("Battle writer is closed.")
+            sequence = self._enqueue(record)
+
+            if not self.durable:
+                return
+            self._cond.wait_for(lambda: self._settled >= sequence)
+            error = self._errors.pop(sequence, None)
+
+        if error is not None:
+            raise error
+
+    async def record_async(self, record: BattleRecord) -> None:
+        """Queues a battle like record(), without blocking the event loop.
+
+        Raises:
+            As for record().
+        """
+        if not self.durable:
+            with self._cond:
+                if len(self._queue) < 2 * self.max_battles and not self._closed:
+                    self._enqueue(record)
+                    return
+        # Waiting for room in the queue, or for the commit, happens on a database thread.
+        await run_db(self.record, record)
+
+    def _enqueue(self, record: BattleRecord) -> int:
+        """Appends a battle to the queue and wakes the flush thread if needed. Caller holds the lock.
+
+        Returns:
+            int: The battle's sequence number.
+        """
+        self._ensure_thread()
+        if not self._queue:
+            self._oldest = time.monotonic()
+        self._accepted += 1
+        self._queue.append((self._accepted, record))
+        # The flush thread sleeps while the queue is empty, and until the deadline after that.
+        if len(self._queue) in (1, self.max_battles):
+            self._cond.notify_all()
+        return self._accepted
+
+    def read_pending(self, read: Callable[[List[Tuple[int, int]]], T]) -> T:
+        """Runs read on the queued battles, so it sees each battle queued or committed, never both or neither.
+
+        read gets the queued (winner_id, loser_id) pairs, in battle order, and does its own
+        database reads. No lock is held while it runs: if a flush commits some of those
+        battles meanwhile, read runs again on a fresh copy of the queue. After a few such
+        retries it runs once more with flushes held off.
+
+        Args:
+            read (Callable): Builds the result from the queued battles and the database.
+
+        Returns:
+            The return value of read.
+        """
+        for _ in range(3):
+            with self._cond:
+                # A batch in flight may or may not be visible to the read yet; wait for it to settle.
+                self._cond.wait_for(lambda: self._flush_generation % 2 == 0)
+                generation = self._flush_generation
+                results = [(record.winner_id, record.loser_id) for _, record in self._queue]
+            value = read(results)
+            if not results:
+                # Battles queued after the copy are newer than the read; those flushed are not double counted.
+                return value
+            with self._cond:
+                if self._flush_generation == generation:
+                    return value
+        with self._flush_lock:
+            with self._cond:
+                results = [(record.winner_id, record.loser_id) for _, record in self._queue]
+            return read(results)
+
+    def flush(self) -> int:
+        """Records every queued battle now, in one transaction.
+
+        Returns:
+            int: The number of battles recorded.
+        """
+        with self._flush_lock:
+            with self._cond:
+                batch, self._queue = self._queue, []
+                if batch:
+                    self._flush_generation += 1
+            if not batch:
+                return 0
+
+            start = time.perf_counter()
+            try:
+                dropped = self._write(batch)
+            except Exception as e:
+                logger.error("Failed to record %d queued battle(s): %s", len(batch), e)
+                with self._cond:
+                    self._flush_failures += 1
+                    if self.durable:
+                        self._errors.update((sequence, e) for sequence, _ in batch)
+                        self._settled = batch[-1][0]
+                    else:
+                        self._queue = batch + self._queue
+                        self._oldest = time.monotonic()
+                        self._retry_at = time.monotonic() + self.interval
+                    self._flush_generation += 1
+                    self._cond.notify_all()
+                return 0
+
+            elapsed = time.perf_counter() - start
+            with self._cond:
+                if self.durable:
+                    self._errors.update(dropped)
+                self._settled = batch[-1][0]
+                self._flush_generation += 1
+                self._flushes += 1
+                self._recorded += len(batch) - len(dropped)
+                self._dropped += len(dropped)
+                self._flush_latency_total += elapsed
+                self._flush_latency_max = max(self._flush_latency_max, elapsed)
+                self._cond.notify_all()
+
+        logger.debug("Flushed %d queued battle(s) in %.3fs", len(batch) - len(dropped), elapsed)
+        return len(batch) - len(dropped)
+
+    @staticmethod
+    def _write(batch: List[Tuple[int, BattleRecord]]) -> Dict[int, Exception]:
+        """Records a batch, dropping battles whose meals are no longer active.
+
+        Returns:
+            Dict[int, Exception]: The error of each dropped battle, by sequence number.
+        """
+        dropped: Dict[int, Exception] = {}
+        while batch:
+            try:
+                record_battle_results([(record.winner_id, record.loser_id) for _, record in batch],
+                                      [record for _, record in batch])
+                break
+            except ValueError:
+                active = get_active_meal_ids(
+                    {meal_id for _, record in batch for meal_id in (record.winner_id, record.loser_id)})
+                kept = []
+                for sequence, record in batch:
+                    inactive = {record.winner_id, record.loser_id} - active
+                    if inactive:
+                        meal_id = min(inactive)
+                        logger.warning("Dropping queued battle %s: meal %s not found or deleted", record, meal_id)
+                        dropped[sequence] = ValueError(f"Meal with ID {meal_id} not found or has been deleted")
+                    else:
+                        kept.append((sequence, record))
+                if len(kept) == len(batch):
+                    raise
+                batch = kept
+        return dropped
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                'durable': self.durable,
+                'flush_interval_seconds': self.interval,
+                'flush_max_battles': self.max_battles,
+                'queued': len(self._queue),
+                'accepted': self._accepted,
+                'recorded': self._recorded,
+                'dropped': self._dropped,
+                'flushes': self._flushes,
+                'flush_failures': self._flush_failures,
+                'flush_latency_mean_seconds':
+                    round(self._flush_latency_total / self._flushes, 6) if self._flushes else 0.0,
+                'flush_latency_max_seconds': round(self._flush_latency_max, 6),
+            }
+
+    def close(self) -> None:
+        """Stops the flush thread and records every battle still queued."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+        self.flush()
+        with self._cond:
+            lost = len(self._queue)
+            self._queue = []
+        if lost:
+            logger.error("Discarded %d queued battle(s) that could not be recorded", lost)
+
+
+def create_battle_writer() -> Optional[BattleWriter]:
+    """Builds the battle writer described by the BATTLE_* environment variables.
+
+    Returns:
+        BattleWriter: The configured writer, or None if BATTLE_WRITE_BEHIND is off and each
+            battle is committed as it is fought.
+    """
+    if not BATTLE_WRITE_BEHIND:
+        return None
+    return BattleWriter()
+
+
+_writer: Optional[BattleWriter] = None
+_writer_pid: Optional[int] = None
+_writer_lock = threading.Lock()
+
+
+def get_battle_writer() -> Optional[BattleWriter]:
+    """Returns the process-wide battle writer, creating it on first use.
+
+    A forked child gets its own writer, since the parent's flush thread does not survive fork.
+
+    Returns:
+        BattleWriter: The shared writer, or None if battles are committed as they are fought.
+    """
+    global _writer, _writer_pid
+    if _writer_pid == os.getpid():
+        return _writer
+    with _writer_lock:
+        if _writer_pid != os.getpid():
+            _writer = create_battle_writer()
+            _writer_pid = os.getpid()
+            set_pending_battles(_writer.read_pending if _writer is not None else None)
+            if _writer is not None:
+                logger.info("Batching battle results every %.3fs or %d battles (durable=%s)",
+                            _writer.interval, _writer.max_battles, _writer.durable)
+        return _writer
+
+
+def set_battle_writer(writer: Optional[BattleWriter]) -> None:
+    """Replaces the process-wide battle writer, flushing and closing the previous one.
+
+    Args:
+        writer (BattleWriter, optional): The new writer, or None to rebuild from the environment.
+    """
+    global _writer, _writer_pid
+    with _writer_lock:
+        previous = _writer if _writer_pid == os.getpid() else None
+        _writer = writer
+        _writer_pid = os.getpid() if writer is not None else None
+    if previous is not None and previous is not writer:
+        previous.close()
+    set_pending_battles(writer.read_pending if writer is not None else None)
+
+
+def shutdown_battle_writer() -> None:
+    """Records every queued battle and stops the writer. A new one is created on next use."""
+    set_battle_writer(None)
+
+
+def _forget_parent_writer() -> None:
+    # The child inherits a copy of the parent's queue, which the parent flushes; merging it
+    # into the child's leaderboard reads would count those battles twice.
+    set_pending_battles(None)
+
+
+atexit.register(shutdown_battle_writer)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_parent_writer)
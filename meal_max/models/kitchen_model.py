@@ -1,19 +1,44 @@
+import base64
 from dataclasses import dataclass
+import heapq
+import json
 import logging
 import os
 import sqlite3
-from typing import Any
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
+from meal_max.models.ratings import RATING_INITIAL, rate_battle, rate_battles
+from meal_max.utils.cache import LRUCache
+from meal_max.utils import sql_utils
+from meal_max.utils.metrics import BATTLES, timed_query
 from meal_max.utils.sql_utils import get_db_connection
 from meal_max.utils.logger import configure_logger
 
-import os
 
-# I changed the path here to avoid misinformationa about the path, 
-# for anyone who sees this code they should apply their own paths for create_meal_table.sql below
-SQL_FILE_PATH = os.getenv("SQL_CREATE_TABLE_PATH", "/app/sql/create_meal_table.sql")
+# Maximum number of IDs bound into a single "id IN (...)" clause
+SQL_IN_CHUNK_SIZE = 500
+
+# Rows per transaction in create_meals_bulk, and the most row errors it reports back
+BULK_CHUNK_SIZE = 1000
+BULK_MAX_ERRORS = 1000
+
+# Leaderboard sort orders, and the page sizes get_leaderboard_page allows
+LEADERBOARD_SORTS = ['wins', 'win_pct', 'rating']
+LEADERBOARD_PAGE_SIZE = int(os.getenv("LEADERBOARD_PAGE_SIZE", "50"))
+LEADERBOARD_MAX_PAGE_SIZE = int(os.getenv("LEADERBOARD_MAX_PAGE_SIZE", "1000"))
 
+# Subtracted from a meal's battle score, by difficulty
+DIFFICULTY_MODIFIERS = {"HIGH": 1, "MED": 2, "LOW": 3}
 
+# Read-through cache for get_meal_by_id / get_meal_by_name. Lookups revalidate it against the
+# catalog version at most once per MEAL_CACHE_REVALIDATE_MS, so a meal changed or deleted by
+# another process is served from it for at most that long (0 checks on every lookup).
+MEAL_CACHE_ENABLED = os.getenv("MEAL_CACHE_ENABLED", "true").lower() == "true"
+MEAL_CACHE_SIZE = int(os.getenv("MEAL_CACHE_SIZE", "1024"))
+MEAL_CACHE_TTL = float(os.getenv("MEAL_CACHE_TTL", "300"))
+MEAL_CACHE_REVALIDATE_MS = float(os.getenv("MEAL_CACHE_REVALIDATE_MS", "1000"))
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
@@ -24,6 +49,9 @@ class Meal:
     """
     Represents a meal with attributes for ID, name, cuisine, price, and difficulty.
 
+    Meals use __slots__ rather than a per-instance __dict__, since caches and tournaments
+    hold many of them at once (see meal_catalog for a columnar store of a whole catalog).
+
     Attributes:
         id (int): The unique identifier for the meal.
         meal (str): The name of the meal.
@@ -31,6 +59,8 @@ class Meal:
         price (float): The price of the meal.
         difficulty (str): The difficulty level of preparing the meal ('LOW', 'MED', 'HIGH').
     """
+    __slots__ = ('id', 'meal', 'cuisine', 'price', 'difficulty')
+
     id: int
     meal: str
     cuisine: str
@@ -50,6 +80,172 @@ class Meal:
             raise ValueError("Difficulty must be 'LOW', 'MED', or 'HIGH'.")
 
 
+@dataclass
+class BattleRecord:
+    """
+    The details of one battle, as written to the battles log.
+
+    Attributes:
+        combatant_1 (int): The ID of the meal in the deciding first slot.
+        combatant_2 (int): The ID of the other meal.
+        winner_id (int): The ID of the winning meal.
+        score_1 (float, optional): The battle score of combatant 1, if known.
+        score_2 (float, optional): The battle score of combatant 2, if known.
+        random_number (float, optional): The random number that decided the battle, if known.
+    """
+    __slots__ = ('combatant_1', 'combatant_2', 'winner_id', 'score_1', 'score_2', 'random_number')
+
+    combatant_1: int
+    combatant_2: int
+    winner_id: int
+    score_1: Optional[float]
+    score_2: Optional[float]
+    random_number: Optional[float]
+
+    @property
+    def loser_id(self) -> int:
+        """The ID of the losing meal."""
+        return self.combatant_2 if self.winner_id == self.combatant_1 else self.combatant_1
+
+    def log_row(self, fought_at: float) -> tuple:
+        """Returns the parameters for _INSERT_BATTLE."""
+        return (fought_at, self.combatant_1, self.combatant_2, self.score_1, self.score_2, self.random_number,
+                self.winner_id)
+
+
+_INSERT_BATTLE = """
+    INSERT INTO battles (fought_at, combatant_1, combatant_2, score_1, score_2, random_number, winner_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+_meals_by_id = LRUCache(MEAL_CACHE_SIZE, MEAL_CACHE_TTL or None)
+_meals_by_name = LRUCache(MEAL_CACHE_SIZE, MEAL_CACHE_TTL or None)
+# Bumped by every invalidation, so a lookup that raced with a write does not cache a stale row.
+_cache_generation = 0
+_cache_lock = threading.Lock()
+# The database path and catalog version the cache was last validated against, and when
+_cache_catalog_key: Optional[Tuple[str, int]] = None
+_cache_validated_at = 0.0
+
+
+def configure_meal_cache(enabled: bool = True, maxsize: Optional[int] = None, ttl: Optional[float] = None) -> None:
+    """
+    Enables, disables or resizes the meal cache. The cache is emptied either way.
+
+    Args:
+        enabled (bool): Whether get_meal_by_id / get_meal_by_name use the cache.
+        maxsize (int, optional): Entries kept per key type. Defaults to the current size.
+        ttl (float, optional): Seconds an entry stays valid, 0 for no expiry. Defaults to the current TTL.
+    """
+    global MEAL_CACHE_ENABLED, _meals_by_id, _meals_by_name
+    maxsize = maxsize if maxsize is not None else _meals_by_id.maxsize
+    ttl = (ttl or None) if ttl is not None else _meals_by_id.ttl
+    MEAL_CACHE_ENABLED = enabled
+    _meals_by_id = LRUCache(maxsize, ttl)
+    _meals_by_name = LRUCache(maxsize, ttl)
+    logger.info("Meal cache %s (size=%d, ttl=%s)", "enabled" if enabled else "disabled", maxsize, ttl)
+
+
+def _bump_cache_generation() -> None:
+    global _cache_generation
+    with _cache_lock:
+        _cache_generation += 1
+
+
+def clear_meal_cache() -> None:
+    """Empties the meal cache."""
+    _bump_cache_generation()
+    _meals_by_id.clear()
+    _meals_by_name.clear()
+
+
+def invalidate_meal(meal_id: int) -> None:
+    """
+    Drops a meal from the cache under both its ID and its name.
+
+    Args:
+        meal_id (int): The unique ID of the meal.
+    """
+    _bump_cache_generation()
+    meal = _meals_by_id.pop(meal_id)
+    if meal is not None:
+        _meals_by_name.pop(meal.meal)
+    else:
+        _meals_by_name.pop_where(lambda cached: cached.id == meal_id)
+
+
+def invalidate_meal_name(meal_name: str) -> None:
+    """
+    Drops a meal from the cache by name.
+
+    Args:
+        meal_name (str): The name of the meal.
+    """
+    _bump_cache_generation()
+    meal = _meals_by_name.pop(meal_name)
+    if meal is not None:
+        _meals_by_id.pop(meal.id)
+
+
+def _revalidate_meal_cache() -> None:
+    """Empties the cache if any process has added, deleted or changed a meal since it was filled.
+
+    Invalidation is otherwise local to this process, so a meal deleted through another server
+    worker would be served from here until it expired. The catalog version is read at most
+    once per MEAL_CACHE_REVALIDATE_MS, so cache hits in between skip the database. The version
+    is read before the row, so a row read after it is dropped by the next check if the
+    catalog changed meanwhile.
+    """
+    global _cache_catalog_key, _cache_validated_at
+    now = time.monotonic()
+    if (_cache_catalog_key is not None and _cache_catalog_key[0] == sql_utils.DB_PATH
+            and now - _cache_validated_at < MEAL_CACHE_REVALIDATE_MS / 1000):
+        return
+    key = (sql_utils.DB_PATH, get_catalog_version())
+    if key != _cache_catalog_key:
+        clear_meal_cache()
+        _cache_catalog_key = key
+    _cache_validated_at = now
+
+
+def _cache_meal(meal: Meal, generation: int) -> None:
+    """Caches a meal read from the database, unless an invalidation happened since the read began."""
+    with _cache_lock:
+        if generation != _cache_generation:
+            return
+        _meals_by_id.put(meal.id, meal)
+        _meals_by_name.put(meal.meal, meal)
+
+
+def get_meal_cache_stats() -> dict[str, Any]:
+    """
+    Returns hit-rate statistics for the meal cache.
+
+    Returns:
+        dict[str, Any]: Whether the cache is enabled, plus the counters of the by-ID and by-name caches.
+    """
+    return {
+        'enabled': MEAL_CACHE_ENABLED,
+        'by_id': _meals_by_id.stats(),
+        'by_name': _meals_by_name.stats(),
+    }
+
+
+def battle_score(price: float, cuisine: str, difficulty: str) -> float:
+    """
+    Computes a meal's battle score: price * len(cuisine) - the difficulty modifier.
+
+    This is the single scoring formula. Inserts store its result in meals.score, and
+    BattleModel.get_battle_score applies it to the combatants.
+
+    Raises:
+        KeyError: If the difficulty is not in DIFFICULTY_MODIFIERS.
+    """
+    return (price * len(cuisine)) - DIFFICULTY_MODIFIERS[difficulty]
+
+
+@timed_query
 def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
     """
     Creates a new meal and inserts it into the database.
@@ -74,10 +270,11 @@ def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                INSERT INTO meals (meal, cuisine, price, difficulty)
-                VALUES (?, ?, ?, ?)
-            """, (meal, cuisine, price, difficulty))
+                INSERT INTO meals (meal, cuisine, price, difficulty, score)
+                VALUES (?, ?, ?, ?, ?)
+            """, (meal, cuisine, price, difficulty, battle_score(price, cuisine, difficulty)))
             conn.commit()
+            invalidate_meal_name(meal)
 
             logger.info("Meal successfully added to the database: %s", meal)
 
@@ -89,20 +286,221 @@ def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
         logger.error("Database error: %s", str(e))
         raise e
 
+# Spellings of the deleted flag accepted from CSV imports
+_BULK_BOOLEANS = {'true': True, 'false': False, '1': True, '0': False}
+
+
+def _validate_bulk_row(row: Any) -> tuple:
+    """
+    Validates one row of a bulk import and returns it as an INSERT parameter tuple.
+
+    Raises:
+        ValueError: If the row is malformed or any field is invalid.
+    """
+    if isinstance(row, Exception):
+        raise ValueError(str(row))
+    if not isinstance(row, dict):
+        raise ValueError("Row must be an object with meal, cuisine, price and difficulty")
+
+    meal = row.get('meal')
+    cuisine = row.get('cuisine')
+    price = row.get('price')
+    difficulty = row.get('difficulty')
+    battles = row.get('battles') or 0
+    wins = row.get('wins') or 0
+    deleted = row.get('deleted', False)
+
+    if not isinstance(meal, str) or not meal.strip():
+        raise ValueError("Invalid meal name: must be a non-empty string")
+    if not isinstance(cuisine, str) or not cuisine.strip():
+        raise ValueError("Invalid cuisine: must be a non-empty string")
+    try:
+        price = float(price)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid price: {price}. Price must be a positive number.")
+    if not price > 0:
+        raise ValueError(f"Invalid price: {price}. Price must be a positive number.")
+    if round(price, 2) != price:
+        raise ValueError(f"Invalid price: {price}. Price must have at most two decimal places.")
+    if difficulty not in ['LOW', 'MED', 'HIGH']:
+        raise ValueError(f"Invalid difficulty level: {difficulty}. Must be 'LOW', 'MED', or 'HIGH'.")
+    try:
+        battles, wins = int(battles), int(wins)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid battles or wins: must be integers")
+    if battles < 0 or not 0 <= wins <= battles:
+        raise ValueError(f"Invalid battles/wins: {battles}/{wins}. Need 0 <= wins <= battles.")
+    # Exports write the flag as a JSON boolean, or as True/False in CSV.
+    if isinstance(deleted, str):
+        deleted = _BULK_BOOLEANS.get(deleted.strip().lower(), deleted)
+    if deleted not in (True, False):
+        raise ValueError(f"Invalid deleted flag: {deleted}. Must be true or false.")
+
+    return (meal, cuisine, price, difficulty, battles, wins, battle_score(price, cuisine, difficulty), bool(deleted))
+
+
+@timed_query
+def create_meals_bulk(rows: Iterable[Any], chunk_size: int = BULK_CHUNK_SIZE) -> dict[str, Any]:
+    """
+    Inserts many meals, committing every chunk_size rows.
+
+    Each row is validated on its own; invalid rows and duplicate names are skipped and
+    reported rather than failing the whole import. Rows are consumed lazily, so a
+    streaming parser can feed an import of any size in constant memory.
+
+    Args:
+        rows (Iterable[Any]): Dicts with meal, cuisine, price, difficulty and optionally
+            battles, wins and deleted, so an export with include_deleted imports back
+            with its deleted meals still deleted. An Exception in place of a row (e.g.
+            from a parser that hit a malformed line) is reported as that row's error.
+        chunk_size (int): Rows per transaction. Defaults to BULK_CHUNK_SIZE.
+
+    Returns:
+        dict[str, Any]: The inserted and failed counts, and up to BULK_MAX_ERRORS
+        {'row': index, 'error': message} entries (row indexes start at 0).
+
+    Raises:
+        ValueError: If chunk_size is less than 1.
+        sqlite3.Error: If a database error occurs; chunks committed before it are kept.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"Invalid chunk size: {chunk_size}. Must be at least 1.")
+
+    summary = {'inserted': 0, 'failed': 0, 'errors': []}
+
+    def report(index: int, message: str) -> None:
+        summary['failed'] += 1
+        if len(summary['errors']) < BULK_MAX_ERRORS:
+            summary['errors'].append({'row': index, 'error': message})
+
+    chunk: List[Tuple[int, tuple]] = []
+    for index, row in enumerate(rows):
+        try:
+            chunk.append((index, _validate_bulk_row(row)))
+        except ValueError as e:
+            report(index, str(e))
+        if len(chunk) >= chunk_size:
+            _insert_meal_chunk(chunk, summary, report)
+            chunk = []
+    if chunk:
+        _insert_meal_chunk(chunk, summary, report)
+
+    logger.info("Bulk import finished: %d inserted, %d failed", summary['inserted'], summary['failed'])
+    return summary
+
+
+def _insert_meal_chunk(chunk: List[Tuple[int, tuple]], summary: dict[str, Any],
+                       report: Callable[[int, str], None]) -> None:
+    """Inserts one chunk of validated rows in a single transaction, skipping duplicate names."""
+    insert = ("INSERT INTO meals (meal, cuisine, price, difficulty, battles, wins, score, deleted) "
+              "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            existing = set()
+            names = [params[0] for _, params in chunk]
+            for start in range(0, len(names), SQL_IN_CHUNK_SIZE):
+                part = names[start:start + SQL_IN_CHUNK_SIZE]
+                cursor.execute(f"SELECT meal FROM meals WHERE meal IN ({', '.join('?' * len(part))})", part)
+                existing.update(name for (name,) in cursor.fetchall())
+
+            batch = []
+            for index, params in chunk:
+                if params[0] in existing:
+                    report(index, f"Meal with name '{params[0]}' already exists")
+                else:
+                    existing.add(params[0])
+                    batch.append((index, params))
+
+            try:
+                cursor.executemany(insert, [params for _, params in batch])
+                conn.commit()
+                summary['inserted'] += len(batch)
+            except sqlite3.IntegrityError:
+                # A concurrent writer inserted one of the names; fall back to row-by-row.
+                conn.rollback()
+                for index, params in batch:
+                    try:
+                        cursor.execute(insert, params)
+                        conn.commit()
+                        summary['inserted'] += 1
+                    except sqlite3.IntegrityError:
+                        conn.rollback()
+                        report(index, f"Meal with name '{params[0]}' already exists")
+
+    except sqlite3.Error as e:
+        logger.error("Database error during bulk import: %s", str(e))
+        raise e
+
+
+def iter_meals(batch_size: int = BULK_CHUNK_SIZE, include_deleted: bool = False) -> Iterator[dict[str, Any]]:
+    """
+    Yields every meal in ID order, reading batch_size rows per query.
+
+    Pages are fetched by keyset (id > last seen ID), and the connection goes back to the pool
+    between pages, so a slow consumer never holds a connection or the whole table in memory.
+
+    Args:
+        batch_size (int): Rows per query. Defaults to BULK_CHUNK_SIZE.
+        include_deleted (bool): Whether to include soft-deleted meals. Defaults to False.
+
+    Yields:
+        dict[str, Any]: id, meal, cuisine, price, difficulty, battles, wins and deleted.
+
+    Raises:
+        ValueError: If batch_size is less than 1.
+        sqlite3.Error: If a database error occurs.
+    """
+    if batch_size < 1:
+        raise ValueError(f"Invalid batch size: {batch_size}. Must be at least 1.")
+
+    query = "SELECT id, meal, cuisine, price, difficulty, battles, wins, deleted FROM meals WHERE id > ?"
+    if not include_deleted:
+        query += " AND deleted = FALSE"
+    query += " ORDER BY id LIMIT ?"
+
+    last_id = 0
+    while True:
+        try:
+            with get_db_connection() as conn:
+                rows = conn.execute(query, (last_id, batch_size)).fetchall()
+        except sqlite3.Error as e:
+            logger.error("Database error: %s", str(e))
+            raise e
+
+        for row in rows:
+            yield {
+                'id': row[0],
+                'meal': row[1],
+                'cuisine': row[2],
+                'price': row[3],
+                'difficulty': row[4],
+                'battles': row[5],
+                'wins': row[6],
+                'deleted': bool(row[7]),
+            }
+        if len(rows) < batch_size:
+            return
+        last_id = rows[-1][0]
+
+@timed_query
 def clear_meals() -> None:
     """
-    Recreates the meals table, effectively deleting all meals.
+    Deletes all meals, with their battle log, and restarts meal IDs at 1.
 
     Raises:
         sqlite3.Error: If any database error occurs.
     """
     try:
-        with open(SQL_FILE_PATH, "r") as fh:
-            create_table_script = fh.read()
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.executescript(create_table_script)
+            cursor.execute("DELETE FROM meals")
+            cursor.execute("DELETE FROM leaderboard")
+            cursor.execute("DELETE FROM battles")
+            cursor.execute("DELETE FROM battle_stats_baseline")
+            cursor.execute("DELETE FROM sqlite_sequence WHERE name = 'meals'")
             conn.commit()
+            clear_meal_cache()
 
             logger.info("Meals cleared successfully.")
 
@@ -110,6 +508,7 @@ def clear_meals() -> None:
         logger.error("Database error while clearing meals: %s", str(e))
         raise e
 
+@timed_query
 def delete_meal(meal_id: int) -> None:
     """
     Marks a meal as deleted in the database.
@@ -136,6 +535,7 @@ def delete_meal(meal_id: int) -> None:
 
             cursor.execute("UPDATE meals SET deleted = TRUE WHERE id = ?", (meal_id,))
             conn.commit()
+            invalidate_meal(meal_id)
 
             logger.info("Meal with ID %s marked as deleted.", meal_id)
 
@@ -143,52 +543,236 @@ def delete_meal(meal_id: int) -> None:
         logger.error("Database error: %s", str(e))
         raise e
 
-def get_leaderboard(sort_by: str="wins") -> dict[str, Any]:
+def encode_leaderboard_cursor(sort_by: str, value: float, meal_id: int) -> str:
     """
-    Retrieves a leaderboard of meals based on the specified sort order.
+    Encodes the position after a leaderboard row as an opaque, URL-safe cursor.
 
     Args:
-        sort_by (str): The attribute to sort the leaderboard by ('wins' or 'win_pct'). Defaults to 'wins'.
+        sort_by (str): The sort order the cursor belongs to.
+        value (float): The row's raw sort value (wins, win_pct as a fraction, or rating).
+        meal_id (int): The row's meal ID, which breaks ties.
 
     Returns:
-        list[dict[str, Any]]: A list of dictionaries representing the leaderboard.
+        str: The cursor.
+    """
+    payload = json.dumps([sort_by, value, meal_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_leaderboard_cursor(cursor: str, sort_by: str) -> Tuple[float, int]:
+    """
+    Decodes a cursor from encode_leaderboard_cursor.
+
+    Returns:
+        Tuple[float, int]: The sort value and meal ID of the last row already seen.
 
     Raises:
-        ValueError: If the sort_by parameter is invalid.
-        sqlite3.Error: If a database error occurs.
+        ValueError: If the cursor is malformed or was issued for another sort order.
     """
-    query = """
-        SELECT id, meal, cuisine, price, difficulty, battles, wins, (wins * 1.0 / battles) AS win_pct
-        FROM meals WHERE deleted = false AND battles > 0
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        cursor_sort, value, meal_id = payload
+        if not isinstance(value, (int, float)) or isinstance(value, bool) or type(meal_id) is not int:
+            raise TypeError(payload)
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid leaderboard cursor: {cursor}") from None
+    if cursor_sort != sort_by:
+        raise ValueError(f"Leaderboard cursor was issued for sort_by={cursor_sort}, not {sort_by}.")
+    return value, meal_id
+
+
+def _leaderboard_query(sort_by: str, cuisine: Optional[str], difficulty: Optional[str],
+                       min_price: Optional[float], max_price: Optional[float],
+                       keyset: Optional[Tuple[str, List[Any]]] = None) -> Tuple[str, List[Any]]:
     """
+    Builds the leaderboard SELECT, without LIMIT, and its parameters.
 
-    if sort_by == "win_pct":
-        query += " ORDER BY win_pct DESC"
-    elif sort_by == "wins":
-        query += " ORDER BY wins DESC"
-    else:
+    Every predicate is one the ordering indexes can serve: cuisine is the leading column of
+    the per-cuisine indexes, and keyset (an extra condition and its parameters) is a range
+    on the sort column.
+
+    Raises:
+        ValueError: If sort_by, difficulty or the price range is invalid.
+    """
+    if sort_by not in LEADERBOARD_SORTS:
         logger.error("Invalid sort_by parameter: %s", sort_by)
         raise ValueError("Invalid sort_by parameter: %s" % sort_by)
+    if difficulty is not None and difficulty not in ['LOW', 'MED', 'HIGH']:
+        raise ValueError(f"Invalid difficulty: {difficulty}. Must be 'LOW', 'MED', or 'HIGH'.")
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise ValueError(f"Invalid price range: min_price {min_price} is greater than max_price {max_price}.")
 
-    try:
+    conditions: List[str] = []
+    params: List[Any] = []
+    if cuisine is not None:
+        conditions.append("cuisine = ?")
+        params.append(cuisine)
+    if difficulty is not None:
+        conditions.append("difficulty = ?")
+        params.append(difficulty)
+    if min_price is not None:
+        conditions.append("price >= ?")
+        params.append(min_price)
+    if max_price is not None:
+        conditions.append("price <= ?")
+        params.append(max_price)
+    if keyset is not None:
+        conditions.append(keyset[0])
+        params.extend(keyset[1])
+
+    query = """
+        SELECT meal_id, meal, cuisine, price, difficulty, battles, wins, win_pct, rating
+        FROM leaderboard
+    """
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY {sort_by} DESC, meal_id"
+    return query, params
+
+
+# Position of each sort column in the rows _leaderboard_query selects
+_LEADERBOARD_SORT_COLUMNS = {'wins': 6, 'win_pct': 7, 'rating': 8}
+
+
+# Runs a read function on the battles accepted but not yet recorded, as (winner_id, loser_id)
+# pairs in battle order, so that the read sees each of them either pending or in the database,
+# never both or neither. Installed by the write-behind battle writer (see battle_writer).
+PendingBattles = Callable[[Callable[[List[Tuple[int, int]]], Any]], Any]
+_pending_battles: Optional[PendingBattles] = None
+
+
+def set_pending_battles(source: Optional[PendingBattles]) -> None:
+    """Sets where leaderboard reads find battles that are queued but not yet recorded.
+
+    Args:
+        source (PendingBattles, optional): The queue's reader, or None if nothing is queued.
+    """
+    global _pending_battles
+    _pending_battles = source
+
+
+def _read_with_pending_battles(read: Callable[[List[Tuple[int, int]]], Any]) -> Any:
+    source = _pending_battles
+    return read([]) if source is None else source(read)
+
+
+def _pending_leaderboard_rows(cursor: sqlite3.Cursor, results: List[Tuple[int, int]], cuisine: Optional[str],
+                              difficulty: Optional[str], min_price: Optional[float],
+                              max_price: Optional[float]) -> Tuple[List[tuple], Set[int]]:
+    """
+    Builds the leaderboard rows of the meals in pending results, as if they were recorded.
+
+    Deltas and Elo ratings are applied the way record_battle_results will apply them, and
+    results with a deleted meal are skipped, as the writer drops them.
+
+    Returns:
+        Tuple[List[tuple], Set[int]]: The rows passing the filters, and the IDs of every
+            pending meal, whose stored leaderboard rows these rows replace.
+    """
+    meal_ids = {meal_id for result in results for meal_id in result}
+    meals = {row[0]: list(row) for row in
+             _select_active_rows(cursor, "id, meal, cuisine, price, difficulty, battles, wins, rating", meal_ids)}
+    results = [(winner_id, loser_id) for winner_id, loser_id in results if winner_id in meals and loser_id in meals]
+
+    ratings = {meal_id: row[7] for meal_id, row in meals.items()}
+    rate_battles(ratings, results)
+    for winner_id, loser_id in results:
+        meals[winner_id][5] += 1
+        meals[winner_id][6] += 1
+        meals[loser_id][5] += 1
+
+    rows = [
+        (meal_id, meal, meal_cuisine, price, meal_difficulty, battles, wins, wins / battles, ratings[meal_id])
+        for meal_id, meal, meal_cuisine, price, meal_difficulty, battles, wins, _ in meals.values()
+        if battles > 0
+        and (cuisine is None or meal_cuisine == cuisine)
+        and (difficulty is None or meal_difficulty == difficulty)
+        and (min_price is None or price >= min_price)
+        and (max_price is None or price <= max_price)
+    ]
+    return rows, meal_ids
+
+
+def _leaderboard_key(sort_by: str) -> Callable[[tuple], Tuple[float, int]]:
+    """Returns the sort key of leaderboard rows: sort_by descending, then meal ID."""
+    column = _LEADERBOARD_SORT_COLUMNS[sort_by]
+    return lambda row: (-row[column], row[0])
+
+
+def _merge_pending(rows: List[tuple], pending_rows: List[tuple], pending_ids: Set[int], sort_by: str) -> List[tuple]:
+    """Replaces the pending meals' stored rows with their pending ones, keeping the ranking order."""
+    key = _leaderboard_key(sort_by)
+    stored = [row for row in rows if row[0] not in pending_ids]
+    return list(heapq.merge(stored, sorted(pending_rows, key=key), key=key))
+
+
+def _leaderboard_row(row: tuple) -> dict[str, Any]:
+    return {
+        'id': row[0],
+        'meal': row[1],
+        'cuisine': row[2],
+        'price': row[3],
+        'difficulty': row[4],
+        'battles': row[5],
+        'wins': row[6],
+        'win_pct': round(row[7] * 100, 1),  # Convert to percentage
+        'rating': round(row[8], 1)
+    }
+
+
+@timed_query
+def get_leaderboard(sort_by: str="wins", limit: Optional[int]=None, offset: int=0, cuisine: Optional[str]=None,
+                    difficulty: Optional[str]=None, min_price: Optional[float]=None,
+                    max_price: Optional[float]=None) -> list[dict[str, Any]]:
+    """
+    Retrieves a leaderboard of meals based on the specified sort order.
+
+    Reads from the materialized leaderboard table, which the schema triggers keep up to
+    date on every stats update, so a page of N rows costs O(N) via the ordering index.
+    For deep pages prefer get_leaderboard_page, whose cursors do not rescan skipped rows.
+    Battles this process has queued for a write-behind flush are merged in.
+
+    Args:
+        sort_by (str): The attribute to sort the leaderboard by ('wins', 'win_pct' or 'rating').
+            Defaults to 'wins'.
+        limit (int, optional): The maximum number of rows to return. Defaults to all rows.
+        offset (int): The number of leading rows to skip. Defaults to 0.
+        cuisine (str, optional): Only include meals of this cuisine.
+        difficulty (str, optional): Only include meals of this difficulty.
+        min_price (float, optional): Only include meals costing at least this much.
+        max_price (float, optional): Only include meals costing at most this much.
+
+    Returns:
+        list[dict[str, Any]]: A list of dictionaries representing the leaderboard.
+
+    Raises:
+        ValueError: If the sort_by, limit, offset or a filter parameter is invalid.
+        sqlite3.Error: If a database error occurs.
+    """
+    query, params = _leaderboard_query(sort_by, cuisine, difficulty, min_price, max_price)
+
+    if limit is not None and limit < 0:
+        raise ValueError(f"Invalid limit: {limit}. Must be non-negative.")
+    if offset < 0:
+        raise ValueError(f"Invalid offset: {offset}. Must be non-negative.")
+    query += " LIMIT ? OFFSET ?"
+
+    def read(pending: List[Tuple[int, int]]) -> List[tuple]:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query)
-            rows = cursor.fetchall()
+            if not pending:
+                cursor.execute(query, params + [-1 if limit is None else limit, offset])
+                return cursor.fetchall()
+            # Every pending meal may drop out of the stored ranking, so read past the page by that many.
+            pending_rows, pending_ids = _pending_leaderboard_rows(cursor, pending, cuisine, difficulty,
+                                                                  min_price, max_price)
+            cursor.execute(query, params + [-1 if limit is None else offset + limit + len(pending_ids), 0])
+            rows = _merge_pending(cursor.fetchall(), pending_rows, pending_ids, sort_by)
+            return rows[offset:None if limit is None else offset + limit]
 
-        leaderboard = []
-        for row in rows:
-            meal = {
-                'id': row[0],
-                'meal': row[1],
-                'cuisine': row[2],
-                'price': row[3],
-                'difficulty': row[4],
-                'battles': row[5],
-                'wins': row[6],
-                'win_pct': round(row[7] * 100, 1)  # Convert to percentage
-            }
-            leaderboard.append(meal)
+    try:
+        rows = _read_with_pending_battles(read)
+        leaderboard = [_leaderboard_row(row) for row in rows]
 
         logger.info("Leaderboard retrieved successfully")
         return leaderboard
@@ -197,6 +781,261 @@ def get_leaderboard(sort_by: str="wins") -> dict[str, Any]:
         logger.error("Database error: %s", str(e))
         raise e
 
+@timed_query
+def get_leaderboard_page(sort_by: str="wins", limit: int=LEADERBOARD_PAGE_SIZE, cursor: Optional[str]=None,
+                         cuisine: Optional[str]=None, difficulty: Optional[str]=None,
+                         min_price: Optional[float]=None, max_price: Optional[float]=None) -> dict[str, Any]:
+    """
+    Retrieves one page of the leaderboard by keyset pagination.
+
+    Each page continues from the last row of the previous one (passed back as cursor), so
+    any page costs O(limit) index steps, and rows do not shift between pages as stats
+    change. Filters are the same as get_leaderboard and must not change between pages.
+    Battles this process has queued for a write-behind flush are merged in.
+
+    Args:
+        sort_by (str): 'wins', 'win_pct' or 'rating'. Defaults to 'wins'.
+        limit (int): The page size, from 1 to LEADERBOARD_MAX_PAGE_SIZE. Defaults to LEADERBOARD_PAGE_SIZE.
+        cursor (str, optional): The next_cursor of the previous page. Defaults to the first page.
+        cuisine, difficulty, min_price, max_price: Filters, see get_leaderboard.
+
+    Returns:
+        dict[str, Any]: 'leaderboard' (the rows) and 'next_cursor' (None on the last page).
+
+    Raises:
+        ValueError: If the limit, cursor or a filter parameter is invalid.
+        sqlite3.Error: If a database error occurs.
+    """
+    if not 1 <= limit <= LEADERBOARD_MAX_PAGE_SIZE:
+        raise ValueError(f"Invalid limit: {limit}. Must be between 1 and {LEADERBOARD_MAX_PAGE_SIZE}.")
+    after = decode_leaderboard_cursor(cursor, sort_by) if cursor is not None else None
+    filters = (cuisine, difficulty, min_price, max_price)
+
+    def fetch(conn: sqlite3.Connection, keyset: Optional[Tuple[str, List[Any]]], count: int) -> List[tuple]:
+        query, params = _leaderboard_query(sort_by, *filters, keyset=keyset)
+        return conn.execute(query + " LIMIT ?", params + [count]).fetchall()
+
+    def read(pending: List[Tuple[int, int]]) -> List[tuple]:
+        with get_db_connection() as conn:
+            pending_rows, pending_ids = [], set()
+            if pending:
+                pending_rows, pending_ids = _pending_leaderboard_rows(conn.cursor(), pending, *filters)
+            # One extra row tells whether there is a next page; pending meals may drop out of the stored rows.
+            wanted = limit + 1 + len(pending_ids)
+            if after is None:
+                rows = fetch(conn, None, wanted)
+            else:
+                # Rows rank by (sort_by DESC, meal_id ASC). Finish the cursor row's tie group,
+                # then continue below its value: two index seeks, where a single
+                # "value < ? OR (value = ? AND meal_id > ?)" would rescan the tie group.
+                value, meal_id = after
+                rows = fetch(conn, (f"{sort_by} = ? AND meal_id > ?", [value, meal_id]), wanted)
+                if len(rows) < wanted:
+                    rows += fetch(conn, (f"{sort_by} < ?", [value]), wanted - len(rows))
+                key = _leaderboard_key(sort_by)
+                pending_rows = [row for row in pending_rows if key(row) > (-value, meal_id)]
+            if pending:
+                rows = _merge_pending(rows, pending_rows, pending_ids, sort_by)
+            return rows
+
+    try:
+        rows = _read_with_pending_battles(read)
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_leaderboard_cursor(sort_by, last[_LEADERBOARD_SORT_COLUMNS[sort_by]], last[0])
+
+    logger.info("Leaderboard page retrieved successfully")
+    return {'leaderboard': [_leaderboard_row(row) for row in rows], 'next_cursor': next_cursor}
+
+def get_leaderboard_version() -> int:
+    """
+    Returns a counter that changes whenever any leaderboard row changes.
+
+    Raises:
+        sqlite3.Error: If a database error occurs.
+    """
+    try:
+        with get_db_connection() as conn:
+            row = conn.execute("SELECT version FROM leaderboard_version WHERE id = 1").fetchone()
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+    return row[0] if row else 0
+
+def get_catalog_version() -> int:
+    """
+    Returns a counter that changes whenever a meal is added, deleted or rescored, but not
+    when it battles.
+
+    Raises:
+        sqlite3.Error: If a database error occurs.
+    """
+    try:
+        with get_db_connection() as conn:
+            row = conn.execute("SELECT version FROM catalog_version WHERE id = 1").fetchone()
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+    return row[0] if row else 0
+
+@timed_query
+def get_meals_by_score(limit: int=LEADERBOARD_PAGE_SIZE, offset: int=0, cuisine: Optional[str]=None,
+                       difficulty: Optional[str]=None, min_score: Optional[float]=None,
+                       max_score: Optional[float]=None) -> list[dict[str, Any]]:
+    """
+    Retrieves non-deleted meals from the strongest battle score down, ties by ID.
+
+    Reads the stored meals.score column through the meals_by_score indexes (per cuisine when
+    filtering by cuisine), so the strongest N meals cost O(N) whether or not they have battled.
+
+    Args:
+        limit (int): The maximum number of meals to return. Defaults to LEADERBOARD_PAGE_SIZE.
+        offset (int): The number of leading meals to skip. Defaults to 0.
+        cuisine (str, optional): Only include meals of this cuisine.
+        difficulty (str, optional): Only include meals of this difficulty.
+        min_score (float, optional): Only include meals scoring at least this much.
+        max_score (float, optional): Only include meals scoring at most this much.
+
+    Returns:
+        list[dict[str, Any]]: The meals with their battle scores.
+
+    Raises:
+        ValueError: If the limit, offset or a filter parameter is invalid.
+        sqlite3.Error: If a database error occurs.
+    """
+    if not 0 <= limit <= LEADERBOARD_MAX_PAGE_SIZE:
+        raise ValueError(f"Invalid limit: {limit}. Must be between 0 and {LEADERBOARD_MAX_PAGE_SIZE}.")
+    if offset < 0:
+        raise ValueError(f"Invalid offset: {offset}. Must be non-negative.")
+    if difficulty is not None and difficulty not in DIFFICULTY_MODIFIERS:
+        raise ValueError(f"Invalid difficulty: {difficulty}. Must be 'LOW', 'MED', or 'HIGH'.")
+    if min_score is not None and max_score is not None and min_score > max_score:
+        raise ValueError(f"Invalid score range: min_score {min_score} is greater than max_score {max_score}.")
+
+    conditions = ["deleted = FALSE"]
+    params: List[Any] = []
+    for condition, value in (("cuisine = ?", cuisine), ("difficulty = ?", difficulty),
+                             ("score >= ?", min_score), ("score <= ?", max_score)):
+        if value is not None:
+            conditions.append(condition)
+            params.append(value)
+    query = f"""
+        SELECT id, meal, cuisine, price, difficulty, score
+        FROM meals
+        WHERE {" AND ".join(conditions)}
+        ORDER BY score DESC, id
+        LIMIT ? OFFSET ?
+    """
+
+    try:
+        with get_db_connection() as conn:
+            rows = conn.execute(query, params + [limit, offset]).fetchall()
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+    logger.info("Retrieved %d meals by battle score", len(rows))
+    return [{'id': row[0], 'meal': row[1], 'cuisine': row[2], 'price': row[3], 'difficulty': row[4],
+             'score': row[5]} for row in rows]
+
+@timed_query
+def rebuild_leaderboard() -> None:
+    """
+    Rebuilds the materialized leaderboard from the meals table.
+
+    The triggers keep the leaderboard current; this is only needed after writing to meals
+    with the triggers absent (e.g. a database restored from an older schema).
+
+    Raises:
+        sqlite3.Error: If any database error occurs.
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM leaderboard")
+            cursor.execute("""
+                INSERT INTO leaderboard (meal_id, meal, cuisine, price, difficulty, battles, wins, win_pct, rating)
+                SELECT id, meal, cuisine, price, difficulty, battles, wins, wins * 1.0 / battles, rating
+                FROM meals WHERE deleted = FALSE AND battles > 0
+            """)
+            conn.commit()
+
+            logger.info("Leaderboard rebuilt with %d meals.", cursor.rowcount)
+
+    except sqlite3.Error as e:
+        logger.error("Database error while rebuilding leaderboard: %s", str(e))
+        raise e
+
+def _select_active_rows(cursor: sqlite3.Cursor, columns: str, meal_ids: Iterable[int]) -> List[tuple]:
+    """Selects columns for the non-deleted meals among meal_ids, ordered by ID.
+
+    The IDs are bound in chunks to stay well under SQLite's bound-parameter limit.
+    """
+    wanted = sorted(set(meal_ids))
+    rows: List[tuple] = []
+    for start in range(0, len(wanted), SQL_IN_CHUNK_SIZE):
+        chunk = wanted[start:start + SQL_IN_CHUNK_SIZE]
+        placeholders = ", ".join("?" * len(chunk))
+        cursor.execute(f"SELECT {columns} FROM meals WHERE deleted = FALSE AND id IN ({placeholders}) ORDER BY id",
+                       chunk)
+        rows.extend(cursor.fetchall())
+    return rows
+
+def get_active_meal_ids(meal_ids: Iterable[int]) -> Set[int]:
+    """Returns the IDs among meal_ids that belong to non-deleted meals.
+
+    Raises:
+        sqlite3.Error: If a database error occurs.
+    """
+    try:
+        with get_db_connection() as conn:
+            return {row[0] for row in _select_active_rows(conn.cursor(), "id", meal_ids)}
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+@timed_query
+def get_active_meals(meal_ids: Optional[Iterable[int]] = None) -> List[Meal]:
+    """Retrieves non-deleted meals, either all of them or those with the given IDs.
+
+    Args:
+        meal_ids (Iterable[int], optional): The IDs to fetch. Defaults to every non-deleted meal.
+
+    Returns:
+        List[Meal]: The meals ordered by ID.
+
+    Raises:
+        ValueError: If any of the requested meals has been deleted or is not found.
+        sqlite3.Error: If a database error occurs.
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            if meal_ids is None:
+                cursor.execute("SELECT id, meal, cuisine, price, difficulty FROM meals WHERE deleted = FALSE ORDER BY id")
+                rows = cursor.fetchall()
+            else:
+                meal_ids = set(meal_ids)
+                rows = _select_active_rows(cursor, "id, meal, cuisine, price, difficulty", meal_ids)
+                missing = meal_ids - {row[0] for row in rows}
+                if missing:
+                    meal_id = min(missing)
+                    logger.info("Meal with ID %s not found or deleted", meal_id)
+                    raise ValueError(f"Meal with ID {meal_id} not found or has been deleted")
+
+        return [Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4]) for row in rows]
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+@timed_query
 def get_meal_by_id(meal_id: int) -> Meal:
     """Retrieves a meal by its unique ID.
 
@@ -210,6 +1049,13 @@ def get_meal_by_id(meal_id: int) -> Meal:
         ValueError: If the meal has been deleted or is not found.
         sqlite3.Error: If a database error occurs.
     """
+    if MEAL_CACHE_ENABLED:
+        _revalidate_meal_cache()
+        meal = _meals_by_id.get(meal_id)
+        if meal is not None:
+            return meal
+        generation = _cache_generation
+
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
@@ -220,7 +1066,10 @@ def get_meal_by_id(meal_id: int) -> Meal:
                 if row[5]:
                     logger.info("Meal with ID %s has been deleted", meal_id)
                     raise ValueError(f"Meal with ID {meal_id} has been deleted")
-                return Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4])
+                meal = Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4])
+                if MEAL_CACHE_ENABLED:
+                    _cache_meal(meal, generation)
+                return meal
             else:
                 logger.info("Meal with ID %s not found", meal_id)
                 raise ValueError(f"Meal with ID {meal_id} not found")
@@ -230,6 +1079,7 @@ def get_meal_by_id(meal_id: int) -> Meal:
         raise e
 
 
+@timed_query
 def get_meal_by_name(meal_name: str) -> Meal:
     """Retrieves a meal by its name.
 
@@ -243,6 +1093,13 @@ def get_meal_by_name(meal_name: str) -> Meal:
         ValueError: If the meal has been deleted or is not found.
         sqlite3.Error: If a database error occurs.
     """
+    if MEAL_CACHE_ENABLED:
+        _revalidate_meal_cache()
+        meal = _meals_by_name.get(meal_name)
+        if meal is not None:
+            return meal
+        generation = _cache_generation
+
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
@@ -253,7 +1110,10 @@ def get_meal_by_name(meal_name: str) -> Meal:
                 if row[5]:
                     logger.info("Meal with name %s has been deleted", meal_name)
                     raise ValueError(f"Meal with name {meal_name} has been deleted")
-                return Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4])
+                meal = Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4])
+                if MEAL_CACHE_ENABLED:
+                    _cache_meal(meal, generation)
+                return meal
             else:
                 logger.info("Meal with name %s not found", meal_name)
                 raise ValueError(f"Meal with name {meal_name} not found")
@@ -263,6 +1123,156 @@ def get_meal_by_name(meal_name: str) -> Meal:
         raise e
 
 
+def _battle_records(results: List[Tuple[int, int]],
+                    records: Optional[List[BattleRecord]]) -> List[BattleRecord]:
+    """Pairs (winner_id, loser_id) results with their log records, checking that they agree.
+
+    Results without records are logged with the winner in the first slot and no scores.
+
+    Raises:
+        ValueError: If records differs in length from results, or a record names other meals.
+    """
+    if records is None:
+        return [BattleRecord(winner_id, loser_id, winner_id, None, None, None) for winner_id, loser_id in results]
+    if len(records) != len(results):
+        raise ValueError(f"Got {len(records)} battle records for {len(results)} results.")
+    for (winner_id, loser_id), record in zip(results, records):
+        if record.winner_id != winner_id or record.loser_id != loser_id:
+            raise ValueError(f"Battle record {record} does not match the result {winner_id} beat {loser_id}.")
+    return list(records)
+
+
+@timed_query
+def record_battle_result(winner_id: int, loser_id: int, record: Optional[BattleRecord] = None) -> None:
+    """Records the outcome of a battle for both meals in a single transaction.
+
+    Both rows are validated and updated by one UPDATE statement, so either both
+    meals' stats and Elo ratings change or neither does. The battle is appended to the
+    battles log in the same transaction.
+
+    Args:
+        winner_id (int): The unique ID of the winning meal.
+        loser_id (int): The unique ID of the losing meal.
+        record (BattleRecord, optional): Slot order, scores and random number to log.
+            Defaults to logging the winner in the first slot with no scores.
+
+    Raises:
+        ValueError: If either meal has been deleted or is not found, or the record names other meals.
+        sqlite3.Error: If a database error occurs.
+    """
+    record, = _battle_records([(winner_id, loser_id)], None if record is None else [record])
+
+    # A meal prepped against itself plays both sides: two battles, one win.
+    same_meal = winner_id == loser_id
+    expected_rows = 1 if same_meal else 2
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # Take the write lock before reading the ratings, so no other battle moves them in between.
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("SELECT id, rating FROM meals WHERE id IN (?, ?)", (winner_id, loser_id))
+            ratings = dict(cursor.fetchall())
+            winner_rating = ratings.get(winner_id, RATING_INITIAL)
+            loser_rating = ratings.get(loser_id, RATING_INITIAL)
+            if not same_meal:
+                winner_rating, loser_rating = rate_battle(winner_rating, loser_rating)
+
+            cursor.execute("""
+                UPDATE meals
+                SET battles = battles + ?,
+                    wins = wins + CASE WHEN id = ? THEN 1 ELSE 0 END,
+                    rating = CASE WHEN id = ? THEN ? ELSE ? END
+                WHERE id IN (?, ?) AND deleted = FALSE
+            """, (2 if same_meal else 1, winner_id, winner_id, winner_rating, loser_rating, winner_id, loser_id))
+
+            if cursor.rowcount != expected_rows:
+                conn.rollback()
+                for meal_id in (winner_id, loser_id):
+                    cursor.execute("SELECT deleted FROM meals WHERE id = ?", (meal_id,))
+                    row = cursor.fetchone()
+                    if row is None:
+                        logger.info("Meal with ID %s not found", meal_id)
+                        invalidate_meal(meal_id)
+                        raise ValueError(f"Meal with ID {meal_id} not found")
+                    if row[0]:
+                        logger.info("Meal with ID %s has been deleted", meal_id)
+                        invalidate_meal(meal_id)
+                        raise ValueError(f"Meal with ID {meal_id} has been deleted")
+                raise ValueError(f"Battle result for meals {winner_id} and {loser_id} could not be recorded")
+
+            cursor.execute(_INSERT_BATTLE, record.log_row(time.time()))
+            conn.commit()
+        BATTLES.inc()
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+
+@timed_query
+def record_battle_results(results: List[Tuple[int, int]], records: Optional[List[BattleRecord]] = None) -> None:
+    """Records the outcomes of many battles in a single transaction.
+
+    Per-meal deltas are aggregated first, so each meal is updated once no matter how
+    many battles it fought, and the battles are appended to the log with one executemany.
+    Elo ratings are applied battle by battle, in the order given.
+
+    Args:
+        results (List[Tuple[int, int]]): (winner_id, loser_id) pairs.
+        records (List[BattleRecord], optional): The log record of each result, in order.
+            Defaults to logging each winner in the first slot with no scores.
+
+    Raises:
+        ValueError: If any participant has been deleted or is not found, or records do not
+            match results; nothing is recorded.
+        sqlite3.Error: If a database error occurs.
+    """
+    records = _battle_records(results, records)
+
+    deltas: Dict[int, List[int]] = {}
+    for winner_id, loser_id in results:
+        deltas.setdefault(winner_id, [0, 0])
+        deltas.setdefault(loser_id, [0, 0])
+        deltas[winner_id][0] += 1
+        deltas[winner_id][1] += 1
+        deltas[loser_id][0] += 1
+
+    if not deltas:
+        return
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # The write lock keeps the participants and their ratings as read until the commit.
+            cursor.execute("BEGIN IMMEDIATE")
+            ratings = dict(_select_active_rows(cursor, "id, rating", deltas))
+            if len(ratings) != len(deltas):
+                conn.rollback()
+                inactive = set(deltas) - set(ratings)
+                for meal_id in inactive:
+                    invalidate_meal(meal_id)
+                meal_id = min(inactive)
+                logger.info("Meal with ID %s not found or deleted", meal_id)
+                raise ValueError(f"Meal with ID {meal_id} not found or has been deleted")
+
+            rate_battles(ratings, results)
+            cursor.executemany(
+                "UPDATE meals SET battles = battles + ?, wins = wins + ?, rating = ? WHERE id = ?",
+                [(battles, wins, ratings[meal_id], meal_id) for meal_id, (battles, wins) in deltas.items()])
+
+            fought_at = time.time()
+            cursor.executemany(_INSERT_BATTLE, [record.log_row(fought_at) for record in records])
+            conn.commit()
+            logger.info("Recorded %d battle results for %d meals", len(results), len(deltas))
+        BATTLES.inc(len(results))
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+
+@timed_query
 def update_meal_stats(meal_id: int, result: str) -> None:
     """Updates the battle statistics for a meal by ID.
 
@@ -282,9 +1292,11 @@ def update_meal_stats(meal_id: int, result: str) -> None:
                 deleted = cursor.fetchone()[0]
                 if deleted:
                     logger.info("Meal with ID %s has been deleted", meal_id)
+                    invalidate_meal(meal_id)
                     raise ValueError(f"Meal with ID {meal_id} has been deleted")
             except TypeError:
                 logger.info("Meal with ID %s not found", meal_id)
+                invalidate_meal(meal_id)
                 raise ValueError(f"Meal with ID {meal_id} not found")
 
             if result == 'win':
@@ -294,6 +1306,9 @@ def update_meal_stats(meal_id: int, result: str) -> None:
             else:
                 raise ValueError(f"Invalid result: {result}. Expected 'win' or 'loss'.")
 
+            # One-sided log row: the opponent and scores are unknown here.
+            cursor.execute(_INSERT_BATTLE, (time.time(), meal_id, None, None, None, None,
+                                            meal_id if result == 'win' else None))
             conn.commit()
 
     except sqlite3.Error as e:
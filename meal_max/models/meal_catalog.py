@@ -0,0 +1,213 @@
+from array import array
+import logging
+import sqlite3
+import sys
+from typing import Dict, Iterable, Iterator, Sequence, Tuple
+
+import numpy as np
+
+from meal_max.models.battle_scoring import ScoreColumns
+from meal_max.models.kitchen_model import DIFFICULTY_MODIFIERS, Meal
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.sql_utils import get_db_connection
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Difficulty codes index this tuple, so a difficulty costs one byte per meal.
+DIFFICULTIES = ('HIGH', 'MED', 'LOW')
+
+# Cuisine codes are stored as uint16, which caps the number of distinct cuisines.
+MAX_CUISINES = 2 ** 16
+
+_DIFFICULTY_CODES = {difficulty: code for code, difficulty in enumerate(DIFFICULTIES)}
+_DIFFICULTY_MODIFIERS = np.array([DIFFICULTY_MODIFIERS[difficulty] for difficulty in DIFFICULTIES], dtype=np.int64)
+
+CatalogRow = Tuple[int, str, str, float, str, int, int]
+
+
+class MealCatalog:
+    """An immutable, struct-of-arrays snapshot of many meals, ordered by ID.
+
+    Each meal costs a few dozen bytes instead of a Meal object plus its strings: numeric
+    columns are NumPy arrays, cuisines and difficulties are small integer codes into shared
+    (interned) string tuples, and names are one UTF-8 buffer sliced by offsets. Meal objects
+    are only built on access.
+
+    Attributes:
+        ids (np.ndarray): Meal IDs (int64), ascending.
+        prices (np.ndarray): Meal prices (float64).
+        cuisine_codes (np.ndarray): Index of each meal's cuisine in cuisines (uint16).
+        difficulty_codes (np.ndarray): Index of each meal's difficulty in DIFFICULTIES (uint8).
+        battles (np.ndarray): Battles fought per meal (int32).
+        wins (np.ndarray): Battles won per meal (int32).
+        cuisines (Tuple[str, ...]): The distinct cuisines, in order of first appearance.
+    """
+
+    __slots__ = ('ids', 'prices', 'cuisine_codes', 'difficulty_codes', 'battles', 'wins', 'cuisines',
+                 '_names', '_name_offsets')
+
+    def __init__(self, ids: np.ndarray, names: bytes, name_offsets: np.ndarray, cuisine_codes: np.ndarray,
+                 cuisines: Sequence[str], prices: np.ndarray, difficulty_codes: np.ndarray,
+                 battles: np.ndarray, wins: np.ndarray):
+        """Wraps already-encoded columns; use from_rows(), from_meals() or load_meal_catalog().
+
+        Raises:
+            ValueError: If the columns differ in length or the IDs are not strictly ascending.
+        """
+        columns = (ids, cuisine_codes, prices, difficulty_codes, battles, wins)
+        if any(len(column) != len(ids) for column in columns) or len(name_offsets) != len(ids) + 1:
+            raise ValueError("Catalog columns must all have one entry per meal.")
+        if len(ids) > 1 and not (np.diff(ids) > 0).all():
+            raise ValueError("Catalog IDs must be unique and in ascending order.")
+        self.ids = ids
+        self.prices = prices
+        self.cuisine_codes = cuisine_codes
+        self.difficulty_codes = difficulty_codes
+        self.battles = battles
+        self.wins = wins
+        self.cuisines = tuple(cuisines)
+        self._names = names
+        self._name_offsets = name_offsets
+        for column in columns + (name_offsets,):
+            column.flags.writeable = False
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[CatalogRow]) -> 'MealCatalog':
+        """Encodes (id, meal, cuisine, price, difficulty, battles, wins) rows in ascending ID order.
+
+        Rows are consumed one at a time into typed buffers, so a cursor can be streamed
+        without holding every row in memory.
+
+        Raises:
+            ValueError: If a difficulty is invalid, there are too many cuisines, or the IDs
+                are not strictly ascending.
+        """
+        ids, prices = array('q'), array('d')
+        cuisine_codes, difficulty_codes = array('H'), array('B')
+        battles, wins = array('i'), array('i')
+        names, name_offsets = bytearray(), array('q', [0])
+        cuisine_index: Dict[str, int] = {}
+        for meal_id, name, cuisine, price, difficulty, meal_battles, meal_wins in rows:
+            code = cuisine_index.get(cuisine)
+            if code is None:
+                if len(cuisine_index) == MAX_CUISINES:
+                    raise ValueError(f"A catalog holds at most {MAX_CUISINES} distinct cuisines.")
+                code = cuisine_index[cuisine] = len(cuisine_index)
+            try:
+                difficulty_codes.append(_DIFFICULTY_CODES[difficulty])
+            except KeyError:
+                raise ValueError(f"Invalid difficulty for meal {meal_id}: {difficulty}.") from None
+            ids.append(meal_id)
+            prices.append(price)
+            cuisine_codes.append(code)
+            battles.append(meal_battles)
+            wins.append(meal_wins)
+            names += name.encode('utf-8')
+            name_offsets.append(len(names))
+
+        return cls(
+            ids=np.frombuffer(ids, dtype=np.int64),
+            names=bytes(names),
+            name_offsets=np.frombuffer(name_offsets, dtype=np.int64),
+            cuisine_codes=np.frombuffer(cuisine_codes, dtype=np.uint16),
+            cuisines=[sys.intern(cuisine) for cuisine in cuisine_index],
+            prices=np.frombuffer(prices, dtype=np.float64),
+            difficulty_codes=np.frombuffer(difficulty_codes, dtype=np.uint8),
+            battles=np.frombuffer(battles, dtype=np.int32),
+            wins=np.frombuffer(wins, dtype=np.int32),
+        )
+
+    @classmethod
+    def from_meals(cls, meals: Iterable[Meal]) -> 'MealCatalog':
+        """Encodes Meal objects, in any order, with zero battles and wins (Meals carry no stats)."""
+        ordered = sorted(meals, key=lambda meal: meal.id)
+        return cls.from_rows((meal.id, meal.meal, meal.cuisine, meal.price, meal.difficulty, 0, 0) for meal in ordered)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[Meal]:
+        for position in range(len(self.ids)):
+            yield self.meal_at(position)
+
+    def __contains__(self, meal_id: object) -> bool:
+        try:
+            self.position(meal_id)
+        except (ValueError, TypeError):
+            return False
+        return True
+
+    def position(self, meal_id: int) -> int:
+        """Returns the index of meal_id in the columns.
+
+        Raises:
+            ValueError: If the meal is not in the catalog.
+        """
+        position = int(np.searchsorted(self.ids, meal_id))
+        if position >= len(self.ids) or self.ids[position] != meal_id:
+            raise ValueError(f"Meal with ID {meal_id} not found in catalog")
+        return position
+
+    def name_at(self, position: int) -> str:
+        return self._names[self._name_offsets[position]:self._name_offsets[position + 1]].decode('utf-8')
+
+    def meal_at(self, position: int) -> Meal:
+        """Builds the Meal stored at a position. Cuisine and difficulty strings are shared, not copied."""
+        return Meal(id=int(self.ids[position]), meal=self.name_at(position),
+                    cuisine=self.cuisines[self.cuisine_codes[position]], price=float(self.prices[position]),
+                    difficulty=DIFFICULTIES[self.difficulty_codes[position]])
+
+    def get(self, meal_id: int) -> Meal:
+        """Returns the meal with the given ID.
+
+        Raises:
+            ValueError: If the meal is not in the catalog.
+        """
+        return self.meal_at(self.position(meal_id))
+
+    def score_columns(self) -> ScoreColumns:
+        """Returns the battle_scoring columns for every meal, without building Meals."""
+        cuisine_lengths = np.array([len(cuisine) for cuisine in self.cuisines], dtype=np.int64)
+        return ScoreColumns(
+            ids=self.ids,
+            prices=self.prices,
+            cuisine_lengths=cuisine_lengths[self.cuisine_codes],
+            modifiers=_DIFFICULTY_MODIFIERS[self.difficulty_codes],
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the columns, the name buffer and the cuisine strings."""
+        arrays = (self.ids, self.prices, self.cuisine_codes, self.difficulty_codes, self.battles, self.wins,
+                  self._name_offsets)
+        return (sum(array.nbytes for array in arrays) + len(self._names)
+                + sum(len(cuisine.encode('utf-8')) for cuisine in self.cuisines))
+
+
+def load_meal_catalog(include_deleted: bool = False) -> MealCatalog:
+    """Loads the meals table into a MealCatalog with a single query.
+
+    Args:
+        include_deleted (bool): Whether to include soft-deleted meals. Defaults to False.
+
+    Returns:
+        MealCatalog: Every (non-deleted) meal with its battle stats, ordered by ID.
+
+    Raises:
+        sqlite3.Error: If a database error occurs.
+    """
+    query = "SELECT id, meal, cuisine, price, difficulty, battles, wins FROM meals"
+    if not include_deleted:
+        query += " WHERE deleted = FALSE"
+    try:
+        with get_db_connection() as conn:
+            catalog = MealCatalog.from_rows(conn.execute(query + " ORDER BY id"))
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+    logger.info("Loaded meal catalog with %d meals (%d bytes)", len(catalog), catalog.nbytes)
+    return catalog
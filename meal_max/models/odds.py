@@ -0,0 +1,168 @@
+import logging
+import os
+import threading
+from typing import Any, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from meal_max.models.battle_scoring import load_battle_scores, winning_draws
+from meal_max.models.kitchen_model import get_catalog_version
+from meal_max.utils import sql_utils
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.random_source import RANDOM_GRID_SIZE
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Opponents per page of get_field_odds, and the most one page may hold
+ODDS_PAGE_SIZE = int(os.getenv("ODDS_PAGE_SIZE", "50"))
+ODDS_MAX_PAGE_SIZE = int(os.getenv("ODDS_MAX_PAGE_SIZE", "10000"))
+
+
+class _ScoreTable(NamedTuple):
+    # The database path is part of the key since tests and tools repoint the pool.
+    key: Tuple[str, int]
+    ids: np.ndarray
+    scores: np.ndarray
+
+
+_score_table: Optional[_ScoreTable] = None
+_score_table_lock = threading.Lock()
+
+
+def clear_score_cache() -> None:
+    """Drops the cached battle scores; the next lookup reloads them."""
+    global _score_table
+    with _score_table_lock:
+        _score_table = None
+
+
+def get_battle_scores() -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the IDs and battle scores of every non-deleted meal, ordered by ID.
+
+    Scores are the stored meals.score column, computed by kitchen_model.battle_score when
+    each meal was inserted, and are cached per process. Each call revalidates the cache
+    against the catalog version, so meals created or deleted by any process are picked up
+    by the next call; battles alone never invalidate it.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Meal IDs (int64) and their scores (float64). Both
+            arrays are shared and read-only.
+
+    Raises:
+        sqlite3.Error: If a database error occurs.
+    """
+    global _score_table
+    key = (sql_utils.DB_PATH, get_catalog_version())
+    table = _score_table
+    if table is not None and table.key == key:
+        return table.ids, table.scores
+
+    with _score_table_lock:
+        table = _score_table
+        if table is None or table.key != key:
+            table = _ScoreTable(key, *load_battle_scores())
+            for array in (table.ids, table.scores):
+                array.flags.writeable = False
+            # Versions only grow, so an unchanged version means the load saw no catalog change.
+            if (sql_utils.DB_PATH, get_catalog_version()) == key:
+                _score_table = table
+            logger.info("Loaded battle scores for %d meals (catalog version %d)", len(table.ids), key[1])
+    return table.ids, table.scores
+
+
+def _position(ids: np.ndarray, meal_id: int) -> int:
+    """Returns the position of meal_id in ids, or raises ValueError if it is not an active meal."""
+    position = int(np.searchsorted(ids, meal_id))
+    if position == len(ids) or ids[position] != meal_id:
+        logger.info("Meal with ID %s not found or deleted", meal_id)
+        raise ValueError(f"Meal with ID {meal_id} not found or has been deleted")
+    return position
+
+
+def get_pair_odds(meal_id_1: int, meal_id_2: int) -> dict[str, Any]:
+    """
+    Returns the exact chance of each combatant winning a battle with the given slot order.
+
+    BattleModel.battle() lets combatant 1 win iff abs(score_1 - score_2) / 100 exceeds the
+    random number, so the odds follow from the two scores alone (see winning_draws).
+
+    Args:
+        meal_id_1 (int): The meal in the first combatant slot.
+        meal_id_2 (int): The meal in the second combatant slot.
+
+    Returns:
+        dict[str, Any]: 'combatant_1' and 'combatant_2', each with the meal's 'id', battle
+            'score' and 'win_probability'.
+
+    Raises:
+        ValueError: If either meal is not found or has been deleted.
+        sqlite3.Error: If a database error occurs.
+    """
+    ids, scores = get_battle_scores()
+    score_1, score_2 = scores[_position(ids, meal_id_1)], scores[_position(ids, meal_id_2)]
+    draws = int(winning_draws(np.abs(score_1 - score_2) / 100))
+    return {
+        'combatant_1': {'id': meal_id_1, 'score': float(score_1), 'win_probability': draws / RANDOM_GRID_SIZE},
+        'combatant_2': {'id': meal_id_2, 'score': float(score_2),
+                        'win_probability': (RANDOM_GRID_SIZE - draws) / RANDOM_GRID_SIZE},
+    }
+
+
+def get_field_odds(meal_id: int, limit: int = ODDS_PAGE_SIZE, offset: int = 0) -> dict[str, Any]:
+    """
+    Returns a meal's exact odds against every other non-deleted meal, in both slots.
+
+    The odds for all opponents are computed in one vectorized pass over the cached scores.
+    Against an opponent drawn uniformly from the field, the meal's chance is the mean of its
+    per-opponent chances; with the slot order also random, every meal's chance is one half.
+
+    Args:
+        meal_id (int): The meal to rate.
+        limit (int): The most opponents to list. Defaults to ODDS_PAGE_SIZE.
+        offset (int): The number of opponents (in ID order) to skip. Defaults to 0.
+
+    Returns:
+        dict[str, Any]: The meal's 'id', 'score', number of 'opponents', and
+            'first_slot_win_probability' / 'second_slot_win_probability' against the field,
+            plus 'odds': the page of opponents, each with its 'id', 'score' and the meal's
+            first- and second-slot win probabilities against it.
+
+    Raises:
+        ValueError: If the meal is not found or has been deleted, or limit is out of range.
+        sqlite3.Error: If a database error occurs.
+    """
+    if not 0 <= limit <= ODDS_MAX_PAGE_SIZE:
+        raise ValueError(f"Invalid limit: {limit}. Must be between 0 and {ODDS_MAX_PAGE_SIZE}.")
+    if offset < 0:
+        raise ValueError(f"Invalid offset: {offset}. Must be non-negative.")
+
+    ids, scores = get_battle_scores()
+    position = _position(ids, meal_id)
+    score = scores[position]
+    draws = winning_draws(np.abs(score - scores) / 100)
+    opponents = np.arange(len(ids)) != position
+    count = len(ids) - 1
+    total, draws_in_field = int(draws[opponents].sum()), count * RANDOM_GRID_SIZE
+
+    page = np.flatnonzero(opponents)[offset:offset + limit]
+    odds = [
+        {
+            'id': opponent_id,
+            'score': opponent_score,
+            'first_slot_win_probability': wins / RANDOM_GRID_SIZE,
+            'second_slot_win_probability': (RANDOM_GRID_SIZE - wins) / RANDOM_GRID_SIZE,
+        }
+        for opponent_id, opponent_score, wins in zip(ids[page].tolist(), scores[page].tolist(), draws[page].tolist())
+    ]
+    return {
+        'id': meal_id,
+        'score': float(score),
+        'opponents': count,
+        'first_slot_win_probability': total / draws_in_field if count else None,
+        'second_slot_win_probability': (draws_in_field - total) / draws_in_field if count else None,
+        'odds': odds,
+    }
@@ -0,0 +1,104 @@
+import logging
+import os
+import sqlite3
+from typing import Any, Iterable, MutableSequence, Tuple
+
+import numpy as np
+
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.metrics import timed_query
+from meal_max.utils.sql_utils import get_db_connection
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Every meal starts at this Elo rating (the meals.rating column default)
+RATING_INITIAL = 1500.0
+# The most points one battle can move; equally rated meals exchange half of it
+RATING_K_FACTOR = float(os.getenv("RATING_K_FACTOR", "32"))
+
+
+def expected_score(rating: float, opponent: float) -> float:
+    """Returns the Elo probability that a meal rated rating beats one rated opponent."""
+    return 1.0 / (1.0 + 10.0 ** ((opponent - rating) / 400.0))
+
+
+def rate_battle(winner_rating: float, loser_rating: float) -> Tuple[float, float]:
+    """Applies one battle to both meals' Elo ratings.
+
+    This is the single rating rule: record_battle_result(s) apply it as battles are recorded
+    and rebuild_ratings replays it over the battles log, so both give identical ratings.
+
+    Args:
+        winner_rating (float): The winner's rating before the battle.
+        loser_rating (float): The loser's rating before the battle.
+
+    Returns:
+        Tuple[float, float]: The winner's and the loser's new ratings.
+    """
+    change = RATING_K_FACTOR * (1.0 - expected_score(winner_rating, loser_rating))
+    return winner_rating + change, loser_rating - change
+
+
+def rate_battles(ratings: MutableSequence, results: Iterable[Tuple[int, int]]) -> None:
+    """Applies (winner_id, loser_id) results, in order, to ratings indexed by meal ID.
+
+    Elo updates are order-dependent (each uses both ratings as left by the meals' previous
+    battles), so this is one sequential pass; a wave-by-wave NumPy version, updating many
+    disjoint pairs at once, measured no faster and is not bit-identical to rate_battle.
+    A meal that battles itself keeps its rating.
+
+    Args:
+        ratings (MutableSequence): Ratings by meal ID, e.g. a dict or a list; updated in place.
+        results (Iterable[Tuple[int, int]]): (winner_id, loser_id) pairs in battle order.
+    """
+    for winner_id, loser_id in results:
+        if winner_id != loser_id:
+            ratings[winner_id], ratings[loser_id] = rate_battle(ratings[winner_id], ratings[loser_id])
+
+
+@timed_query
+def rebuild_ratings() -> dict[str, Any]:
+    """Recomputes every meal's rating by replaying the battles log from RATING_INITIAL.
+
+    Two-sided log rows are replayed in log order, which is the order they were rated in;
+    one-sided rows from update_meal_stats have no opponent and do not move ratings. Counters
+    in the battle stats baseline carry no history, so they do not contribute either. Only
+    meals whose rating changes are written, in one BEGIN IMMEDIATE transaction.
+
+    Returns:
+        dict[str, Any]: 'events', the number of battles replayed, and 'updated', the number
+            of meals whose rating changed.
+
+    Raises:
+        sqlite3.Error: If a database error occurs; nothing is written.
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            meals = cursor.execute("SELECT id, rating FROM meals").fetchall()
+            ids = np.array([row[0] for row in meals], dtype=np.int64)
+            current = np.array([row[1] for row in meals], dtype=np.float64)
+            size = 1 + max(int(ids.max(initial=0)), cursor.execute(
+                "SELECT MAX(IFNULL(MAX(combatant_1), 0), IFNULL(MAX(combatant_2), 0)) FROM battles").fetchone()[0])
+
+            ratings = [RATING_INITIAL] * size
+            cursor.execute("SELECT winner_id, CASE WHEN winner_id = combatant_1 THEN combatant_2 ELSE combatant_1 END "
+                           "FROM battles WHERE combatant_2 IS NOT NULL ORDER BY id")
+            rate_battles(ratings, cursor)
+            events = cursor.execute("SELECT COUNT(*) FROM battles WHERE combatant_2 IS NOT NULL").fetchone()[0]
+
+            replayed = np.array(ratings)[ids]
+            changed = np.flatnonzero(replayed != current)
+            updates = list(zip(replayed[changed].tolist(), ids[changed].tolist()))
+            cursor.executemany("UPDATE meals SET rating = ? WHERE id = ?", updates)
+            conn.commit()
+    except sqlite3.Error as e:
+        logger.error("Database error while rebuilding ratings: %s", str(e))
+        raise e
+
+    logger.info("Replayed %d battles: %d meal ratings changed", events, len(updates))
+    return {'events': events, 'updated': len(updates)}
@@ -0,0 +1,239 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+import logging
+import os
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+from meal_max.models.battle_scoring import battle_deltas, battle_outcomes, battle_scores
+from meal_max.models.meal_catalog import MealCatalog, load_meal_catalog
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.random_source import RANDOM_GRID_SIZE
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Processes that run simulation chunks; 1 runs them in the calling process
+SIMULATION_WORKERS = int(os.getenv("SIMULATION_WORKERS", str(os.cpu_count() or 1)))
+# Battles per chunk: the unit of work sent to a worker, and of memory (~50 bytes per battle)
+SIMULATION_CHUNK_SIZE = int(os.getenv("SIMULATION_CHUNK_SIZE", "1000000"))
+# Largest field for which the per-pair matrices (field size squared cells) are kept
+SIMULATION_MAX_MATRIX_MEALS = int(os.getenv("SIMULATION_MAX_MATRIX_MEALS", "1000"))
+
+# Two-sided 95% normal quantile, the default width of the confidence intervals
+Z_95 = 1.959963984540054
+
+
+def wilson_interval(wins: np.ndarray, battles: np.ndarray,
+                    z: float = Z_95) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Estimates win probabilities from counts, with Wilson score confidence intervals.
+
+    Unlike the normal approximation, the interval stays inside [0, 1] and is not
+    degenerate for probabilities near 0 or 1 (e.g. a meal that always wins its slot).
+
+    Args:
+        wins (np.ndarray): Wins per entry.
+        battles (np.ndarray): Battles per entry.
+        z (float): The normal quantile of the confidence level. Defaults to 95%.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: The estimates and the interval bounds,
+            NaN where there were no battles.
+    """
+    wins = np.asarray(wins, dtype=np.float64)
+    battles = np.asarray(battles, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        estimate = wins / battles
+        denominator = 1 + z * z / battles
+        centre = (estimate + z * z / (2 * battles)) / denominator
+        margin = z * np.sqrt(estimate * (1 - estimate) / battles + z * z / (4 * battles * battles)) / denominator
+    return estimate, np.clip(centre - margin, 0.0, 1.0), np.clip(centre + margin, 0.0, 1.0)
+
+
+@dataclass(frozen=True)
+class SimulationResult:
+    """Battle counts from a simulation, per meal by slot and optionally per ordered pair.
+
+    Index i of every per-meal array is the meal meal_ids[i]. In the pair matrices, cell
+    [i, j] counts battles with meal i in the deciding first slot against meal j.
+
+    Attributes:
+        meal_ids (np.ndarray): The simulated field (int64).
+        seed (int): The seed entropy; running again with it reproduces the result.
+        first_battles (np.ndarray): Battles fought in the first slot, per meal.
+        first_wins (np.ndarray): Battles won from the first slot, per meal.
+        second_battles (np.ndarray): Battles fought in the second slot, per meal.
+        second_wins (np.ndarray): Battles won from the second slot, per meal.
+        pair_battles (np.ndarray, optional): Battles per ordered pair, if requested.
+        pair_wins (np.ndarray, optional): First-slot wins per ordered pair, if requested.
+    """
+    meal_ids: np.ndarray
+    seed: int
+    first_battles: np.ndarray
+    first_wins: np.ndarray
+    second_battles: np.ndarray
+    second_wins: np.ndarray
+    pair_battles: Optional[np.ndarray] = None
+    pair_wins: Optional[np.ndarray] = None
+
+    @property
+    def battles(self) -> int:
+        """The number of battles simulated."""
+        return int(self.first_battles.sum())
+
+    def win_probabilities(self, slot: Optional[int] = None,
+                          z: float = Z_95) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Each meal's chance of beating a random opponent from the field, with intervals.
+
+        Args:
+            slot (int, optional): 1 or 2 for the chance from that slot. Defaults to a
+                random slot, i.e. all the meal's battles.
+            z (float): The normal quantile of the confidence level. Defaults to 95%.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Estimates, lower and upper bounds.
+
+        Raises:
+            ValueError: If slot is not None, 1 or 2.
+        """
+        if slot == 1:
+            return wilson_interval(self.first_wins, self.first_battles, z)
+        if slot == 2:
+            return wilson_interval(self.second_wins, self.second_battles, z)
+        if slot is not None:
+            raise ValueError(f"Invalid slot: {slot}. Must be 1 or 2.")
+        return wilson_interval(self.first_wins + self.second_wins, self.first_battles + self.second_battles, z)
+
+    def win_probability_matrix(self, z: float = Z_95) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """The chance that meal i, in the first slot, beats meal j, per cell [i, j].
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Estimates, lower and upper bounds,
+                NaN for pairs never simulated (including the diagonal).
+
+        Raises:
+            ValueError: If the simulation was run without matrix=True.
+        """
+        if self.pair_battles is None:
+            raise ValueError("This simulation was run without matrix=True.")
+        return wilson_interval(self.pair_wins, self.pair_battles, z)
+
+
+def _simulate_chunk(scores: np.ndarray, battles: int, seed: np.random.SeedSequence,
+                    matrix: bool) -> Tuple[np.ndarray, ...]:
+    """Simulates battles between uniformly drawn pairs of distinct meals.
+
+    Returns:
+        Tuple[np.ndarray, ...]: first_battles, first_wins, second_battles and second_wins
+            per meal, then (if matrix) pair_battles and pair_wins flattened.
+    """
+    rng = np.random.default_rng(seed)
+    size = len(scores)
+    first = rng.integers(0, size, battles)
+    # Draw from the other size - 1 meals, then skip over the first combatant's position.
+    second = rng.integers(0, size - 1, battles)
+    second += second >= first
+    randoms = rng.integers(0, RANDOM_GRID_SIZE, battles) / RANDOM_GRID_SIZE
+    first_won = battle_outcomes(battle_deltas(scores, first, second), randoms)
+
+    counts: Tuple[np.ndarray, ...] = (
+        np.bincount(first, minlength=size),
+        np.bincount(first[first_won], minlength=size),
+        np.bincount(second, minlength=size),
+        np.bincount(second[~first_won], minlength=size),
+    )
+    if matrix:
+        cells = first * size + second
+        counts += (np.bincount(cells, minlength=size * size), np.bincount(cells[first_won], minlength=size * size))
+    return counts
+
+
+class BattleSimulator:
+    """Estimates battle odds by Monte Carlo, without touching the database or random.org.
+
+    The catalog is loaded once (or passed in) and scored with battle_scoring, so simulated
+    battles follow the BattleModel.battle() rule exactly. Each battle pairs two distinct
+    meals of the field drawn uniformly, in a uniformly random slot order, and draws its
+    random number from the random sources' grid with a local NumPy generator. Runs are split into chunks of
+    SIMULATION_CHUNK_SIZE battles with their own child seeds and spread over a process
+    pool, so a result depends on the seed but not on the number of workers.
+
+    Attributes:
+        catalog (MealCatalog): The meals that can be simulated.
+        columns (ScoreColumns): Their battle_scoring columns.
+        scores (np.ndarray): Their battle scores, in catalog order.
+        workers (int): The number of worker processes.
+    """
+
+    def __init__(self, catalog: Optional[MealCatalog] = None, workers: Optional[int] = None):
+        """Loads and scores the catalog.
+
+        Args:
+            catalog (MealCatalog, optional): The meals to simulate. Defaults to every
+                non-deleted meal, read once from the database.
+            workers (int, optional): Worker processes. Defaults to SIMULATION_WORKERS.
+        """
+        self.catalog = catalog if catalog is not None else load_meal_catalog()
+        self.columns = self.catalog.score_columns()
+        self.scores = battle_scores(self.columns)
+        self.workers = workers or SIMULATION_WORKERS
+
+    def run(self, battles: int, meal_ids: Optional[Iterable[int]] = None, matrix: bool = False,
+            seed: Optional[int] = None) -> SimulationResult:
+        """Simulates battles within a field of meals.
+
+        Args:
+            battles (int): The number of battles to simulate.
+            meal_ids (Iterable[int], optional): The field. Defaults to the whole catalog.
+            matrix (bool): Whether to also count battles per ordered pair. Defaults to False.
+            seed (int, optional): Seed for reproducible results. Defaults to fresh entropy.
+
+        Returns:
+            SimulationResult: The battle counts, with win probability helpers.
+
+        Raises:
+            ValueError: If battles is not positive, the field has fewer than two meals or
+                repeats a meal, a meal is not in the catalog, or matrix is requested for
+                more than SIMULATION_MAX_MATRIX_MEALS meals.
+        """
+        if battles < 1:
+            raise ValueError(f"Invalid number of battles: {battles}. Must be at least 1.")
+        if meal_ids is None:
+            positions = np.arange(len(self.catalog))
+        else:
+            positions = self.columns.positions(list(meal_ids))
+            if len(np.unique(positions)) != len(positions):
+                raise ValueError("The field lists a meal more than once.")
+        if len(positions) < 2:
+            raise ValueError("A simulation needs at least two meals.")
+        if matrix and len(positions) > SIMULATION_MAX_MATRIX_MEALS:
+            raise ValueError(f"Pair matrices are limited to {SIMULATION_MAX_MATRIX_MEALS} meals, "
+                             f"got {len(positions)}.")
+
+        seed_sequence = np.random.SeedSequence(seed)
+        sizes = [SIMULATION_CHUNK_SIZE] * (battles // SIMULATION_CHUNK_SIZE)
+        if battles % SIMULATION_CHUNK_SIZE:
+            sizes.append(battles % SIMULATION_CHUNK_SIZE)
+        seeds = seed_sequence.spawn(len(sizes))
+        scores = self.scores[positions]
+
+        workers = min(self.workers, len(sizes))
+        logger.info("Simulating %d battles between %d meals in %d chunks on %d workers",
+                    battles, len(positions), len(sizes), workers)
+        args = (repeat(scores), sizes, seeds, repeat(matrix))
+        if workers <= 1:
+            chunks = list(map(_simulate_chunk, *args))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                chunks = list(executor.map(_simulate_chunk, *args))
+
+        totals = [np.sum(column, axis=0) for column in zip(*chunks)]
+        pair_battles = pair_wins = None
+        if matrix:
+            pair_battles, pair_wins = (total.reshape(len(positions), len(positions)) for total in totals[4:])
+        return SimulationResult(self.catalog.ids[positions], seed_sequence.entropy, *totals[:4],
+                                pair_battles=pair_battles, pair_wins=pair_wins)
@@ -0,0 +1,322 @@
+import logging
+import math
+import os
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from meal_max.models.battle_scoring import battle_scores, columns_from_meals, play_pairings
+from meal_max.models.kitchen_model import BattleRecord, Meal, get_active_meals, record_battle_results
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.random_source import RandomSource, get_random_source
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+TOURNAMENT_FORMATS = ['round_robin', 'knockout', 'swiss']
+
+# The most battles one tournament may schedule. A round robin plays N * (N - 1) / 2 of them,
+# so without a cap a tournament over a large catalog would not fit in memory.
+TOURNAMENT_MAX_BATTLES = int(os.getenv("TOURNAMENT_MAX_BATTLES", "100000"))
+
+
+class TournamentModel:
+    """Runs many battles at once between a set of meals.
+
+    Every meal is scored once up front in one batch (see battle_scoring), the random
+    numbers for the whole tournament are drawn in a single request, and all stat
+    changes are written in one transaction. Each battle follows BattleModel.battle():
+    the first-slot combatant wins iff abs(score_1 - score_2) / 100 > random.
+
+    Attributes:
+        random_source (RandomSource): The source of battle random numbers, or None to use
+            the process-wide source from get_random_source().
+    """
+
+    def __init__(self, random_source: Optional[RandomSource] = None):
+        """Initializes a new TournamentModel.
+
+        Args:
+            random_source (RandomSource, optional): The source of battle random numbers.
+                Defaults to the process-wide source.
+        """
+        self.random_source = random_source
+
+    def run(self, meal_ids: Optional[Iterable[int]] = None, tournament_format: str = "round_robin",
+            rounds: Optional[int] = None, record: bool = True) -> dict[str, Any]:
+        """Runs a tournament and optionally records every battle in the meals' stats.
+
+        Args:
+            meal_ids (Iterable[int], optional): The participating meals. Defaults to all non-deleted meals.
+            tournament_format (str): 'round_robin', 'knockout' or 'swiss'. Defaults to 'round_robin'.
+            rounds (int, optional): Number of Swiss rounds. Defaults to ceil(log2(participants)).
+            record (bool): Whether to write the results to the meals table. Defaults to True.
+
+        Returns:
+            dict[str, Any]: The format, battle count, standings and (for knockout) champion.
+
+        Raises:
+            ValueError: If the format or rounds are invalid, fewer than two meals take part,
+                the tournament would play more than TOURNAMENT_MAX_BATTLES battles, or a
+                requested meal has been deleted or is not found.
+            sqlite3.Error: If a database error occurs.
+        """
+        if tournament_format not in TOURNAMENT_FORMATS:
+            logger.error("Invalid tournament format: %s", tournament_format)
+            raise ValueError(f"Invalid tournament format: {tournament_format}. Must be one of {TOURNAMENT_FORMATS}.")
+        if rounds is not None and rounds < 1:
+            raise ValueError(f"Invalid number of rounds: {rounds}. Must be at least 1.")
+
+        meals = get_active_meals(meal_ids)
+        if len(meals) < 2:
+            logger.error("Not enough meals for a tournament: %d", len(meals))
+            raise ValueError("A tournament needs at least two meals.")
+
+        if tournament_format == "swiss" and rounds is None:
+            rounds = max(1, math.ceil(math.log2(len(meals))))
+        battles = self.count_battles(len(meals), tournament_format, rounds)
+        if battles > TOURNAMENT_MAX_BATTLES:
+            logger.error("Tournament of %d battles exceeds the limit of %d", battles, TOURNAMENT_MAX_BATTLES)
+            raise ValueError(f"A {tournament_format} tournament of {len(meals)} meals plays {battles} battles. "
+                             f"Must be at most {TOURNAMENT_MAX_BATTLES}; pass fewer meal_ids.")
+
+        logger.info("Starting %s tournament with %d meals", tournament_format, len(meals))
+
+        columns = columns_from_meals(meals)
+        score_array = battle_scores(columns)
+        scores = dict(zip(columns.ids.tolist(), score_array.tolist()))
+        source = self.random_source or get_random_source()
+
+        if tournament_format == "round_robin":
+            # N * (N - 1) / 2 battles, decided in one vectorized pass
+            pairings = self.schedule_round_robin([meal.id for meal in meals])
+            randoms = source.get_randoms(len(pairings))
+            winners, losers = play_pairings(columns, pairings, randoms, score_array)
+            results = list(zip(winners.tolist(), losers.tolist()))
+            champion = None
+        elif tournament_format == "knockout":
+            # A field of N meals always plays exactly N - 1 battles
+            randoms = source.get_randoms(len(meals) - 1)
+            results, champion = self._play_knockout(meals, scores, randoms)
+        else:
+            randoms = source.get_randoms(len(meals) // 2 * rounds)
+            results = self._play_swiss(meals, scores, rounds, randoms)
+            champion = None
+
+        if record:
+            record_battle_results(results, self._battle_records(results, scores, randoms))
+
+        standings = self._standings(meals, scores, results)
+        logger.info("Tournament finished: %d battles", len(results))
+        return {
+            'format': tournament_format,
+            'participants': len(meals),
+            'battles': len(results),
+            'recorded': record,
+            'champion': champion,
+            'standings': standings,
+        }
+
+    @staticmethod
+    def count_battles(participants: int, tournament_format: str, rounds: Optional[int] = None) -> int:
+        """Returns the number of battles a tournament plays, without scheduling it.
+
+        Args:
+            participants (int): The number of meals taking part.
+            tournament_format (str): 'round_robin', 'knockout' or 'swiss'.
+            rounds (int, optional): The number of Swiss rounds, required for 'swiss'.
+
+        Returns:
+            int: The number of battles.
+        """
+        if tournament_format == "round_robin":
+            return participants * (participants - 1) // 2
+        if tournament_format == "knockout":
+            return participants - 1
+        return participants // 2 * rounds
+
+    @staticmethod
+    def schedule_round_robin(meal_ids: List[int]) -> List[Tuple[int, int]]:
+        """Pairs every meal with every other meal exactly once.
+
+        Because the first slot decides the battle rule, each meal takes the first slot in
+        half of its battles (to within one).
+
+        Args:
+            meal_ids (List[int]): The participating meal IDs.
+
+        Returns:
+            List[Tuple[int, int]]: (combatant_1, combatant_2) pairings.
+        """
+        pairings = []
+        for i in range(len(meal_ids)):
+            for j in range(i + 1, len(meal_ids)):
+                if (i + j) % 2:
+                    pairings.append((meal_ids[i], meal_ids[j]))
+                else:
+                    pairings.append((meal_ids[j], meal_ids[i]))
+        return pairings
+
+    @staticmethod
+    def _play(pairings: List[Tuple[int, int]], scores: Dict[int, float],
+              randoms: List[float]) -> List[Tuple[int, int]]:
+        """Decides each pairing with the BattleModel.battle() rule.
+
+        Returns:
+            List[Tuple[int, int]]: (winner_id, loser_id) for each pairing, in order.
+        """
+        results = []
+        for (first, second), random_number in zip(pairings, randoms):
+            delta = abs(scores[first] - scores[second]) / 100
+            if delta > random_number:
+                results.append((first, second))
+            else:
+                results.append((second, first))
+        return results
+
+    @staticmethod
+    def _battle_records(results: List[Tuple[int, int]], scores: Dict[int, float],
+                        randoms: List[float]) -> List[BattleRecord]:
+        """Builds the battles log record of each result, played with randoms in order.
+
+        The slot order is recovered from the battle rule: the winner held the first slot
+        iff the normalized score delta beat the random number.
+        """
+        records = []
+        for (winner, loser), random_number in zip(results, randoms):
+            if abs(scores[winner] - scores[loser]) / 100 > random_number:
+                first, second = winner, loser
+            else:
+                first, second = loser, winner
+            records.append(BattleRecord(first, second, winner, scores[first], scores[second], random_number))
+        return records
+
+    def _play_knockout(self, meals: List[Meal], scores: Dict[int, float],
+                       randoms: List[float]) -> Tuple[List[Tuple[int, int]], int]:
+        """Plays a single-elimination bracket seeded by battle score.
+
+        The strongest seed meets the weakest in each round; with an odd field the top seed
+        gets a bye. A field of N meals always plays exactly N - 1 battles, so every random
+        number is drawn up front, in one request.
+        """
+        alive = sorted((meal.id for meal in meals), key=lambda meal_id: (-scores[meal_id], meal_id))
+        results: List[Tuple[int, int]] = []
+
+        while len(alive) > 1:
+            byes = alive[:1] if len(alive) % 2 else []
+            field = alive[len(byes):]
+            half = len(field) // 2
+            pairings = [(field[i], field[-1 - i]) for i in range(half)]
+
+            round_results = self._play(pairings, scores, randoms[len(results):len(results) + len(pairings)])
+            results.extend(round_results)
+            winners = {winner for winner, _ in round_results}
+            # Keep the survivors in seed order for the next round.
+            alive = byes + [meal_id for meal_id in field if meal_id in winners]
+
+        return results, alive[0]
+
+    def _play_swiss(self, meals: List[Meal], scores: Dict[int, float], rounds: int,
+                    randoms: List[float]) -> List[Tuple[int, int]]:
+        """Plays Swiss-system rounds, pairing meals with equal records and avoiding rematches.
+
+        Every round plays len(meals) // 2 battles, using the next slice of randoms. With an
+        odd field the lowest-ranked meal without a bye sits out the round and is awarded a
+        point, but no battle is recorded for it.
+        """
+        ids = [meal.id for meal in meals]
+        per_round = len(ids) // 2
+        points = {meal_id: 0 for meal_id in ids}
+        played: Set[Tuple[int, int]] = set()
+        had_bye: Set[int] = set()
+        results: List[Tuple[int, int]] = []
+
+        for round_number in range(rounds):
+            ranking = sorted(ids, key=lambda meal_id: (-points[meal_id], -scores[meal_id], meal_id))
+            if len(ranking) % 2:
+                bye = next((meal_id for meal_id in reversed(ranking) if meal_id not in had_bye), ranking[-1])
+                had_bye.add(bye)
+                points[bye] += 1
+                ranking.remove(bye)
+
+            matches = self._pair_swiss_round(ranking, played)
+            pairings = []
+            for first, opponent in matches:
+                played.add((min(first, opponent), max(first, opponent)))
+                # Alternate the deciding first slot from round to round.
+                pairings.append((first, opponent) if round_number % 2 == 0 else (opponent, first))
+
+            offset = round_number * per_round
+            round_results = self._play(pairings, scores, randoms[offset:offset + per_round])
+            for winner, _ in round_results:
+                points[winner] += 1
+            results.extend(round_results)
+
+        return results
+
+    @staticmethod
+    def _pair_swiss_round(ranking: List[int], played: Set[Tuple[int, int]],
+                          budget: int = 10000) -> List[Tuple[int, int]]:
+        """Pairs neighbours in the ranking, backtracking to avoid rematches.
+
+        If no rematch-free pairing is found within budget steps, the ranking is paired
+        greedily and some rematches are allowed.
+        """
+        def allowed(a: int, b: int) -> bool:
+            return (min(a, b), max(a, b)) not in played
+
+        # Depth-first search over "pair the top unpaired meal with its next allowed opponent",
+        # kept iterative (and copy-free) so large fields do not hit the recursion limit.
+        size = len(ranking)
+        used = [False] * size
+        stack: List[Tuple[int, int]] = []
+        first, start_index = 0, 1
+        steps = 0
+        matches: Optional[List[Tuple[int, int]]] = None
+        while steps < budget:
+            while first < size and used[first]:
+                first += 1
+            if first >= size - 1:
+                matches = [(ranking[a], ranking[b]) for a, b in stack]
+                break
+            steps += 1
+            opponent = next((i for i in range(max(start_index, first + 1), size)
+                             if not used[i] and allowed(ranking[first], ranking[i])), None)
+            if opponent is None:
+                if not stack:
+                    break
+                first, previous = stack.pop()
+                used[first] = used[previous] = False
+                start_index = previous + 1
+                continue
+            used[first] = used[opponent] = True
+            stack.append((first, opponent))
+            start_index = 0
+
+        if matches is None:
+            logger.info("No rematch-free Swiss pairing found; allowing rematches this round")
+            matches = [(ranking[i], ranking[i + 1]) for i in range(0, len(ranking) - 1, 2)]
+        return matches
+
+    @staticmethod
+    def _standings(meals: List[Meal], scores: Dict[int, float],
+                   results: List[Tuple[int, int]]) -> List[dict[str, Any]]:
+        """Tallies wins and losses per meal, ranked by wins then battle score."""
+        wins = {meal.id: 0 for meal in meals}
+        losses = {meal.id: 0 for meal in meals}
+        for winner, loser in results:
+            wins[winner] += 1
+            losses[loser] += 1
+
+        standings = [
+            {
+                'id': meal.id,
+                'meal': meal.meal,
+                'score': scores[meal.id],
+                'wins': wins[meal.id],
+                'losses': losses[meal.id],
+            }
+            for meal in meals
+        ]
+        standings.sort(key=lambda row: (-row['wins'], -row['score'], row['id']))
+        return standings
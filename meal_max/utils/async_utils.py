@@ -0,0 +1,70 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import logging
+import os
+import threading
+from typing import Any, Callable, Optional, TypeVar
+
+from meal_max.utils import sql_utils
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+T = TypeVar("T")
+
+# Threads that run SQLite work for coroutines. Matching the pool size means a thread
+# never waits on the connection pool; extra work queues in the executor instead.
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", str(sql_utils.DB_POOL_SIZE)))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid: Optional[int] = None
+_executor_lock = threading.Lock()
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """Returns the process-wide executor for database calls, creating it on first use.
+
+    A forked child gets its own executor, since the parent's threads do not survive fork.
+
+    Returns:
+        ThreadPoolExecutor: An executor with DB_EXECUTOR_WORKERS threads.
+    """
+    global _executor, _executor_pid
+    if _executor is not None and _executor_pid == os.getpid():
+        return _executor
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db")
+            _executor_pid = os.getpid()
+            logger.info("Created database executor with %d thread(s)", DB_EXECUTOR_WORKERS)
+        return _executor
+
+
+def shutdown_db_executor() -> None:
+    """Waits for queued database calls and stops the executor. A new one is created on next use."""
+    global _executor, _executor_pid
+    with _executor_lock:
+        executor = _executor if _executor_pid == os.getpid() else None
+        _executor = None
+        _executor_pid = None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+async def run_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Runs a blocking database call on the database executor without blocking the event loop.
+
+    Args:
+        func (Callable): The blocking function, e.g. kitchen_model.record_battle_result.
+        *args: Positional arguments for func.
+        **kwargs: Keyword arguments for func.
+
+    Returns:
+        The return value of func.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_db_executor(), functools.partial(func, *args, **kwargs))
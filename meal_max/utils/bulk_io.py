@@ -0,0 +1,91 @@
+import csv
+import io
+import json
+from typing import Any, Iterable, Iterator, Union
+
+
+# Column order for CSV export; imports accept any subset that includes the required fields.
+MEAL_FIELDS = ['id', 'meal', 'cuisine', 'price', 'difficulty', 'battles', 'wins', 'deleted']
+
+BULK_FORMATS = ['ndjson', 'csv']
+
+
+def parse_ndjson(lines: Iterable[str]) -> Iterator[Union[dict, ValueError]]:
+    """Parses newline-delimited JSON one line at a time.
+
+    Blank lines are skipped. A malformed line yields a ValueError in its place, so the
+    importer can report it against the right row and carry on.
+
+    Args:
+        lines (Iterable[str]): The input, e.g. a text stream.
+
+    Yields:
+        Union[dict, ValueError]: One parsed object (or error) per non-blank line.
+    """
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            yield ValueError(f"Invalid JSON: {e}")
+
+
+def parse_csv(lines: Iterable[str]) -> Iterator[dict]:
+    """Parses CSV with a header row into one dict per row.
+
+    Empty cells are treated as missing values.
+
+    Args:
+        lines (Iterable[str]): The input, e.g. a text stream.
+
+    Yields:
+        dict: The row keyed by the header names.
+    """
+    for row in csv.DictReader(lines):
+        yield {key: value for key, value in row.items() if key is not None and value != ''}
+
+
+def parse_bulk(lines: Iterable[str], bulk_format: str) -> Iterator[Union[dict, ValueError]]:
+    """Parses bulk input in the given format ('ndjson' or 'csv').
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    if bulk_format == 'ndjson':
+        return parse_ndjson(lines)
+    if bulk_format == 'csv':
+        return parse_csv(lines)
+    raise ValueError(f"Invalid format: {bulk_format}. Must be one of {BULK_FORMATS}.")
+
+
+def format_ndjson(rows: Iterable[dict[str, Any]]) -> Iterator[str]:
+    """Serializes rows as newline-delimited JSON, one line per row."""
+    for row in rows:
+        yield json.dumps(row) + "\n"
+
+
+def format_csv(rows: Iterable[dict[str, Any]]) -> Iterator[str]:
+    """Serializes rows as CSV, yielding the MEAL_FIELDS header and then one chunk per row."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=MEAL_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    yield buffer.getvalue()
+    for row in rows:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(row)
+        yield buffer.getvalue()
+
+
+def format_bulk(rows: Iterable[dict[str, Any]], bulk_format: str) -> Iterator[str]:
+    """Serializes rows in the given format ('ndjson' or 'csv').
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    if bulk_format == 'ndjson':
+        return format_ndjson(rows)
+    if bulk_format == 'csv':
+        return format_csv(rows)
+    raise ValueError(f"Invalid format: {bulk_format}. Must be one of {BULK_FORMATS}.")
@@ -0,0 +1,119 @@
+from collections import OrderedDict
+import threading
+import time
+from typing import Any, Callable, Hashable, Optional
+
+
+_MISSING = object()
+
+
+class LRUCache:
+    """A thread-safe least-recently-used cache with an optional time-to-live.
+
+    Attributes:
+        maxsize (int): The maximum number of entries kept.
+        ttl (float): Seconds an entry stays valid, or None for no expiry.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        """Initializes an empty cache.
+
+        Args:
+            maxsize (int): The maximum number of entries kept.
+            ttl (float, optional): Seconds an entry stays valid. Defaults to no expiry.
+
+        Raises:
+            ValueError: If maxsize is less than 1 or ttl is not positive.
+        """
+        if maxsize < 1:
+            raise ValueError(f"Invalid cache size: {maxsize}. Must be at least 1.")
+        if ttl is not None and ttl <= 0:
+            raise ValueError(f"Invalid cache TTL: {ttl}. Must be positive.")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the cached value for key, or default if it is absent or expired."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self._misses += 1
+                return default
+            value, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                self._expirations += 1
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Stores value under key, evicting the least recently used entry if the cache is full."""
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Removes key and returns its value, or default if it was not cached."""
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            self._invalidations += 1
+            return entry[0]
+
+    def pop_where(self, predicate: Callable[[Any], bool]) -> int:
+        """Removes every entry whose value matches predicate.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        with self._lock:
+            keys = [key for key, (value, _) in self._data.items() if predicate(value)]
+            for key in keys:
+                del self._data[key]
+            self._invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        """Removes every entry. The counters are kept."""
+        with self._lock:
+            self._invalidations += len(self._data)
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, Any]:
+        """Returns a snapshot of the cache counters.
+
+        Returns:
+            dict[str, Any]: Size, hits, misses, hit rate, evictions, expirations and invalidations.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'invalidations': self._invalidations,
+            }
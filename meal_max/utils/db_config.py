@@ -0,0 +1,119 @@
+from dataclasses import dataclass
+import logging
+import os
+import sqlite3
+
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+JOURNAL_MODES = ['DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF']
+SYNCHRONOUS_LEVELS = ['OFF', 'NORMAL', 'FULL', 'EXTRA']
+TEMP_STORES = ['DEFAULT', 'FILE', 'MEMORY']
+
+
+@dataclass
+class DatabaseConfig:
+    """
+    Connection-level SQLite settings applied to every connection the application opens.
+
+    Attributes:
+        journal_mode (str): The journal mode ('WAL' lets readers run alongside a writer).
+        synchronous (str): The fsync level ('OFF', 'NORMAL', 'FULL', 'EXTRA').
+        busy_timeout_ms (int): Milliseconds a statement waits on a locked database before failing.
+        cache_size (int): Page cache size; negative values are KiB, positive values are pages.
+        mmap_size (int): Bytes of the database file to memory-map (0 disables mmap).
+        temp_store (str): Where temporary tables and indices live ('DEFAULT', 'FILE', 'MEMORY').
+    """
+    journal_mode: str = 'WAL'
+    synchronous: str = 'NORMAL'
+    busy_timeout_ms: int = 5000
+    cache_size: int = -16000
+    mmap_size: int = 134217728
+    temp_store: str = 'MEMORY'
+
+    def __post_init__(self):
+        """
+        Normalizes and validates the settings.
+
+        Raises:
+            ValueError: If any setting is outside the values SQLite accepts.
+        """
+        self.journal_mode = self.journal_mode.upper()
+        self.synchronous = self.synchronous.upper()
+        self.temp_store = self.temp_store.upper()
+        if self.journal_mode not in JOURNAL_MODES:
+            raise ValueError(f"Invalid journal mode: {self.journal_mode}. Must be one of {JOURNAL_MODES}.")
+        if self.synchronous not in SYNCHRONOUS_LEVELS:
+            raise ValueError(f"Invalid synchronous level: {self.synchronous}. Must be one of {SYNCHRONOUS_LEVELS}.")
+        if self.temp_store not in TEMP_STORES:
+            raise ValueError(f"Invalid temp store: {self.temp_store}. Must be one of {TEMP_STORES}.")
+        if self.busy_timeout_ms < 0:
+            raise ValueError(f"Invalid busy timeout: {self.busy_timeout_ms}. Must be non-negative.")
+        if self.mmap_size < 0:
+            raise ValueError(f"Invalid mmap size: {self.mmap_size}. Must be non-negative.")
+
+    @classmethod
+    def from_env(cls) -> "DatabaseConfig":
+        """
+        Builds a configuration from the DB_* environment variables, falling back to the defaults.
+
+        Returns:
+            DatabaseConfig: The configuration described by the environment.
+        """
+        defaults = cls()
+        return cls(
+            journal_mode=os.getenv("DB_JOURNAL_MODE", defaults.journal_mode),
+            synchronous=os.getenv("DB_SYNCHRONOUS", defaults.synchronous),
+            busy_timeout_ms=int(os.getenv("DB_BUSY_TIMEOUT_MS", defaults.busy_timeout_ms)),
+            cache_size=int(os.getenv("DB_CACHE_SIZE", defaults.cache_size)),
+            mmap_size=int(os.getenv("DB_MMAP_SIZE", defaults.mmap_size)),
+            temp_store=os.getenv("DB_TEMP_STORE", defaults.temp_store),
+        )
+
+    def apply(self, conn: sqlite3.Connection) -> None:
+        """
+        Applies the pragmas to an open connection.
+
+        Args:
+            conn (sqlite3.Connection): The connection to configure.
+
+        Raises:
+            sqlite3.Error: If a pragma cannot be applied.
+        """
+        # busy_timeout goes first so that switching the journal mode can wait on other connections.
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        mode = conn.execute(f"PRAGMA journal_mode = {self.journal_mode}").fetchone()[0]
+        if mode.upper() != self.journal_mode:
+            # In-memory databases cannot use WAL; SQLite reports the mode it kept instead.
+            logger.debug("Requested journal_mode %s, database is using %s", self.journal_mode, mode)
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute(f"PRAGMA cache_size = {int(self.cache_size)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute(f"PRAGMA temp_store = {self.temp_store}")
+
+    def connect(self, db_path: str) -> sqlite3.Connection:
+        """
+        Opens a connection to db_path with this configuration applied.
+
+        The connection may be used from any thread, one thread at a time, so it can be pooled.
+
+        Args:
+            db_path (str): The path of the SQLite database.
+
+        Returns:
+            sqlite3.Connection: The configured connection.
+
+        Raises:
+            sqlite3.Error: If the connection cannot be opened or configured.
+        """
+        conn = sqlite3.connect(db_path, timeout=self.busy_timeout_ms / 1000, check_same_thread=False)
+        try:
+            self.apply(conn)
+        except sqlite3.Error:
+            conn.close()
+            raise
+        return conn
@@ -0,0 +1,271 @@
+from collections import deque
+from contextlib import contextmanager
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Deque, Optional, Tuple
+
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class ConnectionPool:
+    """A bounded pool of reusable SQLite connections.
+
+    Connections are handed out most-recently-used first so that a small working set
+    stays warm, and idle connections older than ``max_idle`` seconds are closed on
+    the next checkout. Every checkout runs a cheap health check so a broken
+    connection is replaced rather than returned to the caller.
+
+    Attributes:
+        db_path (str): The path of the SQLite database the pool connects to.
+        max_size (int): The maximum number of open connections (idle + in use).
+        max_idle (float): Seconds an idle connection may sit in the pool before it is closed.
+        timeout (float): Seconds to wait for a free connection when the pool is exhausted.
+        health_check (bool): Whether to run ``SELECT 1`` on checkout.
+    """
+
+    def __init__(self, db_path: str, max_size: int = 5, max_idle: float = 300.0, timeout: float = 30.0,
+                 health_check: bool = True, connect: Optional[Callable[[str], sqlite3.Connection]] = None):
+        """Initializes an empty pool. Connections are opened lazily on demand.
+
+        Args:
+            db_path (str): The path of the SQLite database.
+            max_size (int): The maximum number of open connections.
+            max_idle (float): Seconds before an idle connection is closed.
+            timeout (float): Seconds to wait for a connection before giving up.
+            health_check (bool): Whether to validate connections on checkout.
+            connect (Callable[[str], sqlite3.Connection], optional): Factory used to open
+                new connections. Defaults to ``sqlite3.connect`` with ``check_same_thread=False``.
+
+        Raises:
+            ValueError: If max_size is less than 1.
+        """
+        if max_size < 1:
+            raise ValueError(f"Invalid pool size: {max_size}. Must be at least 1.")
+
+        self.db_path = db_path
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.health_check = health_check
+        self._connect = connect or self._default_connect
+
+        self._idle: Deque[Tuple[sqlite3.Connection, float]] = deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+
+        self._hits = 0
+        self._misses = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._timeouts = 0
+        self._expired = 0
+        self._health_failures = 0
+
+    @staticmethod
+    def _default_connect(db_path: str) -> sqlite3.Connection:
+        # Pooled connections are shared between request threads, one at a time.
+        return sqlite3.connect(db_path, check_same_thread=False)
+
+    def acquire(self) -> sqlite3.Connection:
+        """Checks a connection out of the pool, opening a new one if needed.
+
+        Returns:
+            sqlite3.Connection: A healthy connection owned by the caller until released.
+
+        Raises:
+            RuntimeError: If the pool is closed or no connection frees up within the timeout.
+            sqlite3.Error: If a new connection cannot be opened.
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            conn, is_new = self._checkout(deadline)
+            if is_new:
+                try:
+                    return self._connect(self.db_path)
+                except BaseException:
+                    self._discard()
+                    raise
+
+            if not self.health_check or self._is_healthy(conn):
+                return conn
+
+            logger.warning("Discarding unhealthy pooled connection to %s", self.db_path)
+            self._close_quietly(conn)
+            with self._cond:
+                self._health_failures += 1
+            self._discard()
+
+    def _checkout(self, deadline: float) -> Tuple[Optional[sqlite3.Connection], bool]:
+        """Reserves an idle connection or a slot for a new one, waiting if necessary."""
+        waited = False
+        wait_start = 0.0
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed.")
+
+                self._prune_idle()
+                if self._idle:
+                    conn, _ = self._idle.pop()
+                    self._hits += 1
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    self._misses += 1
+                    conn = None
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    if waited:
+                        self._wait_time += time.monotonic() - wait_start
+                    logger.error("Timed out waiting for a database connection after %.1fs", self.timeout)
+                    raise RuntimeError("Timed out waiting for a database connection.")
+                if not waited:
+                    waited = True
+                    wait_start = time.monotonic()
+                    self._waits += 1
+                self._cond.wait(remaining)
+
+            if waited:
+                self._wait_time += time.monotonic() - wait_start
+        return conn, conn is None
+
+    def _prune_idle(self) -> None:
+        """Closes idle connections that have exceeded max_idle. Caller holds the lock."""
+        if self.max_idle is None or not self._idle:
+            return
+        cutoff = time.monotonic() - self.max_idle
+        # The deque is ordered oldest-first, so stale connections sit on the left.
+        while self._idle and self._idle[0][1] < cutoff:
+            conn, _ = self._idle.popleft()
+            self._size -= 1
+            self._expired += 1
+            self._close_quietly(conn)
+
+    @staticmethod
+    def _is_healthy(conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn: sqlite3.Connection) -> None:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _discard(self) -> None:
+        """Gives back the slot of a connection that was closed instead of released."""
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Returns a connection to the pool.
+
+        Any transaction left open by the caller is rolled back so the next user starts clean.
+
+        Args:
+            conn (sqlite3.Connection): A connection previously returned by acquire().
+        """
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error as e:
+            logger.warning("Discarding pooled connection that failed to roll back: %s", e)
+            self._close_quietly(conn)
+            self._discard()
+            return
+
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                self._close_quietly(conn)
+                return
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Context manager that checks out a connection and always releases it.
+
+        Yields:
+            sqlite3.Connection: A pooled connection.
+        """
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def warm(self, count: int) -> int:
+        """Opens connections up front so the first requests do not pay for connect and pragmas.
+
+        Args:
+            count (int): How many idle connections the pool should hold, capped at max_size.
+
+        Returns:
+            int: The number of idle connections after warming.
+        """
+        with self._cond:
+            # Checking out idle connections first, then opening the rest, never waits on callers.
+            count = min(count, self.max_size - (self._size - len(self._idle)))
+        held = []
+        try:
+            for _ in range(max(count, 0)):
+                held.append(self.acquire())
+        finally:
+            for conn in held:
+                self.release(conn)
+        with self._cond:
+            return len(self._idle)
+
+    def close(self) -> None:
+        """Closes every idle connection and refuses further checkouts.
+
+        Connections still in use are closed as soon as they are released.
+        """
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._size -= 1
+                self._close_quietly(conn)
+            self._cond.notify_all()
+        logger.info("Connection pool for %s closed.", self.db_path)
+
+    def stats(self) -> dict[str, Any]:
+        """Returns a snapshot of the pool counters.
+
+        Returns:
+            dict[str, Any]: Pool size, idle/in-use counts and hit/miss/wait metrics.
+        """
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                'db_path': self.db_path,
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': idle,
+                'in_use': self._size - idle,
+                'hits': self._hits,
+                'misses': self._misses,
+                'waits': self._waits,
+                'wait_time_seconds': round(self._wait_time, 6),
+                'timeouts': self._timeouts,
+                'expired': self._expired,
+                'health_failures': self._health_failures,
+                'closed': self._closed,
+            }
@@ -1,26 +1,179 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import random
 import sys
+import threading
+from typing import Dict, Optional
 
-from flask import current_app, has_request_context
 
+# The package logger: module loggers (meal_max.*) propagate to its single handler.
+ROOT_LOGGER_NAME = "meal_max"
 
-def configure_logger(logger):
-    logger.setLevel(logging.DEBUG)  # Set the desired logging level here
+# Default level, plus per-logger overrides such as "meal_max.utils.db_pool=DEBUG,app=WARNING"
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+# 'text' or 'json' (one JSON object per line)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+# Hand records to a background thread so callers never wait on stderr
+LOG_ASYNC = os.getenv("LOG_ASYNC", "false").lower() == "true"
+# Fraction of hot-path records (logged with extra=HOT_PATH) that are kept
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
 
-    # Create a console handler that logs to stderr
-    handler = logging.StreamHandler(sys.stderr)
-    handler.setLevel(logging.DEBUG)
+# Pass as extra= on per-battle / per-lookup messages so LOG_SAMPLE_RATE applies to them.
+HOT_PATH = {'hot_path': True}
 
-    # Create a formatter with a timestamp
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
-    # Add the formatter to the handler
-    handler.setFormatter(formatter)
+# LogRecord attributes that are not user-supplied extras
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {'message', 'asctime'}
 
-    # Add the handler to the logger
-    logger.addHandler(handler)
+_handler: Optional[logging.Handler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_setup_lock = threading.Lock()
 
-    if has_request_context():
-        app_logger = current_app.logger
-        for handler in app_logger.handlers:
-            logger.addHandler(handler)
\ No newline at end of file
+
+class JsonFormatter(logging.Formatter):
+    """Formats each record as a single-line JSON object, including any extra= fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key != 'hot_path':
+                payload[key] = value
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a random fraction of hot-path records; all other records pass through.
+
+    Attributes:
+        rate (float): The fraction of hot-path records to keep, between 0 and 1.
+    """
+
+    def __init__(self, rate: float):
+        """
+        Raises:
+            ValueError: If rate is outside [0, 1].
+        """
+        super().__init__()
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError(f"Invalid sample rate: {rate}. Must be between 0 and 1.")
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, 'hot_path', False) or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """Parses a LOG_LEVELS string of comma-separated name=LEVEL pairs.
+
+    Raises:
+        ValueError: If an entry is malformed or names an unknown level.
+    """
+    levels: Dict[str, int] = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, sep, level = entry.partition("=")
+        if not sep or not name.strip():
+            raise ValueError(f"Invalid LOG_LEVELS entry: {entry}. Expected name=LEVEL.")
+        levels[name.strip()] = _level(level)
+    return levels
+
+
+def _level(name: str) -> int:
+    level = logging.getLevelName(name.strip().upper())
+    if not isinstance(level, int):
+        raise ValueError(f"Invalid log level: {name}.")
+    return level
+
+
+def level_for(name: str) -> int:
+    """Returns the configured level for a logger: the most specific LOG_LEVELS match, else LOG_LEVEL."""
+    overrides = parse_levels(LOG_LEVELS)
+    parts = name.split(".")
+    for i in range(len(parts), 0, -1):
+        prefix = ".".join(parts[:i])
+        if prefix in overrides:
+            return overrides[prefix]
+    return _level(LOG_LEVEL)
+
+
+def _build_handler() -> logging.Handler:
+    """Builds the shared stderr handler, behind a QueueHandler when LOG_ASYNC is set."""
+    global _listener
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+    # Sampling runs on the caller's side, so dropped records never reach the queue.
+    sampling = SamplingFilter(LOG_SAMPLE_RATE)
+    if not LOG_ASYNC:
+        stream.addFilter(sampling)
+        return stream
+
+    handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    handler.addFilter(sampling)
+    _listener = logging.handlers.QueueListener(handler.queue, stream, respect_handler_level=True)
+    _listener.start()
+    return handler
+
+
+def get_handler() -> logging.Handler:
+    """Returns the process-wide log handler, creating it on first use."""
+    global _handler
+    if _handler is None:
+        with _setup_lock:
+            if _handler is None:
+                _handler = _build_handler()
+    return _handler
+
+
+def stop_listener() -> None:
+    """Flushes queued records and stops the background logging thread, if there is one."""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+def _restart_listener_in_child() -> None:
+    # The listener thread does not survive fork; without a new one the child's queue never drains.
+    # The child also starts from an empty queue, since records queued before fork are the parent's.
+    global _listener
+    if _listener is not None:
+        _handler.queue = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(_handler.queue, *_listener.handlers,
+                                                   respect_handler_level=True)
+        _listener.start()
+
+
+atexit.register(stop_listener)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listener_in_child)
+
+
+def configure_logger(logger: logging.Logger) -> None:
+    """Sets a logger's level from LOG_LEVEL / LOG_LEVELS and routes it to the shared handler.
+
+    Safe to call any number of times: the handler is attached once, to the meal_max package
+    logger for module loggers and to the logger itself for anything outside the package.
+
+    Args:
+        logger (logging.Logger): The logger to configure.
+    """
+    logger.setLevel(level_for(logger.name))
+    handler = get_handler()
+    in_package = logger.name == ROOT_LOGGER_NAME or logger.name.startswith(ROOT_LOGGER_NAME + ".")
+    target = logging.getLogger(ROOT_LOGGER_NAME) if in_package else logger
+    if handler not in target.handlers:
+        target.addHandler(handler)
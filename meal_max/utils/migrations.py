@@ -0,0 +1,141 @@
+import logging
+import os
+import re
+import sqlite3
+from typing import List, Optional, Tuple
+
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Versioned schema scripts named NNNN_description.sql, applied in order.
+MIGRATIONS_PATH = os.getenv(
+    "SQL_MIGRATIONS_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "sql", "migrations"),
+)
+
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d+)_([\w-]+)\.sql$")
+
+
+def list_migrations(path: Optional[str] = None) -> List[Tuple[int, str, str]]:
+    """Lists the migration scripts in path.
+
+    Args:
+        path (str, optional): The migrations directory. Defaults to MIGRATIONS_PATH.
+
+    Returns:
+        List[Tuple[int, str, str]]: (version, name, file path) sorted by version.
+
+    Raises:
+        ValueError: If two scripts share a version number.
+    """
+    path = path or MIGRATIONS_PATH
+    migrations = []
+    for filename in os.listdir(path):
+        match = MIGRATION_FILE_PATTERN.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(path, filename)))
+    migrations.sort()
+
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicate migration versions in {path}")
+    return migrations
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Returns the schema version recorded in the database (PRAGMA user_version)."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def split_statements(script: str) -> List[str]:
+    """Splits a SQL script into complete statements, keeping trigger bodies intact."""
+    statements = []
+    buffer = ""
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            if buffer.strip():
+                statements.append(buffer.strip())
+            buffer = ""
+    leftover = "\n".join(line for line in buffer.splitlines() if not line.strip().startswith("--")).strip()
+    if leftover:
+        raise ValueError("Migration script ends with an incomplete statement: %s" % leftover[:80])
+    return statements
+
+
+def migrate(conn: sqlite3.Connection, target: Optional[int] = None, path: Optional[str] = None) -> int:
+    """Applies every pending migration up to target, each in its own transaction.
+
+    Each migration takes the write lock with BEGIN IMMEDIATE and re-reads the schema version
+    inside the transaction, so several processes can safely migrate the same database at startup.
+
+    Args:
+        conn (sqlite3.Connection): The database to migrate.
+        target (int, optional): The version to stop at. Defaults to the latest migration.
+        path (str, optional): The migrations directory. Defaults to MIGRATIONS_PATH.
+
+    Returns:
+        int: The schema version after migrating.
+
+    Raises:
+        sqlite3.Error: If a migration fails; that migration is rolled back.
+    """
+    migrations = list_migrations(path)
+    if target is None:
+        target = migrations[-1][0] if migrations else 0
+
+    saved_isolation_level = conn.isolation_level
+    if conn.in_transaction:
+        conn.commit()
+    conn.isolation_level = None  # manage transactions explicitly
+    try:
+        for version, name, filename in migrations:
+            if version > target:
+                break
+            with open(filename) as fh:
+                statements = split_statements(fh.read())
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if get_schema_version(conn) >= version:
+                    conn.execute("COMMIT")
+                    continue
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {int(version)}")
+                conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                conn.execute("ROLLBACK")
+                logger.error("Migration %04d_%s failed: %s", version, name, e)
+                raise e
+            logger.info("Applied migration %04d_%s", version, name)
+
+        return get_schema_version(conn)
+    finally:
+        conn.isolation_level = saved_isolation_level
+
+
+def reset_database(conn: sqlite3.Connection) -> None:
+    """Drops every table (with its indexes and triggers) and resets the schema version to 0.
+
+    Args:
+        conn (sqlite3.Connection): The database to wipe.
+
+    Raises:
+        sqlite3.Error: If a database error occurs.
+    """
+    if conn.in_transaction:
+        conn.commit()
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+    for table in tables:
+        conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+    if any(row[0] == 'sqlite_sequence' for row in conn.execute("SELECT name FROM sqlite_master")):
+        conn.execute("DELETE FROM sqlite_sequence")
+    conn.execute("PRAGMA user_version = 0")
+    conn.commit()
+    logger.info("Dropped %d tables.", len(tables))
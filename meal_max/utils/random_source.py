@@ -0,0 +1,500 @@
+import asyncio
+from collections import deque
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Deque, List, Optional
+
+import aiohttp
+
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.metrics import RANDOM_FETCH_DURATION
+from meal_max.utils.random_utils import get_random_batch, get_random_batch_async
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# random.org's hard limit on numbers per request
+MAX_BATCH_SIZE = 10000
+# Every source draws k / RANDOM_GRID_SIZE for a uniform integer k in [0, RANDOM_GRID_SIZE):
+# random.org's two-decimal fractions, which LocalRandomSource reproduces
+RANDOM_GRID_SIZE = 100
+
+
+class RandomSource:
+    """Base class for providers of random decimal fractions in [0, 1).
+
+    Subclasses implement get_randoms(); get_random() draws a single number from it.
+    """
+
+    name = "base"
+
+    def get_random(self) -> float:
+        """Draws a single random number.
+
+        Returns:
+            float: A random decimal number between 0 and 1 with two decimal places.
+        """
+        return self.get_randoms(1)[0]
+
+    def get_randoms(self, count: int) -> List[float]:
+        """Draws count random numbers.
+
+        Args:
+            count (int): How many numbers to draw.
+
+        Returns:
+            List[float]: Random decimal numbers between 0 and 1 with two decimal places.
+        """
+        raise NotImplementedError
+
+    async def get_random_async(self) -> float:
+        """Draws a single random number without blocking the event loop.
+
+        Returns:
+            float: A random decimal number between 0 and 1 with two decimal places.
+        """
+        return (await self.get_randoms_async(1))[0]
+
+    async def get_randoms_async(self, count: int) -> List[float]:
+        """Draws count random numbers without blocking the event loop.
+
+        The default runs get_randoms() in a worker thread; subclasses that can answer
+        without blocking override it.
+
+        Args:
+            count (int): How many numbers to draw.
+
+        Returns:
+            List[float]: Random decimal numbers between 0 and 1 with two decimal places.
+        """
+        return await asyncio.to_thread(self.get_randoms, count)
+
+    def stats(self) -> dict[str, Any]:
+        """Returns the metrics collected by this source.
+
+        Returns:
+            dict[str, Any]: Source-specific counters.
+        """
+        return {'source': self.name}
+
+    def close(self) -> None:
+        """Releases any resources (threads, sessions) held by the source."""
+
+    async def release_loop(self) -> None:
+        """Releases resources tied to the running event loop, leaving the source usable.
+
+        Call it before a short-lived event loop (e.g. one asyncio.run() per request) ends.
+        """
+
+    async def aclose(self) -> None:
+        """Releases resources tied to the running event loop, then calls close()."""
+        await self.release_loop()
+        self.close()
+
+
+class LocalRandomSource(RandomSource):
+    """Draws numbers from a local PRNG, optionally seeded for reproducible runs.
+
+    Numbers are drawn from the same two-decimal grid (0.00 to 0.99) that random.org returns,
+    so battle outcomes have the same distribution with either source.
+    """
+
+    name = "local"
+
+    def __init__(self, seed: Optional[int] = None):
+        """Initializes the PRNG.
+
+        Args:
+            seed (int, optional): Seed for reproducible sequences. Defaults to OS entropy.
+        """
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._draws = 0
+
+    def get_randoms(self, count: int) -> List[float]:
+        with self._lock:
+            self._draws += count
+            return [self._rng.randrange(RANDOM_GRID_SIZE) / RANDOM_GRID_SIZE for _ in range(count)]
+
+    async def get_randoms_async(self, count: int) -> List[float]:
+        # Drawing from the PRNG never blocks, so a thread hop would only add latency.
+        return self.get_randoms(count)
+
+    def stats(self) -> dict[str, Any]:
+        return {'source': self.name, 'seed': self.seed, 'draws': self._draws}
+
+
+class RemoteRandomSource(RandomSource):
+    """Draws numbers from random.org, one HTTP request per call.
+
+    The async path shares one aiohttp session per event loop, so concurrent battles reuse
+    its keep-alive connections instead of opening one per request.
+    """
+
+    name = "remote"
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._failures = 0
+        self._draws = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self._latency_last = 0.0
+
+    def get_randoms(self, count: int) -> List[float]:
+        """Fetches count numbers from random.org, splitting into requests of at most 10,000.
+
+        Raises:
+            RuntimeError: If a request fails or times out.
+            ValueError: If random.org returns an invalid response.
+        """
+        numbers: List[float] = []
+        while len(numbers) < count:
+            num = min(count - len(numbers), MAX_BATCH_SIZE)
+            start = time.perf_counter()
+            try:
+                numbers.extend(get_random_batch(num))
+            except (RuntimeError, ValueError):
+                with self._lock:
+                    self._failures += 1
+                raise
+            finally:
+                self._record_latency(time.perf_counter() - start)
+        with self._lock:
+            self._draws += count
+        return numbers
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Returns the session for the running event loop, opening one on first use."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            # A session is bound to the loop that created it; a new loop needs its own.
+            self._session = aiohttp.ClientSession()
+            self._session_loop = loop
+        return self._session
+
+    async def get_randoms_async(self, count: int) -> List[float]:
+        """Fetches count numbers from random.org on the shared session.
+
+        Raises:
+            RuntimeError: If a request fails or times out.
+            ValueError: If random.org returns an invalid response.
+        """
+        session = self._get_session()
+        numbers: List[float] = []
+        while len(numbers) < count:
+            num = min(count - len(numbers), MAX_BATCH_SIZE)
+            start = time.perf_counter()
+            try:
+                numbers.extend(await get_random_batch_async(num, session))
+            except (RuntimeError, ValueError):
+                with self._lock:
+                    self._failures += 1
+                raise
+            finally:
+                self._record_latency(time.perf_counter() - start)
+        with self._lock:
+            self._draws += count
+        return numbers
+
+    async def release_loop(self) -> None:
+        session = self._session
+        if session is not None and self._session_loop is asyncio.get_running_loop():
+            self._session = None
+            self._session_loop = None
+            if not session.closed:
+                await session.close()
+
+    def _record_latency(self, elapsed: float) -> None:
+        RANDOM_FETCH_DURATION.observe(elapsed, source=self.name)
+        with self._lock:
+            self._requests += 1
+            self._latency_total += elapsed
+            self._latency_last = elapsed
+            self._latency_max = max(self._latency_max, elapsed)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                'source': self.name,
+                'requests': self._requests,
+                'failures': self._failures,
+                'draws': self._draws,
+                'latency_last_seconds': round(self._latency_last, 6),
+                'latency_mean_seconds': round(self._latency_total / self._requests, 6) if self._requests else 0.0,
+                'latency_max_seconds': round(self._latency_max, 6),
+            }
+
+
+class PrefetchingRandomSource(RandomSource):
+    """Serves numbers from an in-memory buffer that a background thread keeps topped up.
+
+    The refill thread pulls batch_size numbers from the backend whenever the buffer drops to
+    low_water. If a caller finds the buffer short and the backend does not deliver within
+    fallback_after seconds (or a refill fails), the shortfall is drawn from the fallback source
+    instead of blocking the battle.
+
+    Attributes:
+        backend (RandomSource): The slow source that refills the buffer (usually random.org).
+        fallback (RandomSource): The source used when the buffer runs dry, or None to wait.
+        batch_size (int): How many numbers each refill requests.
+        low_water (int): Buffer size at or below which a refill is started.
+        fallback_after (float): Seconds to wait on an empty buffer before falling back.
+    """
+
+    name = "prefetch"
+
+    def __init__(self, backend: RandomSource, batch_size: int = 100, low_water: int = 20,
+                 fallback: Optional[RandomSource] = None, fallback_after: float = 0.25,
+                 max_backoff: float = 30.0):
+        """Initializes the buffer. The refill thread is started on first use.
+
+        Raises:
+            ValueError: If batch_size or low_water are out of range.
+        """
+        if not 1 <= batch_size <= MAX_BATCH_SIZE:
+            raise ValueError(f"Invalid batch size: {batch_size}. Must be between 1 and {MAX_BATCH_SIZE}.")
+        if not 0 <= low_water < batch_size:
+            raise ValueError(f"Invalid low-water mark: {low_water}. Must be between 0 and batch size.")
+
+        self.backend = backend
+        self.fallback = fallback
+        self.batch_size = batch_size
+        self.low_water = low_water
+        self.fallback_after = fallback_after
+        self.max_backoff = max_backoff
+
+        self._buffer: Deque[float] = deque()
+        self._cond = threading.Condition(threading.Lock())
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._wanted = 0
+        self._failure_generation = 0
+
+        self._draws = 0
+        self._fallback_draws = 0
+        self._waits = 0
+        self._refills = 0
+        self._refill_failures = 0
+        self._refill_latency_total = 0.0
+        self._refill_latency_max = 0.0
+        self._refill_latency_last = 0.0
+
+    def _ensure_thread(self) -> None:
+        """Starts the refill thread if it is not running. Caller holds the lock."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._refill_loop, name="random-prefetch", daemon=True)
+            self._thread.start()
+
+    def _needs_refill(self) -> bool:
+        return len(self._buffer) <= self.low_water or len(self._buffer) < self._wanted
+
+    def _refill_loop(self) -> None:
+        backoff = 0.5
+        while True:
+            with self._cond:
+                while not self._closed and not self._needs_refill():
+                    self._cond.wait()
+                if self._closed:
+                    return
+                num = min(MAX_BATCH_SIZE, max(self.batch_size, self._wanted - len(self._buffer)))
+
+            start = time.perf_counter()
+            try:
+                numbers = self.backend.get_randoms(num)
+            except Exception as e:
+                elapsed = time.perf_counter() - start
+                logger.warning("Random prefetch from %s failed after %.3fs: %s", self.backend.name, elapsed, e)
+                with self._cond:
+                    self._refill_failures += 1
+                    self._failure_generation += 1
+                    self._cond.notify_all()
+                    # Back off, but wake early if the source is closed.
+                    self._cond.wait_for(lambda: self._closed, timeout=backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+
+            elapsed = time.perf_counter() - start
+            backoff = 0.5
+            with self._cond:
+                self._buffer.extend(numbers)
+                self._refills += 1
+                self._refill_latency_total += elapsed
+                self._refill_latency_last = elapsed
+                self._refill_latency_max = max(self._refill_latency_max, elapsed)
+                self._cond.notify_all()
+
+    def get_randoms(self, count: int) -> List[float]:
+        """Draws count numbers from the buffer, falling back if the backend is too slow.
+
+        Raises:
+            RuntimeError: If the source is closed, or if there is no fallback and the
+                backend cannot deliver within fallback_after seconds.
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Random source is closed.")
+            self._ensure_thread()
+
+            if len(self._buffer) < count:
+                self._waits += 1
+                self._wanted = count
+                generation = self._failure_generation
+                self._cond.notify_all()
+                self._cond.wait_for(
+                    lambda: len(self._buffer) >= count or self._failure_generation != generation or self._closed,
+                    timeout=self.fallback_after)
+                self._wanted = 0
+
+            taken = min(count, len(self._buffer))
+            numbers = [self._buffer.popleft() for _ in range(taken)]
+            self._draws += count
+            if self._needs_refill():
+                self._cond.notify_all()
+
+            shortfall = count - taken
+            if shortfall:
+                if self.fallback is None:
+                    self._buffer.extendleft(reversed(numbers))
+                    self._draws -= count
+                    raise RuntimeError("Timed out waiting for random numbers from %s." % self.backend.name)
+                self._fallback_draws += shortfall
+
+        if shortfall:
+            logger.warning("Random buffer empty, drawing %d number(s) from %s", shortfall, self.fallback.name)
+            numbers.extend(self.fallback.get_randoms(shortfall))
+        return numbers
+
+    async def get_randoms_async(self, count: int) -> List[float]:
+        """Draws from the buffer in place when it holds enough, otherwise waits in a worker thread.
+
+        Raises:
+            RuntimeError: As for get_randoms().
+        """
+        with self._cond:
+            if not self._closed and len(self._buffer) >= count:
+                numbers = [self._buffer.popleft() for _ in range(count)]
+                self._draws += count
+                self._ensure_thread()
+                if self._needs_refill():
+                    self._cond.notify_all()
+                return numbers
+        return await asyncio.to_thread(self.get_randoms, count)
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                'source': self.name,
+                'backend': self.backend.stats(),
+                'fallback': self.fallback.stats() if self.fallback is not None else None,
+                'buffered': len(self._buffer),
+                'draws': self._draws,
+                'fallback_draws': self._fallback_draws,
+                'waits': self._waits,
+                'refills': self._refills,
+                'refill_failures': self._refill_failures,
+                'refill_latency_last_seconds': round(self._refill_latency_last, 6),
+                'refill_latency_mean_seconds':
+                    round(self._refill_latency_total / self._refills, 6) if self._refills else 0.0,
+                'refill_latency_max_seconds': round(self._refill_latency_max, 6),
+            }
+
+    async def release_loop(self) -> None:
+        await self.backend.release_loop()
+        if self.fallback is not None:
+            await self.fallback.release_loop()
+
+    async def aclose(self) -> None:
+        self.close()
+        await self.backend.aclose()
+        if self.fallback is not None:
+            await self.fallback.aclose()
+
+    def close(self) -> None:
+        """Stops the refill thread and discards the buffer."""
+        with self._cond:
+            self._closed = True
+            self._buffer.clear()
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(1)
+
+
+def create_random_source() -> RandomSource:
+    """Builds the random source described by the RANDOM_* environment variables.
+
+    RANDOM_SOURCE selects 'prefetch' (default: buffered random.org with local fallback),
+    'remote' (one random.org request per draw) or 'local' (PRNG only, seeded by RANDOM_SEED).
+
+    Returns:
+        RandomSource: The configured source.
+
+    Raises:
+        ValueError: If RANDOM_SOURCE names an unknown source.
+    """
+    kind = os.getenv("RANDOM_SOURCE", "prefetch").lower()
+    seed = os.getenv("RANDOM_SEED")
+    seed = int(seed) if seed is not None else None
+
+    if kind == "local":
+        return LocalRandomSource(seed)
+    if kind == "remote":
+        return RemoteRandomSource()
+    if kind == "prefetch":
+        return PrefetchingRandomSource(
+            RemoteRandomSource(),
+            batch_size=int(os.getenv("RANDOM_BATCH_SIZE", "100")),
+            low_water=int(os.getenv("RANDOM_LOW_WATER", "20")),
+            fallback=LocalRandomSource(seed),
+            fallback_after=float(os.getenv("RANDOM_FALLBACK_AFTER", "0.25")),
+        )
+    raise ValueError(f"Invalid RANDOM_SOURCE: {kind}. Expected 'prefetch', 'remote' or 'local'.")
+
+
+_source: Optional[RandomSource] = None
+_source_pid: Optional[int] = None
+_source_lock = threading.Lock()
+
+
+def get_random_source() -> RandomSource:
+    """Returns the process-wide random source, creating it on first use.
+
+    A forked child gets its own source, since the parent's refill thread does not survive fork.
+
+    Returns:
+        RandomSource: The shared source.
+    """
+    global _source, _source_pid
+    if _source is not None and _source_pid == os.getpid():
+        return _source
+    with _source_lock:
+        if _source is None or _source_pid != os.getpid():
+            _source = create_random_source()
+            _source_pid = os.getpid()
+            logger.info("Using %s random source", _source.name)
+        return _source
+
+
+def set_random_source(source: Optional[RandomSource]) -> None:
+    """Replaces the process-wide random source, closing the previous one.
+
+    Args:
+        source (RandomSource, optional): The new source, or None to rebuild from the environment.
+    """
+    global _source, _source_pid
+    with _source_lock:
+        previous = _source if _source_pid == os.getpid() else None
+        _source = source
+        _source_pid = os.getpid() if source is not None else None
+    if previous is not None and previous is not source:
+        previous.close()
@@ -1,4 +1,8 @@
+import asyncio
 import logging
+from typing import List
+
+import aiohttp
 import requests
 
 from meal_max.utils.logger import configure_logger
@@ -48,3 +52,92 @@ def get_random() -> float:
     except requests.exceptions.RequestException as e:
         logger.error("Request to random.org failed: %s", e)
         raise RuntimeError("Request to random.org failed: %s" % e)
+
+
+def get_random_batch(num: int) -> List[float]:
+    """Fetches num random decimal numbers from random.org in a single request.
+
+    Args:
+        num (int): How many numbers to fetch (1 to 10,000, the random.org limit).
+
+    Returns:
+        List[float]: Random decimal numbers between 0 and 1 with two decimal places.
+
+    Raises:
+        ValueError: If num is out of range or the response contains an invalid float.
+        RuntimeError: If the request times out or fails for any reason.
+    """
+    if not 1 <= num <= 10000:
+        raise ValueError(f"Invalid batch size: {num}. Must be between 1 and 10000.")
+
+    url = f"https://www.random.org/decimal-fractions/?num={num}&dec=2&col=1&format=plain&rnd=new"
+
+    try:
+        logger.info("Fetching %d random numbers from random.org", num)
+
+        response = requests.get(url, timeout=5)
+        response.raise_for_status()
+
+        return parse_random_batch(response.text, num)
+
+    except requests.exceptions.Timeout:
+        logger.error("Request to random.org timed out.")
+        raise RuntimeError("Request to random.org timed out.")
+
+    except requests.exceptions.RequestException as e:
+        logger.error("Request to random.org failed: %s", e)
+        raise RuntimeError("Request to random.org failed: %s" % e)
+
+
+async def get_random_batch_async(num: int, session: aiohttp.ClientSession) -> List[float]:
+    """Fetches num random decimal numbers from random.org without blocking the event loop.
+
+    Args:
+        num (int): How many numbers to fetch (1 to 10,000, the random.org limit).
+        session (aiohttp.ClientSession): The shared session whose connections are reused.
+
+    Returns:
+        List[float]: Random decimal numbers between 0 and 1 with two decimal places.
+
+    Raises:
+        ValueError: If num is out of range or the response contains an invalid float.
+        RuntimeError: If the request times out or fails for any reason.
+    """
+    if not 1 <= num <= 10000:
+        raise ValueError(f"Invalid batch size: {num}. Must be between 1 and 10000.")
+
+    url = f"https://www.random.org/decimal-fractions/?num={num}&dec=2&col=1&format=plain&rnd=new"
+
+    try:
+        logger.info("Fetching %d random numbers from random.org", num)
+
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as response:
+            response.raise_for_status()
+            text = await response.text()
+
+        return parse_random_batch(text, num)
+
+    except asyncio.TimeoutError:
+        logger.error("Request to random.org timed out.")
+        raise RuntimeError("Request to random.org timed out.")
+
+    except aiohttp.ClientError as e:
+        logger.error("Request to random.org failed: %s", e)
+        raise RuntimeError("Request to random.org failed: %s" % e)
+
+
+def parse_random_batch(text: str, num: int) -> List[float]:
+    """Parses a plain-text random.org response of one number per line.
+
+    Raises:
+        ValueError: If a line is not a float or the response does not hold num numbers.
+    """
+    try:
+        numbers = [float(line) for line in text.split()]
+    except ValueError:
+        raise ValueError("Invalid response from random.org: %s" % text[:100])
+
+    if len(numbers) != num:
+        raise ValueError("Expected %d numbers from random.org, received %d" % (num, len(numbers)))
+
+    return numbers
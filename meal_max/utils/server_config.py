@@ -0,0 +1,164 @@
+from dataclasses import dataclass
+import logging
+import os
+from typing import Any
+
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+SERVER_MODES = ['development', 'production']
+
+
+@dataclass
+class ServerConfig:
+    """
+    How the HTTP service is served: the Flask dev server, or gunicorn's pre-fork worker model.
+
+    In production mode each worker process runs `threads` request threads (gunicorn's gthread
+    worker when threads > 1), so a worker can serve `threads` requests at once and the service
+    as a whole `workers * threads`.
+
+    Attributes:
+        mode (str): 'development' (Flask dev server with reloader) or 'production' (gunicorn).
+        bind (str): The host:port to listen on.
+        workers (int): The number of worker processes.
+        threads (int): The number of request threads per worker.
+        timeout (int): Seconds a silent worker may take before it is killed and restarted.
+        graceful_timeout (int): Seconds workers get to finish in-flight requests on reload/stop.
+        keepalive (int): Seconds to hold an idle keep-alive connection open.
+        max_requests (int): Requests after which a worker is recycled (0 disables recycling).
+        max_requests_jitter (int): Random extra requests added to max_requests per worker.
+        preload_app (bool): Whether to import the app in the master before forking.
+    """
+    mode: str = 'development'
+    bind: str = '0.0.0.0:5000'
+    workers: int = 2
+    threads: int = 4
+    timeout: int = 30
+    graceful_timeout: int = 30
+    keepalive: int = 5
+    max_requests: int = 0
+    max_requests_jitter: int = 0
+    preload_app: bool = False
+
+    def __post_init__(self):
+        """
+        Normalizes and validates the settings.
+
+        Raises:
+            ValueError: If any setting is out of range.
+        """
+        self.mode = self.mode.lower()
+        if self.mode not in SERVER_MODES:
+            raise ValueError(f"Invalid server mode: {self.mode}. Must be one of {SERVER_MODES}.")
+        if self.workers < 1:
+            raise ValueError(f"Invalid worker count: {self.workers}. Must be at least 1.")
+        if self.threads < 1:
+            raise ValueError(f"Invalid thread count: {self.threads}. Must be at least 1.")
+        if self.timeout < 0 or self.graceful_timeout < 0:
+            raise ValueError("Worker timeouts must be non-negative.")
+        if self.max_requests < 0 or self.max_requests_jitter < 0:
+            raise ValueError("max_requests and max_requests_jitter must be non-negative.")
+
+    @classmethod
+    def from_env(cls) -> "ServerConfig":
+        """
+        Builds a configuration from the SERVER_* and WEB_* environment variables.
+
+        WEB_CONCURRENCY is the worker count, as in other gunicorn deployments; PORT overrides
+        the port of the default bind address.
+
+        Returns:
+            ServerConfig: The configuration described by the environment.
+        """
+        defaults = cls()
+        bind = os.getenv("SERVER_BIND")
+        if bind is None:
+            bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+        return cls(
+            mode=os.getenv("SERVER_MODE", defaults.mode),
+            bind=bind,
+            workers=int(os.getenv("WEB_CONCURRENCY", defaults.workers)),
+            threads=int(os.getenv("WEB_THREADS", defaults.threads)),
+            timeout=int(os.getenv("WEB_TIMEOUT", defaults.timeout)),
+            graceful_timeout=int(os.getenv("WEB_GRACEFUL_TIMEOUT", defaults.graceful_timeout)),
+            keepalive=int(os.getenv("WEB_KEEPALIVE", defaults.keepalive)),
+            max_requests=int(os.getenv("WEB_MAX_REQUESTS", defaults.max_requests)),
+            max_requests_jitter=int(os.getenv("WEB_MAX_REQUESTS_JITTER", defaults.max_requests_jitter)),
+            preload_app=os.getenv("WEB_PRELOAD", str(defaults.preload_app)).lower() == "true",
+        )
+
+    @property
+    def worker_class(self) -> str:
+        """The gunicorn worker class: 'gthread' for threaded workers, 'sync' otherwise."""
+        return 'gthread' if self.threads > 1 else 'sync'
+
+    def gunicorn_settings(self) -> dict[str, Any]:
+        """
+        Returns the settings as gunicorn configuration variables.
+
+        Returns:
+            dict[str, Any]: Setting names and values for a gunicorn config module.
+        """
+        return {
+            'bind': self.bind,
+            'workers': self.workers,
+            'threads': self.threads,
+            'worker_class': self.worker_class,
+            'timeout': self.timeout,
+            'graceful_timeout': self.graceful_timeout,
+            'keepalive': self.keepalive,
+            'max_requests': self.max_requests,
+            'max_requests_jitter': self.max_requests_jitter,
+            'preload_app': self.preload_app,
+        }
+
+    @property
+    def shares_workers(self) -> bool:
+        """Whether requests are spread over several worker processes, so per-process state is not shared."""
+        return self.mode == 'production' and self.workers > 1
+
+    def default_arena_store(self) -> str:
+        """
+        Returns the ARENA_STORE to use when none is set.
+
+        Consecutive requests of one client (prep-combatant, then battle) may reach different
+        workers, so with several workers the arenas must live in the shared SQLite store.
+
+        Returns:
+            str: 'sqlite' when several workers share requests, 'memory' otherwise.
+        """
+        return 'sqlite' if self.shares_workers else 'memory'
+
+    def check_arena_store(self, arena_store: str) -> None:
+        """
+        Refuses a per-process arena store when several workers share requests.
+
+        Args:
+            arena_store (str): The ARENA_STORE setting.
+
+        Raises:
+            ValueError: If the store is 'memory' and requests are spread over several workers.
+        """
+        if self.shares_workers and arena_store.lower() == 'memory':
+            raise ValueError(f"ARENA_STORE=memory keeps arenas per process, but WEB_CONCURRENCY is {self.workers}: "
+                             "combatants prepped on one worker would be missing on the others. "
+                             "Use ARENA_STORE=sqlite or WEB_CONCURRENCY=1.")
+
+    def check_pool_size(self, pool_size: int) -> None:
+        """
+        Warns if a worker's connection pool is smaller than its thread count.
+
+        Each request thread holds a pooled connection while it works, so a smaller pool makes
+        threads queue on the pool instead of on SQLite.
+
+        Args:
+            pool_size (int): The per-process DB_POOL_SIZE.
+        """
+        if self.mode == 'production' and pool_size < self.threads:
+            logger.warning("DB_POOL_SIZE (%d) is smaller than WEB_THREADS (%d); request threads will "
+                           "wait for connections", pool_size, self.threads)
@@ -1,9 +1,15 @@
+import atexit
 from contextlib import contextmanager
 import logging
 import os
 import sqlite3
+import threading
+from typing import Any, Optional
 
+from meal_max.utils.db_config import DatabaseConfig
+from meal_max.utils.db_pool import ConnectionPool
 from meal_max.utils.logger import configure_logger
+from meal_max.utils import metrics
 
 
 logger = logging.getLogger(__name__)
@@ -20,6 +26,19 @@ DB_PATH = os.getenv("DB_PATH", "test_db.sqlite")
 if not os.path.exists(DB_PATH):
     open(DB_PATH, 'a').close()  # Create an empty file if it doesn't exist
 
+# Journal mode, synchronous level, busy timeout and cache pragmas (DB_JOURNAL_MODE, DB_SYNCHRONOUS, ...)
+DB_CONFIG = DatabaseConfig.from_env()
+
+# Connection pool settings
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", "300"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Connections each server worker opens at startup (see init_pool)
+DB_POOL_WARM = int(os.getenv("DB_POOL_WARM", "1"))
+
+_pool: Optional[ConnectionPool] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
 
 
 def check_database_connection():
@@ -45,22 +64,113 @@ def check_table_exists(tablename: str):
         logger.error(error_message)
         raise Exception(error_message) from e
 
-###################################################
-#
-# This one yields rather than returns.
-# What is the type of the yielded value?
-#
-###################################################
+def connect(db_path: str) -> sqlite3.Connection:
+    """Opens a new connection with DB_CONFIG applied.
+
+    Args:
+        db_path (str): The path of the SQLite database.
+
+    Returns:
+        sqlite3.Connection: The configured connection.
+    """
+    return DB_CONFIG.connect(db_path)
+
+
+def get_pool() -> ConnectionPool:
+    """Returns the process-wide connection pool, creating it on first use.
+
+    The pool is rebuilt if DB_PATH has changed or if the process has forked since the
+    pool was created, so a child process never shares its parent's connections.
+
+    Returns:
+        ConnectionPool: The pool serving DB_PATH.
+    """
+    global _pool, _pool_pid
+    pool = _pool
+    if pool is not None and pool.db_path == DB_PATH and _pool_pid == os.getpid():
+        return pool
+
+    with _pool_lock:
+        if _pool is not None and _pool.db_path == DB_PATH and _pool_pid == os.getpid():
+            return _pool
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.close()
+        _pool = ConnectionPool(DB_PATH, max_size=DB_POOL_SIZE, max_idle=DB_POOL_MAX_IDLE,
+                               timeout=DB_POOL_TIMEOUT, connect=connect)
+        _pool_pid = os.getpid()
+        logger.info("Created connection pool for %s (size=%d)", DB_PATH, DB_POOL_SIZE)
+        return _pool
+
+
+def init_pool(warm: Optional[int] = None) -> ConnectionPool:
+    """Creates this process's connection pool and opens its first connections.
+
+    Called by each server worker right after fork, so connection setup happens before the
+    worker accepts requests rather than on its first requests.
+
+    Args:
+        warm (int, optional): Connections to open. Defaults to DB_POOL_WARM.
+
+    Returns:
+        ConnectionPool: The pool serving DB_PATH.
+    """
+    pool = get_pool()
+    opened = pool.warm(DB_POOL_WARM if warm is None else warm)
+    logger.info("Connection pool for %s ready with %d idle connection(s)", DB_PATH, opened)
+    return pool
+
+
+def close_pool() -> None:
+    """Closes the connection pool. A new pool is created on the next get_db_connection()."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.close()
+        _pool = None
+        _pool_pid = None
+
+
+atexit.register(close_pool)
+
+
+def get_pool_stats() -> dict[str, Any]:
+    """Returns hit/miss/wait metrics for the connection pool.
+
+    Returns:
+        dict[str, Any]: The pool counters, see ConnectionPool.stats().
+    """
+    return get_pool().stats()
+
+
+def _pool_connection_counts() -> dict:
+    stats = get_pool_stats()
+    return {('idle',): stats['idle'], ('in_use',): stats['in_use'], ('max',): stats['max_size']}
+
+
+metrics.gauge("mealmax_db_pool_connections", "Pooled database connections by state.",
+              _pool_connection_counts, ("state",))
+
+
 @contextmanager
 def get_db_connection():
+    """Checks a connection out of the pool for the duration of the with block.
+
+    Yields:
+        sqlite3.Connection: A pooled connection. It is returned to the pool, with any
+        uncommitted transaction rolled back, when the block exits.
+
+    Raises:
+        sqlite3.Error: If a database error occurs.
+    """
+    pool = get_pool()
     conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = pool.acquire()
         yield conn
     except sqlite3.Error as e:
         logger.error("Database connection error: %s", str(e))
         raise e
     finally:
         if conn:
-            conn.close()
-            logger.info("Database connection closed.")
+            pool.release(conn)
+            logger.debug("Database connection returned to pool.")
@@ -3,12 +3,12 @@
 # Check if the database file already exists
 if [ -f "$DB_PATH" ]; then
     echo "Recreating database at $DB_PATH."
-    # Drop and recreate the tables
-    sqlite3 "$DB_PATH" < /app/sql/create_meal_table.sql
+    # Drop the tables and rebuild the schema from the migrations
+    python -m meal_max.cli migrate --reset
     echo "Database recreated successfully."
 else
     echo "Creating database at $DB_PATH."
     # Create the database for the first time
-    sqlite3 "$DB_PATH" < /app/sql/create_meal_table.sql
+    python -m meal_max.cli migrate
     echo "Database created successfully."
-fi
\ No newline at end of file
+fi
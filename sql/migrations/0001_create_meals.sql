@@ -1,5 +1,6 @@
-DROP TABLE IF EXISTS meals;
-CREATE TABLE meals (
+-- IF NOT EXISTS lets this migration adopt databases created by the old
+-- create_meal_table.sql script, which already have the meals table.
+CREATE TABLE IF NOT EXISTS meals (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     meal TEXT NOT NULL UNIQUE,
     cuisine TEXT NOT NULL,
@@ -8,4 +9,4 @@ CREATE TABLE meals (
     battles INTEGER DEFAULT 0,
     wins INTEGER DEFAULT 0,
     deleted BOOLEAN DEFAULT FALSE
-);
\ No newline at end of file
+);
@@ -0,0 +1,48 @@
+-- Materialized leaderboard: one row per non-deleted meal that has battled,
+-- kept in step with meals by the triggers below.
+CREATE TABLE IF NOT EXISTS leaderboard (
+    meal_id INTEGER PRIMARY KEY,
+    meal TEXT NOT NULL,
+    cuisine TEXT NOT NULL,
+    price REAL NOT NULL,
+    difficulty TEXT NOT NULL,
+    battles INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    win_pct REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS leaderboard_by_wins ON leaderboard (wins DESC, meal_id);
+CREATE INDEX IF NOT EXISTS leaderboard_by_win_pct ON leaderboard (win_pct DESC, meal_id);
+
+CREATE TRIGGER IF NOT EXISTS meals_leaderboard_insert AFTER INSERT ON meals
+WHEN NEW.deleted = FALSE AND NEW.battles > 0
+BEGIN
+    INSERT INTO leaderboard (meal_id, meal, cuisine, price, difficulty, battles, wins, win_pct)
+    VALUES (NEW.id, NEW.meal, NEW.cuisine, NEW.price, NEW.difficulty, NEW.battles, NEW.wins,
+            NEW.wins * 1.0 / NEW.battles);
+END;
+
+CREATE TRIGGER IF NOT EXISTS meals_leaderboard_upsert AFTER UPDATE OF battles, wins, deleted ON meals
+WHEN NEW.deleted = FALSE AND NEW.battles > 0
+BEGIN
+    INSERT INTO leaderboard (meal_id, meal, cuisine, price, difficulty, battles, wins, win_pct)
+    VALUES (NEW.id, NEW.meal, NEW.cuisine, NEW.price, NEW.difficulty, NEW.battles, NEW.wins,
+            NEW.wins * 1.0 / NEW.battles)
+    ON CONFLICT (meal_id) DO UPDATE SET
+        battles = excluded.battles, wins = excluded.wins, win_pct = excluded.win_pct;
+END;
+
+CREATE TRIGGER IF NOT EXISTS meals_leaderboard_remove AFTER UPDATE OF battles, wins, deleted ON meals
+WHEN NEW.deleted != FALSE OR NEW.battles <= 0
+BEGIN
+    DELETE FROM leaderboard WHERE meal_id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS meals_leaderboard_delete AFTER DELETE ON meals
+BEGIN
+    DELETE FROM leaderboard WHERE meal_id = OLD.id;
+END;
+
+-- Backfill meals that battled before the leaderboard existed.
+INSERT OR REPLACE INTO leaderboard (meal_id, meal, cuisine, price, difficulty, battles, wins, win_pct)
+SELECT id, meal, cuisine, price, difficulty, battles, wins, wins * 1.0 / battles
+FROM meals WHERE deleted = FALSE AND battles > 0;
@@ -0,0 +1,5 @@
+-- Catalog loads (get_active_meals) read the non-deleted meals in ID order; this
+-- partial covering index serves them without touching deleted rows or the table.
+-- It leaves out battles and wins so that battle stats updates never have to touch it.
+CREATE INDEX IF NOT EXISTS meals_active_catalog
+    ON meals (id, meal, cuisine, price, difficulty, deleted) WHERE deleted = FALSE;
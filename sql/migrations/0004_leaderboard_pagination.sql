@@ -0,0 +1,27 @@
+-- Cuisine-filtered leaderboard pages walk these indexes in rank order, so a page costs
+-- O(page size) whatever the cuisine's share of the catalog.
+CREATE INDEX IF NOT EXISTS leaderboard_by_cuisine_wins ON leaderboard (cuisine, wins DESC, meal_id);
+CREATE INDEX IF NOT EXISTS leaderboard_by_cuisine_win_pct ON leaderboard (cuisine, win_pct DESC, meal_id);
+
+-- A counter bumped by every leaderboard change; the API serves it as the ETag, so an
+-- unchanged leaderboard is answered with 304 Not Modified without being queried.
+CREATE TABLE IF NOT EXISTS leaderboard_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO leaderboard_version (id, version) VALUES (1, 0);
+
+CREATE TRIGGER IF NOT EXISTS leaderboard_version_insert AFTER INSERT ON leaderboard
+BEGIN
+    UPDATE leaderboard_version SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS leaderboard_version_update AFTER UPDATE ON leaderboard
+BEGIN
+    UPDATE leaderboard_version SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS leaderboard_version_delete AFTER DELETE ON leaderboard
+BEGIN
+    UPDATE leaderboard_version SET version = version + 1 WHERE id = 1;
+END;
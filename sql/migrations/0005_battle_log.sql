@@ -0,0 +1,38 @@
+-- Append-only log of every stats change: one row per battle, written in the same
+-- transaction as the meals counters it explains. Rows from update_meal_stats are
+-- one-sided (no combatant_2 or scores), and scores and the random draw are NULL when
+-- the caller did not supply them.
+CREATE TABLE IF NOT EXISTS battles (
+    id INTEGER PRIMARY KEY,
+    fought_at REAL NOT NULL,
+    combatant_1 INTEGER NOT NULL,
+    combatant_2 INTEGER,
+    score_1 REAL,
+    score_2 REAL,
+    random_number REAL,
+    winner_id INTEGER
+);
+
+CREATE TRIGGER IF NOT EXISTS battles_append_only BEFORE UPDATE ON battles
+BEGIN
+    SELECT RAISE(ABORT, 'battles is append-only');
+END;
+
+-- Counters a meal already had when it entered the log: battles fought before this
+-- migration, and those imported with the meal (create_meals_bulk). A meal's battles and
+-- wins are its baseline plus what the log records for it.
+CREATE TABLE IF NOT EXISTS battle_stats_baseline (
+    meal_id INTEGER PRIMARY KEY,
+    battles INTEGER NOT NULL,
+    wins INTEGER NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS meals_battle_stats_baseline AFTER INSERT ON meals
+WHEN NEW.battles > 0 OR NEW.wins > 0
+BEGIN
+    INSERT OR REPLACE INTO battle_stats_baseline (meal_id, battles, wins)
+    VALUES (NEW.id, NEW.battles, NEW.wins);
+END;
+
+INSERT OR REPLACE INTO battle_stats_baseline (meal_id, battles, wins)
+SELECT id, battles, wins FROM meals WHERE battles > 0 OR wins > 0;
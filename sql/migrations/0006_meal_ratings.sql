@@ -0,0 +1,38 @@
+-- Elo rating per meal (see meal_max.models.ratings), updated by every two-sided battle
+-- write and mirrored into the leaderboard so it can be ranked by rating. Meals that
+-- battled before this migration start at the default; rebuild_ratings() replays the
+-- battles log to rate them.
+ALTER TABLE meals ADD COLUMN rating REAL NOT NULL DEFAULT 1500.0;
+ALTER TABLE leaderboard ADD COLUMN rating REAL NOT NULL DEFAULT 1500.0;
+
+CREATE INDEX IF NOT EXISTS leaderboard_by_rating ON leaderboard (rating DESC, meal_id);
+CREATE INDEX IF NOT EXISTS leaderboard_by_cuisine_rating ON leaderboard (cuisine, rating DESC, meal_id);
+
+-- The leaderboard triggers now copy the rating, and fire on rating changes.
+DROP TRIGGER IF EXISTS meals_leaderboard_insert;
+DROP TRIGGER IF EXISTS meals_leaderboard_upsert;
+DROP TRIGGER IF EXISTS meals_leaderboard_remove;
+
+CREATE TRIGGER meals_leaderboard_insert AFTER INSERT ON meals
+WHEN NEW.deleted = FALSE AND NEW.battles > 0
+BEGIN
+    INSERT INTO leaderboard (meal_id, meal, cuisine, price, difficulty, battles, wins, win_pct, rating)
+    VALUES (NEW.id, NEW.meal, NEW.cuisine, NEW.price, NEW.difficulty, NEW.battles, NEW.wins,
+            NEW.wins * 1.0 / NEW.battles, NEW.rating);
+END;
+
+CREATE TRIGGER meals_leaderboard_upsert AFTER UPDATE OF battles, wins, rating, deleted ON meals
+WHEN NEW.deleted = FALSE AND NEW.battles > 0
+BEGIN
+    INSERT INTO leaderboard (meal_id, meal, cuisine, price, difficulty, battles, wins, win_pct, rating)
+    VALUES (NEW.id, NEW.meal, NEW.cuisine, NEW.price, NEW.difficulty, NEW.battles, NEW.wins,
+            NEW.wins * 1.0 / NEW.battles, NEW.rating)
+    ON CONFLICT (meal_id) DO UPDATE SET
+        battles = excluded.battles, wins = excluded.wins, win_pct = excluded.win_pct, rating = excluded.rating;
+END;
+
+CREATE TRIGGER meals_leaderboard_remove AFTER UPDATE OF battles, wins, rating, deleted ON meals
+WHEN NEW.deleted != FALSE OR NEW.battles <= 0
+BEGIN
+    DELETE FROM leaderboard WHERE meal_id = NEW.id;
+END;
@@ -0,0 +1,23 @@
+-- A counter bumped whenever the set of active meals or their scoring columns changes.
+-- Battle stats updates leave it alone, so processes can cache per-meal battle scores
+-- (see meal_max.models.odds) and revalidate them with a single-row read.
+CREATE TABLE IF NOT EXISTS catalog_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 0);
+
+CREATE TRIGGER IF NOT EXISTS catalog_version_insert AFTER INSERT ON meals
+BEGIN
+    UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS catalog_version_update AFTER UPDATE OF price, cuisine, difficulty, deleted ON meals
+BEGIN
+    UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS catalog_version_delete AFTER DELETE ON meals
+BEGIN
+    UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+END;
@@ -0,0 +1,29 @@
+-- Battle score per meal, computed once by kitchen_model.battle_score when the meal is
+-- inserted (price, cuisine and difficulty never change afterwards) and indexed so meals
+-- can be ranked and filtered by strength.
+ALTER TABLE meals ADD COLUMN score REAL;
+
+-- Backfill existing meals with the same arithmetic as battle_score: a float64 product of
+-- the price and the cuisine's length in characters, minus the integer difficulty modifier.
+-- tests/test_migrations.py checks the result against battle_score bit for bit.
+UPDATE meals SET score = price * length(cuisine) - CASE difficulty WHEN 'HIGH' THEN 1 WHEN 'MED' THEN 2 WHEN 'LOW' THEN 3 END;
+
+-- From now on only battle_score computes scores; inserts that leave it out are rejected.
+CREATE TRIGGER IF NOT EXISTS meals_score_required BEFORE INSERT ON meals
+WHEN NEW.score IS NULL
+BEGIN
+    SELECT RAISE(ABORT, 'meals.score is required: compute it with kitchen_model.battle_score');
+END;
+
+CREATE INDEX IF NOT EXISTS meals_by_score ON meals (score DESC, id) WHERE deleted = FALSE;
+CREATE INDEX IF NOT EXISTS meals_by_cuisine_score ON meals (cuisine, score DESC, id) WHERE deleted = FALSE;
+
+-- Score caches revalidate against the catalog version, so rescoring a meal must bump it.
+DROP TRIGGER IF EXISTS catalog_version_update;
+
+CREATE TRIGGER catalog_version_update AFTER UPDATE OF price, cuisine, difficulty, deleted, score ON meals
+BEGIN
+    UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+END;
+
+UPDATE catalog_version SET version = version + 1 WHERE id = 1;
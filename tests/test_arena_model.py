@@ -0,0 +1,194 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from meal_max.models.arena_model import DEFAULT_ARENA_ID, MemoryArenaStore, SqliteArenaStore
+from meal_max.models.kitchen_model import Meal
+from meal_max.utils.random_source import LocalRandomSource
+
+class ArenaStoreTests:
+    """Behaviour shared by every arena store; mixed into a TestCase per store."""
+
+    def make_store(self, **kwargs):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.store = self.make_store()
+        self.combatant_1 = Meal(id=1, meal="Spaghetti", cuisine="Italian", price=12.5, difficulty="MED")
+        self.combatant_2 = Meal(id=2, meal="Sushi", cuisine="Japanese", price=15.0, difficulty="HIGH")
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_arenas_are_isolated(self):
+        """Test that each arena keeps its own combatant list."""
+        arena_1 = self.store.create()
+        arena_2 = self.store.create()
+        with self.store.session(arena_1) as model:
+            model.prep_combatant(self.combatant_1)
+        with self.store.session(arena_2) as model:
+            self.assertEqual(model.get_combatants(), [])
+        with self.store.session(arena_1) as model:
+            self.assertEqual(model.get_combatants(), [self.combatant_1])
+
+    def test_missing_arena(self):
+        """Test that opening an unknown arena raises a ValueError unless create is set."""
+        with self.assertRaises(ValueError):
+            with self.store.session("missing"):
+                pass
+        with self.store.session(DEFAULT_ARENA_ID, create=True) as model:
+            model.prep_combatant(self.combatant_1)
+        self.assertTrue(self.store.exists(DEFAULT_ARENA_ID))
+
+    def test_delete(self):
+        """Test that a deleted arena can no longer be opened."""
+        arena_id = self.store.create()
+        self.assertTrue(self.store.delete(arena_id))
+        self.assertFalse(self.store.delete(arena_id))
+        self.assertFalse(self.store.exists(arena_id))
+
+    def test_failed_operation_keeps_combatants(self):
+        """Test that the combatants are saved even when the session body raises."""
+        arena_id = self.store.create()
+        with self.store.session(arena_id) as model:
+            model.prep_combatant(self.combatant_1)
+            model.prep_combatant(self.combatant_2)
+        with self.assertRaises(ValueError):
+            with self.store.session(arena_id) as model:
+                model.prep_combatant(self.combatant_1)
+        with self.store.session(arena_id) as model:
+            self.assertEqual(len(model.get_combatants()), 2)
+
+    @patch('meal_max.models.battle_model.record_battle_result')
+    def test_battle_removes_loser(self, mock_record_battle_result):
+        """Test that a battle in an arena saves the surviving combatant."""
+        arena_id = self.store.create()
+        with self.store.session(arena_id) as model:
+            model.prep_combatant(self.combatant_1)
+            model.prep_combatant(self.combatant_2)
+            winner = model.battle()
+        with self.store.session(arena_id) as model:
+            self.assertEqual([meal.meal for meal in model.get_combatants()], [winner])
+        mock_record_battle_result.assert_called_once()
+
+    def test_concurrent_preps_never_overfill(self):
+        """Test that concurrent sessions on one arena are serialized."""
+        arena_id = self.store.create()
+        outcomes = []
+
+        def prep(meal):
+            try:
+                with self.store.session(arena_id) as model:
+                    model.prep_combatant(meal)
+                outcomes.append(True)
+            except ValueError:
+                outcomes.append(False)
+
+        threads = [threading.Thread(target=prep, args=(Meal(id=i, meal=f"Meal {i}", cuisine="Test",
+                                                            price=1.0, difficulty="LOW"),))
+                   for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(outcomes.count(True), 2)
+        with self.store.session(arena_id) as model:
+            self.assertEqual(len(model.get_combatants()), 2)
+
+    def test_idle_arenas_expire(self):
+        """Test that unused arenas are discarded, but the default arena is kept."""
+        store = self.make_store(idle_timeout=10)
+        arena_id = store.create()
+        with store.session(DEFAULT_ARENA_ID, create=True):
+            pass
+        with patch('meal_max.models.arena_model.time.monotonic', return_value=1e12), \
+                patch('meal_max.models.arena_model.time.time', return_value=1e12):
+            self.assertEqual(store.expire_idle(), 1)
+        self.assertFalse(store.exists(arena_id))
+        self.assertTrue(store.exists(DEFAULT_ARENA_ID))
+        store.close()
+
+class test_memory_arena_store(ArenaStoreTests, unittest.TestCase):
+
+    def make_store(self, **kwargs):
+        return MemoryArenaStore(random_source=LocalRandomSource(0), **kwargs)
+
+class test_sqlite_arena_store(ArenaStoreTests, unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        super().setUp()
+
+    def tearDown(self):
+        super().tearDown()
+        self.tmpdir.cleanup()
+
+    def make_store(self, **kwargs):
+        return SqliteArenaStore(os.path.join(self.tmpdir.name, "arenas.sqlite"),
+                                random_source=LocalRandomSource(0), **kwargs)
+
+    def test_arenas_are_shared_between_stores(self):
+        """Test that a second store on the same file (another worker) sees the same arenas."""
+        arena_id = self.store.create()
+        with self.store.session(arena_id) as model:
+            model.prep_combatant(self.combatant_1)
+
+        other = self.make_store()
+        with other.session(arena_id) as model:
+            self.assertEqual(model.get_combatants(), [self.combatant_1])
+        other.close()
+
+    def test_sessions_lock_only_their_arena(self):
+        """Test that a session holds its own arena, but not the database, while it runs."""
+        arena_1 = self.store.create()
+        arena_2 = self.store.create()
+        other = self.make_store()
+        entered = threading.Event()
+
+        def prep_arena_1():
+            with other.session(arena_1) as model:
+                entered.set()
+                model.prep_combatant(self.combatant_2)
+
+        with self.store.session(arena_1) as model:
+            model.prep_combatant(self.combatant_1)
+            # Another worker's session on a different arena goes ahead at once...
+            with other.session(arena_2) as other_model:
+                other_model.prep_combatant(self.combatant_2)
+            # ...while one on the same arena waits for this session to save.
+            thread = threading.Thread(target=prep_arena_1)
+            thread.start()
+            self.assertFalse(entered.wait(0.2))
+        thread.join()
+
+        with self.store.session(arena_1) as model:
+            self.assertEqual(model.get_combatants(), [self.combatant_1, self.combatant_2])
+        other.close()
+
+    def test_lapsed_lock_is_taken_over(self):
+        """Test that an arena held past the lock timeout is handed on, and the late save is dropped."""
+        store = self.make_store(lock_timeout=0.05)
+        arena_id = store.create()
+        stuck = store.session(arena_id)
+        stuck.__enter__().prep_combatant(self.combatant_1)
+
+        with store.session(arena_id) as model:
+            model.prep_combatant(self.combatant_2)
+        with self.assertLogs('meal_max.models.arena_model', level='WARNING'):
+            stuck.__exit__(None, None, None)
+        with store.session(arena_id) as model:
+            self.assertEqual(model.get_combatants(), [self.combatant_2])
+        store.close()
+
+    def test_rejects_meals_database(self):
+        """Test that the arena store refuses to share the meals database file."""
+        with patch('meal_max.models.arena_model.sql_utils.DB_PATH', self.store.db_path):
+            with self.assertRaises(ValueError):
+                self.make_store()
+
+
+if __name__ == '__main__':
+    unittest.main()
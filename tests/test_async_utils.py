@@ -0,0 +1,48 @@
+import asyncio
+import threading
+import unittest
+
+from meal_max.utils.async_utils import get_db_executor, run_db, shutdown_db_executor
+
+class test_async_utils(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncTearDown(self):
+        shutdown_db_executor()
+
+    async def test_run_db_runs_off_the_event_loop(self):
+        """Test that run_db calls the function on an executor thread and returns its result."""
+        def whoami(prefix, suffix=""):
+            return prefix + threading.current_thread().name + suffix
+
+        name = await run_db(whoami, "thread:", suffix="!")
+        self.assertTrue(name.startswith("thread:db"))
+        self.assertTrue(name.endswith("!"))
+
+    async def test_run_db_propagates_errors(self):
+        """Test that exceptions raised by the database call reach the awaiting coroutine."""
+        def fail():
+            raise ValueError("Meal with ID 1 not found")
+
+        with self.assertRaises(ValueError):
+            await run_db(fail)
+
+    async def test_executor_is_bounded(self):
+        """Test that no more than DB_EXECUTOR_WORKERS calls run at once."""
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def work():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            threading.Event().wait(0.01)
+            with lock:
+                running.pop()
+
+        await asyncio.gather(*(run_db(work) for _ in range(30)))
+        self.assertLessEqual(max(peak), get_db_executor()._max_workers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from meal_max.models import battle_log, kitchen_model
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.tournament_model import TournamentModel
+from meal_max.utils import migrations, sql_utils
+from meal_max.utils.random_source import LocalRandomSource
+
+class test_battle_log(unittest.TestCase):
+
+    def setUp(self):
+        """Point the pool at a fresh database with the meals schema and a few meals."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.saved_db_path = sql_utils.DB_PATH
+        sql_utils.close_pool()
+        sql_utils.DB_PATH = os.path.join(self.tmpdir.name, "meals.sqlite")
+        kitchen_model.clear_meal_cache()
+
+        with sql_utils.get_db_connection() as conn:
+            migrations.migrate(conn)
+
+        for name, cuisine, price, difficulty in [("Spaghetti", "Italian", 12.5, "MED"),
+                                                 ("Sushi", "Japanese", 15.0, "HIGH"),
+                                                 ("Tacos", "Mexican", 8.5, "LOW"),
+                                                 ("Curry", "Indian", 9.0, "LOW")]:
+            kitchen_model.create_meal(name, cuisine, price, difficulty)
+
+    def tearDown(self):
+        sql_utils.close_pool()
+        sql_utils.DB_PATH = self.saved_db_path
+        self.tmpdir.cleanup()
+
+    def query(self, sql, params=()):
+        with sql_utils.get_db_connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def log(self):
+        return self.query("SELECT combatant_1, combatant_2, score_1, score_2, random_number, winner_id "
+                          "FROM battles ORDER BY id")
+
+    def test_battle_is_logged(self):
+        """Test that BattleModel.battle logs participants, scores, the draw and the winner."""
+        model = BattleModel(random_source=LocalRandomSource(3))
+        model.prep_combatant(kitchen_model.get_meal_by_id(1))
+        model.prep_combatant(kitchen_model.get_meal_by_id(2))
+        winner = model.battle()
+
+        (first, second, score_1, score_2, random_number, winner_id), = self.log()
+        self.assertEqual((first, second, score_1, score_2), (1, 2, 85.5, 119.0))
+        self.assertEqual(winner_id, 1 if abs(score_1 - score_2) / 100 > random_number else 2)
+        self.assertEqual(kitchen_model.get_meal_by_id(winner_id).meal, winner)
+        self.assertEqual(battle_log.audit_battle_stats(), {'events': 1, 'mismatches': []})
+
+    def test_tournament_log_follows_battle_rule(self):
+        """Test that tournament battles are logged with the deciding slot order recovered."""
+        for tournament_format in ("round_robin", "knockout", "swiss"):
+            TournamentModel(random_source=LocalRandomSource(5)).run(tournament_format=tournament_format)
+        rows = self.log()
+        self.assertEqual(len(rows), 6 + 3 + 2 * 2)
+        for first, second, score_1, score_2, random_number, winner_id in rows:
+            self.assertEqual(winner_id, first if abs(score_1 - score_2) / 100 > random_number else second)
+        self.assertEqual(battle_log.audit_battle_stats()['mismatches'], [])
+
+    def test_update_meal_stats_is_logged(self):
+        """Test that single-meal updates are logged one-sided and replay exactly."""
+        kitchen_model.update_meal_stats(3, 'win')
+        kitchen_model.update_meal_stats(3, 'loss')
+        self.assertEqual(self.log(), [(3, None, None, None, None, 3), (3, None, None, None, None, None)])
+        self.assertEqual(battle_log.audit_battle_stats(), {'events': 2, 'mismatches': []})
+
+    def test_rebuild_restores_counters(self):
+        """Test that counters changed behind the log's back are reported and restored."""
+        kitchen_model.record_battle_results([(1, 2), (1, 3), (4, 1)])
+        with sql_utils.get_db_connection() as conn:
+            conn.execute("UPDATE meals SET battles = 0, wins = 0 WHERE id = 1")
+            conn.execute("UPDATE meals SET battles = 9 WHERE id = 4")
+            conn.commit()
+
+        expected = [{'id': 1, 'battles': 0, 'wins': 0, 'log_battles': 3, 'log_wins': 2},
+                    {'id': 4, 'battles': 9, 'wins': 1, 'log_battles': 1, 'log_wins': 1}]
+        self.assertEqual(battle_log.audit_battle_stats(), {'events': 3, 'mismatches': expected})
+        self.assertEqual(battle_log.rebuild_battle_stats(), {'events': 3, 'mismatches': expected})
+
+        self.assertEqual(battle_log.audit_battle_stats()['mismatches'], [])
+        self.assertEqual(self.query("SELECT meal_id, battles, wins FROM leaderboard ORDER BY meal_id"),
+                         [(1, 3, 2), (2, 1, 0), (3, 1, 0), (4, 1, 1)])
+
+    def test_imported_counters_are_baseline(self):
+        """Test that counters imported with a meal survive a rebuild."""
+        kitchen_model.create_meals_bulk([{'meal': "Ramen", 'cuisine': "Japanese", 'price': 11.0,
+                                          'difficulty': "MED", 'battles': 7, 'wins': 4}])
+        kitchen_model.record_battle_result(5, 1)
+
+        self.assertEqual(battle_log.rebuild_battle_stats()['mismatches'], [])
+        self.assertEqual(self.query("SELECT battles, wins FROM meals WHERE id = 5"), [(8, 5)])
+
+    def test_log_is_append_only(self):
+        """Test that logged battles cannot be rewritten, and clear_meals empties the log."""
+        kitchen_model.record_battle_result(1, 2)
+        with sql_utils.get_db_connection() as conn:
+            with self.assertRaises(sqlite3.DatabaseError):
+                conn.execute("UPDATE battles SET winner_id = 2")
+            conn.rollback()
+
+        kitchen_model.clear_meals()
+        self.assertEqual(self.log(), [])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM battle_stats_baseline"), [(0,)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,9 @@
+import asyncio
 import unittest
-from unittest.mock import patch, MagicMock
-from meal_max.models.kitchen_model import Meal
-from meal_max.models.battle_model import BattleModel
+from unittest.mock import AsyncMock, patch, MagicMock
+from meal_max.models.kitchen_model import BattleRecord, Meal
+from meal_max.models.battle_model import BATTLES_MAX_PAIRINGS, BattleModel, run_battles
+from meal_max.utils.random_source import LocalRandomSource
 from meal_max.utils.random_utils import get_random
 
 class test_battle_model(unittest.TestCase):
@@ -17,9 +19,9 @@ class test_battle_model(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.battle_model.battle()
 
-    @patch('meal_max.models.battle_model.update_meal_stats')
+    @patch('meal_max.models.battle_model.record_battle_result')
     @patch('meal_max.utils.random_utils.get_random', return_value=0.5)
-    def test_battle_with_identical_scores(self, mock_get_random, mock_update_meal_stats):
+    def test_battle_with_identical_scores(self, mock_get_random, mock_record_battle_result):
         """Test battle outcome when both combatants have identical scores."""
         self.battle_model.prep_combatant(self.combatant_1)
         self.battle_model.prep_combatant(self.combatant_2)
@@ -65,6 +67,7 @@ class test_battle_model(unittest.TestCase):
             (0,),  
             (0,)   
         ]
+        mock_cursor.rowcount = 2
 
         self.battle_model.prep_combatant(self.combatant_1)
         self.battle_model.prep_combatant(self.combatant_2)
@@ -75,6 +78,20 @@ class test_battle_model(unittest.TestCase):
 
         self.assertIn(winner, ['Spaghetti', 'Sushi'])
 
+    @patch('meal_max.models.battle_model.record_battle_result')
+    def test_battle_uses_injected_random_source(self, mock_record_battle_result):
+        """Test that battle draws its random number from the injected source."""
+        source = MagicMock()
+        source.get_random.return_value = 0.0
+        battle_model = BattleModel(random_source=source)
+        battle_model.prep_combatant(self.combatant_1)
+        battle_model.prep_combatant(self.combatant_2)
+
+        # Any positive delta beats a draw of 0.0, so combatant 1 wins.
+        self.assertEqual(battle_model.battle(), "Spaghetti")
+        source.get_random.assert_called_once()
+        mock_record_battle_result.assert_called_once_with(1, 2, BattleRecord(1, 2, 1, 85.5, 119.0, 0.0))
+
     def test_get_battle_score(self):
         """Test the calculation of the battle score for a combatant."""
         score = self.battle_model.get_battle_score(self.combatant_1)
@@ -90,6 +107,114 @@ class test_battle_model(unittest.TestCase):
             self.battle_model.get_battle_score(combatant)
 
 
+class test_battle_model_async(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.combatant_1 = Meal(id=1, meal="Spaghetti", cuisine="Italian", price=12.5, difficulty="MED")
+        self.combatant_2 = Meal(id=2, meal="Sushi", cuisine="Japanese", price=15.0, difficulty="HIGH")
+
+    @patch('meal_max.models.battle_model.record_battle_result')
+    async def test_battle_async(self, mock_record_battle_result):
+        """Test that battle_async awaits the random source and records the result."""
+        source = MagicMock()
+        source.get_random_async = AsyncMock(return_value=0.99)
+        battle_model = BattleModel(random_source=source)
+        battle_model.prep_combatant(self.combatant_1)
+        battle_model.prep_combatant(self.combatant_2)
+
+        # No delta beats a draw of 0.99, so combatant 2 wins.
+        self.assertEqual(await battle_model.battle_async(), "Sushi")
+        source.get_random_async.assert_awaited_once()
+        source.get_random.assert_not_called()
+        mock_record_battle_result.assert_called_once_with(2, 1, BattleRecord(1, 2, 2, 85.5, 119.0, 0.99))
+        self.assertEqual([meal.meal for meal in battle_model.get_combatants()], ["Sushi"])
+
+    async def test_battle_async_with_no_combatants(self):
+        """Test that battle_async raises an error when there are no combatants."""
+        with self.assertRaises(ValueError):
+            await BattleModel().battle_async()
+
+    @patch('meal_max.models.battle_model.record_battle_result')
+    async def test_battles_wait_on_randomness_concurrently(self, mock_record_battle_result):
+        """Test that battles on separate models overlap while waiting for random numbers."""
+        in_flight = []
+        release = asyncio.Event()
+
+        async def slow_random():
+            in_flight.append(1)
+            await release.wait()
+            return 0.5
+
+        source = MagicMock()
+        source.get_random_async = slow_random
+        models = []
+        for _ in range(50):
+            model = BattleModel(random_source=source)
+            model.prep_combatant(self.combatant_1)
+            model.prep_combatant(self.combatant_2)
+            models.append(model)
+
+        battles = asyncio.gather(*(model.battle_async() for model in models))
+        while len(in_flight) < 50:
+            await asyncio.sleep(0)
+        release.set()
+        self.assertEqual(len(await battles), 50)
+        self.assertEqual(mock_record_battle_result.call_count, 50)
+
+
+class test_run_battles(unittest.TestCase):
+
+    def setUp(self):
+        self.meals = {
+            1: Meal(id=1, meal="Spaghetti", cuisine="Italian", price=12.5, difficulty="MED"),
+            2: Meal(id=2, meal="Sushi", cuisine="Japanese", price=15.0, difficulty="HIGH"),
+            3: Meal(id=3, meal="Tacos", cuisine="Mexican", price=12.5, difficulty="MED"),
+        }
+
+    @patch('meal_max.models.battle_model.record_battle_result')
+    @patch('meal_max.models.battle_model.get_meal_by_id')
+    def test_run_battles(self, mock_get_meal_by_id, mock_record_battle_result):
+        """Test that every pairing is battled on its own model and recorded, winners in order."""
+        mock_get_meal_by_id.side_effect = self.meals.__getitem__
+        source = MagicMock(wraps=LocalRandomSource(4))
+        source.get_random_async = AsyncMock(return_value=0.99)
+        source.release_loop = AsyncMock()
+
+        # No delta beats a draw of 0.99, so the second slot wins every battle.
+        self.assertEqual(run_battles([(1, 2), (2, 3), (3, 1)], random_source=source), ["Sushi", "Tacos", "Spaghetti"])
+        self.assertEqual(mock_record_battle_result.call_count, 3)
+        self.assertEqual(source.get_random_async.await_count, 3)
+        source.release_loop.assert_awaited_once()
+
+    @patch('meal_max.models.battle_model.record_battle_result')
+    @patch('meal_max.models.battle_model.get_meal_by_id')
+    def test_run_battles_reports_each_failure(self, mock_get_meal_by_id, mock_record_battle_result):
+        """Test that a failed battle is reported in its slot, while the others are still recorded."""
+        mock_get_meal_by_id.side_effect = self.meals.__getitem__
+        error = ValueError("Meal with ID 2 has been deleted")
+
+        def record(winner_id, loser_id, record):
+            if winner_id == 3:
+                raise error
+
+        mock_record_battle_result.side_effect = record
+        source = MagicMock(wraps=LocalRandomSource(4))
+        source.get_random_async = AsyncMock(return_value=0.99)
+        source.release_loop = AsyncMock()
+
+        self.assertEqual(run_battles([(1, 2), (2, 3), (3, 1)], random_source=source), ["Sushi", error, "Spaghetti"])
+        self.assertEqual(mock_record_battle_result.call_count, 3)
+
+    @patch('meal_max.models.battle_model.record_battle_result')
+    @patch('meal_max.models.battle_model.get_meal_by_id')
+    def test_run_battles_invalid(self, mock_get_meal_by_id, mock_record_battle_result):
+        """Test that no battle is played for an empty, oversized or unknown list of pairings."""
+        mock_get_meal_by_id.side_effect = ValueError("Meal with ID 9 not found")
+        for pairings in ([], [(1, 2)] * (BATTLES_MAX_PAIRINGS + 1), [(1, 9)]):
+            with self.assertRaises(ValueError):
+                run_battles(pairings, random_source=LocalRandomSource(4))
+        mock_record_battle_result.assert_not_called()
+
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from meal_max.models import kitchen_model
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.battle_scoring import (battle_deltas, battle_outcomes, battle_scores, columns_from_meals,
+                                            load_score_columns, play_pairings)
+from meal_max.models.kitchen_model import Meal
+from meal_max.utils import migrations, sql_utils
+
+class test_battle_scoring(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a random catalog with awkward prices and cuisine names."""
+        rng = random.Random(3)
+        cuisines = ["Thai", "Italian", "Vietnamese", "Crème", "日本料理", "X"]
+        self.meals = [
+            Meal(id=meal_id, meal=f"Meal {meal_id}", cuisine=rng.choice(cuisines),
+                 price=rng.choice([0.1, 0.3, 9.99, 1e-9, 123456.789, rng.uniform(0, 50)]),
+                 difficulty=rng.choice(["LOW", "MED", "HIGH"]))
+            for meal_id in rng.sample(range(1, 5000), 500)
+        ]
+        self.battle_model = BattleModel()
+        self.rng = rng
+
+    def test_scores_match_scalar_path_exactly(self):
+        """Test that batch scores are bit-identical to get_battle_score."""
+        columns = columns_from_meals(self.meals)
+        scores = dict(zip(columns.ids.tolist(), battle_scores(columns).tolist()))
+
+        for meal in self.meals:
+            self.assertEqual(scores[meal.id].hex(), self.battle_model.get_battle_score(meal).hex())
+
+    def test_outcomes_match_scalar_rule(self):
+        """Test that deltas and winners agree with BattleModel's delta > random rule."""
+        columns = columns_from_meals(self.meals)
+        by_id = {meal.id: meal for meal in self.meals}
+        pairings = [tuple(self.rng.sample(list(by_id), 2)) for _ in range(2000)]
+        # Include ties between a delta and its random number.
+        randoms = [self.rng.random() for _ in range(1990)]
+        for first, second in pairings[1990:]:
+            score_1 = self.battle_model.get_battle_score(by_id[first])
+            score_2 = self.battle_model.get_battle_score(by_id[second])
+            randoms.append(abs(score_1 - score_2) / 100)
+
+        winners, losers = play_pairings(columns, pairings, randoms)
+
+        for (first, second), random_number, winner, loser in zip(pairings, randoms, winners, losers):
+            delta = abs(self.battle_model.get_battle_score(by_id[first])
+                        - self.battle_model.get_battle_score(by_id[second])) / 100
+            expected = (first, second) if delta > random_number else (second, first)
+            self.assertEqual((int(winner), int(loser)), expected)
+
+    def test_deltas_use_positions(self):
+        """Test that deltas index the score array by position."""
+        scores = np.array([10.0, 250.0, 40.0])
+        deltas = battle_deltas(scores, np.array([0, 2]), np.array([1, 0]))
+        np.testing.assert_array_equal(deltas, [2.4, 0.3])
+
+    def test_outcomes_reject_wrong_random_count(self):
+        """Test that a random number is required for every pairing."""
+        with self.assertRaises(ValueError):
+            battle_outcomes(np.array([0.1, 0.2]), [0.5])
+
+    def test_unknown_meal_in_pairing(self):
+        """Test that pairing a meal outside the columns raises a ValueError."""
+        columns = columns_from_meals(self.meals[:2])
+        missing = max(meal.id for meal in self.meals) + 1
+        with self.assertRaisesRegex(ValueError, f"Meal with ID {missing}"):
+            play_pairings(columns, [(self.meals[0].id, missing)], [0.5])
+
+    def test_empty_batch(self):
+        """Test that an empty catalog scores to an empty array."""
+        columns = columns_from_meals([])
+        self.assertEqual(len(columns), 0)
+        self.assertEqual(battle_scores(columns).shape, (0,))
+
+
+class test_load_score_columns(unittest.TestCase):
+
+    def setUp(self):
+        """Point the pool at a fresh database with a few meals."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.saved_db_path = sql_utils.DB_PATH
+        sql_utils.close_pool()
+        sql_utils.DB_PATH = os.path.join(self.tmpdir.name, "meals.sqlite")
+        kitchen_model.clear_meal_cache()
+
+        with sql_utils.get_db_connection() as conn:
+            migrations.migrate(conn)
+
+        for name, cuisine, price, difficulty in [("Pho", "Vietnamese", 9.99, "LOW"), ("Mochi", "日本料理", 4.1, "HIGH"),
+                                                 ("Tacos", "Mexican", 8.5, "MED")]:
+            kitchen_model.create_meal(name, cuisine, price, difficulty)
+        kitchen_model.delete_meal(3)
+
+    def tearDown(self):
+        sql_utils.close_pool()
+        sql_utils.DB_PATH = self.saved_db_path
+        self.tmpdir.cleanup()
+
+    def test_columns_match_meals(self):
+        """Test that columns read from SQLite score the same as the Meal objects."""
+        columns = load_score_columns()
+        meals = kitchen_model.get_active_meals()
+
+        self.assertEqual(columns.ids.tolist(), [1, 2])
+        np.testing.assert_array_equal(battle_scores(columns), battle_scores(columns_from_meals(meals)))
+
+    def test_requested_ids(self):
+        """Test loading selected meals, and that deleted meals are rejected."""
+        self.assertEqual(load_score_columns([2]).ids.tolist(), [2])
+        with self.assertRaises(ValueError):
+            load_score_columns([1, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
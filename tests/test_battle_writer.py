@@ -0,0 +1,207 @@
+import asyncio
+import os
+import random
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from meal_max.models import kitchen_model
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.battle_writer import BattleWriter, get_battle_writer, set_battle_writer
+from meal_max.models.kitchen_model import BattleRecord
+from meal_max.utils import migrations, sql_utils
+from meal_max.utils.async_utils import run_db
+from meal_max.utils.random_source import LocalRandomSource
+
+class test_battle_writer(unittest.TestCase):
+
+    def setUp(self):
+        """Point the pool at a fresh database with a few meals, some of them already battled."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.saved_db_path = sql_utils.DB_PATH
+        sql_utils.close_pool()
+        sql_utils.DB_PATH = os.path.join(self.tmpdir.name, "meals.sqlite")
+        kitchen_model.clear_meal_cache()
+
+        with sql_utils.get_db_connection() as conn:
+            migrations.migrate(conn)
+
+        for index in range(12):
+            kitchen_model.create_meal(f"Meal {index}", ["Thai", "Italian", "Mexican"][index % 3],
+                                      5.0 + index, ["LOW", "MED", "HIGH"][index % 3])
+        kitchen_model.record_battle_results([(1, 2), (3, 4), (5, 6), (1, 3)])
+
+        rng = random.Random(3)
+        self.results = [tuple(rng.sample(range(1, 13), 2)) for _ in range(40)] + [(7, 7)]
+        self.writer = BattleWriter(interval=60, max_battles=1000)
+
+    def tearDown(self):
+        self.writer.close()
+        set_battle_writer(None)
+        sql_utils.close_pool()
+        sql_utils.DB_PATH = self.saved_db_path
+        self.tmpdir.cleanup()
+
+    def queue(self, writer, results):
+        for winner_id, loser_id in results:
+            writer.record(BattleRecord(winner_id, loser_id, winner_id, None, None, None))
+
+    def wait_for_recorded(self, writer, count):
+        deadline = time.monotonic() + 5
+        while writer.stats()['recorded'] < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(writer.stats()['recorded'], count)
+
+    def leaderboards(self):
+        """Every sort and filter, in full, by offset pages and by cursor pages."""
+        views = []
+        for sort_by in kitchen_model.LEADERBOARD_SORTS:
+            for filters in ({}, {'cuisine': "Thai"}, {'difficulty': "MED", 'min_price': 6.0, 'max_price': 14.0}):
+                views.append(kitchen_model.get_leaderboard(sort_by, **filters))
+                views.append(kitchen_model.get_leaderboard(sort_by, limit=3, offset=2, **filters))
+                pages, cursor = [], None
+                while True:
+                    page = kitchen_model.get_leaderboard_page(sort_by, limit=4, cursor=cursor, **filters)
+                    pages.append(page['leaderboard'])
+                    cursor = page['next_cursor']
+                    if cursor is None:
+                        break
+                views.append(pages)
+        return views
+
+    def test_leaderboard_merges_queued_battles(self):
+        """Test that reads with battles queued match the reads after they are flushed."""
+        kitchen_model.set_pending_battles(self.writer.read_pending)
+        self.queue(self.writer, self.results)
+        self.assertEqual(self.writer.stats()['queued'], len(self.results))
+        merged = self.leaderboards()
+
+        self.assertEqual(self.writer.flush(), len(self.results))
+        self.assertEqual(self.writer.stats()['queued'], 0)
+        self.assertEqual(self.leaderboards(), merged)
+
+    def test_reads_do_not_hold_off_flushes(self):
+        """Test that reads run side by side and let a flush commit, then retry on the flushed state."""
+        self.queue(self.writer, self.results)
+        calls = []
+
+        def read(pending):
+            calls.append(len(pending))
+            if len(calls) == 1:
+                # Another leaderboard read, and a flush, while this one is running.
+                self.assertEqual(self.writer.read_pending(len), len(self.results))
+                flusher = threading.Thread(target=self.writer.flush)
+                flusher.start()
+                flusher.join(5)
+                self.assertFalse(flusher.is_alive())
+            return len(pending)
+
+        self.assertEqual(self.writer.read_pending(read), 0)
+        self.assertEqual(calls, [len(self.results), 0])
+
+    def test_flush_matches_immediate_writes(self):
+        """Test that one flushed batch leaves the same stats and ratings as battle-by-battle commits."""
+        self.queue(self.writer, self.results)
+        self.writer.flush()
+        batched = kitchen_model.get_leaderboard("rating")
+
+        with sql_utils.get_db_connection() as conn:
+            conn.execute("UPDATE meals SET battles = 0, wins = 0, rating = 1500.0")
+            conn.commit()
+        kitchen_model.record_battle_results([(1, 2), (3, 4), (5, 6), (1, 3)])
+        for winner_id, loser_id in self.results:
+            kitchen_model.record_battle_result(winner_id, loser_id)
+        self.assertEqual(kitchen_model.get_leaderboard("rating"), batched)
+
+    def test_flushes_on_size_and_interval(self):
+        """Test that the flush thread records a full batch at once and a partial one after the interval."""
+        writer = BattleWriter(interval=0.2, max_battles=5)
+        try:
+            self.queue(writer, self.results[:5])
+            self.wait_for_recorded(writer, 5)
+            self.assertEqual(writer.stats()['flushes'], 1)
+
+            started = time.monotonic()
+            self.queue(writer, self.results[5:7])
+            self.wait_for_recorded(writer, 7)
+            self.assertGreaterEqual(time.monotonic() - started, 0.2)
+            self.assertEqual(writer.stats()['flushes'], 2)
+        finally:
+            writer.close()
+
+    def test_deleted_meals_are_dropped(self):
+        """Test that battles of a meal deleted before the flush are dropped, and the rest recorded."""
+        self.queue(self.writer, [(1, 2), (8, 9), (2, 8)])
+        kitchen_model.delete_meal(8)
+        self.assertEqual(self.writer.flush(), 1)
+        self.assertEqual(self.writer.stats()['dropped'], 2)
+        with sql_utils.get_db_connection() as conn:
+            self.assertEqual(conn.execute("SELECT battles, wins FROM meals WHERE id = 9").fetchone(), (0, 0))
+
+    def test_durable_record_waits_for_commit(self):
+        """Test that a durable record() returns once committed, and raises for a deleted meal."""
+        writer = BattleWriter(interval=0.01, max_battles=100, durable=True)
+        try:
+            writer.record(BattleRecord(10, 11, 10, None, None, None))
+            with sql_utils.get_db_connection() as conn:
+                self.assertEqual(conn.execute("SELECT battles, wins FROM meals WHERE id = 10").fetchone(), (1, 1))
+            kitchen_model.delete_meal(11)
+            with self.assertRaises(ValueError):
+                writer.record(BattleRecord(10, 11, 10, None, None, None))
+        finally:
+            writer.close()
+
+    def test_record_async(self):
+        """Test that record_async queues on the event loop, and waits for a durable commit on a database thread."""
+        async def record_all(writer, results):
+            for winner_id, loser_id in results:
+                await writer.record_async(BattleRecord(winner_id, loser_id, winner_id, None, None, None))
+
+        with patch('meal_max.models.battle_writer.run_db', wraps=run_db) as mock_run_db:
+            asyncio.run(record_all(self.writer, self.results))
+            self.assertEqual(self.writer.stats()['queued'], len(self.results))
+            mock_run_db.assert_not_called()
+
+            writer = BattleWriter(interval=0.01, max_battles=100, durable=True)
+            try:
+                asyncio.run(record_all(writer, [(10, 11)]))
+                self.assertEqual(mock_run_db.call_count, 1)
+                with sql_utils.get_db_connection() as conn:
+                    self.assertEqual(conn.execute("SELECT battles, wins FROM meals WHERE id = 10").fetchone(), (1, 1))
+            finally:
+                writer.close()
+
+        self.writer.close()
+        with self.assertRaises(RuntimeError):
+            asyncio.run(record_all(self.writer, [(1, 2)]))
+
+    def test_close_flushes(self):
+        """Test that closing the writer records its queue and refuses new battles."""
+        self.queue(self.writer, self.results)
+        self.writer.close()
+        self.assertEqual(self.writer.stats()['recorded'], len(self.results))
+        with self.assertRaises(RuntimeError):
+            self.queue(self.writer, [(1, 2)])
+
+    def test_battle_model_queues_results(self):
+        """Test that BattleModel.battle() hands its result to the process-wide writer."""
+        set_battle_writer(self.writer)
+        self.assertIs(get_battle_writer(), self.writer)
+        model = BattleModel(random_source=LocalRandomSource(1))
+        model.prep_combatant(kitchen_model.get_meal_by_id(10))
+        model.prep_combatant(kitchen_model.get_meal_by_id(11))
+        winner = model.battle()
+
+        self.assertEqual(self.writer.stats()['queued'], 1)
+        rows = [row for row in kitchen_model.get_leaderboard() if row['id'] >= 10]
+        self.assertEqual([(row['meal'], row['battles'], row['wins']) for row in rows],
+                         [(winner, 1, 1)] + [(row['meal'], 1, 0) for row in rows if row['meal'] != winner])
+        set_battle_writer(None)
+        self.assertEqual(self.writer.stats()['recorded'], 1)
+        self.assertIsNone(get_battle_writer())
+
+
+if __name__ == '__main__':
+    unittest.main()
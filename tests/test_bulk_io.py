@@ -0,0 +1,127 @@
+import io
+import os
+import tempfile
+import unittest
+
+from meal_max.models import kitchen_model
+from meal_max.utils import migrations, sql_utils
+from meal_max.utils.bulk_io import format_bulk, format_csv, format_ndjson, parse_bulk, parse_csv, parse_ndjson
+
+class test_bulk_io(unittest.TestCase):
+
+    def setUp(self):
+        """Point the pool at a fresh, migrated database."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.saved_db_path = sql_utils.DB_PATH
+        sql_utils.close_pool()
+        sql_utils.DB_PATH = os.path.join(self.tmpdir.name, "meals.sqlite")
+        kitchen_model.clear_meal_cache()
+
+        with sql_utils.get_db_connection() as conn:
+            migrations.migrate(conn)
+
+    def tearDown(self):
+        sql_utils.close_pool()
+        sql_utils.DB_PATH = self.saved_db_path
+        self.tmpdir.cleanup()
+
+    ##################################################
+    # Parsing and Formatting Test Cases
+    ##################################################
+
+    def test_parse_ndjson_reports_bad_lines(self):
+        """Test that a malformed NDJSON line becomes a ValueError in its place."""
+        rows = list(parse_ndjson(io.StringIO('{"meal": "Pizza"}\n\nnot json\n{"meal": "Soup"}\n')))
+        self.assertEqual(rows[0], {'meal': 'Pizza'})
+        self.assertIsInstance(rows[1], ValueError)
+        self.assertEqual(rows[2], {'meal': 'Soup'})
+
+    def test_parse_csv_drops_empty_cells(self):
+        """Test that empty CSV cells are treated as missing."""
+        rows = list(parse_csv(io.StringIO("meal,cuisine,price,difficulty,wins\nPizza,Italian,9.5,LOW,\n")))
+        self.assertEqual(rows, [{'meal': 'Pizza', 'cuisine': 'Italian', 'price': '9.5', 'difficulty': 'LOW'}])
+
+    def test_parse_invalid_format(self):
+        """Test that an unknown format is rejected."""
+        with self.assertRaises(ValueError):
+            parse_bulk(io.StringIO(""), "xml")
+
+    def test_csv_round_trip(self):
+        """Test that exported CSV can be parsed back."""
+        rows = [{'id': 1, 'meal': 'Pizza', 'cuisine': 'Italian', 'price': 9.5, 'difficulty': 'LOW',
+                 'battles': 2, 'wins': 1, 'deleted': False}]
+        text = "".join(format_csv(rows))
+        self.assertEqual(text.splitlines()[0], "id,meal,cuisine,price,difficulty,battles,wins,deleted")
+        self.assertEqual(list(parse_csv(io.StringIO(text)))[0]['meal'], 'Pizza')
+        self.assertEqual("".join(format_ndjson(rows)).count("\n"), 1)
+
+    ##################################################
+    # Bulk Import Test Cases
+    ##################################################
+
+    def test_create_meals_bulk(self):
+        """Test that valid rows are inserted across chunks and bad rows are reported."""
+        rows = [
+            {'meal': 'Pizza', 'cuisine': 'Italian', 'price': 9.5, 'difficulty': 'LOW'},
+            {'meal': 'Soup', 'cuisine': 'French', 'price': '4.25', 'difficulty': 'MED', 'battles': '3', 'wins': '2'},
+            {'meal': 'Pizza', 'cuisine': 'Italian', 'price': 9.5, 'difficulty': 'LOW'},
+            {'meal': 'Tacos', 'cuisine': 'Mexican', 'price': 1.234, 'difficulty': 'LOW'},
+            ValueError("Invalid JSON"),
+            {'meal': 'Curry', 'cuisine': 'Indian', 'price': 8.0, 'difficulty': 'HIGH'},
+        ]
+        summary = kitchen_model.create_meals_bulk(rows, chunk_size=2)
+
+        self.assertEqual(summary['inserted'], 3)
+        self.assertEqual(summary['failed'], 3)
+        self.assertEqual(sorted(error['row'] for error in summary['errors']), [2, 3, 4])
+
+        self.assertEqual(kitchen_model.get_meal_by_name('Soup').price, 4.25)
+        soup = next(row for row in kitchen_model.iter_meals() if row['meal'] == 'Soup')
+        self.assertEqual((soup['battles'], soup['wins']), (3, 2))
+        self.assertEqual([row['meal'] for row in kitchen_model.get_leaderboard()], ['Soup'])
+
+    def test_create_meals_bulk_skips_existing_names(self):
+        """Test that names already in the catalog are reported, not inserted twice."""
+        kitchen_model.create_meal('Pizza', 'Italian', 9.5, 'LOW')
+        summary = kitchen_model.create_meals_bulk(
+            [{'meal': 'Pizza', 'cuisine': 'Italian', 'price': 9.5, 'difficulty': 'LOW'}])
+        self.assertEqual((summary['inserted'], summary['failed']), (0, 1))
+
+    def test_export_import_round_trip_keeps_deleted(self):
+        """Test that meals exported with include_deleted import back with the same deleted flags."""
+        kitchen_model.create_meals_bulk(
+            [{'meal': f'Meal {i}', 'cuisine': 'Test', 'price': 5.0, 'difficulty': 'LOW'} for i in range(4)])
+        kitchen_model.record_battle_result(1, 2)
+        kitchen_model.delete_meal(2)
+        exported = list(kitchen_model.iter_meals(include_deleted=True))
+
+        for bulk_format in ('ndjson', 'csv'):
+            kitchen_model.clear_meals()
+            text = "".join(format_bulk(exported, bulk_format))
+            summary = kitchen_model.create_meals_bulk(parse_bulk(io.StringIO(text), bulk_format))
+            self.assertEqual((summary['inserted'], summary['failed']), (4, 0))
+            self.assertEqual(list(kitchen_model.iter_meals(include_deleted=True)), exported)
+            self.assertEqual([row['id'] for row in kitchen_model.get_leaderboard()], [1])
+            with self.assertRaises(ValueError):
+                kitchen_model.get_meal_by_name('Meal 1')
+
+        summary = kitchen_model.create_meals_bulk(
+            [{'meal': 'Soup', 'cuisine': 'French', 'price': 4.0, 'difficulty': 'MED', 'deleted': 'maybe'}])
+        self.assertEqual(summary['failed'], 1)
+        self.assertIn("deleted", summary['errors'][0]['error'])
+
+    def test_iter_meals_pages_in_id_order(self):
+        """Test that iter_meals yields every meal across pages and honours include_deleted."""
+        kitchen_model.create_meals_bulk(
+            [{'meal': f'Meal {i}', 'cuisine': 'Test', 'price': 5.0, 'difficulty': 'LOW'} for i in range(7)])
+        kitchen_model.delete_meal(3)
+
+        ids = [row['id'] for row in kitchen_model.iter_meals(batch_size=3)]
+        self.assertEqual(ids, [1, 2, 4, 5, 6, 7])
+        all_rows = list(kitchen_model.iter_meals(batch_size=3, include_deleted=True))
+        self.assertEqual(len(all_rows), 7)
+        self.assertTrue(all_rows[2]['deleted'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from unittest.mock import patch
+
+from meal_max.utils.cache import LRUCache
+
+class test_cache(unittest.TestCase):
+
+    def test_get_and_put(self):
+        """Test that cached values are returned and misses give the default."""
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['hit_rate']), (1, 1, 0.5))
+
+    def test_least_recently_used_is_evicted(self):
+        """Test that the entry not used for longest is evicted when the cache is full."""
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_entries_expire(self):
+        """Test that entries older than the TTL are treated as misses."""
+        cache = LRUCache(maxsize=2, ttl=10)
+        with patch('meal_max.utils.cache.time.monotonic', return_value=100.0):
+            cache.put("a", 1)
+        with patch('meal_max.utils.cache.time.monotonic', return_value=111.0):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+    def test_pop_where(self):
+        """Test that entries can be invalidated by value."""
+        cache = LRUCache(maxsize=4)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.pop_where(lambda value: value == 2), 1)
+        self.assertEqual(len(cache), 1)
+
+    def test_invalid_size(self):
+        """Test that a cache must hold at least one entry."""
+        with self.assertRaises(ValueError):
+            LRUCache(maxsize=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
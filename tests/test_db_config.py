@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from meal_max.utils.db_config import DatabaseConfig
+
+class test_db_config(unittest.TestCase):
+
+    def setUp(self):
+        """Create a throwaway database file."""
+        fd, self.db_path = tempfile.mkstemp(suffix=".sqlite")
+        os.close(fd)
+
+    def tearDown(self):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.db_path + suffix):
+                os.remove(self.db_path + suffix)
+
+    def test_connect_applies_pragmas(self):
+        """Test that every pragma is applied to a new connection."""
+        config = DatabaseConfig(journal_mode='wal', synchronous='normal', busy_timeout_ms=1234,
+                                cache_size=-4000, mmap_size=1048576, temp_store='memory')
+        conn = config.connect(self.db_path)
+        try:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)
+            self.assertEqual(conn.execute("PRAGMA busy_timeout").fetchone()[0], 1234)
+            self.assertEqual(conn.execute("PRAGMA cache_size").fetchone()[0], -4000)
+            self.assertEqual(conn.execute("PRAGMA temp_store").fetchone()[0], 2)
+        finally:
+            conn.close()
+
+    @patch.dict(os.environ, {"DB_JOURNAL_MODE": "delete", "DB_SYNCHRONOUS": "FULL", "DB_BUSY_TIMEOUT_MS": "250"})
+    def test_from_env(self):
+        """Test that the DB_* environment variables override the defaults."""
+        config = DatabaseConfig.from_env()
+        self.assertEqual(config.journal_mode, "DELETE")
+        self.assertEqual(config.synchronous, "FULL")
+        self.assertEqual(config.busy_timeout_ms, 250)
+        self.assertEqual(config.temp_store, "MEMORY")
+
+    def test_invalid_journal_mode(self):
+        """Test that an unknown journal mode is rejected."""
+        with self.assertRaises(ValueError):
+            DatabaseConfig(journal_mode="FAST")
+
+    def test_invalid_busy_timeout(self):
+        """Test that a negative busy timeout is rejected."""
+        with self.assertRaises(ValueError):
+            DatabaseConfig(busy_timeout_ms=-1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from meal_max.utils.db_pool import ConnectionPool
+
+class test_db_pool(unittest.TestCase):
+
+    def setUp(self):
+        """Create a pool against a throwaway database file."""
+        fd, self.db_path = tempfile.mkstemp(suffix=".sqlite")
+        os.close(fd)
+        self.pool = ConnectionPool(self.db_path, max_size=2, max_idle=60, timeout=0.2)
+
+    def tearDown(self):
+        self.pool.close()
+        os.remove(self.db_path)
+
+    def test_connection_is_reused(self):
+        """Test that a released connection is handed out again as a pool hit."""
+        with self.pool.connection() as conn_1:
+            pass
+        with self.pool.connection() as conn_2:
+            pass
+        self.assertIs(conn_1, conn_2)
+        stats = self.pool.stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['size'], 1)
+
+    def test_pool_exhausted_times_out(self):
+        """Test that acquire raises a RuntimeError when every connection is in use."""
+        conn_1 = self.pool.acquire()
+        conn_2 = self.pool.acquire()
+        with self.assertRaises(RuntimeError):
+            self.pool.acquire()
+        self.assertEqual(self.pool.stats()['timeouts'], 1)
+        self.pool.release(conn_1)
+        self.pool.release(conn_2)
+
+    def test_waiter_gets_released_connection(self):
+        """Test that a waiting thread is handed a connection as soon as one is released."""
+        self.pool.timeout = 5
+        held = [self.pool.acquire(), self.pool.acquire()]
+        result = {}
+
+        def worker():
+            result['conn'] = self.pool.acquire()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        self.pool.release(held[0])
+        thread.join(2)
+
+        self.assertIs(result['conn'], held[0])
+        self.assertEqual(self.pool.stats()['waits'], 1)
+        self.pool.release(held[1])
+        self.pool.release(result['conn'])
+
+    def test_unhealthy_connection_is_replaced(self):
+        """Test that a broken idle connection is discarded on checkout."""
+        conn = self.pool.acquire()
+        self.pool.release(conn)
+        conn.close()
+
+        with self.pool.connection() as replacement:
+            self.assertIsNot(replacement, conn)
+            replacement.execute("SELECT 1")
+        self.assertEqual(self.pool.stats()['health_failures'], 1)
+
+    def test_idle_connections_expire(self):
+        """Test that connections idle for longer than max_idle are closed."""
+        self.pool.max_idle = 10
+        conn = self.pool.acquire()
+        self.pool.release(conn)
+
+        with patch('meal_max.utils.db_pool.time.monotonic', return_value=1e12):
+            with self.pool.connection() as fresh:
+                self.assertIsNot(fresh, conn)
+        self.assertEqual(self.pool.stats()['expired'], 1)
+
+    def test_release_rolls_back_open_transaction(self):
+        """Test that uncommitted work is rolled back when a connection is released."""
+        with self.pool.connection() as conn:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+            conn.commit()
+            conn.execute("INSERT INTO t VALUES (1)")
+
+        with self.pool.connection() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 0)
+
+    def test_close_rejects_checkout(self):
+        """Test that a closed pool refuses new checkouts."""
+        with self.pool.connection():
+            pass
+        self.pool.close()
+        self.assertEqual(self.pool.stats()['idle'], 0)
+        with self.assertRaises(RuntimeError):
+            self.pool.acquire()
+
+    def test_invalid_size(self):
+        """Test that a pool must allow at least one connection."""
+        with self.assertRaises(ValueError):
+            ConnectionPool(self.db_path, max_size=0)
+
+    def test_connect_failure_frees_slot(self):
+        """Test that a failed connect does not leak a pool slot."""
+        pool = ConnectionPool(self.db_path, max_size=1, timeout=0.1,
+                              connect=lambda path: (_ for _ in ()).throw(sqlite3.OperationalError("boom")))
+        with self.assertRaises(sqlite3.OperationalError):
+            pool.acquire()
+        self.assertEqual(pool.stats()['size'], 0)
+
+    def test_warm_opens_idle_connections(self):
+        """Test that warm pre-opens connections without exceeding the pool size."""
+        self.assertEqual(self.pool.warm(5), 2)
+        stats = self.pool.stats()
+        self.assertEqual(stats['idle'], 2)
+        self.assertEqual(stats['in_use'], 0)
+        self.assertEqual(self.pool.warm(1), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
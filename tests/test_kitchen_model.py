@@ -1,13 +1,15 @@
 import unittest
 from unittest.mock import patch, MagicMock
 import sqlite3
-from meal_max.models.kitchen_model import Meal, create_meal, clear_meals, delete_meal, get_leaderboard, get_meal_by_id, get_meal_by_name
+from meal_max.models import kitchen_model
+from meal_max.models.kitchen_model import BattleRecord, Meal, create_meal, delete_meal, get_leaderboard, get_meal_by_id, get_meal_by_name, record_battle_result, record_battle_results
 
 class test_kitchen_model(unittest.TestCase):
 
     def setUp(self):
         """Set up the test environment."""
         self.sample_meal = Meal(id=1, meal="Pasta", cuisine="Italian", price=10.0, difficulty="MED")
+        kitchen_model.configure_meal_cache(enabled=True)
 
     @patch('meal_max.models.kitchen_model.get_db_connection')
     def test_create_meal_successful(self, mock_db_connection):
@@ -20,8 +22,8 @@ class test_kitchen_model(unittest.TestCase):
         create_meal("Pasta", "Italian", 10.0, "MED")
 
         mock_cursor.execute.assert_called_once_with(
-            """INSERT INTO meals (meal, cuisine, price, difficulty) VALUES (?, ?, ?, ?)""",
-            ("Pasta", "Italian", 10.0, "MED")
+            """INSERT INTO meals (meal, cuisine, price, difficulty, score) VALUES (?, ?, ?, ?, ?)""",
+            ("Pasta", "Italian", 10.0, "MED", 68.0)
         )
         mock_conn.commit.assert_called_once()
 
@@ -34,7 +36,7 @@ class test_kitchen_model(unittest.TestCase):
 
         create_meal('Pasta', 'Italian', 10.0, 'MED')
 
-        expected_sql = 'INSERT INTO meals (meal, cuisine, price, difficulty) VALUES (?, ?, ?, ?)'
+        expected_sql = 'INSERT INTO meals (meal, cuisine, price, difficulty, score) VALUES (?, ?, ?, ?, ?)'
         actual_sql = mock_cursor.execute.call_args[0][0]
 
         expected_sql_normalized = ' '.join(expected_sql.split())
@@ -130,8 +132,8 @@ class test_kitchen_model(unittest.TestCase):
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
         mock_cursor.fetchall.return_value = [
-            (1, "Pasta", "Italian", 10.0, "MED", 10, 8, 0.8),
-            (2, "Sushi", "Japanese", 15.0, "HIGH", 12, 7, 0.58)
+            (1, "Pasta", "Italian", 10.0, "MED", 10, 8, 0.8, 1560.25),
+            (2, "Sushi", "Japanese", 15.0, "HIGH", 12, 7, 0.58, 1512.0)
         ]
         mock_conn.cursor.return_value = mock_cursor
         mock_db_connection.return_value.__enter__.return_value = mock_conn
@@ -140,6 +142,7 @@ class test_kitchen_model(unittest.TestCase):
         self.assertEqual(len(leaderboard), 2)
         self.assertEqual(leaderboard[0]['meal'], "Pasta")
         self.assertEqual(leaderboard[1]['meal'], "Sushi")
+        self.assertEqual(leaderboard[0]['rating'], 1560.2)
 
     @patch('meal_max.models.kitchen_model.get_db_connection')
     def test_create_meal_extremely_high_price_as_infinity(self, mock_db_connection):
@@ -154,10 +157,146 @@ class test_kitchen_model(unittest.TestCase):
         args, _ = mock_cursor.execute.call_args
         self.assertEqual(args[1][2], float('inf')) 
 
+    @patch('meal_max.models.kitchen_model.get_db_connection')
+    def test_record_battle_result_successful(self, mock_db_connection):
+        """Test that both meals are updated by a single statement, logged, and committed once."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.rowcount = 2
+        mock_cursor.fetchall.return_value = [(1, 1500.0), (2, 1500.0)]
+        mock_conn.cursor.return_value = mock_cursor
+        mock_db_connection.return_value.__enter__.return_value = mock_conn
+
+        record_battle_result(1, 2, BattleRecord(2, 1, 1, 3.5, 2.0, 0.01))
+
+        begin, ratings, update, log = mock_cursor.execute.call_args_list
+        self.assertEqual(begin[0][0], "BEGIN IMMEDIATE")
+        self.assertEqual(update[0][1], (1, 1, 1, 1516.0, 1484.0, 1, 2))
+        self.assertIn("INSERT INTO battles", log[0][0])
+        self.assertEqual(log[0][1][1:], (2, 1, 3.5, 2.0, 0.01, 1))
+        mock_conn.commit.assert_called_once()
+
+    def test_record_battle_result_mismatched_record(self):
+        """Test that a log record naming other meals is rejected before any write."""
+        with self.assertRaises(ValueError):
+            record_battle_result(1, 2, BattleRecord(1, 3, 1, None, None, None))
+        with self.assertRaises(ValueError):
+            record_battle_results([(1, 2)], [])
+
+    @patch('meal_max.models.kitchen_model.get_db_connection')
+    def test_record_battle_result_deleted_loser(self, mock_db_connection):
+        """Test that a deleted participant rolls back the update and raises a ValueError."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.rowcount = 1
+        mock_cursor.fetchone.side_effect = [(False,), (True,)]
+        mock_conn.cursor.return_value = mock_cursor
+        mock_db_connection.return_value.__enter__.return_value = mock_conn
 
+        with self.assertRaises(ValueError) as context:
+            record_battle_result(1, 2)
+        self.assertIn("has been deleted", str(context.exception))
+        mock_conn.rollback.assert_called_once()
+        mock_conn.commit.assert_not_called()
 
+    @patch('meal_max.models.kitchen_model.get_db_connection')
+    def test_record_battle_result_missing_winner(self, mock_db_connection):
+        """Test that an unknown winner raises a ValueError."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.rowcount = 1
+        mock_cursor.fetchone.return_value = None
+        mock_conn.cursor.return_value = mock_cursor
+        mock_db_connection.return_value.__enter__.return_value = mock_conn
+
+        with self.assertRaises(ValueError) as context:
+            record_battle_result(99, 2)
+        self.assertIn("not found", str(context.exception))
+
+    @patch('meal_max.models.kitchen_model.get_db_connection')
+    def test_record_battle_results_aggregates_deltas(self, mock_db_connection):
+        """Test that many battles become one executemany with a single row per meal."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [(1, 1500.0), (2, 1500.0), (3, 1500.0)]
+        mock_conn.cursor.return_value = mock_cursor
+        mock_db_connection.return_value.__enter__.return_value = mock_conn
+
+        record_battle_results([(1, 2), (1, 3), (3, 2)])
+
+        update, log = mock_cursor.executemany.call_args_list
+        self.assertEqual(sorted((battles, wins, meal_id) for battles, wins, _, meal_id in update[0][1]),
+                         [(2, 0, 2), (2, 1, 3), (2, 2, 1)])
+        self.assertEqual([row[1:] for row in log[0][1]], [(1, 2, None, None, None, 1), (1, 3, None, None, None, 1),
+                                                        (3, 2, None, None, None, 3)])
+        mock_conn.commit.assert_called_once()
+
+    @patch('meal_max.models.kitchen_model.get_db_connection')
+    def test_record_battle_results_deleted_meal(self, mock_db_connection):
+        """Test that a deleted participant rolls back the whole batch."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [(1, 1500.0)]
+        mock_conn.cursor.return_value = mock_cursor
+        mock_db_connection.return_value.__enter__.return_value = mock_conn
+
+        with self.assertRaises(ValueError) as context:
+            record_battle_results([(1, 2)])
+        self.assertIn("ID 2", str(context.exception))
+        mock_conn.rollback.assert_called_once()
+        mock_conn.commit.assert_not_called()
+
+    @patch('meal_max.models.kitchen_model.get_db_connection')
+    def test_get_meal_by_id_cached(self, mock_db_connection):
+        """Test that a second lookup by ID or name is served from the cache."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = (1, "Pasta", "Italian", 10.0, "MED", False)
+        mock_conn.cursor.return_value = mock_cursor
+        mock_db_connection.return_value.__enter__.return_value = mock_conn
+
+        first = get_meal_by_id(1)
+        self.assertIs(get_meal_by_id(1), first)
+        self.assertIs(get_meal_by_name("Pasta"), first)
+        self.assertEqual(mock_cursor.execute.call_count, 1)
+        self.assertEqual(kitchen_model.get_meal_cache_stats()['by_id']['hits'], 1)
+
+    @patch('meal_max.models.kitchen_model.get_db_connection')
+    def test_delete_meal_invalidates_cache(self, mock_db_connection):
+        """Test that deleting a meal evicts it under both its ID and its name."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.side_effect = [(1, "Pasta", "Italian", 10.0, "MED", False), (False,),
+                                            (1, "Pasta", "Italian", 10.0, "MED", True)]
+        mock_conn.cursor.return_value = mock_cursor
+        mock_db_connection.return_value.__enter__.return_value = mock_conn
+
+        get_meal_by_name("Pasta")
+        delete_meal(1)
+
+        with self.assertRaises(ValueError):
+            get_meal_by_name("Pasta")
+        self.assertEqual(kitchen_model.get_meal_cache_stats()['by_id']['size'], 0)
+
+    @patch('meal_max.models.kitchen_model.get_db_connection')
+    def test_meal_cache_disabled(self, mock_db_connection):
+        """Test that every lookup hits the database when the cache is disabled."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = (1, "Pasta", "Italian", 10.0, "MED", False)
+        mock_conn.cursor.return_value = mock_cursor
+        mock_db_connection.return_value.__enter__.return_value = mock_conn
 
+        kitchen_model.configure_meal_cache(enabled=False)
+        get_meal_by_id(1)
+        get_meal_by_id(1)
+        self.assertEqual(mock_cursor.execute.call_count, 2)
 
+    def test_meal_has_no_instance_dict(self):
+        """Test that Meal uses slots, so arbitrary attributes cannot be added."""
+        self.assertFalse(hasattr(self.sample_meal, '__dict__'))
+        with self.assertRaises(AttributeError):
+            self.sample_meal.rating = 5
 
 
 if __name__ == '__main__':
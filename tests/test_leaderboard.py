@@ -0,0 +1,177 @@
+import os
+import tempfile
+import unittest
+
+from meal_max.models import kitchen_model
+from meal_max.utils import migrations, sql_utils
+
+class test_leaderboard(unittest.TestCase):
+
+    def setUp(self):
+        """Point the pool at a fresh database with the meals schema and a few meals."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.saved_db_path = sql_utils.DB_PATH
+        sql_utils.close_pool()
+        sql_utils.DB_PATH = os.path.join(self.tmpdir.name, "meals.sqlite")
+        kitchen_model.clear_meal_cache()
+
+        with sql_utils.get_db_connection() as conn:
+            migrations.migrate(conn)
+
+        for name, cuisine, price in [("Spaghetti", "Italian", 12.5), ("Sushi", "Japanese", 15.0),
+                                     ("Tacos", "Mexican", 8.5), ("Curry", "Indian", 9.0)]:
+            kitchen_model.create_meal(name, cuisine, price, "MED")
+
+    def tearDown(self):
+        sql_utils.close_pool()
+        sql_utils.DB_PATH = self.saved_db_path
+        self.tmpdir.cleanup()
+
+    def leaderboard_table(self):
+        with sql_utils.get_db_connection() as conn:
+            return conn.execute("SELECT meal_id, battles, wins FROM leaderboard ORDER BY meal_id").fetchall()
+
+    def test_meals_without_battles_are_not_listed(self):
+        """Test that the leaderboard starts empty."""
+        self.assertEqual(kitchen_model.get_leaderboard(), [])
+
+    def test_stats_updates_maintain_leaderboard(self):
+        """Test that each stats write path updates the materialized rows."""
+        kitchen_model.update_meal_stats(1, 'win')
+        kitchen_model.record_battle_result(2, 1)
+        kitchen_model.record_battle_results([(2, 3), (2, 3)])
+
+        self.assertEqual(self.leaderboard_table(), [(1, 2, 1), (2, 3, 3), (3, 2, 0)])
+        leaderboard = kitchen_model.get_leaderboard("wins")
+        self.assertEqual([row['meal'] for row in leaderboard], ["Sushi", "Spaghetti", "Tacos"])
+        self.assertEqual(leaderboard[0]['win_pct'], 100.0)
+        self.assertEqual(leaderboard[1]['win_pct'], 50.0)
+
+    def test_sort_by_win_pct(self):
+        """Test the win percentage ordering, with ties broken by meal ID."""
+        kitchen_model.record_battle_results([(1, 2), (2, 1), (3, 4)])
+        leaderboard = kitchen_model.get_leaderboard("win_pct")
+        self.assertEqual([row['id'] for row in leaderboard], [3, 1, 2, 4])
+
+    def test_pagination(self):
+        """Test limit and offset paging over the leaderboard."""
+        kitchen_model.record_battle_results([(1, 2), (1, 3), (1, 4), (2, 3), (2, 4), (3, 4)])
+        self.assertEqual([row['id'] for row in kitchen_model.get_leaderboard(limit=2)], [1, 2])
+        self.assertEqual([row['id'] for row in kitchen_model.get_leaderboard(limit=2, offset=2)], [3, 4])
+        self.assertEqual(kitchen_model.get_leaderboard(limit=0), [])
+
+    def test_invalid_pagination(self):
+        """Test that negative limits and offsets are rejected."""
+        with self.assertRaises(ValueError):
+            kitchen_model.get_leaderboard(limit=-1)
+        with self.assertRaises(ValueError):
+            kitchen_model.get_leaderboard(offset=-1)
+
+    def test_keyset_pages_cover_leaderboard(self):
+        """Test that following next_cursor visits every row once, in leaderboard order."""
+        kitchen_model.record_battle_results([(1, 2), (2, 1), (3, 4), (1, 4), (2, 3)])
+        for sort_by in kitchen_model.LEADERBOARD_SORTS:
+            seen, cursor = [], None
+            while True:
+                page = kitchen_model.get_leaderboard_page(sort_by, limit=1, cursor=cursor)
+                seen.extend(row['id'] for row in page['leaderboard'])
+                cursor = page['next_cursor']
+                if cursor is None:
+                    break
+            self.assertEqual(seen, [row['id'] for row in kitchen_model.get_leaderboard(sort_by)])
+
+    def test_keyset_page_is_stable_across_updates(self):
+        """Test that a stats change does not repeat rows already seen on the next page."""
+        kitchen_model.record_battle_results([(1, 2), (1, 3), (2, 4)])
+        first = kitchen_model.get_leaderboard_page("wins", limit=2)
+        self.assertEqual([row['id'] for row in first['leaderboard']], [1, 2])
+
+        kitchen_model.record_battle_result(3, 4)
+        second = kitchen_model.get_leaderboard_page("wins", limit=2, cursor=first['next_cursor'])
+        self.assertEqual([row['id'] for row in second['leaderboard']], [3, 4])
+        self.assertIsNone(second['next_cursor'])
+
+    def test_invalid_cursor(self):
+        """Test that malformed cursors, cursors of another sort order and bad limits are rejected."""
+        kitchen_model.record_battle_results([(1, 2), (3, 4)])
+        cursor = kitchen_model.get_leaderboard_page("wins", limit=1)['next_cursor']
+        for sort_by, bad in [("wins", "not-a-cursor"), ("wins", "WyJ3aW5zIl0"), ("win_pct", cursor)]:
+            with self.assertRaises(ValueError):
+                kitchen_model.get_leaderboard_page(sort_by, limit=1, cursor=bad)
+        with self.assertRaises(ValueError):
+            kitchen_model.get_leaderboard_page("wins", limit=0)
+
+    def test_filters(self):
+        """Test filtering by cuisine, difficulty and price range."""
+        kitchen_model.create_meal("Pad Thai", "Thai", 11.0, "LOW")
+        kitchen_model.record_battle_results([(1, 2), (3, 4), (5, 1)])
+
+        def ids(**filters):
+            return [row['id'] for row in kitchen_model.get_leaderboard(**filters)]
+
+        self.assertEqual(ids(cuisine="Thai"), [5])
+        self.assertEqual(ids(difficulty="MED"), [1, 3, 2, 4])
+        self.assertEqual(ids(min_price=9.0, max_price=12.5), [1, 5, 4])
+        self.assertEqual(kitchen_model.get_leaderboard_page(cuisine="Mexican", limit=5)['leaderboard'][0]['id'], 3)
+        with self.assertRaises(ValueError):
+            kitchen_model.get_leaderboard(difficulty="EASY")
+        with self.assertRaises(ValueError):
+            kitchen_model.get_leaderboard(min_price=5.0, max_price=1.0)
+
+    def test_version_changes_with_leaderboard(self):
+        """Test that the leaderboard version moves on battles and deletes, and only then."""
+        before = kitchen_model.get_leaderboard_version()
+        kitchen_model.create_meal("Pad Thai", "Thai", 11.0, "LOW")
+        self.assertEqual(kitchen_model.get_leaderboard_version(), before)
+
+        kitchen_model.record_battle_result(1, 2)
+        after_battle = kitchen_model.get_leaderboard_version()
+        self.assertGreater(after_battle, before)
+
+        kitchen_model.delete_meal(1)
+        self.assertGreater(kitchen_model.get_leaderboard_version(), after_battle)
+
+    def test_deleted_meal_leaves_leaderboard(self):
+        """Test that deleting a meal removes it from the leaderboard."""
+        kitchen_model.record_battle_result(1, 2)
+        kitchen_model.delete_meal(1)
+        self.assertEqual([row['id'] for row in kitchen_model.get_leaderboard()], [2])
+
+    def test_meals_by_score(self):
+        """Test ranking every active meal by stored battle score, with filters, battled or not."""
+        kitchen_model.create_meal("Pad Thai", "Thai", 11.0, "LOW")
+        kitchen_model.create_meal("Ramen", "Japanese", 8.5, "HIGH")
+        kitchen_model.delete_meal(2)
+
+        # Scores: Spaghetti 85.5, Tacos 57.5, Curry 52.0, Pad Thai 41.0, Ramen 67.0
+        strongest = kitchen_model.get_meals_by_score()
+        self.assertEqual([(row['id'], row['score']) for row in strongest],
+                         [(1, 85.5), (6, 67.0), (3, 57.5), (4, 52.0), (5, 41.0)])
+        self.assertEqual(strongest[1], {'id': 6, 'meal': "Ramen", 'cuisine': "Japanese", 'price': 8.5,
+                                        'difficulty': "HIGH", 'score': 67.0})
+
+        self.assertEqual([row['id'] for row in kitchen_model.get_meals_by_score(limit=2, offset=1)], [6, 3])
+        self.assertEqual([row['id'] for row in kitchen_model.get_meals_by_score(cuisine="Japanese")], [6])
+        self.assertEqual([row['id'] for row in kitchen_model.get_meals_by_score(difficulty="MED", max_score=60)],
+                         [3, 4])
+        self.assertEqual([row['id'] for row in kitchen_model.get_meals_by_score(min_score=52, max_score=67)],
+                         [6, 3, 4])
+
+        for kwargs in ({'limit': kitchen_model.LEADERBOARD_MAX_PAGE_SIZE + 1}, {'offset': -1},
+                       {'difficulty': "EASY"}, {'min_score': 10, 'max_score': 5}):
+            with self.assertRaises(ValueError):
+                kitchen_model.get_meals_by_score(**kwargs)
+
+    def test_rebuild_leaderboard(self):
+        """Test that a rebuild restores rows written behind the triggers' back."""
+        kitchen_model.record_battle_result(1, 2)
+        with sql_utils.get_db_connection() as conn:
+            conn.execute("DELETE FROM leaderboard")
+            conn.commit()
+
+        kitchen_model.rebuild_leaderboard()
+        self.assertEqual(self.leaderboard_table(), [(1, 1, 1), (2, 1, 0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import io
+import json
+import logging
+import unittest
+from unittest.mock import patch
+
+from meal_max.utils import logger as log_utils
+from meal_max.utils.logger import HOT_PATH, JsonFormatter, SamplingFilter, configure_logger, level_for, \
+    parse_levels
+
+class test_logger(unittest.TestCase):
+
+    def test_configure_logger_is_idempotent(self):
+        """Test that repeated configuration attaches the shared handler once, to the package logger."""
+        module_logger = logging.getLogger("meal_max.tests.idempotent")
+        for _ in range(3):
+            configure_logger(module_logger)
+        package_handlers = logging.getLogger("meal_max").handlers
+        self.assertEqual(package_handlers.count(log_utils.get_handler()), 1)
+        self.assertEqual(module_logger.handlers, [])
+
+    def test_outside_package_gets_handler_directly(self):
+        """Test that a logger outside meal_max gets its own (single) reference to the handler."""
+        other = logging.getLogger("tests.outside_package")
+        configure_logger(other)
+        configure_logger(other)
+        self.assertEqual(other.handlers, [log_utils.get_handler()])
+        other.removeHandler(log_utils.get_handler())
+
+    @patch.object(log_utils, 'LOG_LEVEL', 'WARNING')
+    @patch.object(log_utils, 'LOG_LEVELS', 'meal_max.utils=DEBUG, meal_max.utils.db_pool=ERROR')
+    def test_level_for_uses_most_specific_override(self):
+        """Test that LOG_LEVELS overrides LOG_LEVEL by longest logger-name prefix."""
+        self.assertEqual(level_for("meal_max.utils.db_pool"), logging.ERROR)
+        self.assertEqual(level_for("meal_max.utils.cache"), logging.DEBUG)
+        self.assertEqual(level_for("meal_max.models.battle_model"), logging.WARNING)
+
+    def test_parse_levels_invalid(self):
+        """Test that malformed LOG_LEVELS entries are rejected."""
+        with self.assertRaises(ValueError):
+            parse_levels("meal_max.utils")
+        with self.assertRaises(ValueError):
+            parse_levels("meal_max.utils=LOUD")
+
+    def test_json_formatter_includes_extras(self):
+        """Test that JSON output is one object per record with extra fields but no sampling marker."""
+        record = logging.LogRecord("meal_max.x", logging.INFO, __file__, 1, "won %s", ("Sushi",), None)
+        record.meal_id = 3
+        record.hot_path = True
+        payload = json.loads(JsonFormatter().format(record))
+        self.assertEqual(payload['message'], "won Sushi")
+        self.assertEqual(payload['level'], "INFO")
+        self.assertEqual(payload['meal_id'], 3)
+        self.assertNotIn('hot_path', payload)
+
+    def test_sampling_filter_only_samples_hot_path(self):
+        """Test that a zero sample rate drops hot-path records and keeps the rest."""
+        sampling = SamplingFilter(0.0)
+        stream = io.StringIO()
+        handler = logging.StreamHandler(stream)
+        handler.addFilter(sampling)
+        test_logger = logging.getLogger("tests.sampling")
+        test_logger.propagate = False
+        test_logger.addHandler(handler)
+        try:
+            test_logger.warning("hot", extra=HOT_PATH)
+            test_logger.warning("cold")
+        finally:
+            test_logger.removeHandler(handler)
+        self.assertEqual(stream.getvalue().split(), ["cold"])
+
+    def test_invalid_sample_rate(self):
+        """Test that sample rates outside [0, 1] are rejected."""
+        with self.assertRaises(ValueError):
+            SamplingFilter(1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from meal_max.models import kitchen_model
+from meal_max.models.battle_scoring import battle_scores, columns_from_meals
+from meal_max.models.kitchen_model import Meal
+from meal_max.models.meal_catalog import MealCatalog, load_meal_catalog
+from meal_max.utils import migrations, sql_utils
+
+class test_meal_catalog(unittest.TestCase):
+
+    def setUp(self):
+        """Set up meals out of ID order, with repeated cuisines and non-ASCII names."""
+        self.meals = [
+            Meal(id=7, meal="Crème brûlée", cuisine="French", price=6.5, difficulty="HIGH"),
+            Meal(id=2, meal="Sushi", cuisine="Japanese", price=15.0, difficulty="HIGH"),
+            Meal(id=5, meal="Ratatouille", cuisine="French", price=11.25, difficulty="LOW"),
+            Meal(id=3, meal="Ramen", cuisine="Japanese", price=11.0, difficulty="MED"),
+        ]
+        self.catalog = MealCatalog.from_meals(self.meals)
+
+    def test_round_trip(self):
+        """Test that every meal comes back unchanged, in ID order."""
+        self.assertEqual(list(self.catalog), sorted(self.meals, key=lambda meal: meal.id))
+        self.assertEqual(self.catalog.get(7), self.meals[0])
+        self.assertEqual(len(self.catalog), 4)
+
+    def test_cuisines_are_encoded_once(self):
+        """Test that repeated cuisines share one code and one string object."""
+        self.assertEqual(self.catalog.cuisines, ("Japanese", "French"))
+        self.assertEqual(self.catalog.cuisine_codes.tolist(), [0, 0, 1, 1])
+        self.assertIs(self.catalog.get(5).cuisine, self.catalog.get(7).cuisine)
+        self.assertEqual(self.catalog.difficulty_codes.dtype, np.uint8)
+
+    def test_lookup_of_missing_meal(self):
+        """Test that looking up an absent ID raises a ValueError."""
+        self.assertNotIn(4, self.catalog)
+        self.assertIn(5, self.catalog)
+        with self.assertRaisesRegex(ValueError, "Meal with ID 99 not found"):
+            self.catalog.get(99)
+
+    def test_score_columns_match_meals(self):
+        """Test that scores from the catalog equal scores from the Meal objects."""
+        np.testing.assert_array_equal(battle_scores(self.catalog.score_columns()),
+                                      battle_scores(columns_from_meals(self.meals)))
+
+    def test_columns_are_read_only(self):
+        """Test that the snapshot cannot be modified in place."""
+        with self.assertRaises(ValueError):
+            self.catalog.prices[0] = 1.0
+
+    def test_invalid_rows(self):
+        """Test that bad difficulties and repeated IDs are rejected."""
+        with self.assertRaises(ValueError):
+            MealCatalog.from_rows([(1, "Toast", "British", 2.0, "EASY", 0, 0)])
+        with self.assertRaises(ValueError):
+            MealCatalog.from_rows([(1, "Toast", "British", 2.0, "LOW", 0, 0), (1, "Tea", "British", 1.0, "LOW", 0, 0)])
+
+    def test_empty_catalog(self):
+        """Test that an empty catalog has no meals and empty score columns."""
+        catalog = MealCatalog.from_rows([])
+        self.assertEqual(list(catalog), [])
+        self.assertEqual(len(catalog.score_columns()), 0)
+
+    def test_nbytes_is_compact(self):
+        """Test that the columnar store uses well under 100 bytes per meal."""
+        self.assertLess(self.catalog.nbytes / len(self.catalog), 100)
+
+
+class test_load_meal_catalog(unittest.TestCase):
+
+    def setUp(self):
+        """Point the pool at a fresh database with a few meals."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.saved_db_path = sql_utils.DB_PATH
+        sql_utils.close_pool()
+        sql_utils.DB_PATH = os.path.join(self.tmpdir.name, "meals.sqlite")
+        kitchen_model.clear_meal_cache()
+
+        with sql_utils.get_db_connection() as conn:
+            migrations.migrate(conn)
+
+        for name, cuisine, price in [("Spaghetti", "Italian", 12.5), ("Sushi", "Japanese", 15.0),
+                                     ("Tacos", "Mexican", 8.5)]:
+            kitchen_model.create_meal(name, cuisine, price, "MED")
+        kitchen_model.record_battle_result(1, 2)
+        kitchen_model.delete_meal(3)
+
+    def tearDown(self):
+        sql_utils.close_pool()
+        sql_utils.DB_PATH = self.saved_db_path
+        self.tmpdir.cleanup()
+
+    def test_loads_active_meals_with_stats(self):
+        """Test that the catalog holds non-deleted meals and their battle counters."""
+        catalog = load_meal_catalog()
+
+        self.assertEqual(list(catalog), kitchen_model.get_active_meals())
+        self.assertEqual(catalog.battles.tolist(), [1, 1])
+        self.assertEqual(catalog.wins.tolist(), [1, 0])
+
+    def test_include_deleted(self):
+        """Test that deleted meals can be included."""
+        self.assertEqual(load_meal_catalog(include_deleted=True).ids.tolist(), [1, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
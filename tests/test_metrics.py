@@ -0,0 +1,75 @@
+import unittest
+from unittest.mock import patch
+
+from meal_max.utils import metrics
+from meal_max.utils.metrics import Counter, Gauge, Histogram, Registry, timed
+
+class test_metrics(unittest.TestCase):
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test that observations land in every bucket whose bound they do not exceed."""
+        histogram = Histogram("test_latency_seconds", "Test latency.", ("route",), buckets=(0.1, 1.0))
+        histogram.observe(0.05, route="/a")
+        histogram.observe(0.1, route="/a")
+        histogram.observe(5.0, route="/a")
+        text = histogram.render()
+        self.assertIn('test_latency_seconds_bucket{route="/a",le="0.1"} 2', text)
+        self.assertIn('test_latency_seconds_bucket{route="/a",le="1"} 2', text)
+        self.assertIn('test_latency_seconds_bucket{route="/a",le="+Inf"} 3', text)
+        self.assertIn('test_latency_seconds_count{route="/a"} 3', text)
+        self.assertIn("# TYPE test_latency_seconds histogram", text)
+
+    def test_counter_and_labels(self):
+        """Test that counters accumulate per label set and reject unknown labels."""
+        counter = Counter("test_events_total", "Test events.", ("kind",))
+        counter.inc(kind="win")
+        counter.inc(2, kind="win")
+        self.assertEqual(counter.value(kind="win"), 3)
+        with self.assertRaises(ValueError):
+            counter.inc(outcome="win")
+
+    def test_gauge_reads_callback(self):
+        """Test that gauges are read from their callback at render time."""
+        gauge = Gauge("test_connections", "Test connections.", lambda: {('idle',): 2}, ("state",))
+        self.assertIn('test_connections{state="idle"} 2', gauge.render())
+
+    def test_registry_rejects_conflicting_types(self):
+        """Test that a name cannot be registered as two kinds of metric."""
+        registry = Registry()
+        first = registry.register(Counter("test_total", "Test."))
+        self.assertIs(registry.register(Counter("test_total", "Test.")), first)
+        with self.assertRaises(ValueError):
+            registry.register(Histogram("test_total", "Test."))
+
+    def test_timed_records_calls_and_errors(self):
+        """Test that timed observes every call and counts the ones that raise."""
+        histogram = Histogram("test_call_seconds", "Test calls.", ("function",))
+        errors = Counter("test_call_errors_total", "Test errors.", ("function",))
+
+        @timed(histogram, errors, function="lookup")
+        def lookup(fail):
+            if fail:
+                raise ValueError("Meal not found")
+            return "Sushi"
+
+        self.assertEqual(lookup(False), "Sushi")
+        with self.assertRaises(ValueError):
+            lookup(True)
+        self.assertEqual(histogram.count(function="lookup"), 2)
+        self.assertEqual(errors.value(function="lookup"), 1)
+
+    @patch.object(metrics, 'METRICS_ENABLED', False)
+    def test_disabled_metrics_have_no_overhead(self):
+        """Test that with metrics disabled, timed returns the function unwrapped and observe is a no-op."""
+        histogram = Histogram("test_disabled_seconds", "Test.")
+
+        def lookup():
+            return "Sushi"
+
+        self.assertIs(timed(histogram)(lookup), lookup)
+        histogram.observe(1.0)
+        self.assertEqual(histogram.count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+import os
+import re
+import sqlite3
+import tempfile
+import unittest
+
+from meal_max.models import kitchen_model, odds
+from meal_max.utils import migrations, sql_utils
+
+LEGACY_SCHEMA = """
+CREATE TABLE meals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    meal TEXT NOT NULL UNIQUE,
+    cuisine TEXT NOT NULL,
+    price REAL NOT NULL,
+    difficulty TEXT CHECK(difficulty IN ('HIGH', 'MED', 'LOW')),
+    battles INTEGER DEFAULT 0,
+    wins INTEGER DEFAULT 0,
+    deleted BOOLEAN DEFAULT FALSE
+);
+INSERT INTO meals (meal, cuisine, price, difficulty, battles, wins) VALUES ('Sushi', 'Japanese', 15.0, 'HIGH', 4, 3);
+"""
+
+class test_migrations(unittest.TestCase):
+
+    def setUp(self):
+        """Create an empty database file."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.conn = sqlite3.connect(os.path.join(self.tmpdir.name, "meals.sqlite"))
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmpdir.cleanup()
+
+    def latest_version(self):
+        return migrations.list_migrations()[-1][0]
+
+    def object_names(self, object_type):
+        return {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = ?", (object_type,))}
+
+    def test_migrate_fresh_database(self):
+        """Test that migrating an empty database creates the full schema and records the version."""
+        version = migrations.migrate(self.conn)
+
+        self.assertEqual(version, self.latest_version())
+        self.assertEqual(migrations.get_schema_version(self.conn), version)
+        self.assertTrue({'meals', 'leaderboard'} <= self.object_names('table'))
+        self.assertIn('meals_active_catalog', self.object_names('index'))
+
+    def test_migrate_is_idempotent(self):
+        """Test that a second migrate applies nothing and keeps the version."""
+        version = migrations.migrate(self.conn)
+        self.assertEqual(migrations.migrate(self.conn), version)
+
+    def test_migrate_to_target(self):
+        """Test that migrate stops at the requested version."""
+        self.assertEqual(migrations.migrate(self.conn, target=1), 1)
+        self.assertNotIn('leaderboard', self.object_names('table'))
+
+    def test_migrate_adopts_legacy_database(self):
+        """Test that a database built by the old drop-and-recreate script is upgraded in place."""
+        self.conn.executescript(LEGACY_SCHEMA)
+        migrations.migrate(self.conn)
+
+        self.assertEqual(self.conn.execute("SELECT meal_id, battles, wins FROM leaderboard").fetchall(), [(1, 4, 3)])
+        self.assertEqual(self.conn.execute("SELECT meal_id, battles, wins FROM battle_stats_baseline").fetchall(),
+                         [(1, 4, 3)])
+
+    def test_scores_backfilled_exactly(self):
+        """Test that the score backfill matches battle_score bit for bit, and later inserts need a score."""
+        migrations.migrate(self.conn, target=7)
+        meals = [("A", "Crème brûlée", 0.29, "LOW"), ("B", "Thai", 1e-9, "MED"), ("C", "日本料理", 123456.79, "HIGH"),
+                 ("D", "X", 9.99, "LOW"), ("E", "Italian", 15, "MED")]
+        self.conn.executemany("INSERT INTO meals (meal, cuisine, price, difficulty) VALUES (?, ?, ?, ?)", meals)
+        migrations.migrate(self.conn)
+
+        stored = [row[0] for row in self.conn.execute("SELECT score FROM meals ORDER BY id")]
+        expected = [kitchen_model.battle_score(price, cuisine, difficulty) for _, cuisine, price, difficulty in meals]
+        self.assertEqual([score.hex() for score in stored], [float(score).hex() for score in expected])
+        self.assertTrue({'meals_by_score', 'meals_by_cuisine_score'} <= self.object_names('index'))
+        with self.assertRaises(sqlite3.DatabaseError):
+            self.conn.execute("INSERT INTO meals (meal, cuisine, price, difficulty) VALUES ('F', 'Thai', 5.0, 'LOW')")
+
+    def test_failed_migration_rolls_back(self):
+        """Test that a broken migration leaves the schema version unchanged."""
+        path = os.path.join(self.tmpdir.name, "migrations")
+        os.mkdir(path)
+        with open(os.path.join(path, "0001_ok.sql"), "w") as fh:
+            fh.write("CREATE TABLE a (x INTEGER);\n")
+        with open(os.path.join(path, "0002_broken.sql"), "w") as fh:
+            fh.write("CREATE TABLE b (x INTEGER);\nINSERT INTO missing VALUES (1);\n")
+
+        with self.assertRaises(sqlite3.OperationalError):
+            migrations.migrate(self.conn, path=path)
+        self.assertEqual(migrations.get_schema_version(self.conn), 1)
+        self.assertNotIn('b', self.object_names('table'))
+
+    def test_reset_database(self):
+        """Test that a reset drops every table and restarts the version at 0."""
+        migrations.migrate(self.conn)
+        migrations.reset_database(self.conn)
+
+        self.assertEqual(migrations.get_schema_version(self.conn), 0)
+        self.assertEqual(self.object_names('table') - {'sqlite_sequence'}, set())
+
+    def test_split_statements_keeps_trigger_bodies(self):
+        """Test that semicolons inside a trigger body do not split the statement."""
+        statements = migrations.split_statements(
+            "CREATE TABLE t (x);\n-- note\nCREATE TRIGGER tr AFTER INSERT ON t BEGIN\n  DELETE FROM t;\nEND;\n")
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(statements[1].endswith("END;"))
+
+class test_query_plans(unittest.TestCase):
+    """Every kitchen_model query on a request path must be served by an index, not a table scan."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.saved = (sql_utils.DB_PATH, sql_utils.DB_POOL_SIZE)
+        sql_utils.close_pool()
+        sql_utils.DB_PATH = os.path.join(self.tmpdir.name, "meals.sqlite")
+        kitchen_model.clear_meal_cache()
+        # A single pooled connection, so the trace callback sees every statement.
+        sql_utils.DB_POOL_SIZE = 1
+
+        with sql_utils.get_db_connection() as conn:
+            migrations.migrate(conn)
+            self.statements = []
+            conn.set_trace_callback(self.statements.append)
+            self.conn = conn
+
+        for name, cuisine in [("Spaghetti", "Italian"), ("Sushi", "Japanese"), ("Tacos", "Mexican")]:
+            kitchen_model.create_meal(name, cuisine, 10.0, "MED")
+
+    def tearDown(self):
+        self.conn.set_trace_callback(None)
+        sql_utils.close_pool()
+        sql_utils.DB_PATH, sql_utils.DB_POOL_SIZE = self.saved
+        self.tmpdir.cleanup()
+
+    def assert_indexed(self, func, *args, **kwargs):
+        del self.statements[:]
+        func(*args, **kwargs)
+        queries = [sql for sql in self.statements
+                   if re.match(r"\s*(SELECT|UPDATE|DELETE|INSERT)\b", sql, re.I) and sql.strip() != "SELECT 1"]
+        self.assertTrue(queries, f"{func.__name__} ran no queries")
+
+        for sql in queries:
+            plan = [row[3] for row in self.conn.execute("EXPLAIN QUERY PLAN " + sql)]
+            for detail in plan:
+                self.assertNotRegex(detail, r"^SCAN \w+$", f"{func.__name__} scans a table: {sql}")
+                self.assertNotIn("TEMP B-TREE", detail, f"{func.__name__} sorts without an index: {sql}")
+
+    def test_meal_lookups_use_indexes(self):
+        self.assert_indexed(kitchen_model.get_meal_by_id, 1)
+        self.assert_indexed(kitchen_model.get_meal_by_name, "Sushi")
+        self.assert_indexed(kitchen_model.get_active_meals)
+        self.assert_indexed(kitchen_model.get_active_meals, [1, 2])
+
+    def test_stats_updates_use_indexes(self):
+        self.assert_indexed(kitchen_model.update_meal_stats, 1, 'win')
+        self.assert_indexed(kitchen_model.record_battle_result, 1, 2)
+        self.assert_indexed(kitchen_model.record_battle_results, [(1, 2), (3, 1)])
+
+    def test_leaderboard_uses_indexes(self):
+        kitchen_model.record_battle_results([(1, 2), (3, 1)])
+        self.assert_indexed(kitchen_model.get_leaderboard, "wins")
+        self.assert_indexed(kitchen_model.get_leaderboard, "win_pct", limit=10, offset=1)
+        self.assert_indexed(kitchen_model.get_leaderboard, "rating", limit=100)
+        self.assert_indexed(kitchen_model.get_leaderboard, "wins", cuisine="Thai", difficulty="LOW", max_price=20)
+
+    def test_leaderboard_pages_use_indexes(self):
+        kitchen_model.record_battle_results([(1, 2), (3, 1)])
+        for sort_by in kitchen_model.LEADERBOARD_SORTS:
+            cursor = kitchen_model.get_leaderboard_page(sort_by, limit=1)['next_cursor']
+            self.assert_indexed(kitchen_model.get_leaderboard_page, sort_by, limit=1, cursor=cursor)
+            self.assert_indexed(kitchen_model.get_leaderboard_page, sort_by, limit=1, cursor=cursor, cuisine="Thai")
+        self.assert_indexed(kitchen_model.get_leaderboard_version)
+
+    def test_delete_uses_indexes(self):
+        self.assert_indexed(kitchen_model.delete_meal, 3)
+
+    def test_meals_by_score_use_indexes(self):
+        self.assert_indexed(kitchen_model.get_meals_by_score, limit=100)
+        self.assert_indexed(kitchen_model.get_meals_by_score, cuisine="Thai", min_score=10, max_score=50)
+        self.assert_indexed(kitchen_model.get_meals_by_score, difficulty="LOW", offset=1)
+
+    def test_odds_use_indexes(self):
+        odds.clear_score_cache()
+        self.assert_indexed(odds.get_pair_odds, 1, 2)
+        self.assert_indexed(kitchen_model.get_catalog_version)
+
+
+if __name__ == '__main__':
+    unittest.main()
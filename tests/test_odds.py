@@ -0,0 +1,130 @@
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from meal_max.models import kitchen_model, odds
+from meal_max.models.battle_model import BattleModel
+from meal_max.utils import migrations, sql_utils
+from meal_max.utils.random_source import RANDOM_GRID_SIZE
+
+class test_odds(unittest.TestCase):
+
+    def setUp(self):
+        """Point the pool at a fresh database with the meals schema and awkwardly priced meals."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.saved_db_path = sql_utils.DB_PATH
+        sql_utils.close_pool()
+        sql_utils.DB_PATH = os.path.join(self.tmpdir.name, "meals.sqlite")
+        kitchen_model.clear_meal_cache()
+        odds.clear_score_cache()
+
+        with sql_utils.get_db_connection() as conn:
+            migrations.migrate(conn)
+
+        rng = random.Random(5)
+        kitchen_model.create_meals_bulk([
+            {'meal': f"Meal {index}", 'cuisine': rng.choice(["Thai", "Italian", "Crème", "X"]),
+             'price': rng.choice([0.29, 0.3, 1.01, 9.99, 25.0, round(rng.uniform(0, 50), 2)]),
+             'difficulty': rng.choice(["LOW", "MED", "HIGH"])}
+            for index in range(60)
+        ])
+        model = BattleModel()
+        self.scores = {meal.id: model.get_battle_score(meal) for meal in kitchen_model.get_active_meals()}
+
+    def tearDown(self):
+        sql_utils.close_pool()
+        sql_utils.DB_PATH = self.saved_db_path
+        self.tmpdir.cleanup()
+
+    def first_slot_wins(self, meal_id_1, meal_id_2):
+        """Counts the random numbers with which meal_id_1 wins, by BattleModel's scalar rule."""
+        delta = abs(self.scores[meal_id_1] - self.scores[meal_id_2]) / 100
+        return sum(delta > k / RANDOM_GRID_SIZE for k in range(RANDOM_GRID_SIZE))
+
+    def test_pair_odds_are_exact(self):
+        """Test that pair odds match the battle rule over every possible random number."""
+        for meal_id_1 in self.scores:
+            for meal_id_2 in (1, 2, meal_id_1):
+                result = odds.get_pair_odds(meal_id_1, meal_id_2)
+                wins = self.first_slot_wins(meal_id_1, meal_id_2)
+                self.assertEqual(result['combatant_1']['win_probability'], wins / RANDOM_GRID_SIZE)
+                self.assertEqual(result['combatant_2']['win_probability'], (RANDOM_GRID_SIZE - wins) / RANDOM_GRID_SIZE)
+                self.assertEqual(result['combatant_1']['score'], self.scores[meal_id_1])
+
+    def test_field_odds(self):
+        """Test the per-opponent odds, their averages and paging."""
+        result = odds.get_field_odds(7, limit=1000)
+        opponents = [meal_id for meal_id in sorted(self.scores) if meal_id != 7]
+        wins = [self.first_slot_wins(7, meal_id) for meal_id in opponents]
+
+        self.assertEqual(result['opponents'], 59)
+        self.assertEqual([row['id'] for row in result['odds']], opponents)
+        self.assertEqual([row['first_slot_win_probability'] for row in result['odds']],
+                         [count / RANDOM_GRID_SIZE for count in wins])
+        self.assertAlmostEqual(result['first_slot_win_probability'], sum(wins) / (59 * RANDOM_GRID_SIZE))
+        self.assertAlmostEqual(result['first_slot_win_probability'] + result['second_slot_win_probability'], 1.0)
+
+        page = odds.get_field_odds(7, limit=5, offset=10)
+        self.assertEqual(page['odds'], result['odds'][10:15])
+        with self.assertRaises(ValueError):
+            odds.get_field_odds(7, limit=odds.ODDS_MAX_PAGE_SIZE + 1)
+
+    def test_scores_cached_until_catalog_changes(self):
+        """Test that battles reuse the cached scores while creating and deleting meals reload them."""
+        with patch("meal_max.models.odds.load_battle_scores", wraps=odds.load_battle_scores) as load:
+            odds.get_pair_odds(1, 2)
+            kitchen_model.record_battle_result(1, 2)
+            kitchen_model.update_meal_stats(3, 'win')
+            odds.get_field_odds(1)
+            self.assertEqual(load.call_count, 1)
+
+            kitchen_model.create_meal("Ramen", "Japanese", 11.0, "MED")
+            self.assertEqual(odds.get_field_odds(1)['opponents'], 60)
+            kitchen_model.delete_meal(2)
+            self.assertEqual(odds.get_field_odds(1)['opponents'], 59)
+            self.assertEqual(load.call_count, 3)
+
+        with self.assertRaises(ValueError):
+            odds.get_pair_odds(1, 2)
+
+    def test_catalog_version(self):
+        """Test that the catalog version follows meal changes, but not battles."""
+        version = kitchen_model.get_catalog_version()
+        kitchen_model.record_battle_results([(1, 2), (3, 4)])
+        self.assertEqual(kitchen_model.get_catalog_version(), version)
+        kitchen_model.delete_meal(5)
+        kitchen_model.create_meal("Ramen", "Japanese", 11.0, "MED")
+        self.assertEqual(kitchen_model.get_catalog_version(), version + 2)
+        kitchen_model.clear_meals()
+        self.assertGreater(kitchen_model.get_catalog_version(), version + 2)
+
+    def test_meal_cache_sees_other_processes(self):
+        """Test that a meal deleted outside this process's cache invalidation is dropped at the next check."""
+        kitchen_model.configure_meal_cache(enabled=True)
+        meal = kitchen_model.get_meal_by_id(3)
+        self.assertIs(kitchen_model.get_meal_by_name(meal.meal), meal)
+
+        # Another server worker's delete_meal: same database, different cache.
+        with sqlite3.connect(sql_utils.DB_PATH) as conn:
+            conn.execute("UPDATE meals SET deleted = TRUE WHERE id = 3")
+        with patch("meal_max.models.kitchen_model.get_catalog_version",
+                   wraps=kitchen_model.get_catalog_version) as get_version:
+            # Within the revalidation window, hits do not touch the database.
+            self.assertIs(kitchen_model.get_meal_by_id(3), meal)
+            get_version.assert_not_called()
+
+            later = time.monotonic() + kitchen_model.MEAL_CACHE_REVALIDATE_MS / 1000
+            with patch("meal_max.models.kitchen_model.time.monotonic", return_value=later):
+                with self.assertRaises(ValueError):
+                    kitchen_model.get_meal_by_id(3)
+                with self.assertRaises(ValueError):
+                    kitchen_model.get_meal_by_name(meal.meal)
+                self.assertIsNot(kitchen_model.get_meal_by_id(4), None)
+            get_version.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import threading
+import unittest
+from unittest.mock import AsyncMock, patch, MagicMock
+
+from meal_max.utils.random_source import LocalRandomSource, PrefetchingRandomSource, RandomSource, \
+    RemoteRandomSource, create_random_source
+from meal_max.utils.random_utils import get_random_batch
+
+class StubSource(RandomSource):
+    """A backend that returns a fixed value and can be made slow or failing."""
+
+    name = "stub"
+
+    def __init__(self, value=0.5, fail=False, gate=None):
+        self.value = value
+        self.fail = fail
+        self.gate = gate
+        self.calls = []
+
+    def get_randoms(self, count):
+        self.calls.append(count)
+        if self.gate is not None:
+            self.gate.wait()
+        if self.fail:
+            raise RuntimeError("Request to random.org failed")
+        return [self.value] * count
+
+class test_random_source(unittest.TestCase):
+
+    def test_local_source_is_reproducible(self):
+        """Test that two local sources with the same seed produce the same sequence."""
+        self.assertEqual(LocalRandomSource(7).get_randoms(50), LocalRandomSource(7).get_randoms(50))
+
+    def test_local_source_uses_two_decimal_grid(self):
+        """Test that local numbers match random.org's two-decimal [0, 1) range."""
+        numbers = LocalRandomSource(1).get_randoms(1000)
+        self.assertTrue(all(0.0 <= n < 1.0 and round(n, 2) == n for n in numbers))
+
+    @patch('meal_max.utils.random_utils.requests.get')
+    def test_get_random_batch(self, mock_get):
+        """Test that a bulk request is parsed into a list of floats."""
+        mock_get.return_value = MagicMock(text="0.12\n0.50\n0.99\n")
+        self.assertEqual(get_random_batch(3), [0.12, 0.5, 0.99])
+        self.assertIn("num=3", mock_get.call_args[0][0])
+
+    @patch('meal_max.utils.random_utils.requests.get')
+    def test_get_random_batch_short_response(self, mock_get):
+        """Test that a response with too few numbers raises a ValueError."""
+        mock_get.return_value = MagicMock(text="0.12\n")
+        with self.assertRaises(ValueError):
+            get_random_batch(2)
+
+    def test_get_random_batch_invalid_size(self):
+        """Test that batch sizes outside random.org's limits are rejected."""
+        with self.assertRaises(ValueError):
+            get_random_batch(0)
+
+    @patch('meal_max.utils.random_source.get_random_batch', return_value=[0.25, 0.75])
+    def test_remote_source_records_latency(self, mock_batch):
+        """Test that the remote source counts requests and draws."""
+        source = RemoteRandomSource()
+        self.assertEqual(source.get_randoms(2), [0.25, 0.75])
+        stats = source.stats()
+        self.assertEqual(stats['requests'], 1)
+        self.assertEqual(stats['draws'], 2)
+
+    def test_prefetch_serves_from_buffer(self):
+        """Test that the prefetching source pulls numbers from the backend in bulk."""
+        backend = StubSource(0.3)
+        source = PrefetchingRandomSource(backend, batch_size=10, low_water=2, fallback_after=1)
+        try:
+            self.assertEqual(source.get_randoms(3), [0.3, 0.3, 0.3])
+            self.assertEqual(backend.calls[0], 10)
+            self.assertEqual(source.stats()['fallback_draws'], 0)
+        finally:
+            source.close()
+
+    def test_prefetch_falls_back_when_backend_slow(self):
+        """Test that a slow backend is bypassed in favour of the fallback source."""
+        gate = threading.Event()
+        source = PrefetchingRandomSource(StubSource(gate=gate), batch_size=10, low_water=2,
+                                         fallback=StubSource(0.9), fallback_after=0.05)
+        try:
+            self.assertEqual(source.get_random(), 0.9)
+            self.assertEqual(source.stats()['fallback_draws'], 1)
+        finally:
+            gate.set()
+            source.close()
+
+    def test_prefetch_falls_back_on_failure(self):
+        """Test that a failing backend triggers the fallback without waiting out the timeout."""
+        source = PrefetchingRandomSource(StubSource(fail=True), batch_size=10, low_water=2,
+                                         fallback=StubSource(0.1), fallback_after=5)
+        try:
+            self.assertEqual(source.get_random(), 0.1)
+            self.assertGreaterEqual(source.stats()['refill_failures'], 1)
+        finally:
+            source.close()
+
+    def test_prefetch_without_fallback_raises(self):
+        """Test that a failing backend without fallback raises a RuntimeError."""
+        source = PrefetchingRandomSource(StubSource(fail=True), batch_size=10, low_water=2, fallback_after=0.05)
+        try:
+            with self.assertRaises(RuntimeError):
+                source.get_random()
+        finally:
+            source.close()
+
+    def test_prefetch_invalid_low_water(self):
+        """Test that the low-water mark must be below the batch size."""
+        with self.assertRaises(ValueError):
+            PrefetchingRandomSource(StubSource(), batch_size=10, low_water=10)
+
+    @patch.dict('os.environ', {"RANDOM_SOURCE": "local", "RANDOM_SEED": "3"})
+    def test_create_local_source_from_env(self):
+        """Test that RANDOM_SOURCE=local builds a seeded local source."""
+        source = create_random_source()
+        self.assertIsInstance(source, LocalRandomSource)
+        self.assertEqual(source.seed, 3)
+
+    @patch.dict('os.environ', {"RANDOM_SOURCE": "dice"})
+    def test_create_unknown_source(self):
+        """Test that an unknown RANDOM_SOURCE is rejected."""
+        with self.assertRaises(ValueError):
+            create_random_source()
+
+
+class test_random_source_async(unittest.IsolatedAsyncioTestCase):
+
+    async def test_local_source_async_matches_sync(self):
+        """Test that the async local path draws the same sequence as the sync path."""
+        self.assertEqual(await LocalRandomSource(7).get_randoms_async(20), LocalRandomSource(7).get_randoms(20))
+
+    async def test_default_async_runs_sync_source(self):
+        """Test that sources without an async path fall back to get_randoms in a thread."""
+        backend = StubSource(0.4)
+        self.assertEqual(await backend.get_random_async(), 0.4)
+        self.assertEqual(backend.calls, [1])
+
+    @patch('meal_max.utils.random_source.get_random_batch_async', new_callable=AsyncMock, return_value=[0.25])
+    async def test_remote_source_async_shares_session(self, mock_batch):
+        """Test that async remote draws reuse one session and record latency."""
+        source = RemoteRandomSource()
+        try:
+            self.assertEqual(await source.get_random_async(), 0.25)
+            await source.get_random_async()
+            sessions = {call.args[1] for call in mock_batch.await_args_list}
+            self.assertEqual(len(sessions), 1)
+            self.assertEqual(source.stats()['requests'], 2)
+        finally:
+            await source.aclose()
+
+    @patch('meal_max.utils.random_source.get_random_batch_async', new_callable=AsyncMock, return_value=[0.25])
+    async def test_remote_source_release_loop(self, mock_batch):
+        """Test that release_loop closes the loop's session and leaves the source usable."""
+        source = RemoteRandomSource()
+        try:
+            await source.get_random_async()
+            session = mock_batch.await_args.args[1]
+            await source.release_loop()
+            self.assertTrue(session.closed)
+            self.assertEqual(await source.get_random_async(), 0.25)
+            self.assertIsNot(mock_batch.await_args.args[1], session)
+        finally:
+            await source.aclose()
+
+    async def test_prefetch_async_serves_from_buffer(self):
+        """Test that the async prefetch path drains a filled buffer without a thread hop."""
+        source = PrefetchingRandomSource(StubSource(0.3), batch_size=10, low_water=2, fallback_after=1)
+        try:
+            source.get_random()
+            with patch('meal_max.utils.random_source.asyncio.to_thread') as mock_to_thread:
+                self.assertEqual(await source.get_randoms_async(3), [0.3, 0.3, 0.3])
+                mock_to_thread.assert_not_called()
+        finally:
+            await source.aclose()
+
+
+if __name__ == '__main__':
+    unittest.main()
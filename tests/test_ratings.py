@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+
+from meal_max.models import kitchen_model, ratings
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.tournament_model import TournamentModel
+from meal_max.utils import migrations, sql_utils
+from meal_max.utils.random_source import LocalRandomSource
+
+class test_rating_rule(unittest.TestCase):
+
+    def test_equal_ratings_exchange_half_k(self):
+        """Test that equally rated meals exchange K / 2 points."""
+        self.assertEqual(ratings.rate_battle(1500.0, 1500.0), (1516.0, 1484.0))
+
+    def test_upsets_move_more_points(self):
+        """Test that beating a stronger meal gains more than beating a weaker one, zero-sum."""
+        upset = ratings.rate_battle(1400.0, 1600.0)
+        expected = ratings.rate_battle(1600.0, 1400.0)
+        self.assertGreater(upset[0] - 1400.0, expected[0] - 1600.0)
+        for winner, loser in (upset, expected):
+            self.assertAlmostEqual(winner + loser, 3000.0)
+        self.assertAlmostEqual(ratings.expected_score(1600.0, 1400.0) + ratings.expected_score(1400.0, 1600.0), 1.0)
+
+    def test_rate_battles_in_order(self):
+        """Test that results apply in order and self-battles leave the rating alone."""
+        table = {1: 1500.0, 2: 1500.0}
+        ratings.rate_battles(table, [(1, 2), (1, 1), (2, 1)])
+        first = ratings.rate_battle(1500.0, 1500.0)
+        self.assertEqual(table, dict(zip((2, 1), ratings.rate_battle(first[1], first[0]))))
+
+
+class test_ratings_storage(unittest.TestCase):
+
+    def setUp(self):
+        """Point the pool at a fresh database with the meals schema and a few meals."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.saved_db_path = sql_utils.DB_PATH
+        sql_utils.close_pool()
+        sql_utils.DB_PATH = os.path.join(self.tmpdir.name, "meals.sqlite")
+        kitchen_model.clear_meal_cache()
+
+        with sql_utils.get_db_connection() as conn:
+            migrations.migrate(conn)
+
+        for name, cuisine, price in [("Spaghetti", "Italian", 12.5), ("Sushi", "Japanese", 15.0),
+                                     ("Tacos", "Mexican", 8.5), ("Curry", "Indian", 9.0)]:
+            kitchen_model.create_meal(name, cuisine, price, "MED")
+
+    def tearDown(self):
+        sql_utils.close_pool()
+        sql_utils.DB_PATH = self.saved_db_path
+        self.tmpdir.cleanup()
+
+    def stored(self):
+        with sql_utils.get_db_connection() as conn:
+            return dict(conn.execute("SELECT id, rating FROM meals"))
+
+    def test_battles_update_ratings(self):
+        """Test that each two-sided write path applies the rating rule, and one-sided updates do not."""
+        kitchen_model.record_battle_result(1, 2)
+        kitchen_model.record_battle_results([(3, 1), (3, 4)])
+        kitchen_model.update_meal_stats(4, 'win')
+
+        expected = {meal_id: ratings.RATING_INITIAL for meal_id in range(1, 5)}
+        ratings.rate_battles(expected, [(1, 2), (3, 1), (3, 4)])
+        self.assertEqual(self.stored(), expected)
+
+    def test_rebuild_matches_incremental(self):
+        """Test that replaying the log reproduces the incrementally maintained ratings exactly."""
+        TournamentModel(random_source=LocalRandomSource(2)).run(tournament_format="round_robin")
+        model = BattleModel(random_source=LocalRandomSource(2))
+        for first, second in [(1, 2), (2, 3), (4, 4)]:
+            model.clear_combatants()
+            model.prep_combatant(kitchen_model.get_meal_by_id(first))
+            model.prep_combatant(kitchen_model.get_meal_by_id(second))
+            model.battle()
+        incremental = self.stored()
+
+        self.assertEqual(ratings.rebuild_ratings(), {'events': 9, 'updated': 0})
+        with sql_utils.get_db_connection() as conn:
+            conn.execute("UPDATE meals SET rating = 1500.0")
+            conn.commit()
+        self.assertEqual(ratings.rebuild_ratings(), {'events': 9, 'updated': 4})
+        self.assertEqual(self.stored(), incremental)
+
+    def test_leaderboard_ranks_by_rating(self):
+        """Test the rating sort order and that the leaderboard follows rating rebuilds."""
+        kitchen_model.record_battle_results([(1, 2), (2, 3), (2, 4), (4, 3)])
+        leaderboard = kitchen_model.get_leaderboard("rating")
+        self.assertEqual([row['id'] for row in leaderboard], [2, 1, 4, 3])
+        self.assertEqual([row['rating'] for row in leaderboard],
+                         sorted((row['rating'] for row in leaderboard), reverse=True))
+
+        with sql_utils.get_db_connection() as conn:
+            conn.execute("UPDATE meals SET rating = 1500.0 WHERE id = 3")
+            conn.commit()
+        self.assertEqual(kitchen_model.get_leaderboard("rating")[2]['id'], 3)
+        ratings.rebuild_ratings()
+        self.assertEqual(kitchen_model.get_leaderboard("rating"), leaderboard)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import gzip
+import json
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from meal_max.models.kitchen_model import Meal
+from meal_max.utils import serialization
+
+class test_serialization(unittest.TestCase):
+
+    def setUp(self):
+        """Remember the active backend so every test can switch freely."""
+        self.addCleanup(serialization.set_backend, serialization.get_backend())
+        self.meal = Meal(id=1, meal="Crème brûlée", cuisine="French", price=6.5, difficulty="HIGH")
+
+    def backends(self):
+        return ['stdlib'] + (['orjson'] if serialization.orjson is not None else [])
+
+    def test_backends_agree(self):
+        """Test that every backend encodes meals, rows and NumPy values to the same JSON."""
+        payload = {'status': 'success', 'meal': self.meal, 'scores': np.array([1.5, -2.0]),
+                   'rows': [{'wins': 3, 'id': 2}], 'count': np.int64(4)}
+        expected = {'status': 'success', 'count': 4, 'scores': [1.5, -2.0], 'rows': [{'wins': 3, 'id': 2}],
+                    'meal': {'id': 1, 'meal': "Crème brûlée", 'cuisine': "French", 'price': 6.5,
+                             'difficulty': "HIGH"}}
+        for backend in self.backends():
+            serialization.set_backend(backend)
+            encoded = serialization.dumps(payload, sort_keys=True)
+            self.assertIsInstance(encoded, bytes)
+            self.assertEqual(json.loads(encoded), expected, backend)
+            self.assertEqual(serialization.loads(encoded), expected, backend)
+            self.assertIn("Crème".encode(), encoded)
+
+    def test_sort_keys_and_indent(self):
+        """Test key sorting and indentation options."""
+        for backend in self.backends():
+            serialization.set_backend(backend)
+            self.assertEqual(serialization.dumps({'b': 1, 'a': 2}, sort_keys=True), b'{"a":2,"b":1}')
+            self.assertEqual(serialization.dumps({'a': 1}, indent=True), b'{\n  "a": 1\n}')
+
+    def test_unserializable_value(self):
+        """Test that unknown types raise a TypeError on every backend."""
+        for backend in self.backends():
+            serialization.set_backend(backend)
+            with self.assertRaises(TypeError):
+                serialization.dumps({'x': object()})
+
+    def test_backend_selection(self):
+        """Test resolving 'auto', and rejecting unknown or missing backends."""
+        self.assertEqual(serialization.resolve_backend('stdlib'), 'stdlib')
+        with patch.object(serialization, 'orjson', None):
+            self.assertEqual(serialization.resolve_backend('auto'), 'stdlib')
+            with self.assertRaises(ValueError):
+                serialization.resolve_backend('orjson')
+        with self.assertRaises(ValueError):
+            serialization.resolve_backend('ujson')
+
+    def test_compress_threshold(self):
+        """Test that only bodies of at least COMPRESS_MIN_BYTES are gzipped."""
+        body = b'{"leaderboard":[' + b','.join([b'{"id":1}'] * 1000) + b']}'
+        with patch.object(serialization, 'COMPRESS_MIN_BYTES', 1024):
+            self.assertIsNone(serialization.compress(b'{}'))
+            compressed = serialization.compress(body)
+        self.assertEqual(gzip.decompress(compressed), body)
+        self.assertLess(len(compressed), len(body))
+        with patch.object(serialization, 'COMPRESS_MIN_BYTES', 0):
+            self.assertIsNone(serialization.compress(body))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from meal_max.utils.server_config import ServerConfig
+
+class test_server_config(unittest.TestCase):
+
+    @patch.dict(os.environ, {"SERVER_MODE": "Production", "WEB_CONCURRENCY": "3", "WEB_THREADS": "8",
+                             "PORT": "8080", "WEB_MAX_REQUESTS": "1000"})
+    def test_from_env(self):
+        """Test that the SERVER_* and WEB_* environment variables override the defaults."""
+        config = ServerConfig.from_env()
+        self.assertEqual(config.mode, "production")
+        self.assertEqual(config.bind, "0.0.0.0:8080")
+        self.assertEqual(config.workers, 3)
+        self.assertEqual(config.threads, 8)
+        self.assertEqual(config.max_requests, 1000)
+        self.assertEqual(config.graceful_timeout, 30)
+
+    def test_gunicorn_settings(self):
+        """Test that threaded workers use the gthread worker class."""
+        settings = ServerConfig(mode="production", workers=2, threads=4).gunicorn_settings()
+        self.assertEqual(settings['workers'], 2)
+        self.assertEqual(settings['threads'], 4)
+        self.assertEqual(settings['worker_class'], "gthread")
+        self.assertEqual(ServerConfig(threads=1).worker_class, "sync")
+
+    def test_invalid_mode(self):
+        """Test that an unknown server mode is rejected."""
+        with self.assertRaises(ValueError):
+            ServerConfig(mode="staging")
+
+    def test_invalid_workers(self):
+        """Test that at least one worker is required."""
+        with self.assertRaises(ValueError):
+            ServerConfig(workers=0)
+
+    def test_arena_store_shared_across_workers(self):
+        """Test that several workers default to the SQLite arena store and refuse the in-memory one."""
+        config = ServerConfig(mode="production", workers=2)
+        self.assertEqual(config.default_arena_store(), "sqlite")
+        with self.assertRaises(ValueError):
+            config.check_arena_store("memory")
+        config.check_arena_store("sqlite")
+
+        for single in (ServerConfig(mode="production", workers=1), ServerConfig(mode="development", workers=4)):
+            self.assertEqual(single.default_arena_store(), "memory")
+            single.check_arena_store("memory")
+
+    def test_small_pool_warns(self):
+        """Test that a pool smaller than the thread count is reported."""
+        with self.assertLogs('meal_max.utils.server_config', level='WARNING'):
+            ServerConfig(mode="production", threads=8).check_pool_size(4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from meal_max.models import kitchen_model, simulation
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.meal_catalog import MealCatalog
+from meal_max.models.simulation import BattleSimulator, wilson_interval
+from meal_max.utils import migrations, sql_utils
+
+class test_simulation(unittest.TestCase):
+
+    def setUp(self):
+        """Point the pool at a fresh database with the meals schema and a few meals."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.saved_db_path = sql_utils.DB_PATH
+        sql_utils.close_pool()
+        sql_utils.DB_PATH = os.path.join(self.tmpdir.name, "meals.sqlite")
+        kitchen_model.clear_meal_cache()
+
+        with sql_utils.get_db_connection() as conn:
+            migrations.migrate(conn)
+
+        # Scores 85.5, 119.0, 56.5 and 33.0: pair deltas from 0.235 to 0.86.
+        for name, cuisine, price, difficulty in [("Spaghetti", "Italian", 12.5, "MED"),
+                                                 ("Sushi", "Japanese", 15.0, "HIGH"),
+                                                 ("Tacos", "Mexican", 8.5, "LOW"),
+                                                 ("Curry", "Indian", 6.0, "LOW")]:
+            kitchen_model.create_meal(name, cuisine, price, difficulty)
+        kitchen_model.record_battle_result(1, 2)
+
+    def tearDown(self):
+        sql_utils.close_pool()
+        sql_utils.DB_PATH = self.saved_db_path
+        self.tmpdir.cleanup()
+
+    def snapshot(self):
+        with sql_utils.get_db_connection() as conn:
+            return (conn.execute("SELECT * FROM meals ORDER BY id").fetchall(),
+                    conn.execute("SELECT * FROM battles ORDER BY id").fetchall())
+
+    def exact_matrix(self, simulator):
+        """P(meal i in the first slot beats meal j) over every random number, from the scalar path."""
+        model = BattleModel()
+        scores = [model.get_battle_score(kitchen_model.get_meal_by_id(int(meal_id)))
+                  for meal_id in simulator.catalog.ids]
+        return np.array([[sum(abs(a - b) / 100 > k / 100 for k in range(100)) / 100 for b in scores] for a in scores])
+
+    def test_estimates_converge_to_battle_rule(self):
+        """Test that simulated odds match the battle rule within their confidence intervals."""
+        simulator = BattleSimulator(workers=1)
+        result = simulator.run(400000, matrix=True, seed=11)
+        exact = self.exact_matrix(simulator)
+        off_diagonal = ~np.eye(4, dtype=bool)
+
+        estimate, low, high = result.win_probability_matrix(z=4.0)
+        self.assertTrue(np.isnan(estimate[~off_diagonal]).all())
+        self.assertTrue(((low <= exact) & (exact <= high))[off_diagonal].all())
+
+        first, low, high = result.win_probabilities(slot=1, z=4.0)
+        field = exact.sum(axis=1) / 3
+        self.assertTrue(((low <= field) & (field <= high)).all())
+        overall = result.win_probabilities()[0]
+        self.assertTrue(np.allclose(overall, 0.5, atol=0.005))
+        self.assertEqual(result.battles, 400000)
+        self.assertEqual(int(result.pair_battles.sum()), 400000)
+
+    def test_read_only(self):
+        """Test that simulating neither writes to the database nor draws from random.org."""
+        before = self.snapshot()
+        with patch("meal_max.utils.random_utils.get_random", side_effect=AssertionError("random.org")), \
+                patch("meal_max.utils.random_utils.get_random_batch", side_effect=AssertionError("random.org")):
+            BattleSimulator(workers=1).run(10000, seed=1)
+        self.assertEqual(self.snapshot(), before)
+
+    def test_deterministic_across_workers(self):
+        """Test that a seed reproduces the same counts however chunks are spread."""
+        simulator = BattleSimulator()
+        with patch.object(simulation, "SIMULATION_CHUNK_SIZE", 3000):
+            simulator.workers = 1
+            serial = simulator.run(10000, meal_ids=[4, 2, 3], matrix=True, seed=5)
+            simulator.workers = 2
+            parallel = simulator.run(10000, meal_ids=[4, 2, 3], matrix=True, seed=serial.seed)
+        self.assertEqual(serial.meal_ids.tolist(), [4, 2, 3])
+        for field in ("first_battles", "first_wins", "second_battles", "second_wins", "pair_battles", "pair_wins"):
+            self.assertTrue(np.array_equal(getattr(serial, field), getattr(parallel, field)), field)
+
+    def test_catalog_without_database(self):
+        """Test that a given catalog is simulated as is."""
+        catalog = MealCatalog.from_rows([(7, "A", "Thai", 40.0, "LOW", 0, 0), (9, "B", "Thai", 10.0, "LOW", 0, 0)])
+        result = BattleSimulator(catalog, workers=1).run(1000, seed=2)
+        # Scores 157 and 37: the first slot always wins.
+        self.assertEqual(result.first_wins.tolist(), result.first_battles.tolist())
+        self.assertEqual(result.second_wins.tolist(), [0, 0])
+
+    def test_invalid_runs(self):
+        """Test that invalid fields and sizes are rejected."""
+        simulator = BattleSimulator(workers=1)
+        for kwargs in ({'battles': 0}, {'battles': 10, 'meal_ids': [1]}, {'battles': 10, 'meal_ids': [1, 1]},
+                       {'battles': 10, 'meal_ids': [1, 99]}):
+            with self.assertRaises(ValueError):
+                simulator.run(**kwargs)
+        with patch.object(simulation, "SIMULATION_MAX_MATRIX_MEALS", 3), self.assertRaises(ValueError):
+            simulator.run(10, matrix=True)
+        with self.assertRaises(ValueError):
+            simulator.run(10).win_probability_matrix()
+
+    def test_wilson_interval(self):
+        """Test the interval against known values, and its edges."""
+        estimate, low, high = wilson_interval(np.array([50, 0, 0]), np.array([100, 10, 0]))
+        self.assertAlmostEqual(low[0], 0.4038, places=4)
+        self.assertAlmostEqual(high[0], 0.5962, places=4)
+        self.assertEqual((estimate[1], low[1]), (0.0, 0.0))
+        self.assertGreater(high[1], 0.0)
+        self.assertTrue(np.isnan(estimate[2]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from meal_max.models.kitchen_model import Meal
+from meal_max.models.tournament_model import TournamentModel
+from meal_max.utils.random_source import LocalRandomSource
+
+class test_tournament_model(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a catalog of meals and a seeded tournament."""
+        self.meals = [
+            Meal(id=1, meal="Spaghetti", cuisine="Italian", price=12.5, difficulty="MED"),
+            Meal(id=2, meal="Sushi", cuisine="Japanese", price=15.0, difficulty="HIGH"),
+            Meal(id=3, meal="Tacos", cuisine="Mexican", price=8.5, difficulty="LOW"),
+            Meal(id=4, meal="Ramen", cuisine="Japanese", price=11.0, difficulty="MED"),
+            Meal(id=5, meal="Curry", cuisine="Indian", price=9.0, difficulty="LOW"),
+        ]
+        self.tournament_model = TournamentModel(random_source=LocalRandomSource(1))
+
+        patcher = patch('meal_max.models.tournament_model.get_active_meals', return_value=self.meals)
+        self.mock_get_active_meals = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch('meal_max.models.tournament_model.record_battle_results')
+        self.mock_record_battle_results = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_round_robin_plays_every_pair(self):
+        """Test that a round robin plays each pair once and records all results together."""
+        result = self.tournament_model.run(tournament_format="round_robin")
+
+        self.assertEqual(result['battles'], 10)
+        self.mock_record_battle_results.assert_called_once()
+        recorded = self.mock_record_battle_results.call_args[0][0]
+        self.assertEqual({frozenset(pair) for pair in recorded}, {frozenset((a, b)) for a in range(1, 6)
+                                                                   for b in range(a + 1, 6)})
+        self.assertEqual(sum(row['wins'] for row in result['standings']), 10)
+
+    def test_round_robin_balances_first_slot(self):
+        """Test that every meal takes the deciding first slot about half the time."""
+        pairings = TournamentModel.schedule_round_robin([1, 2, 3, 4, 5])
+        first_slots = [first for first, _ in pairings]
+        for meal_id in range(1, 6):
+            self.assertEqual(first_slots.count(meal_id), 2)
+
+    def test_knockout_crowns_one_champion(self):
+        """Test that a knockout of N meals plays N - 1 battles and names the unbeaten meal."""
+        result = self.tournament_model.run(tournament_format="knockout")
+
+        self.assertEqual(result['battles'], 4)
+        recorded = self.mock_record_battle_results.call_args[0][0]
+        losers = {loser for _, loser in recorded}
+        self.assertEqual(len(losers), 4)
+        self.assertNotIn(result['champion'], losers)
+
+    def test_swiss_avoids_rematches(self):
+        """Test that Swiss rounds pair meals without repeating a matchup when possible."""
+        result = self.tournament_model.run(tournament_format="swiss", rounds=3)
+
+        self.assertEqual(result['battles'], 6)
+        recorded = self.mock_record_battle_results.call_args[0][0]
+        self.assertEqual(len({frozenset(pair) for pair in recorded}), 6)
+
+    def test_randomness_drawn_in_one_request(self):
+        """Test that the whole tournament draws its random numbers with a single call."""
+        source = MagicMock()
+        source.get_randoms.return_value = [0.5] * 10
+        TournamentModel(random_source=source).run(tournament_format="round_robin")
+        source.get_randoms.assert_called_once_with(10)
+
+    def test_dry_run_does_not_record(self):
+        """Test that record=False leaves the meals table untouched."""
+        self.tournament_model.run(tournament_format="knockout", record=False)
+        self.mock_record_battle_results.assert_not_called()
+
+    def test_invalid_format(self):
+        """Test that an unknown format raises a ValueError."""
+        with self.assertRaises(ValueError):
+            self.tournament_model.run(tournament_format="ladder")
+
+    def test_not_enough_meals(self):
+        """Test that a tournament needs at least two meals."""
+        self.mock_get_active_meals.return_value = self.meals[:1]
+        with self.assertRaises(ValueError):
+            self.tournament_model.run()
+
+
+    def test_battle_limit(self):
+        """Test that a tournament over the battle limit is refused before any battle is played."""
+        source = MagicMock()
+        tournament_model = TournamentModel(random_source=source)
+        with patch('meal_max.models.tournament_model.TOURNAMENT_MAX_BATTLES', 9):
+            # Five meals play 10 round robin battles, 4 knockout battles and 2 per Swiss round.
+            with self.assertRaises(ValueError):
+                tournament_model.run(tournament_format="round_robin")
+            with self.assertRaises(ValueError):
+                tournament_model.run(tournament_format="swiss", rounds=5)
+            source.get_randoms.assert_not_called()
+            self.mock_record_battle_results.assert_not_called()
+
+            self.assertEqual(self.tournament_model.run(tournament_format="swiss", rounds=4)['battles'], 8)
+
+if __name__ == '__main__':
+    unittest.main()